@@ -0,0 +1,120 @@
+// Edge cache purge trigger for Google Apps Script
+// Generated by the Blog Template Generator - posts a signed purge message to the
+// deployed worker(s) whenever the sheet content really changes.
+//
+// Setup: paste into Extensions > Apps Script, then run installPurgeTriggers() once.
+// Simple onEdit triggers cannot call UrlFetchApp, so installable triggers are used.
+
+const PURGE_WORKER_URLS = {{WORKER_URLS}};
+const PURGE_SHEETS = {{SHEET_NAMES}};
+const PURGE_DEBOUNCE_SECONDS = {{DEBOUNCE_SECONDS}};
+
+function installPurgeTriggers() {
+  // Store the shared secret and (re)create the installable triggers
+  PropertiesService.getScriptProperties().setProperty('PURGE_SECRET', '{{PURGE_SECRET}}');
+
+  ScriptApp.getProjectTriggers().forEach(trigger => {
+    const handler = trigger.getHandlerFunction();
+    if (handler === 'onSheetEdit' || handler === 'onSheetChange' || handler === 'flushPendingPurge') {
+      ScriptApp.deleteTrigger(trigger);
+    }
+  });
+
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  ScriptApp.newTrigger('onSheetEdit').forSpreadsheet(spreadsheet).onEdit().create();
+  ScriptApp.newTrigger('onSheetChange').forSpreadsheet(spreadsheet).onChange().create();
+  console.log('Purge triggers installed for ' + PURGE_WORKER_URLS.length + ' worker(s)');
+}
+
+function onSheetEdit(e) {
+  // Cell edits: only watched sheets, and only when the value actually changed
+  try {
+    const sheetName = e.range.getSheet().getName();
+    if (!isWatchedSheet(sheetName)) return;
+    if (e.value !== undefined && e.oldValue !== undefined && e.value === e.oldValue) return;
+
+    requestPurge(sheetName, 'edit');
+  } catch (error) {
+    console.error('Error in onSheetEdit:', error);
+  }
+}
+
+function onSheetChange(e) {
+  // Structural changes; cell edits are handled by onSheetEdit and formatting is ignored
+  try {
+    const structural = ['INSERT_ROW', 'REMOVE_ROW', 'INSERT_COLUMN', 'REMOVE_COLUMN', 'INSERT_GRID', 'REMOVE_GRID', 'OTHER'];
+    if (structural.indexOf(e.changeType) === -1) return;
+
+    requestPurge('*', e.changeType.toLowerCase());
+  } catch (error) {
+    console.error('Error in onSheetChange:', error);
+  }
+}
+
+function isWatchedSheet(sheetName) {
+  return PURGE_SHEETS.length === 0 || PURGE_SHEETS.indexOf(sheetName) !== -1;
+}
+
+function requestPurge(sheetName, reason) {
+  // Coalesce bursts (paste, fill-down): one purge now, one more after the burst
+  const cache = CacheService.getScriptCache();
+  if (cache.get('purge-sent')) {
+    if (!cache.get('purge-scheduled')) {
+      cache.put('purge-scheduled', '1', PURGE_DEBOUNCE_SECONDS);
+      ScriptApp.newTrigger('flushPendingPurge').timeBased().after(PURGE_DEBOUNCE_SECONDS * 1000).create();
+    }
+    return;
+  }
+  sendPurge(sheetName, reason);
+}
+
+function flushPendingPurge() {
+  // One-shot time trigger created by requestPurge
+  ScriptApp.getProjectTriggers().forEach(trigger => {
+    if (trigger.getHandlerFunction() === 'flushPendingPurge') {
+      ScriptApp.deleteTrigger(trigger);
+    }
+  });
+  CacheService.getScriptCache().remove('purge-scheduled');
+  sendPurge('*', 'debounced');
+}
+
+function sendPurge(sheetName, reason) {
+  // Sign "<timestamp>.<body>" with HMAC-SHA256 and POST it to every worker
+  const secret = PropertiesService.getScriptProperties().getProperty('PURGE_SECRET');
+  if (!secret) {
+    console.error('PURGE_SECRET missing - run installPurgeTriggers() first');
+    return;
+  }
+
+  const timestamp = Math.floor(Date.now() / 1000).toString();
+  const body = JSON.stringify({
+    spreadsheetId: SpreadsheetApp.getActiveSpreadsheet().getId(),
+    sheet: sheetName,
+    reason: reason,
+    editedAt: new Date().toISOString()
+  });
+  const signature = Utilities.computeHmacSha256Signature(timestamp + '.' + body, secret)
+    .map(byte => ('0' + (byte & 0xff).toString(16)).slice(-2))
+    .join('');
+
+  PURGE_WORKER_URLS.forEach(workerUrl => {
+    try {
+      const response = UrlFetchApp.fetch(workerUrl.replace(/\/$/, '') + '/__purge', {
+        method: 'post',
+        contentType: 'application/json',
+        payload: body,
+        headers: {
+          'X-Purge-Timestamp': timestamp,
+          'X-Purge-Signature': signature
+        },
+        muteHttpExceptions: true
+      });
+      console.log('Purge ' + workerUrl + ': ' + response.getResponseCode());
+    } catch (error) {
+      console.error('Purge failed for ' + workerUrl + ':', error);
+    }
+  });
+
+  CacheService.getScriptCache().put('purge-sent', '1', PURGE_DEBOUNCE_SECONDS);
+}
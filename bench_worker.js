@@ -0,0 +1,179 @@
+#!/usr/bin/env node
+// Local load harness for generated Cloudflare Workers scripts.
+//
+// Runs each worker in a Node vm with a simulated Google Sheets upstream and
+// browser round-trip time, and reports time to first contentful post: the
+// time until the browser holds the first post, counting the /api/posts
+// round-trip an empty homepage shell needs, and time to first byte of the
+// homepage (streamed workers send the shell before the snapshot is ready).
+// Cold = fresh isolate, warm = snapshot already cached. The CSV body arrives
+// in 16 KB chunks; parse ms is the worker's own CSV parse time (cold).
+// Startup ms is isolate cold start: compiling the script and running its top
+// level in a fresh context (a new filename per run defeats V8's in-process
+// compilation cache). --startup measures only that, no page views.
+//
+// usage: node bench_worker.js worker.js [other-worker.js ...]
+//            [--rows 200] [--rtt 40] [--upstream 120] [--runs 10] [--startup] [--json]
+
+const fs = require('fs')
+const vm = require('vm')
+
+function parseArgs(argv) {
+    const options = { rows: 200, rtt: 40, upstream: 120, runs: 10, json: false, startup: false, workers: [] }
+    for (let i = 0; i < argv.length; i++) {
+        const arg = argv[i]
+        if (arg === '--json' || arg === '--startup') options[arg.slice(2)] = true
+        else if (arg.startsWith('--')) options[arg.slice(2)] = Number(argv[++i])
+        else options.workers.push(arg)
+    }
+    return options
+}
+
+function sampleCsv(rows) {
+    const lines = ['id,title,slug,content,category,tags,author,date,status']
+    for (let i = 0; i < rows; i++) {
+        lines.push(`${i + 1},Post ${i},post-${i},"Isi artikel ${i}, cukup panjang untuk kartu.",Tech,"sheets, blog",Admin,2025-01-${String(i % 28 + 1).padStart(2, '0')},published`)
+    }
+    return lines.join('\n') + '\n'
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms))
+
+function chunkedBody(text, size = 16 * 1024) {
+    const bytes = new TextEncoder().encode(text)
+    let offset = 0
+    return new ReadableStream({
+        pull(controller) {
+            if (offset >= bytes.length) return controller.close()
+            controller.enqueue(bytes.subarray(offset, offset + size))
+            offset += size
+        }
+    })
+}
+
+let loads = 0
+
+function loadWorker(source, csv, upstreamMs) {
+    let handler = null
+    const context = {
+        console: { log() {}, error() {}, warn() {} },
+        URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream,
+        CompressionStream: typeof CompressionStream !== 'undefined' ? CompressionStream : undefined,
+        AbortController, performance, setTimeout, clearTimeout, atob, btoa, crypto, structuredClone,
+        addEventListener: (type, fn) => { handler = fn },
+        fetch: async () => {
+            await sleep(upstreamMs)
+            return new Response(chunkedBody(csv), { status: 200, headers: { 'Content-Type': 'text/csv' } })
+        }
+    }
+    context.globalThis = context
+    context.self = context
+    vm.createContext(context)
+    const start = performance.now()
+    new vm.Script(source, { filename: `worker-${++loads}.js` }).runInContext(context)
+    const startupMs = performance.now() - start
+    const request = async path => {
+        const start = performance.now()
+        let response
+        await handler({ request: new Request('https://bench.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        response = await response
+        const reader = response.body.getReader()
+        const decoder = new TextDecoder()
+        let text = ''
+        let firstByteMs = null
+        for (let chunk = await reader.read(); !chunk.done; chunk = await reader.read()) {
+            if (firstByteMs === null) firstByteMs = performance.now() - start
+            text += decoder.decode(chunk.value, { stream: true })
+        }
+        return { text: text + decoder.decode(), firstByteMs }
+    }
+    request.parseMs = () => {
+        const { parseMs } = vm.runInContext('getMetricsSnapshot()', context)
+        return parseMs.count ? parseMs.mean * parseMs.count : 0
+    }
+    request.startupMs = startupMs
+    return request
+}
+
+// One page view: GET /, plus GET /api/posts when the first post is not in the HTML
+async function pageView(request, rttMs, firstTitle) {
+    const start = performance.now()
+    await sleep(rttMs)
+    const { text, firstByteMs } = await request('/')
+    const ttfb = rttMs + firstByteMs
+    let roundTrips = 1
+    if (!text.includes(firstTitle)) {
+        await sleep(rttMs)
+        await request('/api/posts')
+        roundTrips += 1
+    }
+    return { ms: performance.now() - start, ttfb, roundTrips }
+}
+
+const median = values => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)]
+
+async function benchWorker(path, options) {
+    const source = fs.readFileSync(path, 'utf8')
+    const csv = sampleCsv(options.rows)
+    const cold = []
+    const warm = []
+    const ttfb = []
+    const parse = []
+    const startup = []
+    let roundTrips = 0
+    for (let run = 0; run < options.runs; run++) {
+        const request = loadWorker(source, csv, options.upstream)
+        startup.push(request.startupMs)
+        if (options.startup) continue
+        const first = await pageView(request, options.rtt, 'Post 0')
+        cold.push(first.ms)
+        ttfb.push(first.ttfb)
+        roundTrips = first.roundTrips
+        parse.push(request.parseMs())
+        warm.push((await pageView(request, options.rtt, 'Post 0')).ms)
+    }
+    if (options.startup) {
+        return { worker: path, scriptBytes: Buffer.byteLength(source), startupMs: Number(median(startup).toFixed(2)) }
+    }
+    return {
+        worker: path,
+        scriptBytes: Buffer.byteLength(source),
+        startupMs: Number(median(startup).toFixed(2)),
+        roundTrips,
+        coldTtfbMs: Number(median(ttfb).toFixed(1)),
+        coldMs: Number(median(cold).toFixed(1)),
+        warmMs: Number(median(warm).toFixed(1)),
+        parseMs: Number(median(parse).toFixed(1))
+    }
+}
+
+async function main() {
+    const options = parseArgs(process.argv.slice(2))
+    if (!options.workers.length) {
+        console.error('usage: node bench_worker.js worker.js [...] [--rows N] [--rtt MS] [--upstream MS] [--runs N] [--startup] [--json]')
+        process.exit(2)
+    }
+    const results = []
+    for (const path of options.workers) results.push(await benchWorker(path, options))
+
+    if (options.json) {
+        console.log(JSON.stringify({ options: { rows: options.rows, rtt: options.rtt, upstream: options.upstream, runs: options.runs }, results }, null, 2))
+        return
+    }
+    if (options.startup) {
+        console.log(`runs=${options.runs} (median)`)
+        console.log('worker'.padEnd(40) + 'bytes'.padStart(10) + 'startup ms'.padStart(12))
+        for (const result of results) console.log(result.worker.padEnd(40) + String(result.scriptBytes).padStart(10) + String(result.startupMs).padStart(12))
+        return
+    }
+    console.log(`rows=${options.rows} rtt=${options.rtt}ms upstream=${options.upstream}ms runs=${options.runs} (median)`)
+    console.log('worker'.padEnd(40) + 'round-trips'.padStart(12) + 'cold ttfb'.padStart(10) + 'cold ms'.padStart(10) + 'warm ms'.padStart(10) + 'parse ms'.padStart(10) + 'startup ms'.padStart(12))
+    for (const result of results) {
+        console.log(result.worker.padEnd(40) + String(result.roundTrips).padStart(12) + String(result.coldTtfbMs).padStart(10) + String(result.coldMs).padStart(10) + String(result.warmMs).padStart(10) + String(result.parseMs).padStart(10) + String(result.startupMs).padStart(12))
+    }
+}
+
+main().catch(error => {
+    console.error(error)
+    process.exit(1)
+})
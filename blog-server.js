@@ -1,5 +1,6 @@
 // Blog Server - Menghubungkan Google Sheets dengan Template Blog
 const express = require('express');
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 
@@ -138,6 +139,12 @@ async function getGoogleSheetsData() {
     }
 }
 
+// Snippet watchDataVersion hanya ada satu: change_detector.VERSION_WATCH_CLIENT_JS
+function versionWatchClient() {
+    const source = fs.readFileSync(path.join(__dirname, 'change_detector.py'), 'utf8');
+    return source.match(/^VERSION_WATCH_CLIENT_JS = """\n([\s\S]*?)"""/m)[1];
+}
+
 // Route untuk halaman blog utama
 app.get('/', async (req, res) => {
     try {
@@ -148,7 +155,8 @@ app.get('/', async (req, res) => {
             .replace(/\{\{site_title\}\}/g, BLOG_CONFIG.site_title)
             .replace(/\{\{site_description\}\}/g, BLOG_CONFIG.site_description)
             .replace(/\{\{site_keywords\}\}/g, BLOG_CONFIG.site_keywords)
-            .replace(/\{\{current_year\}\}/g, BLOG_CONFIG.current_year);
+            .replace(/\{\{current_year\}\}/g, BLOG_CONFIG.current_year)
+            .replace('/*{{VERSION_WATCH_CLIENT}}*/', () => versionWatchClient());
         
         res.send(html);
     } catch (error) {
@@ -444,6 +452,40 @@ app.get('/tag/:tag', async (req, res) => {
     }
 });
 
+// Version token cached for VERSION_TTL_MS: every browser polls /api/version,
+// but the sheet is downloaded at most once per TTL (concurrent polls share it)
+const VERSION_TTL_MS = Number(process.env.VERSION_TTL_MS) || 30 * 1000;
+let versionCache = null;
+
+async function getDataVersion() {
+    if (versionCache && Date.now() < versionCache.expires) {
+        return versionCache.pending;
+    }
+    const pending = getGoogleSheetsData().then(posts => ({
+        version: crypto.createHash('sha256').update(JSON.stringify(posts)).digest('hex').slice(0, 12),
+        total: posts.length
+    }));
+    versionCache = { pending, expires: Date.now() + VERSION_TTL_MS };
+    pending.catch(() => { versionCache = null; });
+    return pending;
+}
+
+// Data version endpoint - browsers poll this instead of reloading all posts
+app.get('/api/version', async (req, res) => {
+    try {
+        const { version, total } = await getDataVersion();
+        res.set('Cache-Control', 'no-store');
+        res.json({ version, total });
+    } catch (error) {
+        console.error('Error computing data version:', error);
+        res.status(500).json({
+            success: false,
+            message: 'Error computing data version',
+            error: error.message
+        });
+    }
+});
+
 // Health check endpoint
 app.get('/health', (req, res) => {
     res.json({
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Headless build and deploy for one or many blogs, without Streamlit.
+
+    python blog_cli.py snapshot sites/*.json
+    python blog_cli.py build --jobs 4 sites/*.json
+    python blog_cli.py deploy --json app_config.json
+    python blog_cli.py bench app_config.json
+
+Each site is a JSON file with the same keys as the UI's app_config.json
+(app_config.json itself when no file is given). Builds go to <out>/<site>/
+and are skipped when the snapshot version, settings and generator sources
+are unchanged. Each build reports the worker's size (raw and gzip), the
+shared runtime version and the measured isolate cold start (needs node).
+Snapshots and the image cache are shared with the UI.
+With --json every site prints one JSON line with per-stage timings in ms.
+The pipeline is only imported once a command runs, so --help stays instant.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = 'app_config.json'
+
+
+def load_site(path):
+    """(site name, config dict) for a site config file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    name = config.get('site_name') or os.path.splitext(os.path.basename(path))[0]
+    return name, config
+
+
+@lru_cache(maxsize=None)
+def snapshot_store():
+    """One store (and lock) for every job in this run"""
+    import site_pipeline
+    return site_pipeline.get_snapshot_store()
+
+
+def run_snapshot(name, config, args):
+    import site_pipeline
+
+    start = time.perf_counter()
+    store = snapshot_store()
+    previous = store.versions(site_pipeline.snapshot_key(config))
+    success, snapshot, message = site_pipeline.load_sheet_snapshot(config, store, refresh=True)
+    result = {'site': name, 'ok': success, 'message': message,
+              'timings': {'total': round((time.perf_counter() - start) * 1000, 1)}}
+    if success:
+        result.update(version=snapshot['version'], rows=len(snapshot['rows']),
+                      changed=not previous or previous[0]['version'] != snapshot['version'])
+    return result
+
+
+def run_build(name, config, args):
+    import site_pipeline
+
+    return site_pipeline.build_site(config, os.path.join(args.out, name), name, store=snapshot_store(),
+                                    refresh=args.refresh, force=args.force)
+
+
+def run_deploy(name, config, args):
+    import site_pipeline
+
+    return site_pipeline.deploy_site(config, os.path.join(args.out, name), name, store=snapshot_store(),
+                                     refresh=args.refresh, force=args.force)
+
+
+def run_bench(name, config, args):
+    result = run_build(name, config, args)
+    node = shutil.which('node')
+    if not result['ok']:
+        return result
+    if node is None:
+        return dict(result, ok=False, message="node tidak tersedia")
+    completed = subprocess.run(
+        [node, os.path.join(ROOT, 'bench_worker.js'), os.path.join(result['out_dir'], 'worker.js'),
+         '--runs', str(args.runs), '--rows', str(result.get('rows') or 200), '--json'],
+        capture_output=True, text=True, timeout=600,
+    )
+    if completed.returncode != 0:
+        return dict(result, ok=False, message=completed.stderr.strip()[-500:])
+    return dict(result, bench=json.loads(completed.stdout)['results'][0], message="Benchmarked")
+
+
+COMMANDS = {'snapshot': run_snapshot, 'build': run_build, 'deploy': run_deploy, 'bench': run_bench}
+
+
+def run_site(command, path, args):
+    try:
+        name, config = load_site(path)
+    except (OSError, ValueError) as e:
+        return {'site': path, 'ok': False, 'message': f"Cannot read config: {e}"}
+    try:
+        return COMMANDS[command](name, config, args)
+    except Exception as e:
+        return {'site': name, 'ok': False, 'message': f"{type(e).__name__}: {e}"}
+
+
+def format_result(result):
+    status = 'ok' if result['ok'] else 'FAILED'
+    if result.get('cached'):
+        status = 'cached'
+    total = result.get('timings', {}).get('total')
+    line = f"[{status}] {result['site']}: {result.get('message', '')}"
+    if result.get('url'):
+        line += f" -> {result['url']}"
+    outputs = result.get('outputs') or {}
+    if outputs.get('worker_bytes') and not result.get('cached'):
+        line += f" (worker {outputs['worker_bytes']} bytes, {outputs.get('worker_gzip_bytes')} gzip, runtime {outputs.get('runtime_version')}"
+        line += f", cold start {outputs['cold_start_ms']} ms)" if outputs.get('cold_start_ms') is not None else ")"
+    if result.get('bench'):
+        bench = result['bench']
+        line += f" (ttfb {bench['coldTtfbMs']} ms, first post {bench['coldMs']} ms, parse {bench['parseMs']} ms, startup {bench['startupMs']} ms, {bench['scriptBytes']} bytes)"
+    return line + (f" [{total} ms]" if total is not None else "")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build and deploy Google Sheets blogs without the Streamlit UI")
+    parser.add_argument('command', choices=sorted(COMMANDS), help="snapshot: fetch sheets; build: generate dist/<site>; deploy: build + upload; bench: build + local load test")
+    parser.add_argument('sites', nargs='*', help=f"site config files (default: {DEFAULT_CONFIG})")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="sites processed in parallel")
+    parser.add_argument('--out', default='dist', help="output directory, one subdirectory per site")
+    parser.add_argument('--refresh', action='store_true', help="fetch the sheet even when a snapshot is stored")
+    parser.add_argument('--force', action='store_true', help="rebuild and redeploy even when nothing changed")
+    parser.add_argument('--runs', type=int, default=5, help="bench: runs per worker")
+    parser.add_argument('--json', action='store_true', help="one JSON object per site (JSON Lines)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_intermixed_args(argv)
+    sites = args.sites or [DEFAULT_CONFIG]
+    jobs = max(1, min(args.jobs, len(sites)))
+
+    # Build stages are network and process-pool bound, so threads are enough to overlap sites
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_site, args.command, path, args) for path in sites]
+        failures = 0
+        for future in futures:
+            result = future.result()
+            failures += not result['ok']
+            print(json.dumps(result, default=str) if args.json else format_result(result), flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
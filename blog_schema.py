@@ -0,0 +1,160 @@
+"""
+Declarative schema for the blog sheet (see sample-spreadsheet-structure.md).
+
+validate_rows maps header aliases onto the canonical columns, fills
+defaults, coerces `date` to ISO dates, splits `tags` into lists and
+normalizes `status` in one vectorized pandas pass. Rows that cannot be
+repaired are quarantined with their reasons instead of being silently
+dropped, so renderers can rely on every column being present and typed.
+"""
+
+from datetime import date
+
+import pandas as pd
+
+# column -> aliases (compared after lower-casing, trimming and spaces -> "_"),
+# whether the row is invalid without it, default for empty cells, and type
+BLOG_SCHEMA = {
+    'id': {'aliases': ['no', 'post_id'], 'required': False, 'default': None, 'type': 'id'},
+    'title': {'aliases': ['name', 'item', 'judul', 'post_title'], 'required': True, 'default': '', 'type': 'text'},
+    'slug': {'aliases': ['permalink', 'url_slug'], 'required': False, 'default': None, 'type': 'slug'},
+    'content': {'aliases': ['description', 'details', 'body', 'konten', 'isi'], 'required': True, 'default': '', 'type': 'text'},
+    'category': {'aliases': ['type', 'kategori', 'categories'], 'required': False, 'default': 'Uncategorized', 'type': 'text'},
+    'tags': {'aliases': ['tag', 'keywords', 'label', 'labels'], 'required': False, 'default': '', 'type': 'list'},
+    'author': {'aliases': ['penulis', 'writer', 'by'], 'required': False, 'default': 'Admin', 'type': 'text'},
+    'date': {'aliases': ['tanggal', 'published_at', 'publish_date', 'created_at'], 'required': False, 'default': 'today', 'type': 'date'},
+    'status': {'aliases': ['state', 'publish_status'], 'required': False, 'default': 'published', 'type': 'status'},
+    'meta_description': {'aliases': ['meta', 'seo_description', 'description_meta'], 'required': False, 'default': '', 'type': 'text'},
+    'featured_image': {'aliases': ['image', 'thumbnail', 'gambar', 'image_url'], 'required': False, 'default': '', 'type': 'text'},
+    'excerpt': {'aliases': ['summary', 'ringkasan'], 'required': False, 'default': '', 'type': 'text'},
+}
+
+STATUS_VALUES = ['published', 'draft', 'scheduled', 'private']
+STATUS_ALIASES = {
+    'publish': 'published', 'public': 'published', 'live': 'published', 'terbit': 'published', 'aktif': 'published',
+    'drafts': 'draft', 'draf': 'draft', 'konsep': 'draft',
+    'schedule': 'scheduled', 'terjadwal': 'scheduled',
+    'hidden': 'private', 'privat': 'private',
+}
+
+
+def normalize_header(header):
+    return '_'.join(str(header).strip().lower().split())
+
+
+class ValidationResult:
+    """Valid rows (canonical columns) plus quarantined rows with reasons"""
+
+    def __init__(self, rows, quarantined, renamed, missing_columns):
+        self.rows = rows
+        self.quarantined = quarantined
+        self.renamed = renamed
+        self.missing_columns = missing_columns
+
+    def summary(self):
+        return {
+            'valid': len(self.rows),
+            'quarantined': len(self.quarantined),
+            'renamed': self.renamed,
+            'missing_columns': self.missing_columns,
+        }
+
+
+def _slugify(series):
+    return series.str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-')
+
+
+def validate_rows(rows, schema=BLOG_SCHEMA):
+    """Normalize sheet rows against `schema`, returns a ValidationResult
+
+    Required columns that are absent from the header altogether (e.g.
+    `content` when only LIST_COLUMNS were fetched) are reported in
+    missing_columns but not enforced per row. Unknown columns are kept.
+    """
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return ValidationResult([], [], {}, [c for c, spec in schema.items() if spec['required']])
+
+    # Header aliases -> canonical names (an exact canonical header always wins)
+    lookup = {}
+    for column, spec in schema.items():
+        for alias in spec['aliases']:
+            lookup.setdefault(alias, column)
+    for column in schema:
+        lookup[column] = column
+    renamed, taken = {}, set()
+    normalized = {header: normalize_header(header) for header in df.columns}
+    for header in sorted(df.columns, key=lambda h: normalized[h] not in schema):
+        target = lookup.get(normalized[header])
+        if target and target not in taken:
+            taken.add(target)
+            if header != target:
+                renamed[header] = target
+    df = df.rename(columns=renamed)
+
+    present = set(df.columns)
+    missing_columns = [column for column, spec in schema.items() if spec['required'] and column not in present]
+    for column in schema:
+        if column not in present:
+            df[column] = ''
+
+    for column in df.columns:
+        if column not in schema:
+            df[column] = df[column].fillna('')
+    text_columns = [column for column in df.columns if column in schema]
+    df[text_columns] = df[text_columns].fillna('').astype(str).apply(lambda s: s.str.strip())
+
+    reasons = pd.DataFrame(index=df.index)
+    for column, spec in schema.items():
+        if spec['required'] and column in present:
+            reasons[f'missing {column}'] = df[column] == ''
+
+    today = date.today().isoformat()
+    for column, spec in schema.items():
+        kind, default = spec['type'], spec['default']
+        values = df[column]
+        empty = values == ''
+
+        if kind == 'date':
+            parsed = pd.to_datetime(values.where(~empty), errors='coerce', format='mixed')
+            reasons[f'invalid {column}'] = ~empty & parsed.isna()
+            iso = parsed.dt.strftime('%Y-%m-%d')
+            df[column] = iso.where(~empty, today if default == 'today' else (default or ''))
+        elif kind == 'status':
+            status = values.str.lower().replace(STATUS_ALIASES)
+            status = status.where(~empty, default)
+            reasons[f'unknown {column}'] = ~status.isin(STATUS_VALUES)
+            df[column] = status
+        elif kind == 'list':
+            df[column] = values.str.split(',').map(lambda parts: [part.strip() for part in parts if part.strip()])
+        elif kind == 'slug':
+            df[column] = _slugify(values.where(~empty, df['title']))
+            reasons[f'duplicate {column}'] = (df[column] != '') & df[column].duplicated(keep='first')
+        elif kind == 'id':
+            df[column] = values.where(~empty, pd.Series(df.index + 1, index=df.index).astype(str))
+        elif default:
+            df[column] = values.where(~empty, default)
+
+    bad = reasons.any(axis=1)
+    canonical = list(schema) + [column for column in df.columns if column not in schema]
+    valid = df.loc[~bad, canonical].to_dict('records')
+
+    quarantined = []
+    if bad.any():
+        originals = pd.DataFrame(list(rows))
+        for index in df.index[bad]:
+            quarantined.append({
+                'row': int(index) + 2,  # sheet row number (header is row 1)
+                'reasons': [reason for reason in reasons.columns if reasons.at[index, reason]],
+                'data': originals.loc[index].fillna('').to_dict(),
+            })
+
+    return ValidationResult(valid, quarantined, renamed, missing_columns)
+
+
+def post_tags(post):
+    """Tags of a post as a list (validated rows already hold lists)"""
+    tags = post.get('tags') or []
+    if isinstance(tags, str):
+        return [tag.strip() for tag in tags.split(',') if tag.strip()]
+    return list(tags)
@@ -0,0 +1,209 @@
+"""
+Build-time SEO artifacts: sitemap.xml, robots.txt, RSS 2.0 and Atom feeds.
+
+Everything is computed once per dataset instead of rescanning posts on each
+request. The XML is produced by generators (a sitemap index plus
+sitemap-N.xml files once there are more than 50k URLs). Each artifact
+carries a content hash (used as its ETag) and a gzip variant, plus brotli
+when that module is installed, whenever compression saves bytes. The
+worker generators serve them with long cache lifetimes and conditional GET
+(see worker_runtime.ARTIFACTS_JS).
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from post_pages import meta_description
+from sheets_loader import slugify
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SITEMAP_MAX_URLS = 50000
+FEED_LIMIT = 20
+CONTENT_TYPES = {
+    'xml': 'application/xml; charset=utf-8',
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'txt': 'text/plain; charset=utf-8',
+}
+
+
+def _post_date(post):
+    """`date` column as an aware datetime (None when missing or unparseable)"""
+    try:
+        parsed = date.fromisoformat(str(post.get('date') or '')[:10])
+    except ValueError:
+        return None
+    return datetime.combine(parsed, time(), tzinfo=timezone.utc)
+
+
+def _entries(posts, base_url):
+    # (url, lastmod datetime, post) for published posts, first post wins on duplicate slugs
+    seen = set()
+    for post in posts:
+        if (post.get('status') or 'published') != 'published':
+            continue
+        slug = post.get('slug') or slugify(post.get('title', ''))
+        if slug and slug not in seen:
+            seen.add(slug)
+            yield f"{base_url}/post/{slug}", _post_date(post), post
+
+
+def iter_urlset(urls):
+    """Stream one <urlset> document from (loc, lastmod) pairs"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc, lastmod in urls:
+        yield f"<url><loc>{escape(loc)}</loc>"
+        if lastmod:
+            yield f"<lastmod>{lastmod.date().isoformat()}</lastmod>"
+        yield "</url>\n"
+    yield '</urlset>\n'
+
+
+def iter_sitemap_index(sitemaps):
+    """Stream a <sitemapindex> from (loc, lastmod) pairs"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc, lastmod in sitemaps:
+        yield f"<sitemap><loc>{escape(loc)}</loc>"
+        if lastmod:
+            yield f"<lastmod>{lastmod.date().isoformat()}</lastmod>"
+        yield "</sitemap>\n"
+    yield '</sitemapindex>\n'
+
+
+def iter_rss(items, site, base_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>\n'
+    yield f"<title>{escape(str(site.get('title', 'Blog')))}</title>\n"
+    yield f"<link>{escape(base_url)}/</link>\n"
+    yield f"<description>{escape(str(site.get('description', '')))}</description>\n"
+    yield f'<atom:link href="{escape(base_url)}/rss.xml" rel="self" type="application/rss+xml"/>\n'
+    if items and items[0][1]:
+        yield f"<lastBuildDate>{format_datetime(items[0][1])}</lastBuildDate>\n"
+    for url, published, post in items:
+        yield "<item>"
+        yield f"<title>{escape(str(post.get('title', '')))}</title>"
+        yield f"<link>{escape(url)}</link><guid isPermaLink=\"true\">{escape(url)}</guid>"
+        yield f"<description>{escape(meta_description(post, limit=300))}</description>"
+        if published:
+            yield f"<pubDate>{format_datetime(published)}</pubDate>"
+        if post.get('category'):
+            yield f"<category>{escape(str(post['category']))}</category>"
+        yield "</item>\n"
+    yield '</channel></rss>\n'
+
+
+def iter_atom(items, site, base_url, updated):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f"<title>{escape(str(site.get('title', 'Blog')))}</title>\n"
+    if site.get('description'):
+        yield f"<subtitle>{escape(str(site['description']))}</subtitle>\n"
+    yield f'<link href="{escape(base_url)}/"/><link href="{escape(base_url)}/atom.xml" rel="self"/>\n'
+    yield f"<id>{escape(base_url)}/</id>\n<updated>{updated.isoformat()}</updated>\n"
+    for url, published, post in items:
+        stamp = (published or updated).isoformat()
+        yield "<entry>"
+        yield f"<title>{escape(str(post.get('title', '')))}</title>"
+        yield f'<link href="{escape(url)}"/><id>{escape(url)}</id>'
+        yield f"<published>{stamp}</published><updated>{stamp}</updated>"
+        yield f"<author><name>{escape(str(post.get('author') or 'Admin'))}</name></author>"
+        yield f"<summary>{escape(meta_description(post, limit=300))}</summary>"
+        yield "</entry>\n"
+    yield '</feed>\n'
+
+
+def _artifact(chunks, kind, last_modified):
+    body = ''.join(chunks).encode('utf-8')
+    artifact = {
+        'type': CONTENT_TYPES[kind],
+        'hash': hashlib.sha256(body).hexdigest()[:16],
+        'body': body,
+        'lastModified': format_datetime(last_modified, usegmt=True),
+    }
+    # Precompressed variants only when they actually save bytes (robots.txt rarely does)
+    variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body)
+    artifact.update({encoding: data for encoding, data in variants.items() if len(data) < len(body)})
+    return artifact
+
+
+def build_artifacts(posts, site, feed_limit=FEED_LIMIT, max_urls=SITEMAP_MAX_URLS):
+    """{path: artifact} for sitemap(s), robots.txt, /rss.xml and /atom.xml
+
+    site['base_url'] is required: sitemap and feed URLs must be absolute.
+    """
+    base_url = str(site.get('base_url') or '').rstrip('/')
+    if not base_url:
+        raise ValueError("site['base_url'] is required for sitemaps and feeds")
+
+    entries = list(_entries(posts, base_url))
+    dates = [published for _, published, _ in entries if published]
+    updated = max(dates) if dates else datetime.now(timezone.utc).replace(microsecond=0)
+
+    artifacts = {}
+    urls = [(f"{base_url}/", updated)] + [(url, published) for url, published, _ in entries]
+    if len(urls) <= max_urls:
+        artifacts['/sitemap.xml'] = _artifact(iter_urlset(urls), 'xml', updated)
+    else:
+        index = []
+        for number, start in enumerate(range(0, len(urls), max_urls), 1):
+            chunk = urls[start:start + max_urls]
+            chunk_dates = [lastmod for _, lastmod in chunk if lastmod]
+            chunk_updated = max(chunk_dates) if chunk_dates else updated
+            artifacts[f'/sitemap-{number}.xml'] = _artifact(iter_urlset(chunk), 'xml', chunk_updated)
+            index.append((f"{base_url}/sitemap-{number}.xml", chunk_updated))
+        artifacts['/sitemap.xml'] = _artifact(iter_sitemap_index(index), 'xml', updated)
+
+    robots = f"User-agent: *\nAllow: /\n\nSitemap: {base_url}/sitemap.xml\n"
+    artifacts['/robots.txt'] = _artifact([robots], 'txt', updated)
+
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    latest = sorted(entries, key=lambda entry: entry[1] or oldest, reverse=True)[:feed_limit]
+    artifacts['/rss.xml'] = _artifact(iter_rss(latest, site, base_url), 'rss', updated)
+    artifacts['/atom.xml'] = _artifact(iter_atom(latest, site, base_url, updated), 'atom', updated)
+    return artifacts
+
+
+def worker_artifacts(artifacts):
+    """JSON-friendly form for config['buildArtifacts'] (precompressed bodies as base64)"""
+    return {
+        path: {
+            'type': artifact['type'],
+            'etag': f'"{artifact["hash"]}"',
+            'lastModified': artifact['lastModified'],
+            'body': artifact['body'].decode('utf-8'),
+            **{encoding: base64.b64encode(artifact[encoding]).decode('ascii') for encoding in ('gzip', 'br') if encoding in artifact},
+        }
+        for path, artifact in artifacts.items()
+    }
+
+
+def write_artifacts(artifacts, directory='dist'):
+    """Write each artifact plus .gz/.br variants and an artifacts.json manifest, returns the manifest"""
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    for path, artifact in artifacts.items():
+        file_path = os.path.join(directory, path.lstrip('/'))
+        with open(file_path, 'wb') as f:
+            f.write(artifact['body'])
+        for encoding, extension in (('gzip', '.gz'), ('br', '.br')):
+            if encoding in artifact:
+                with open(file_path + extension, 'wb') as f:
+                    f.write(artifact[encoding])
+        manifest[path] = {'type': artifact['type'], 'hash': artifact['hash'], 'bytes': len(artifact['body']), 'lastModified': artifact['lastModified']}
+    with open(os.path.join(directory, 'artifacts.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,256 @@
+"""
+Change-detection service for spreadsheet data.
+
+Instead of every open page reloading itself (and re-downloading the whole
+sheet) on a timer, a single poller keeps a hashed snapshot per sheet and
+publishes a tiny version token. Pages fetch only /api/version and reload
+their data when the token changes; /api/changes streams incremental row
+diffs over Server-Sent Events, and optional webhooks get a POST per change.
+"""
+
+import hashlib
+import json
+import queue
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+def snapshot_version(rows):
+    """Short, stable version token for a list (or other sequence) of row dicts"""
+    canonical = json.dumps(rows if isinstance(rows, list) else list(rows), sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+def row_key(row, index):
+    """Identity of a row for diffing: id, then slug, then title, then position"""
+    for field in ('id', 'slug', 'title'):
+        value = str(row.get(field, '')).strip()
+        if value:
+            return f"{field}:{value}"
+    return f"row:{index}"
+
+
+def diff_rows(old_rows, new_rows):
+    """Row-level diff between two snapshots: added/changed rows and removed keys"""
+    old = {row_key(row, i): row for i, row in enumerate(old_rows)}
+    new = {row_key(row, i): row for i, row in enumerate(new_rows)}
+    return {
+        'added': [row for key, row in new.items() if key not in old],
+        'changed': [row for key, row in new.items() if key in old and old[key] != row],
+        'removed': [key for key in old if key not in new],
+    }
+
+
+class ChangeDetector:
+    """Polls one or more sheets and tracks a version token per sheet
+
+    `sources` maps a sheet name to a callable returning (success, rows,
+    message), e.g. lambda: get_sheets_data(spreadsheet_id, "WEBSITE").
+    Failed polls keep the previous snapshot, so an outage never looks like
+    "all rows removed".
+    """
+
+    def __init__(self, sources, interval=60, webhooks=None):
+        self.sources = dict(sources)
+        self.interval = interval
+        self.webhooks = list(webhooks or [])
+        self.snapshots = {}
+        self.last_error = {}
+        self.last_checked = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self):
+        """Combined token over all sheets (what pages compare against)"""
+        with self._lock:
+            tokens = {name: snapshot['version'] for name, snapshot in self.snapshots.items()}
+        if not tokens:
+            return None
+        if len(tokens) == 1:
+            return next(iter(tokens.values()))
+        return hashlib.sha256(json.dumps(tokens, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+    def status(self):
+        with self._lock:
+            sheets = {
+                name: {'version': snapshot['version'], 'rows': len(snapshot['rows']), 'changedAt': snapshot['changed_at']}
+                for name, snapshot in self.snapshots.items()
+            }
+        return {
+            'version': self.version,
+            'checkedAt': self.last_checked,
+            'interval': self.interval,
+            'sheets': sheets,
+            'errors': dict(self.last_error),
+        }
+
+    def rows(self, sheet_name):
+        with self._lock:
+            snapshot = self.snapshots.get(sheet_name)
+            return list(snapshot['rows']) if snapshot else []
+
+    def poll_once(self):
+        """Check every source once, returns {sheet_name: diff} for sheets that changed"""
+        changes = {}
+        for name, fetch in self.sources.items():
+            try:
+                success, rows, message = fetch()
+            except Exception as e:
+                success, rows, message = False, [], str(e)
+            if not success:
+                self.last_error[name] = message
+                continue
+            self.last_error.pop(name, None)
+
+            version = snapshot_version(rows)
+            with self._lock:
+                previous = self.snapshots.get(name)
+                if previous and previous['version'] == version:
+                    continue
+                self.snapshots[name] = {
+                    'version': version,
+                    'rows': rows,
+                    'changed_at': datetime.now().isoformat(),
+                }
+            changes[name] = diff_rows(previous['rows'] if previous else [], rows)
+
+        self.last_checked = datetime.now().isoformat()
+        if changes:
+            self._publish(changes)
+        return changes
+
+    def _publish(self, changes):
+        event = {'version': self.version, 'changes': changes}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+        for url in self.webhooks:
+            try:
+                requests.post(url, json=event, timeout=10)
+            except Exception:
+                self.last_error[f"webhook:{url}"] = f"POST failed at {datetime.now().isoformat()}"
+
+    def subscribe(self):
+        """Queue receiving one event per change (for SSE clients)"""
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def start(self):
+        """Start polling in a daemon thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sheet-change-detector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.interval)
+
+
+def _make_handler(detector, heartbeat=15):
+    class ChangeFeedHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/api/version':
+                self._send_json({'version': detector.version, 'checkedAt': detector.last_checked})
+            elif path == '/api/status':
+                self._send_json(detector.status())
+            elif path.startswith('/api/snapshot/'):
+                self._send_json({'rows': detector.rows(path[len('/api/snapshot/'):])})
+            elif path == '/api/changes':
+                self._stream_changes()
+            else:
+                self._send_json({'error': 'Not Found'}, status=404)
+
+        def _stream_changes(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-store')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            subscriber = detector.subscribe()
+            try:
+                self.wfile.write(f"event: version\ndata: {json.dumps({'version': detector.version})}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                while True:
+                    try:
+                        event = subscriber.get(timeout=heartbeat)
+                        message = f"event: change\ndata: {json.dumps(event, default=str)}\n\n"
+                    except queue.Empty:
+                        message = ": keep-alive\n\n"
+                    self.wfile.write(message.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                detector.unsubscribe(subscriber)
+
+    return ChangeFeedHandler
+
+
+def serve_change_feed(detector, host='127.0.0.1', port=5055):
+    """Serve /api/version, /api/status, /api/snapshot/<sheet> and /api/changes (SSE) in a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _make_handler(detector))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="change-feed-server", daemon=True)
+    thread.start()
+    return server
+
+
+# Browser-side snippet: poll the version endpoint and run `onChange` only when it moves
+VERSION_WATCH_CLIENT_JS = """
+function watchDataVersion(versionUrl, intervalMs, onChange, initialVersion) {
+    let current = initialVersion || null
+    async function check() {
+        try {
+            const response = await fetch(versionUrl, { cache: 'no-store' })
+            if (!response.ok) return
+            const { version } = await response.json()
+            if (!version) return
+            if (current === null) {
+                current = version
+            } else if (version !== current) {
+                current = version
+                onChange(version)
+            }
+        } catch (error) {
+            console.warn('Version check failed:', error)
+        }
+    }
+    check()
+    return setInterval(check, intervalMs)
+}
+"""
@@ -0,0 +1,58 @@
+"""
+Server-side windowing for large sheet previews.
+
+Filtering, paging and text truncation happen in pandas so Streamlit only
+ships the visible rows to the browser. Column statistics are computed once
+per data snapshot by the caller's cache.
+"""
+
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 250]
+TRUNCATE_CHARS = 120
+
+
+def column_stats(df):
+    """One row per column: type, filled cells, distinct values, longest text"""
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        text = series.astype(str)
+        filled = series.notna() & (text.str.strip() != "")
+        rows.append({
+            'column': column,
+            'dtype': str(series.dtype),
+            'filled': int(filled.sum()),
+            'empty': int(len(series) - filled.sum()),
+            'unique': int(text[series.notna()].nunique()),
+            'max_length': int(text.str.len().max()) if len(series) else 0,
+        })
+    return pd.DataFrame(rows, columns=['column', 'dtype', 'filled', 'empty', 'unique', 'max_length'])
+
+
+def filter_rows(df, query, column=None):
+    """Positions of rows whose `column` (or any column) contains `query`, case-insensitive"""
+    if not query:
+        return df.index.to_numpy()
+    columns = [column] if column else list(df.columns)
+    mask = pd.Series(False, index=df.index)
+    for name in columns:
+        mask |= df[name].astype(str).str.contains(query, case=False, regex=False, na=False)
+    return df.index[mask].to_numpy()
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def page_window(df, positions, page, page_size, max_chars=TRUNCATE_CHARS):
+    """Rows of one page (1-based) with long text cells shortened for display"""
+    start = (page - 1) * page_size
+    window = df.loc[positions[start:start + page_size]].copy()
+    for name in window.columns:
+        if pd.api.types.is_object_dtype(window[name]) or pd.api.types.is_string_dtype(window[name]):
+            text = window[name].astype(str)
+            long_cells = text.str.len() > max_chars
+            if long_cells.any():
+                window[name] = text.where(~long_cells, text.str.slice(0, max_chars - 1) + "…")
+    return window
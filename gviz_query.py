@@ -0,0 +1,392 @@
+"""
+Query pushdown for the gviz CSV endpoint (Google Visualization Query Language).
+
+The plain CSV exports always return every row and every column, drafts and the
+heavy `content` column included. A `tq` query lets Google filter, project, sort
+and page the rows before download, so list views only transfer and parse what
+they show. Queries address columns by letter, so the header row is read first
+(one small request) and names are mapped to letters; the labels of every
+result are checked against the names asked for, in case the sheet's columns
+moved in between.
+
+FixtureGVizSession is a local stand-in that evaluates the subset of the
+language build_query emits, and serve_gviz_mock exposes it over HTTP for the
+generated workers.
+"""
+
+import csv
+import io
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+import requests
+
+from sheets_api import LIST_COLUMNS, column_index, column_letter
+from sheets_loader import SHEETS_BASE_URL, USER_AGENT, parse_csv_rows
+
+COMPARISONS = ('=', '!=', '<', '<=', '>', '>=', 'contains', 'starts with', 'ends with')
+NULL_CHECKS = ('is null', 'is not null')
+
+# Rows the list views show: everything but drafts and untitled rows
+# (status and title are text columns, whose blank cells are '' rather than null)
+PUBLISHED_FILTER = [('status', '!=', 'draft'), ('title', '!=', '')]
+
+
+def gviz_literal(value):
+    """Quote a string literal (the language has no escapes, so pick a quote the value lacks)"""
+    text = str(value)
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    raise ValueError(f"Value can't be quoted in a gviz query: {text!r}")
+
+
+def _letters(columns):
+    return {str(name).strip().lower(): column_letter(i) for i, name in enumerate(columns) if str(name).strip()}
+
+
+def _condition(letter, op, value):
+    if op in NULL_CHECKS:
+        return f"{letter} {op}"
+    if op not in COMPARISONS:
+        raise ValueError(f"Unsupported gviz operator: {op}")
+    if op == '!=':
+        # Blank text cells are '' and match <>, but blank number/date cells are null and null <> 'x' is not true
+        condition = f"{letter} <> {gviz_literal(value)}"
+        return condition if value == '' else f"({condition} or {letter} is null)"
+    return f"{letter} {op} {gviz_literal(value)}"
+
+
+def build_query(columns, select=None, where=None, order_by=None, limit=None, offset=None):
+    """Visualization query text for a sheet whose header row is `columns`
+
+    select: column names (missing ones are skipped, None = all columns)
+    where: [(name, op, value)] joined with `and`, ops from COMPARISONS / NULL_CHECKS
+        (value is ignored for null checks); a list of such tuples in place of
+        one is joined with `or`; a {name: value} dict means equality. Blank
+        text cells are '' in gviz (test them with '=' / '!=' ''); only blank
+        number and date cells are null
+    order_by: [name] or [(name, 'asc' | 'desc')]
+    Filter and sort columns must exist (ValueError), since dropping them would
+    change which rows come back. Returns (query, selected column names).
+    """
+    letters = _letters(columns)
+
+    def letter(name):
+        try:
+            return letters[str(name).strip().lower()]
+        except KeyError:
+            raise ValueError(f"Column not in sheet: {name}") from None
+
+    if select is None:
+        selected = [str(name).strip() for name in columns if str(name).strip()]
+    else:
+        selected = [name for name in select if str(name).strip().lower() in letters]
+        if not selected:
+            raise ValueError("None of the selected columns are in the sheet")
+
+    clauses = ["select " + ", ".join(letter(name) for name in selected)]
+    if isinstance(where, dict):
+        where = [(name, '=', value) for name, value in where.items()]
+    if where:
+        conditions = []
+        for item in where:
+            if isinstance(item, list):
+                conditions.append("(" + " or ".join(_condition(letter(name), op, value) for name, op, value in item) + ")")
+            else:
+                name, op, value = item
+                conditions.append(_condition(letter(name), op, value))
+        clauses.append("where " + " and ".join(conditions))
+    if order_by:
+        terms = []
+        for term in order_by:
+            name, direction = (term, 'asc') if isinstance(term, str) else term
+            if direction not in ('asc', 'desc'):
+                raise ValueError(f"Unsupported sort direction: {direction}")
+            terms.append(f"{letter(name)} {direction}")
+        clauses.append("order by " + ", ".join(terms))
+    if limit is not None:
+        clauses.append(f"limit {max(0, int(limit))}")
+    if offset:
+        clauses.append(f"offset {max(0, int(offset))}")
+    return " ".join(clauses), selected
+
+
+def gviz_url(spreadsheet_id, sheet_name, query=None):
+    """gviz CSV URL for one sheet, with the first row forced as the header"""
+    url = f"{SHEETS_BASE_URL.format(spreadsheet_id=spreadsheet_id)}/gviz/tq?tqx=out:csv&headers=1&sheet={quote(sheet_name)}"
+    if query:
+        url += f"&tq={quote(query)}"
+    return url
+
+
+def _get_csv(url, session, timeout):
+    http = session or requests
+    response = http.get(url, headers={'User-Agent': USER_AGENT}, timeout=timeout)
+    if response.status_code != 200 or response.text.lstrip().startswith('<'):
+        raise RuntimeError(f"gviz query failed (HTTP {response.status_code})")
+    return response.text
+
+
+def fetch_columns(spreadsheet_id, sheet_name="WEBSITE", session=None, timeout=30):
+    """Header labels of a sheet, in column order (index = column letter)"""
+    text = _get_csv(gviz_url(spreadsheet_id, sheet_name, "select * limit 1"), session, timeout)
+    return [label.strip() for label in next(csv.reader(io.StringIO(text)), [])]
+
+
+def query_sheet(spreadsheet_id, sheet_name="WEBSITE", select=None, where=None, order_by=None, limit=None,
+                offset=None, columns=None, session=None, timeout=30):
+    """Rows picked by a pushed-down query (same return shape as get_sheets_data)
+
+    `columns` (the header row) skips the header request when already known.
+    """
+    try:
+        columns = columns or fetch_columns(spreadsheet_id, sheet_name, session, timeout)
+        query, selected = build_query(columns, select, where, order_by, limit, offset)
+        text = _get_csv(gviz_url(spreadsheet_id, sheet_name, query), session, timeout)
+        labels = [label.strip().lower() for label in next(csv.reader(io.StringIO(text)), [])]
+        if labels != [name.strip().lower() for name in selected]:
+            return False, [], "Sheet columns changed since the header was read"
+        data = parse_csv_rows(text)
+        return True, data, f"Successfully loaded {len(data)} rows (gviz query)"
+    except Exception as e:
+        return False, [], f"Error: {str(e)}"
+
+
+def list_view_query(published_only=True, columns=LIST_COLUMNS, limit=None, offset=None, order_by=None):
+    """query_sheet keyword arguments for a list view (no `content`, drafts filtered out)"""
+    return {'select': columns, 'where': list(PUBLISHED_FILTER) if published_only else None,
+            'order_by': order_by, 'limit': limit, 'offset': offset}
+
+
+# ---- Local stand-in ----
+
+QUERY_TOKEN = re.compile(r"\s*(?:(<=|>=|<>|!=|[=<>(),*])|'([^']*)'|\"([^\"]*)\"|(\d+)|([A-Za-z_]\w*))")
+
+
+class _QueryParser:
+    """Parser for the query subset build_query emits"""
+
+    def __init__(self, query):
+        self.tokens = []
+        pos = 0
+        query = query.strip()
+        while pos < len(query):
+            match = QUERY_TOKEN.match(query, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Invalid query near: {query[pos:pos + 20]}")
+            symbol, single, double, number, word = match.groups()
+            if symbol:
+                self.tokens.append(('op', symbol))
+            elif single is not None or double is not None:
+                self.tokens.append(('str', single if single is not None else double))
+            elif number:
+                self.tokens.append(('num', int(number)))
+            else:
+                self.tokens.append(('word', word))
+            pos = match.end()
+        self.pos = 0
+
+    def peek(self, *words):
+        if self.pos + len(words) > len(self.tokens):
+            return False
+        return all((kind == 'op' and value == word) or (kind == 'word' and value.lower() == word)
+                   for (kind, value), word in zip(self.tokens[self.pos:], words))
+
+    def take(self, *words):
+        if not self.peek(*words):
+            raise ValueError(f"Expected {' '.join(words)}")
+        self.pos += len(words)
+
+    def next(self, kind):
+        if self.pos >= len(self.tokens) or self.tokens[self.pos][0] != kind:
+            raise ValueError(f"Expected a {kind}")
+        self.pos += 1
+        return self.tokens[self.pos - 1][1]
+
+    def column(self):
+        word = self.next('word')
+        if not word.isalpha() or not word.isupper():
+            raise ValueError(f"Invalid column ID: {word}")
+        return column_index(word)
+
+    def parse(self):
+        query = {'select': None, 'where': None, 'order_by': [], 'limit': None, 'offset': 0}
+        if self.peek('select'):
+            self.take('select')
+            if self.peek('*'):
+                self.take('*')
+            else:
+                query['select'] = [self.column()]
+                while self.peek(','):
+                    self.take(',')
+                    query['select'].append(self.column())
+        if self.peek('where'):
+            self.take('where')
+            query['where'] = self.expression()
+        if self.peek('order', 'by'):
+            self.take('order', 'by')
+            while True:
+                index = self.column()
+                descending = self.peek('desc')
+                if descending or self.peek('asc'):
+                    self.pos += 1
+                query['order_by'].append((index, descending))
+                if not self.peek(','):
+                    break
+                self.take(',')
+        if self.peek('limit'):
+            self.take('limit')
+            query['limit'] = self.next('num')
+        if self.peek('offset'):
+            self.take('offset')
+            query['offset'] = self.next('num')
+        if self.pos != len(self.tokens):
+            raise ValueError("Unexpected text at the end of the query")
+        return query
+
+    def expression(self):
+        terms = [self.conjunction()]
+        while self.peek('or'):
+            self.take('or')
+            terms.append(self.conjunction())
+        return lambda row: any(term(row) for term in terms)
+
+    def conjunction(self):
+        factors = [self.factor()]
+        while self.peek('and'):
+            self.take('and')
+            factors.append(self.factor())
+        return lambda row: all(factor(row) for factor in factors)
+
+    def factor(self):
+        if self.peek('not'):
+            self.take('not')
+            inner = self.factor()
+            return lambda row: not inner(row)
+        if self.peek('('):
+            self.take('(')
+            inner = self.expression()
+            self.take(')')
+            return inner
+        index = self.column()
+        if self.peek('is', 'not', 'null'):
+            self.take('is', 'not', 'null')
+            return lambda row: _cell(row, index) is not None
+        if self.peek('is', 'null'):
+            self.take('is', 'null')
+            return lambda row: _cell(row, index) is None
+        for words in (('starts', 'with'), ('ends', 'with'), ('contains',), ('<=',), ('>=',), ('<>',), ('!=',), ('=',), ('<',), ('>',)):
+            if self.peek(*words):
+                self.take(*words)
+                op = ' '.join(words)
+                break
+        else:
+            raise ValueError("Expected a comparison")
+        literal = self.next('str')
+        compare = {
+            '=': lambda a, b: a == b, '<>': lambda a, b: a != b, '!=': lambda a, b: a != b,
+            '<': lambda a, b: a < b, '<=': lambda a, b: a <= b, '>': lambda a, b: a > b, '>=': lambda a, b: a >= b,
+            'contains': lambda a, b: b in a, 'starts with': lambda a, b: a.startswith(b), 'ends with': lambda a, b: a.endswith(b),
+        }[op]
+        return lambda row: compare(_cell(row, index), literal)
+
+
+def _cell(row, index):
+    # Fixture grids hold text columns only, and gviz returns blank text cells as '' (never null)
+    return row[index] if index < len(row) else ''
+
+
+def run_query(grid, query):
+    """Evaluate a query against a grid ([[cell, ...], ...], header row first), returns the result grid"""
+    parsed = _QueryParser(query or '').parse()
+    header, rows = grid[0], [row for row in grid[1:] if any(str(cell).strip() for cell in row)]
+    width = len(header)
+    selected = parsed['select'] if parsed['select'] is not None else list(range(width))
+    if any(index >= width for index in selected):
+        raise ValueError("Column not in sheet")
+    if parsed['where']:
+        rows = [row for row in rows if parsed['where'](row)]
+    for index, descending in reversed(parsed['order_by']):
+        rows = sorted(rows, key=lambda row: _cell(row, index), reverse=descending)
+    rows = rows[parsed['offset']:]
+    if parsed['limit'] is not None:
+        rows = rows[:parsed['limit']]
+    return [[header[i] for i in selected]] + [[row[i] if i < len(row) else '' for i in selected] for row in rows]
+
+
+class FixtureResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+class FixtureGVizSession:
+    """Local stand-in for the gviz CSV endpoint, backed by in-memory grids
+
+    Grids are {sheet_name: [[cell, ...], ...]} (header row first). Every
+    request's (sheet, query) is recorded in `calls`; `bytes_sent` adds up the
+    CSV returned, so tests can compare transfer sizes.
+    """
+
+    def __init__(self, grids):
+        self.grids = grids
+        self.calls = []
+        self.bytes_sent = 0
+
+    @classmethod
+    def from_csv(cls, paths):
+        """Build a session from {sheet_name: csv_path} recordings"""
+        grids = {}
+        for sheet_name, path in paths.items():
+            with open(path, newline='', encoding='utf-8') as f:
+                grids[sheet_name] = [row for row in csv.reader(f)]
+        return cls(grids)
+
+    def get(self, url, headers=None, timeout=None):
+        params = parse_qs(urlsplit(url).query)
+        sheet_name = params.get('sheet', [None])[0]
+        query = params.get('tq', [''])[0]
+        self.calls.append((sheet_name, query))
+        if '/gviz/tq' not in url or sheet_name not in self.grids:
+            return FixtureResponse(400, '<!DOCTYPE html><html><body>Invalid sheet</body></html>')
+        try:
+            result = run_query(self.grids[sheet_name], query)
+        except ValueError as e:
+            return FixtureResponse(400, f'<!DOCTYPE html><html><body>Invalid query: {e}</body></html>')
+        out = io.StringIO()
+        csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator='\n').writerows(result)
+        self.bytes_sent += len(out.getvalue().encode('utf-8'))
+        return FixtureResponse(200, out.getvalue())
+
+
+def serve_gviz_mock(session, host='127.0.0.1', port=0):
+    """Serve a FixtureGVizSession over HTTP from a daemon thread
+
+    Requests keep the docs.google.com path (/spreadsheets/d/<id>/gviz/tq?...),
+    so a worker's fetch only needs its origin rewritten to
+    f"http://127.0.0.1:{server.server_address[1]}".
+    """
+    class GVizMockHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            response = session.get(self.path)
+            body = response.text.encode('utf-8')
+            self.send_response(response.status_code)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8' if response.status_code == 200 else 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), GVizMockHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="gviz-mock", daemon=True)
+    thread.start()
+    return server
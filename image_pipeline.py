@@ -0,0 +1,249 @@
+"""
+Build-time responsive images for the `featured_image` column.
+
+Each source image is fetched once into a content-addressed cache
+(.image-cache/originals/<hash>.<ext>, indexed by URL in sources.json).
+Resized AVIF/WebP variants are written next to it as
+variants/<hash>-<width>.<format> across a process pool. Variants that
+already exist for a hash are skipped, so a rebuild only encodes new or
+changed images. The generators then emit <picture> markup with srcset,
+sizes, width/height and loading="lazy". Pillow is optional: without it
+posts keep their original image URL.
+"""
+
+import hashlib
+import html
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+DEFAULT_SIZES = '(max-width: 768px) 100vw, 50vw'
+PREFERRED_FORMATS = ('avif', 'webp')
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+QUALITY = {'avif': 55, 'webp': 78}
+USER_AGENT = 'Mozilla/5.0 (compatible; BlogGenerator/1.0)'
+
+
+def available_formats():
+    """Variant formats this Pillow build can encode, best first"""
+    if Image is None:
+        return []
+    return [fmt for fmt in PREFERRED_FORMATS if features.check(fmt)]
+
+
+class ImageCache:
+    """Content-addressed originals plus resized variants on disk"""
+
+    def __init__(self, root='.image-cache', session=None):
+        self.root = root
+        self.session = session
+        self.originals = os.path.join(root, 'originals')
+        self.variants = os.path.join(root, 'variants')
+        self._index_path = os.path.join(root, 'sources.json')
+        self._lock = threading.Lock()
+        os.makedirs(self.originals, exist_ok=True)
+        os.makedirs(self.variants, exist_ok=True)
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def save_index(self):
+        with self._lock:
+            tmp_path = self._index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=2)
+            os.replace(tmp_path, self._index_path)
+
+    def _read_source(self, source):
+        if urlparse(source).scheme in ('http', 'https'):
+            http = self.session or requests
+            response = http.get(source, headers={'User-Agent': USER_AGENT}, timeout=30)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            return response.content
+        path = source[len('file://'):] if source.startswith('file://') else source
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def fetch(self, source, refresh=False):
+        """Cache entry {hash, file, width, height} for a URL or local path, downloading it only once"""
+        with self._lock:
+            entry = self.index.get(source)
+        if entry and not refresh and os.path.exists(os.path.join(self.originals, entry['file'])):
+            return entry
+
+        data = self._read_source(source)
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        extension = os.path.splitext(urlparse(source).path)[1].lower()[:5] or '.img'
+        file_name = digest + extension
+        path = os.path.join(self.originals, file_name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        with Image.open(path) as image:
+            width, height = image.size
+        entry = {'hash': digest, 'file': file_name, 'width': width, 'height': height}
+        with self._lock:
+            self.index[source] = entry
+        return entry
+
+    def variant_name(self, digest, width, fmt):
+        return f"{digest}-{width}.{fmt}"
+
+
+def variant_widths(original_width, widths=DEFAULT_WIDTHS):
+    """Target widths no larger than the original (the original width when it is smaller than all)"""
+    fitting = [width for width in sorted(widths) if width < original_width]
+    largest = min(original_width, max(widths))
+    return fitting + ([largest] if largest not in fitting else [])
+
+
+def _encode_variants(original_path, variants_dir, digest, widths, formats):
+    # Runs in a worker process: one source image, every missing width x format
+    written = []
+    with Image.open(original_path) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = None
+            for fmt in formats:
+                path = os.path.join(variants_dir, f"{digest}-{width}.{fmt}")
+                if os.path.exists(path):
+                    continue
+                if resized is None:
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                tmp_path = path + '.tmp'
+                resized.save(tmp_path, format=fmt.upper(), quality=QUALITY[fmt])
+                os.replace(tmp_path, path)
+                written.append(os.path.basename(path))
+    return written
+
+
+def build_images(posts, cache=None, widths=DEFAULT_WIDTHS, formats=None, base_url='/img',
+                 column='featured_image', max_workers=4):
+    """Fetch and resize every distinct image in `column`, returns (images, errors)
+
+    images maps each source URL to {src, width, height, srcset: {format: ...},
+    files, encoded}; `encoded` lists the variant files written by this build
+    (empty when the image was unchanged). errors maps URL -> message.
+    """
+    if Image is None:
+        return {}, {}
+    cache = cache or ImageCache()
+    formats = [fmt for fmt in (formats or available_formats()) if fmt in available_formats()]
+    sources = list(dict.fromkeys(str(post.get(column) or '').strip() for post in posts))
+    sources = [source for source in sources if source]
+
+    entries, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources) or 1))) as pool:
+        futures = {source: pool.submit(cache.fetch, source) for source in sources}
+        for source, future in futures.items():
+            try:
+                entries[source] = future.result()
+            except Exception as e:
+                errors[source] = str(e)
+    cache.save_index()
+
+    # Only images with missing variants go to the process pool
+    tasks = {}
+    for source, entry in entries.items():
+        targets = variant_widths(entry['width'], widths)
+        missing = [w for w in targets for fmt in formats
+                   if not os.path.exists(os.path.join(cache.variants, cache.variant_name(entry['hash'], w, fmt)))]
+        if missing and entry['hash'] not in tasks:
+            tasks[entry['hash']] = (os.path.join(cache.originals, entry['file']), cache.variants, entry['hash'], targets, formats)
+
+    written = {}
+    if len(tasks) > 1 and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            futures = {digest: pool.submit(_encode_variants, *task) for digest, task in tasks.items()}
+            for digest, future in futures.items():
+                try:
+                    written[digest] = future.result()
+                except Exception as e:
+                    written[digest] = e
+    else:
+        for digest, task in tasks.items():
+            try:
+                written[digest] = _encode_variants(*task)
+            except Exception as e:
+                written[digest] = e
+
+    images = {}
+    for source, entry in entries.items():
+        result = written.get(entry['hash'], [])
+        if isinstance(result, Exception):
+            errors[source] = str(result)
+            continue
+        targets = variant_widths(entry['width'], widths)
+        largest = targets[-1]
+        images[source] = {
+            'src': source,
+            'width': largest,
+            'height': max(1, round(entry['height'] * largest / entry['width'])),
+            'srcset': {
+                fmt: ', '.join(f"{base_url.rstrip('/')}/{cache.variant_name(entry['hash'], w, fmt)} {w}w" for w in targets)
+                for fmt in formats
+            },
+            'files': [cache.variant_name(entry['hash'], w, fmt) for w in targets for fmt in formats],
+            'encoded': result,
+        }
+    return images, errors
+
+
+def responsive_img_html(url, images, alt='', sizes=DEFAULT_SIZES, css_class=''):
+    """<picture> with AVIF/WebP sources for a built image, a lazy <img> for anything else"""
+    if not url:
+        return ''
+    class_attr = f' class="{html.escape(css_class)}"' if css_class else ''
+    info = images.get(url) if images else None
+    if not info:
+        return f'<img src="{html.escape(url)}" alt="{html.escape(alt)}"{class_attr} loading="lazy" decoding="async">'
+    sources = ''.join(
+        f'<source type="{MIME_TYPES[fmt]}" srcset="{html.escape(srcset)}" sizes="{html.escape(sizes)}">'
+        for fmt, srcset in info['srcset'].items()
+    )
+    return (
+        f'<picture>{sources}<img src="{html.escape(info["src"])}" alt="{html.escape(alt)}"{class_attr} '
+        f'width="{info["width"]}" height="{info["height"]}" loading="lazy" decoding="async"></picture>'
+    )
+
+
+def attach_images(posts, images, column='featured_image', sizes=DEFAULT_SIZES):
+    """Copies of `posts` with an `image` field the template JS renders as <picture>"""
+    attached = []
+    for post in posts:
+        info = images.get(str(post.get(column) or '').strip())
+        if info:
+            post = dict(post, image={'src': info['src'], 'width': info['width'], 'height': info['height'],
+                                     'srcset': info['srcset'], 'sizes': sizes})
+        attached.append(post)
+    return attached
+
+
+def export_images(images, cache, directory='dist/img'):
+    """Copy the variant files referenced by `images` to `directory`, returns the copied names"""
+    os.makedirs(directory, exist_ok=True)
+    copied = []
+    for info in images.values():
+        for name in info['files']:
+            target = os.path.join(directory, name)
+            if not os.path.exists(target):
+                shutil.copyfile(os.path.join(cache.variants, name), target)
+                copied.append(name)
+    return copied
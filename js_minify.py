@@ -0,0 +1,161 @@
+"""
+Build-time minifier for the generated worker scripts.
+
+Conservative by design: it only removes comments and whitespace, it never
+renames anything. String, template and regex literals are copied untouched
+(template literals hold the page HTML). Line breaks are kept wherever
+automatic semicolon insertion could depend on them, since the worker
+sources leave most semicolons out.
+"""
+
+IDENTIFIER_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+OPERATOR_CHARS = frozenset('=+-*%<>&|!?:^~')
+# After these a `/` starts a regex literal rather than a division
+REGEX_KEYWORDS = frozenset(('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                            'instanceof', 'yield', 'await'))
+# A line break right after / right before these can't end a statement
+JOIN_AFTER = frozenset('{([,;=&|?:<>*')
+JOIN_BEFORE = frozenset('.,)]};?:&|=')
+
+
+class _Lexer:
+    def __init__(self, source):
+        self.source = source
+        self.length = len(source)
+
+    def string(self, i):
+        quote = self.source[i]
+        i += 1
+        while i < self.length:
+            char = self.source[i]
+            if char == '\\':
+                i += 2
+            elif char == quote:
+                return i + 1
+            elif char == '\n':
+                break
+            else:
+                i += 1
+        raise ValueError(f"Unterminated string literal at offset {i}")
+
+    def template(self, i):
+        i += 1
+        while i < self.length:
+            char = self.source[i]
+            if char == '\\':
+                i += 2
+            elif char == '`':
+                return i + 1
+            elif char == '$' and self.source.startswith('{', i + 1):
+                # Expression inside the template: lexed as code up to its closing brace
+                i = self.tokens(i + 2, nested=True)[-1]
+            else:
+                i += 1
+        raise ValueError(f"Unterminated template literal at offset {i}")
+
+    def regex(self, i):
+        i += 1
+        in_class = False
+        while i < self.length:
+            char = self.source[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char == '\n':
+                break
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                i += 1
+                while i < self.length and self.source[i] in IDENTIFIER_CHARS:
+                    i += 1
+                return i
+            i += 1
+        raise ValueError(f"Unterminated regex literal at offset {i}")
+
+    def tokens(self, i, nested=False):
+        """[(token, gap before it: '', ' ' or newline), ..., end offset]; `nested` stops after the unmatched `}`"""
+        source, length = self.source, self.length
+        result = []
+        gap = ''
+        previous = ''
+        depth = 0
+        while i < length:
+            char = source[i]
+            if char in ' \t\r\n\f\v﻿':
+                gap = '\n' if char == '\n' else gap or ' '
+                i += 1
+                continue
+            if source.startswith('//', i):
+                end = source.find('\n', i)
+                i = length if end == -1 else end
+                gap = gap or ' '
+                continue
+            if source.startswith('/*', i):
+                end = source.find('*/', i + 2)
+                if end == -1:
+                    raise ValueError(f"Unterminated comment at offset {i}")
+                gap = '\n' if '\n' in source[i:end] else gap or ' '
+                i = end + 2
+                continue
+
+            start = i
+            if char in '\'"':
+                i = self.string(i)
+            elif char == '`':
+                i = self.template(i)
+            elif char == '/' and (not previous or previous[-1] in '(,=:[!&|?{};+-*%<>~^' or previous in REGEX_KEYWORDS):
+                i = self.regex(i)
+            elif char.isdigit() or (char == '.' and source[i + 1:i + 2].isdigit()):
+                while i < length and (source[i] in IDENTIFIER_CHARS or source[i] == '.'
+                                      or (source[i] in '+-' and source[i - 1] in 'eE' and not source[start:i].startswith(('0x', '0X')))):
+                    i += 1
+            elif char in IDENTIFIER_CHARS:
+                while i < length and source[i] in IDENTIFIER_CHARS:
+                    i += 1
+            elif char in OPERATOR_CHARS:
+                while i < length and source[i] in OPERATOR_CHARS:
+                    i += 1
+            else:
+                if nested and char == '{':
+                    depth += 1
+                elif nested and char == '}':
+                    if depth == 0:
+                        result.append(i + 1)
+                        return result
+                    depth -= 1
+                i += 1
+            previous = source[start:i]
+            result.append((previous, gap))
+            gap = ''
+        if nested:
+            raise ValueError("Unterminated template expression")
+        result.append(i)
+        return result
+
+
+def _needs_space(left, right):
+    a, b = left[-1], right[0]
+    if a in IDENTIFIER_CHARS and b in IDENTIFIER_CHARS:
+        return True
+    # a - -b, a + ++b, a / /re/, `<!--` and `-->` (HTML-like comments), 1 .toString()
+    return ((a == b and a in '+-/') or (a == '/' and b == '*') or (a == '<' and b == '!')
+            or (a == '-' and b == '>') or (a in IDENTIFIER_CHARS and b == '.'))
+
+
+def minify_js(source):
+    """Source with comments and redundant whitespace removed (raises ValueError on unterminated literals)"""
+    out = []
+    previous = ''
+    for token, gap in _Lexer(source).tokens(0)[:-1]:
+        if previous and gap:
+            joinable = (previous[-1] in JOIN_AFTER and previous not in ('++', '--')) or token[0] in JOIN_BEFORE
+            if gap == '\n' and not joinable:
+                out.append('\n')
+            elif _needs_space(previous, token):
+                out.append(' ')
+        out.append(token)
+        previous = token
+    return ''.join(out) + '\n'
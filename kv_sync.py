@@ -0,0 +1,275 @@
+"""
+Workers KV data tier for the generated workers.
+
+kv_records turns the parsed dataset into precomputed JSON values: the raw
+posts the worker snapshots from, plus the /api payloads it can return as-is
+(posts, list pages, one key per post, categories, stats, version). sync_kv
+pushes them through the KV bulk write API in parallel chunks. A local state
+file (.kv-sync/<namespace>.json) records the hash of every written key, so
+later syncs only write changed keys and delete the ones that disappeared.
+api:version is written last so it only moves once the data is in place.
+
+serve_kv_mock is a local stand-in for the bulk endpoints, used by the tests
+and for trying a sync without a Cloudflare account.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from blog_schema import post_tags
+from change_detector import snapshot_version
+from sheets_loader import slugify, wire_tags
+
+API_BASE = 'https://api.cloudflare.com/client/v4'
+KV_BINDING = 'BLOG_KV'
+STATE_DIR = '.kv-sync'
+# Cloudflare accepts up to 10,000 pairs and 100 MB per bulk request
+MAX_BULK_KEYS = 10000
+MAX_BULK_BYTES = 50 * 1024 * 1024
+VERSION_KEY = 'api:version'
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def kv_records(posts, page_size=6, updated=None):
+    """{key: JSON text} for every precomputed value the workers read
+
+    `updated` (the snapshot's creation time) keeps the stats and version
+    values stable between syncs of the same data. Posts may be validated
+    rows (tags as lists); values are written in the workers' wire format.
+    """
+    posts = [dict(post, slug=post.get('slug') or slugify(post.get('title', '')), tags=wire_tags(post_tags(post)))
+             for post in posts]
+    published = [post for post in posts if post.get('status') != 'draft' and str(post.get('title') or '').strip()]
+    page_size = max(1, int(page_size or 6))
+    pages = max(1, -(-len(published) // page_size))
+
+    categories, tags = {}, set()
+    for post in posts:
+        category = post.get('category') or 'Uncategorized'
+        categories[category] = categories.get(category, 0) + 1
+        tags.update(post_tags(post))
+    updated = updated or datetime.now().isoformat()
+
+    records = {
+        'snapshot:posts': _dumps(posts),
+        'api:posts': _dumps({'success': True, 'posts': published, 'total': len(published)}),
+        'api:categories': _dumps({'success': True, 'categories': [{'name': name, 'count': count} for name, count in categories.items()]}),
+        'api:stats': _dumps({'success': True, 'stats': {
+            'totalPosts': len(posts),
+            'totalCategories': len({post.get('category') for post in posts if post.get('category')}),
+            'totalTags': len(tags),
+            'lastUpdated': updated,
+        }}),
+    }
+    for page in range(1, pages + 1):
+        records[f'api:posts:page:{page}'] = _dumps({
+            'success': True, 'posts': published[(page - 1) * page_size:page * page_size],
+            'total': len(published), 'page': page, 'pages': pages,
+        })
+    for post in published:
+        records.setdefault(f"api:post:{post['slug']}", _dumps({'success': True, 'post': post}))
+    records[VERSION_KEY] = _dumps({'version': snapshot_version(posts), 'fetchedAt': updated})
+    return records
+
+
+class KVClient:
+    """Bulk write/delete for one KV namespace (base_url can point at serve_kv_mock)"""
+
+    def __init__(self, account_id, namespace_id, api_token, base_url=API_BASE, session=None, timeout=60):
+        self.namespace_id = namespace_id
+        self.url = f"{base_url.rstrip('/')}/accounts/{account_id}/storage/kv/namespaces/{namespace_id}"
+        self.headers = {'Authorization': f'Bearer {api_token}', 'Content-Type': 'application/json'}
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _check(self, response):
+        try:
+            data = response.json()
+        except ValueError:
+            data = {'body': response.text[:500]}
+        if response.status_code != 200 or not data.get('success', False):
+            raise RuntimeError(f"KV API HTTP {response.status_code}: {data.get('errors') or data}")
+        return data.get('result') or {}
+
+    def bulk_put(self, items):
+        """Write [(key, value)] in one request"""
+        body = json.dumps([{'key': key, 'value': value} for key, value in items])
+        return self._check(self.session.put(f"{self.url}/bulk", data=body.encode('utf-8'), headers=self.headers, timeout=self.timeout))
+
+    def bulk_delete(self, keys):
+        """Delete a list of keys in one request"""
+        return self._check(self.session.post(f"{self.url}/bulk/delete", data=json.dumps(list(keys)), headers=self.headers, timeout=self.timeout))
+
+
+def chunk_items(items, max_keys=MAX_BULK_KEYS, max_bytes=MAX_BULK_BYTES):
+    """Split [(key, value)] into bulk-sized chunks (by count and by encoded size)"""
+    chunks, current, size = [], [], 0
+    for key, value in items:
+        item_size = len(key.encode('utf-8')) + len(value.encode('utf-8')) + 32
+        if current and (len(current) >= max_keys or size + item_size > max_bytes):
+            chunks.append(current)
+            current, size = [], 0
+        current.append((key, value))
+        size += item_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _hash(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def sync_kv(records, client, state_dir=STATE_DIR, max_workers=4, max_keys=MAX_BULK_KEYS, max_bytes=MAX_BULK_BYTES, full=False):
+    """Write changed keys, then the version key, then delete stale keys; returns (success, data, message)
+
+    Chunks that fail are left out of the state file, so the next sync retries
+    them. `full` ignores the state file and rewrites every key.
+    """
+    state_path = os.path.join(state_dir, f"{client.namespace_id}.json")
+    state = {} if full else _load_state(state_path)
+    hashes = {key: _hash(value) for key, value in records.items()}
+    changed = [(key, value) for key, value in records.items() if state.get(key) != hashes[key]]
+    version_item = next((item for item in changed if item[0] == VERSION_KEY), None)
+    changed = [item for item in changed if item is not version_item]
+    stale = [key for key in state if key not in records]
+
+    written, errors = [], []
+    chunks = chunk_items(changed, max_keys, max_bytes)
+    if chunks:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            futures = [(chunk, pool.submit(client.bulk_put, chunk)) for chunk in chunks]
+            for chunk, future in futures:
+                try:
+                    future.result()
+                    written.extend(key for key, _ in chunk)
+                except Exception as e:
+                    errors.append(str(e))
+    new_state = {key: value for key, value in state.items() if key in records}
+    new_state.update({key: hashes[key] for key in written})
+
+    # The version pointer moves only once every data key is in place
+    if version_item and not errors:
+        try:
+            client.bulk_put([version_item])
+            written.append(VERSION_KEY)
+            new_state[VERSION_KEY] = hashes[VERSION_KEY]
+        except Exception as e:
+            errors.append(str(e))
+
+    deleted = []
+    if not errors:
+        for chunk in chunk_items([(key, '') for key in stale], max_keys, max_bytes):
+            try:
+                client.bulk_delete([key for key, _ in chunk])
+                deleted.extend(key for key, _ in chunk)
+            except Exception as e:
+                errors.append(str(e))
+    for key in deleted:
+        new_state.pop(key, None)
+    _save_state(state_path, new_state)
+
+    data = {'written': len(written), 'deleted': len(deleted), 'unchanged': len(records) - len(changed) - bool(version_item),
+            'chunks': len(chunks), 'errors': errors}
+    if errors:
+        return False, data, f"KV sync incomplete: {errors[0]}"
+    return True, data, f"KV sync: {len(written)} written, {len(deleted)} deleted, {data['unchanged']} unchanged"
+
+
+def _make_mock_handler(store, requests_log):
+    class KVMockHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length).decode('utf-8') or 'null')
+
+        def _namespace(self, suffix):
+            parts = self.path.split('?', 1)[0].strip('/').split('/')
+            # accounts/<id>/storage/kv/namespaces/<ns>/<suffix...>
+            if len(parts) < 6 or parts[0] != 'accounts' or parts[2:5] != ['storage', 'kv', 'namespaces'] or parts[6:] != suffix:
+                return None
+            if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+                self._send_json({'success': False, 'errors': [{'message': 'Authentication error'}]}, status=401)
+                return False
+            return store.setdefault(parts[5], {})
+
+        def do_PUT(self):
+            namespace = self._namespace(['bulk'])
+            if namespace is None:
+                return self._send_json({'success': False, 'errors': [{'message': 'Not Found'}]}, status=404)
+            if namespace is False:
+                return
+            items = self._read_json()
+            if not isinstance(items, list) or len(items) > MAX_BULK_KEYS:
+                return self._send_json({'success': False, 'errors': [{'message': 'Invalid bulk body'}]}, status=400)
+            for item in items:
+                namespace[item['key']] = item['value']
+            requests_log.append(('put', len(items)))
+            self._send_json({'success': True, 'result': {'successful_key_count': len(items), 'unsuccessful_keys': []}})
+
+        def do_POST(self):
+            namespace = self._namespace(['bulk', 'delete'])
+            if namespace is None:
+                return self._send_json({'success': False, 'errors': [{'message': 'Not Found'}]}, status=404)
+            if namespace is False:
+                return
+            keys = self._read_json() or []
+            for key in keys:
+                namespace.pop(key, None)
+            requests_log.append(('delete', len(keys)))
+            self._send_json({'success': True, 'result': {'successful_key_count': len(keys), 'unsuccessful_keys': []}})
+
+    return KVMockHandler
+
+
+def serve_kv_mock(host='127.0.0.1', port=0):
+    """Local KV bulk API (PUT .../bulk, POST .../bulk/delete) served from a daemon thread
+
+    Namespaces are dicts in server.kv_store; server.kv_requests logs
+    ('put' | 'delete', key count) per request. Use
+    f"http://127.0.0.1:{server.server_address[1]}" as the KVClient base_url.
+    """
+    store, requests_log = {}, []
+    server = ThreadingHTTPServer((host, port), _make_mock_handler(store, requests_log))
+    server.daemon_threads = True
+    server.kv_store = store
+    server.kv_requests = requests_log
+    thread = threading.Thread(target=server.serve_forever, name="kv-mock", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,205 @@
+"""
+Offline import of local spreadsheets (CSV, XLSX, ODS).
+
+Files come from a path or an st.file_uploader upload and end up in the same
+SheetDataset as the Google Sheets path, so validation, snapshots and the
+generators do not care where the rows came from. CSV is read in chunks by
+the pandas C parser; workbooks are read sheet by sheet, across a process
+pool when there are several large sheets. openpyxl (XLSX) and odfpy (ODS)
+are optional: without them those formats report a clear error.
+"""
+
+import hashlib
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time
+
+import pandas as pd
+
+from sheets_loader import PARALLEL_PARSE_MIN_BYTES, SheetDataset
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import odf  # noqa: F401  (pandas' "odf" engine)
+except ImportError:
+    odf = None
+
+SUPPORTED_EXTENSIONS = ['csv', 'xlsx', 'ods']
+CHUNK_ROWS = 20000
+
+
+def detect_format(path):
+    """'csv', 'xlsx' or 'ods' from the file contents (extension only as a hint)"""
+    if not zipfile.is_zipfile(path):
+        # Exports renamed to .xlsx are often plain CSV
+        return 'csv'
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        if 'xl/workbook.xml' in names:
+            return 'xlsx'
+        if 'mimetype' in names and b'opendocument.spreadsheet' in archive.read('mimetype'):
+            return 'ods'
+    raise ValueError(f"Unsupported spreadsheet file: {os.path.basename(path)}")
+
+
+def save_upload(uploaded, directory='.uploads'):
+    """Write an uploaded file (st.file_uploader) to disk, named by its content hash
+
+    Worker processes open workbooks by path, so uploads are parsed from
+    disk like any other local file. Re-uploading the same file reuses it.
+    """
+    data = uploaded.getvalue()
+    stem, extension = os.path.splitext(os.path.basename(uploaded.name))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{stem}-{hashlib.sha256(data).hexdigest()[:12]}{extension.lower()}")
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return path
+
+
+def _clean_frame(df):
+    # Same row shape as parse_csv_rows: trimmed headers, no unnamed columns, no blank rows
+    df = df.rename(columns=lambda header: str(header).strip())
+    df = df[[column for column in df.columns if column and not column.startswith('Unnamed:')]]
+    blank = df.apply(lambda s: s.str.strip() == '').all(axis=1) if len(df.columns) else pd.Series(True, index=df.index)
+    return df[~blank].to_dict('records')
+
+
+def read_csv_rows(path, chunk_rows=CHUNK_ROWS):
+    """Row dicts of a CSV file, parsed `chunk_rows` at a time (all values as strings)"""
+    rows = []
+    chunks = pd.read_csv(path, dtype=str, keep_default_na=False, skip_blank_lines=True,
+                         encoding='utf-8-sig', chunksize=chunk_rows)
+    for chunk in chunks:
+        rows.extend(_clean_frame(chunk))
+    return rows
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == time() else value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def sheet_names(path, fmt=None):
+    """Sheet names of a workbook in file order (one pseudo-sheet for CSV)"""
+    fmt = fmt or detect_format(path)
+    if fmt == 'csv':
+        return [os.path.splitext(os.path.basename(path))[0]]
+    if fmt == 'xlsx':
+        if openpyxl is None:
+            raise ImportError("Reading .xlsx files needs openpyxl (pip install openpyxl)")
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    if odf is None:
+        raise ImportError("Reading .ods files needs odfpy (pip install odfpy)")
+    return list(pd.ExcelFile(path, engine='odf').sheet_names)
+
+
+def read_sheet_rows(path, fmt, sheet_name, chunk_rows=CHUNK_ROWS):
+    """Row dicts of one sheet; XLSX rows are streamed and converted `chunk_rows` at a time"""
+    if fmt == 'csv':
+        return read_csv_rows(path, chunk_rows)
+    if fmt == 'ods':
+        if odf is None:
+            raise ImportError("Reading .ods files needs odfpy (pip install odfpy)")
+        df = pd.read_excel(path, sheet_name=sheet_name, engine='odf', dtype=str, keep_default_na=False)
+        return _clean_frame(df)
+
+    if openpyxl is None:
+        raise ImportError("Reading .xlsx files needs openpyxl (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        values = workbook[sheet_name].iter_rows(values_only=True)
+        headers = [_cell_text(h).strip() for h in next(values, None) or []]
+        rows, chunk = [], []
+        for row in values:
+            chunk.append([_cell_text(value) for value in row])
+            if len(chunk) >= chunk_rows:
+                rows.extend(_clean_frame(pd.DataFrame(chunk, columns=_padded(headers, chunk))))
+                chunk = []
+        if chunk:
+            rows.extend(_clean_frame(pd.DataFrame(chunk, columns=_padded(headers, chunk))))
+        return rows
+    finally:
+        workbook.close()
+
+
+def _padded(headers, chunk):
+    # Rows can be wider or narrower than the header row
+    width = max(len(headers), max(len(row) for row in chunk))
+    for row in chunk:
+        row.extend([''] * (width - len(row)))
+    return headers + [f'Unnamed: {i}' for i in range(len(headers), width)]
+
+
+def _read_sheet_task(args):
+    return read_sheet_rows(*args)
+
+
+def load_local_file(path, tab_names=None, max_workers=4, chunk_rows=CHUNK_ROWS,
+                    parallel_min_bytes=PARALLEL_PARSE_MIN_BYTES):
+    """Load a local CSV/XLSX/ODS file into a SheetDataset
+
+    Workbooks load every sheet (or only `tab_names`); when there are several
+    and the file is at least `parallel_min_bytes`, sheets are parsed in
+    parallel across at most `max_workers` processes. Sheets that fail are
+    reported in dataset.errors, like tabs on the Google path.
+    """
+    fmt = detect_format(path)
+    names = sheet_names(path, fmt)
+    if tab_names:
+        wanted = set(tab_names)
+        errors = {name: "Sheet not found in file" for name in tab_names if name not in names}
+        names = [name for name in names if name in wanted]
+    else:
+        errors = {}
+
+    tasks = [(path, fmt, name, chunk_rows) for name in names]
+    results = {}
+    if len(tasks) > 1 and os.path.getsize(path) >= parallel_min_bytes:
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as pool:
+            futures = {task[2]: pool.submit(_read_sheet_task, task) for task in tasks}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+    else:
+        for task in tasks:
+            try:
+                results[task[2]] = _read_sheet_task(task)
+            except Exception as e:
+                errors[task[2]] = str(e)
+
+    return SheetDataset({name: results[name] for name in names if name in results}, errors)
+
+
+def get_local_file_data(path, sheet_name="WEBSITE"):
+    """Rows of `sheet_name` (or the first sheet) from a local file (same return shape as get_sheets_data)"""
+    if not path or not os.path.exists(path):
+        return False, [], f"Local file not found: {path or '(none)'}"
+    try:
+        dataset = load_local_file(path)
+    except Exception as e:
+        return False, [], f"Error: {str(e)}"
+    tab = sheet_name if sheet_name in dataset else next(iter(dataset.tables), None)
+    if tab is None:
+        return False, [], "; ".join(dataset.errors.values()) or "No sheets found in file"
+    data = dataset[tab]
+    return True, data, f"Successfully loaded {len(data)} rows from {os.path.basename(path)} ({tab})"
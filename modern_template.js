@@ -1,6 +1,6 @@
 // Modern Cloudflare Workers Template
 // Auto-deployable with clean structure
-
+/*{{SITE_DATA}}*/
 // Configuration - will be replaced during deployment
 const CONFIG = {
     SPREADSHEET_ID: '{{SPREADSHEET_ID}}',
@@ -8,16 +8,17 @@ const CONFIG = {
     BLOG_TITLE: '{{BLOG_TITLE}}',
     BLOG_DESCRIPTION: '{{BLOG_DESCRIPTION}}',
     PRIMARY_COLOR: '{{PRIMARY_COLOR}}',
-    SECONDARY_COLOR: '{{SECONDARY_COLOR}}'
+    SECONDARY_COLOR: '{{SECONDARY_COLOR}}',
+    METRICS_ENABLED: '{{METRICS_ENABLED}}' === 'true'
 }
-
+/*{{RUNTIME}}*/
 // Main event listener
 addEventListener('fetch', event => {
-    event.respondWith(handleRequest(event.request))
+    event.respondWith(handleRequest(event.request, event))
 })
 
 // Request router
-async function handleRequest(request) {
+async function handleRequest(request, event) {
     const url = new URL(request.url)
     const path = url.pathname
 
@@ -32,28 +33,50 @@ async function handleRequest(request) {
         return new Response(null, { status: 200, headers: corsHeaders })
     }
 
+    // Signed cache purge from the Apps Script trigger
+    if (path === '/__purge') {
+        return handlePurge(request)
+    }
+
+    const timing = createTiming(event)
+
     try {
-        let response
-
-        switch (path) {
-            case '/':
-                response = await serveBlog()
-                break
-            case '/api/posts':
-                response = await apiResponse(await fetchPosts())
-                break
-            case '/api/stats':
-                response = await apiResponse(await fetchStats())
-                break
-            case '/health':
-                response = await apiResponse({
-                    status: 'healthy',
-                    timestamp: new Date().toISOString(),
-                    config: CONFIG.BLOG_TITLE
-                })
-                break
-            default:
-                response = new Response('Not Found', { status: 404 })
+        // Sitemap, robots.txt and feeds built by the generator, then API payloads precomputed in KV
+        let response = serveArtifact(request, path, timing) || await serveKV(url, timing)
+
+        if (!response) {
+            switch (path) {
+                case '/':
+                    response = await serveBlog(timing)
+                    break
+                case '/api/posts':
+                    response = url.searchParams.has('limit') || url.searchParams.has('offset')
+                        ? await apiResponse(await fetchPostsWindow(url, timing), timing)
+                        : await snapshotAPIResponse(request, timing, await getSnapshot(timing), 'posts', fetchPosts)
+                    break
+                case '/api/stats':
+                    response = await snapshotAPIResponse(request, timing, await getSnapshot(timing), 'stats', fetchStats)
+                    break
+                case '/api/version':
+                    response = await apiResponse(versionPayload(await getSnapshot(timing)), timing)
+                    break
+                case '/health':
+                    response = await apiResponse({
+                        status: 'healthy',
+                        timestamp: new Date().toISOString(),
+                        config: CONFIG.BLOG_TITLE,
+                        metrics: getMetricsSnapshot()
+                    }, timing)
+                    break
+                case '/metrics':
+                    response = CONFIG.METRICS_ENABLED
+                        ? await apiResponse(getMetricsSnapshot(), timing)
+                        : new Response('Not Found', { status: 404 })
+                    break
+                default:
+                    response = (path.startsWith('/post/') && prerenderedPost(pathSlug(path, '/post/'), timing))
+                        || new Response('Not Found', { status: 404 })
+            }
         }
 
         // Add CORS headers
@@ -61,7 +84,7 @@ async function handleRequest(request) {
             response.headers.set(key, value)
         })
 
-        return response
+        return withServerTiming(response, timing, routeLabel(path))
 
     } catch (error) {
         console.error('Request error:', error)
@@ -76,86 +99,66 @@ async function handleRequest(request) {
 }
 
 // API response wrapper
-async function apiResponse(data) {
-    return new Response(JSON.stringify(data), {
+async function apiResponse(data, timing) {
+    const start = timingNow()
+    const body = JSON.stringify(data)
+    timing.add('render', timingNow() - start)
+
+    return new Response(body, {
         headers: { 'Content-Type': 'application/json' }
     })
 }
 
-// Fetch data from Google Sheets
-async function fetchSheetsData() {
-    const urls = [
-        `https://docs.google.com/spreadsheets/d/${CONFIG.SPREADSHEET_ID}/export?format=csv&gid=0`,
-        `https://docs.google.com/spreadsheets/d/${CONFIG.SPREADSHEET_ID}/export?format=csv`
-    ]
-
-    for (const url of urls) {
-        try {
-            const response = await fetch(url, {
-                headers: { 'User-Agent': 'CF-Workers-Blog/1.0' }
-            })
-
-            if (response.ok && response.status === 200) {
-                const csvText = await response.text()
-                if (csvText && !csvText.includes('<!DOCTYPE') && csvText.includes(',')) {
-                    return parseCSV(csvText)
-                }
-            }
-        } catch (error) {
-            console.error(`Failed to fetch from ${url}:`, error)
-        }
-    }
+// Fetch data from Google Sheets (hedged across URLs for the configured tab, see sheetVariants)
+async function fetchSheetsData(timing) {
+    const variants = sheetVariants(CONFIG.SPREADSHEET_ID, CONFIG.SHEET_NAME)
 
-    return []
+    // Every variant failed (null): cachedSnapshot falls back to the last-known-good snapshot
+    return hedgedFetch(variants, timing, response => {
+        if (!response.ok || response.status !== 200) return null
+        return readCSV(response, timing, post => post.title ? post : null)
+    }, { headers: { 'User-Agent': 'CF-Workers-Blog/1.0' } })
 }
 
-// Simple CSV parser
-function parseCSV(csvText) {
-    const lines = csvText.trim().split('\n')
-    if (lines.length < 2) return []
-
-    const headers = lines[0].split(',').map(h => h.replace(/"/g, '').trim().toLowerCase())
-    const posts = []
-
-    for (let i = 1; i < lines.length; i++) {
-        const values = lines[i].split(',').map(v => v.replace(/"/g, '').trim())
-        if (values.length < headers.length) continue
-
-        const post = {}
-        headers.forEach((header, index) => {
-            post[header] = values[index] || ''
-        })
-
-        if (post.title && post.title.trim()) {
-            posts.push(post)
-        }
-    }
-
-    return posts
+async function getSnapshot(timing) {
+    return cachedSnapshot(timing, async () => (await loadPrebuiltPosts(timing)) || fetchSheetsData(timing))
 }
 
-// Get posts data
-async function fetchPosts() {
-    const posts = await fetchSheetsData()
+// Get posts data (`snapshot` is passed when the body is built for snapshotAPIResponse)
+async function fetchPosts(timing, snapshot) {
+    const { posts } = snapshot || await getSnapshot(timing)
     return {
         success: true,
-        posts: posts.filter(post => post.status !== 'draft'),
+        posts: await timing.measure('index', () => posts.filter(post => post.status !== 'draft')),
         total: posts.length
     }
 }
 
+// Rows the list views show, for queries pushed down to Google (see queryListWindow)
+const SHEET_SOURCE = {
+    spreadsheetId: CONFIG.SPREADSHEET_ID,
+    sheetName: CONFIG.SHEET_NAME,
+    where: PUBLISHED_WHERE,
+    toRecord: post => post.title ? post : null
+}
+
+// One window of list fields (no content), e.g. /api/posts?limit=6&offset=12
+async function fetchPostsWindow(url, timing) {
+    return (await queryListWindow(url, SHEET_SOURCE, timing)) || listWindowPayload((await fetchPosts(timing)).posts, url)
+}
+
 // Get statistics
-async function fetchStats() {
-    const posts = await fetchSheetsData()
+async function fetchStats(timing, snapshot) {
+    const { posts } = snapshot || await getSnapshot(timing)
     const categories = new Set()
     const tags = new Set()
 
-    posts.forEach(post => {
+    await timing.measure('index', () => posts.forEach(post => {
         if (post.category) categories.add(post.category)
         if (post.tags) {
             post.tags.split(',').forEach(tag => tags.add(tag.trim()))
         }
-    })
+    }))
 
     return {
         success: true,
@@ -168,7 +171,11 @@ async function fetchStats() {
 }
 
 // Serve main blog page
-async function serveBlog() {
+async function serveBlog(timing) {
+    // Inlined for BlogLoader, so first paint needs no /api round-trip.
+    // The load starts here; with STREAM_HTML the page is sent while it runs.
+    const routes = (async () => ({ '/api/posts': await fetchPosts(timing), '/api/stats': await fetchStats(timing) }))()
+    const renderStart = timingNow()
     const html = `<!DOCTYPE html>
 <html lang="id">
 <head>
@@ -396,6 +403,8 @@ async function serveBlog() {
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
     
     <script>
+        /*{{VERSION_WATCH_CLIENT}}*/
+
         // Modern async data loading
         class BlogLoader {
             constructor() {
@@ -410,11 +419,11 @@ async function serveBlog() {
                     this.loadStats()
                 ])
                 
-                // Auto-refresh every 5 minutes
-                setInterval(() => {
+                // Reload data only when the sheet version changes
+                watchDataVersion('/api/version', 60000, () => {
                     this.loadPosts()
                     this.loadStats()
-                }, 300000)
+                })
             }
 
             async loadPosts() {
@@ -547,8 +556,13 @@ async function serveBlog() {
     </script>
 </body>
 </html>`
-
-    return new Response(html, {
-        headers: { 'Content-Type': 'text/html' }
-    })
+    timing.add('render', timingNow() - renderStart)
+
+    // Nothing above depends on the sheet: only the state before </body> waits for it
+    // (BlogLoader starts on DOMContentLoaded, after the shim is installed)
+    const stateAt = html.lastIndexOf('</body>')
+    return htmlResponse([
+        html.slice(0, stateAt),
+        routes.then(resolved => hydrationScript(resolved) + '\n' + html.slice(stateAt))
+    ], { 'Content-Type': 'text/html' })
 }
\ No newline at end of file
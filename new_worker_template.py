@@ -1,3 +1,8 @@
+from datetime import datetime
+
+from worker_runtime import assemble_worker, site_data_js
+
+
 def generate_improved_worker_script(config, custom_html_template=None):
     """Generate improved Cloudflare Workers script following best practices"""
     spreadsheet_id = config.get('spreadsheetId', '14K69q8SMd3pCAROB1YQMDrmuw8y6QphxAslF_y-3NrM')
@@ -5,24 +10,20 @@ def generate_improved_worker_script(config, custom_html_template=None):
     blog_title = config.get('blogTitle', 'My Blog')
     blog_description = config.get('blogDescription', 'Blog powered by Google Sheets')
     blog_keywords = config.get('blogKeywords', 'blog, google sheets')
+    enable_metrics = 'true' if config.get('enableMetrics', False) else 'false'
     
-    # Escape custom template for JavaScript
-    custom_template_js = "null"
-    if custom_html_template:
-        import json
-        escaped_template = json.dumps(custom_html_template)
-        custom_template_js = escaped_template
-    
-    return f"""// Improved Cloudflare Workers Script
+    header = f"""// Improved Cloudflare Workers Script
 // Following CF Workers best practices
 // Generated on: {datetime.now().isoformat()}
-
-// Configuration
+"""
+    
+    data = f"""// Configuration
 const CONFIG = {{
     SPREADSHEET_ID: '{spreadsheet_id}',
     SHEET_NAME: '{sheet_name}',
     BLOG_TITLE: '{blog_title}',
     BLOG_DESCRIPTION: '{blog_description}',
+    METRICS_ENABLED: {enable_metrics},
     CORS_HEADERS: {{
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
@@ -30,16 +31,16 @@ const CONFIG = {{
     }}
 }}
 
-// Custom HTML Template
-const CUSTOM_HTML_TEMPLATE = {custom_template_js}
-
-// Main event listener
+// Custom HTML Template and build-time data
+{site_data_js(config, custom_html_template)}"""
+    
+    return assemble_worker(header, data, f"""// Main event listener
 addEventListener('fetch', event => {{
-    event.respondWith(handleRequest(event.request))
+    event.respondWith(handleRequest(event.request, event))
 }})
 
 // Route handler
-async function handleRequest(request) {{
+async function handleRequest(request, event) {{
     const url = new URL(request.url)
     const path = url.pathname
 
@@ -48,16 +49,34 @@ async function handleRequest(request) {{
         return handleCORS()
     }}
 
+    // Signed cache purge from the Apps Script trigger
+    if (path === '/__purge') {{
+        return handlePurge(request)
+    }}
+
+    const timing = createTiming(event)
+    // Sitemap, robots.txt and feeds built by the generator, then API payloads precomputed in KV
+    const response = serveArtifact(request, path, timing) || await serveKV(url, timing) || await routeRequest(request, url, timing)
+    return withServerTiming(response, timing, routeLabel(path))
+}}
+
+async function routeRequest(request, url, timing) {{
+    const path = url.pathname
     // Route handling
     switch (path) {{
         case '/':
-            return serveHomePage()
+            return serveHomePage(timing)
         case '/api/posts':
-            return handleAPIResponse(await getPosts())
+            if (url.searchParams.has('limit') || url.searchParams.has('offset')) {{
+                return handleAPIResponse(await getPostsWindow(url, timing), timing)
+            }}
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'posts', getPosts, CONFIG.CORS_HEADERS)
         case '/api/categories':
-            return handleAPIResponse(await getCategories())
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'categories', getCategories, CONFIG.CORS_HEADERS)
         case '/api/stats':
-            return handleAPIResponse(await getStats())
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'stats', getStats, CONFIG.CORS_HEADERS)
+        case '/api/version':
+            return handleAPIResponse(versionPayload(await getSnapshot(timing)), timing)
         case '/health':
             return handleAPIResponse({{ 
                 status: 'ok', 
@@ -66,9 +85,19 @@ async function handleRequest(request) {{
                     spreadsheet_id: CONFIG.SPREADSHEET_ID,
                     blog_title: CONFIG.BLOG_TITLE,
                     custom_template: CUSTOM_HTML_TEMPLATE !== null
-                }}
-            }})
+                }},
+                metrics: getMetricsSnapshot()
+            }}, timing)
+        case '/metrics':
+            if (CONFIG.METRICS_ENABLED) {{
+                return handleAPIResponse(getMetricsSnapshot(), timing)
+            }}
+            return new Response('Not Found', {{ status: 404 }})
         default:
+            if (path.startsWith('/post/')) {{
+                const page = prerenderedPost(pathSlug(path, '/post/'), timing)
+                if (page) return page
+            }}
             return new Response('Not Found', {{ status: 404 }})
     }}
 }}
@@ -82,8 +111,12 @@ function handleCORS() {{
 }}
 
 // API response wrapper
-function handleAPIResponse(data) {{
-    return new Response(JSON.stringify(data), {{
+function handleAPIResponse(data, timing) {{
+    const start = timingNow()
+    const body = JSON.stringify(data)
+    timing.add('render', timingNow() - start)
+
+    return new Response(body, {{
         headers: {{
             'Content-Type': 'application/json',
             ...CONFIG.CORS_HEADERS
@@ -91,80 +124,42 @@ function handleAPIResponse(data) {{
     }})
 }}
 
-// Fetch Google Sheets data
-async function fetchSheetsData() {{
-    try {{
-        const urls = [
-            `https://docs.google.com/spreadsheets/d/${{CONFIG.SPREADSHEET_ID}}/export?format=csv&gid=0`,
-            `https://docs.google.com/spreadsheets/d/${{CONFIG.SPREADSHEET_ID}}/export?format=csv`,
-            `https://docs.google.com/spreadsheets/d/${{CONFIG.SPREADSHEET_ID}}/gviz/tq?tqx=out:csv&sheet=${{CONFIG.SHEET_NAME}}`
-        ]
+// Fetch Google Sheets data (hedged across URLs for the configured tab, see sheetVariants)
+async function fetchSheetsData(timing) {{
+    const variants = sheetVariants(CONFIG.SPREADSHEET_ID, CONFIG.SHEET_NAME)
 
-        for (const url of urls) {{
-            try {{
-                console.log(`Trying URL: ${{url}}`)
-                const response = await fetch(url, {{
-                    headers: {{
-                        'User-Agent': 'Mozilla/5.0 (compatible; CF-Worker/1.0)'
-                    }}
-                }})
-
-                if (response.ok && !response.url.includes('accounts.google.com')) {{
-                    const csvText = await response.text()
-                    if (csvText && !csvText.includes('<!DOCTYPE') && !csvText.includes('<html')) {{
-                        return parseCSV(csvText)
-                    }}
-                }}
-            }} catch (error) {{
-                console.error(`Error with URL ${{url}}:`, error)
-                continue
-            }}
+    // Every variant failed (null): cachedSnapshot falls back to the last-known-good snapshot
+    return hedgedFetch(variants, timing, response => {{
+        if (!response.ok || response.url.includes('accounts.google.com')) return null
+        return readCSV(response, timing, csvPost)
+    }}, {{
+        headers: {{
+            'User-Agent': 'Mozilla/5.0 (compatible; CF-Worker/1.0)'
         }}
-
-        return []
-    }} catch (error) {{
-        console.error('Error fetching sheets data:', error)
-        return []
-    }}
+    }})
 }}
 
-// Parse CSV data
-function parseCSV(csvText) {{
-    const lines = csvText.trim().split('\\n')
-    if (lines.length < 2) return []
-
-    const headers = lines[0].split(',').map(h => h.replace(/"/g, '').trim().toLowerCase())
-    const posts = []
-
-    for (let i = 1; i < lines.length; i++) {{
-        const values = lines[i].split(',').map(v => v.replace(/"/g, '').trim())
-        if (values.length < headers.length) continue
-
-        const post = {{}}
-        headers.forEach((header, index) => {{
-            post[header] = values[index] || ''
-        }})
-
-        // Skip empty posts
-        if (!post.title && !post.content) continue
-
-        // Create slug from title
-        post.slug = (post.title || '').toLowerCase()
-            .replace(/[^a-z0-9]+/g, '-')
-            .replace(/^-|-$/g, '')
+async function getSnapshot(timing) {{
+    return cachedSnapshot(timing, async () => (await loadPrebuiltPosts(timing)) || fetchSheetsData(timing))
+}}
 
-        posts.push(post)
-    }}
+// Rows the list views show, for queries pushed down to Google (see queryListWindow)
+const SHEET_SOURCE = {{ spreadsheetId: CONFIG.SPREADSHEET_ID, sheetName: CONFIG.SHEET_NAME, where: PUBLISHED_WHERE, toRecord: csvPost }}
 
-    return posts
+// Post for a parsed CSV row: empty rows are skipped, the slug comes from the title
+function csvPost(post) {{
+    if (!post.title && !post.content) return null
+    post.slug = slugFor(post.title)
+    return post
 }}
 
 // API endpoints
-async function getPosts() {{
-    const posts = await fetchSheetsData()
-    const publishedPosts = posts.filter(post => 
+// `snapshot` is passed when the body is built for snapshotAPIResponse
+async function getPosts(timing, snapshot) {{
+    const {{ posts }} = snapshot || await getSnapshot(timing)
+    const publishedPosts = await timing.measure('index', () => posts.filter(post => 
         post.status !== 'draft' && post.title && post.title.trim()
-    )
+    ))
 
     return {{
         success: true,
@@ -173,14 +168,19 @@ async function getPosts() {{
     }}
 }}
 
-async function getCategories() {{
-    const posts = await fetchSheetsData()
+// One window of list fields (no content), e.g. /api/posts?limit=6&offset=12
+async function getPostsWindow(url, timing) {{
+    return (await queryListWindow(url, SHEET_SOURCE, timing)) || listWindowPayload((await getPosts(timing)).posts, url)
+}}
+
+async function getCategories(timing, snapshot) {{
+    const {{ posts }} = snapshot || await getSnapshot(timing)
     const categories = {{}}
 
-    posts.forEach(post => {{
+    await timing.measure('index', () => posts.forEach(post => {{
         const category = post.category || 'Uncategorized'
         categories[category] = (categories[category] || 0) + 1
-    }})
+    }}))
 
     return {{
         success: true,
@@ -191,17 +191,17 @@ async function getCategories() {{
     }}
 }}
 
-async function getStats() {{
-    const posts = await fetchSheetsData()
+async function getStats(timing, snapshot) {{
+    const {{ posts, fetchedAt }} = snapshot || await getSnapshot(timing)
     const categories = new Set()
     const tags = new Set()
 
-    posts.forEach(post => {{
+    await timing.measure('index', () => posts.forEach(post => {{
         if (post.category) categories.add(post.category)
         if (post.tags) {{
             post.tags.split(',').forEach(tag => tags.add(tag.trim()))
         }}
-    }})
+    }}))
 
     return {{
         success: true,
@@ -209,35 +209,54 @@ async function getStats() {{
             totalPosts: posts.length,
             totalCategories: categories.size,
             totalTags: tags.size,
-            lastUpdated: new Date().toISOString()
+            lastUpdated: new Date(fetchedAt).toISOString()
         }}
     }}
 }}
 
 // Serve homepage
-async function serveHomePage() {{
+async function serveHomePage(timing) {{
+    const headers = {{
+        'Content-Type': 'text/html',
+        ...CONFIG.CORS_HEADERS
+    }}
+    // Posts and stats come from the cached snapshot, so the page arrives complete in one response.
+    // The load starts here; with STREAM_HTML the shell is sent while it runs.
+    const data = (async () => {{
+        const postsPayload = await getPosts(timing)
+        const statsPayload = await getStats(timing)
+        return {{ postsPayload, statsPayload }}
+    }})()
+
     // Use custom template if available
     if (CUSTOM_HTML_TEMPLATE) {{
         console.log('Using custom HTML template')
         
         // Replace template variables in custom template
         let html = CUSTOM_HTML_TEMPLATE
-        html = html.replace(/\\{\\{blog_title\\}\\}/g, CONFIG.BLOG_TITLE)
-        html = html.replace(/\\{\\{blog_description\\}\\}/g, CONFIG.BLOG_DESCRIPTION)
-        html = html.replace(/\\{\\{site_title\\}\\}/g, CONFIG.BLOG_TITLE)
-        html = html.replace(/\\{\\{site_description\\}\\}/g, CONFIG.BLOG_DESCRIPTION)
-        html = html.replace(/\\{\\{current_year\\}\\}/g, new Date().getFullYear())
-        
-        return new Response(html, {{
-            headers: {{ 
-                'Content-Type': 'text/html',
-                ...CONFIG.CORS_HEADERS 
-            }}
-        }})
+        html = html.replace(/\\{{\\{{blog_title\\}}\\}}/g, CONFIG.BLOG_TITLE)
+        html = html.replace(/\\{{\\{{blog_description\\}}\\}}/g, CONFIG.BLOG_DESCRIPTION)
+        html = html.replace(/\\{{\\{{site_title\\}}\\}}/g, CONFIG.BLOG_TITLE)
+        html = html.replace(/\\{{\\{{site_description\\}}\\}}/g, CONFIG.BLOG_DESCRIPTION)
+        html = html.replace(/\\{{\\{{current_year\\}}\\}}/g, new Date().getFullYear())
+        // The template's own /api calls are answered from the inlined payloads
+        return templateResponse(html, data.then(({{ postsPayload, statsPayload }}) => (
+            {{ '/api/posts': postsPayload, '/api/stats': statsPayload }}
+        )), headers)
     }}
 
     // Default template if no custom template
-    const html = `<!DOCTYPE html>
+    return htmlResponse([renderHomeShell(), data.then(({{ postsPayload, statsPayload }}) => {{
+        const renderStart = timingNow()
+        const html = renderHomeBody(firstPagePayload(postsPayload, HOME_FIRST_PAGE), statsPayload)
+        timing.add('render', timingNow() - renderStart)
+        return html
+    }})], headers)
+}}
+
+// Head, CSS and page shell: everything that does not depend on the sheet
+function renderHomeShell() {{
+    return `<!DOCTYPE html>
 <html lang="id">
 <head>
     <meta charset="UTF-8">
@@ -299,11 +318,14 @@ async function serveHomePage() {{
         <div class="row">
             <div class="col-lg-8">
                 <h2 class="mb-4"><i class="fas fa-newspaper me-2"></i>Latest Posts</h2>
-                <div id="postsContainer" class="row">
-                    <div class="col-12 loading">
-                        <i class="fas fa-spinner fa-spin fa-2x"></i>
-                        <p class="mt-2">Loading posts...</p>
-                    </div>
+                <div id="postsContainer" class="row">`
+}}
+
+// Post cards, stats and page scripts for the first page of the snapshot
+function renderHomeBody(firstPosts, statsPayload) {{
+    const stats = statsPayload.stats
+    return `
+                    ${{firstPosts.posts.length ? firstPosts.posts.map(renderHomeCard).join('') : renderEmptyHome()}}
                 </div>
             </div>
             <div class="col-lg-4">
@@ -311,7 +333,20 @@ async function serveHomePage() {{
                     <div class="card-body">
                         <h5><i class="fas fa-chart-bar me-2"></i>Statistics</h5>
                         <div id="statsContainer">
-                            <p><i class="fas fa-spinner fa-spin"></i> Loading...</p>
+                            <div class="row text-center">
+                                <div class="col-4">
+                                    <h6>${{stats.totalPosts}}</h6>
+                                    <small class="text-muted">Posts</small>
+                                </div>
+                                <div class="col-4">
+                                    <h6>${{stats.totalCategories}}</h6>
+                                    <small class="text-muted">Categories</small>
+                                </div>
+                                <div class="col-4">
+                                    <h6>${{stats.totalTags}}</h6>
+                                    <small class="text-muted">Tags</small>
+                                </div>
+                            </div>
                         </div>
                     </div>
                 </div>
@@ -326,6 +361,7 @@ async function serveHomePage() {{
         </div>
     </footer>
 
+    ${{hydrationScript({{ '/api/posts': firstPosts, '/api/stats': statsPayload }})}}
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
     <script>
         // Load posts
@@ -403,19 +439,39 @@ async function serveHomePage() {{
             }}
         }}
 
-        // Initialize
+        // Server-rendered above; only a partial first page fetches the rest (after first paint)
         document.addEventListener('DOMContentLoaded', function() {{
-            loadPosts();
-            loadStats();
+            if (JSON.parse(document.getElementById('initial-state').textContent)['/api/posts'].partial) loadPosts();
         }});
     </script>
 </body>
 </html>`
+}}
 
-    return new Response(html, {{
-        headers: {{ 
-            'Content-Type': 'text/html',
-            ...CONFIG.CORS_HEADERS 
-        }}
-    }})
-}}"""
\ No newline at end of file
+// One homepage post card (same markup loadPosts() renders in the browser)
+function renderHomeCard(post) {{
+    return `
+                        <div class="col-md-6 mb-4">
+                            <div class="card h-100">
+                                <div class="card-body d-flex flex-column">
+                                    <h5 class="card-title">${{escapeHtml(post.title || 'Untitled')}}</h5>
+                                    <p class="card-text flex-grow-1">${{escapeHtml((post.content || '').substring(0, 120))}}...</p>
+                                    <div class="mt-auto">
+                                        <small class="text-muted">
+                                            <i class="fas fa-folder me-1"></i>${{escapeHtml(post.category || 'General')}}
+                                            <span class="ms-2">${{escapeHtml(post.date || 'No date')}}</span>
+                                        </small>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>`
+}}
+
+function renderEmptyHome() {{
+    return `
+                        <div class="col-12 text-center py-5">
+                            <i class="fas fa-file-alt fa-3x text-muted mb-3"></i>
+                            <h4>No Posts Found</h4>
+                            <p class="text-muted">Add content to your Google Sheets.</p>
+                        </div>`
+}}""")
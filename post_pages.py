@@ -0,0 +1,218 @@
+"""
+Per-post HTML pages rendered on the Python side.
+
+Each published post becomes a complete page (meta description, OpenGraph,
+Twitter card and JSON-LD BlogPosting from the sheet columns) so /post/<slug>
+paints without any client-side API call. Pages are split into a per-post
+head and body around one shared layout: written out as static files, or
+embedded in a worker as a compact {layout, pages} map (see worker_runtime).
+Large post lists are rendered across a process pool.
+"""
+
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+
+from blog_schema import post_tags
+from sheets_loader import slugify
+
+# Below this many posts, process start-up costs more than rendering
+PARALLEL_RENDER_MIN_POSTS = 500
+HEAD_MARKER = '<!--post-head-->'
+BODY_MARKER = '<!--post-body-->'
+
+LAYOUT = """<!DOCTYPE html>
+<html lang="%(lang)s">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+""" + HEAD_MARKER + """
+<style>
+body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; color: #1e293b; background: #f8fafc; }
+header { background: %(primary)s; color: #fff; padding: 14px 20px; }
+header a { color: #fff; text-decoration: none; font-weight: 600; }
+main { max-width: 760px; margin: 0 auto; padding: 24px 20px; }
+article { background: #fff; border-radius: 12px; padding: 28px; box-shadow: 0 2px 6px rgba(0,0,0,0.06); }
+h1 { margin: 0 0 8px; line-height: 1.25; }
+.meta { color: #64748b; font-size: 0.9rem; margin-bottom: 20px; }
+.featured { width: 100%%; height: auto; border-radius: 8px; margin-bottom: 20px; }
+.content { line-height: 1.8; font-size: 1.05rem; }
+.tags span { display: inline-block; background: %(primary)s; color: #fff; border-radius: 999px; padding: 2px 10px; margin: 0 4px 4px 0; font-size: 0.8rem; }
+footer { text-align: center; color: #64748b; padding: 24px; font-size: 0.85rem; }
+</style>
+</head>
+<body>
+<header><a href="/">%(site_title)s</a></header>
+<main>
+""" + BODY_MARKER + """
+<p><a href="/">&larr; Back to Blog</a></p>
+</main>
+<footer>&copy; %(year)s %(site_title)s</footer>
+</body>
+</html>
+"""
+
+
+def _script_json(value):
+    # Safe inside <script>: no "</script>" or "<!--" can close the block early
+    return json.dumps(value, ensure_ascii=False, default=str).replace('</', '<\\/').replace('<!--', '<\\!--')
+
+
+def _attr(value):
+    return html.escape(str(value or ''), quote=True)
+
+
+def meta_description(post, limit=160):
+    """meta_description, else excerpt, else the start of the content (one line, <= limit chars)"""
+    text = post.get('meta_description') or post.get('excerpt') or post.get('content') or ''
+    text = ' '.join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + '…'
+
+
+def content_html(text):
+    """Plain sheet text as escaped paragraphs (blank line = new paragraph, newline = <br>)"""
+    paragraphs = re.split(r'\n\s*\n', str(text or '').replace('\r\n', '\n').strip())
+    return ''.join(
+        '<p>' + html.escape(paragraph).replace('\n', '<br>') + '</p>'
+        for paragraph in paragraphs if paragraph.strip()
+    )
+
+
+def render_layout(site):
+    """Shared page shell with HEAD_MARKER / BODY_MARKER where each post goes"""
+    return LAYOUT % {
+        'lang': _attr(site.get('lang', 'id')),
+        'primary': site.get('primary_color', '#2563eb'),
+        'site_title': html.escape(str(site.get('title', 'Blog'))),
+        'year': datetime.now().year,
+    }
+
+
+def render_post_parts(post, site):
+    """(head, body) HTML fragments for one post"""
+    site_title = str(site.get('title', 'Blog'))
+    base_url = str(site.get('base_url') or '').rstrip('/')
+    slug = post.get('slug') or slugify(post.get('title', ''))
+    url = f"{base_url}/post/{slug}" if base_url else ''
+    title = str(post.get('title', ''))
+    description = meta_description(post)
+    image = post.get('featured_image') or ''
+    tags = post_tags(post)
+    author = post.get('author') or 'Admin'
+    if isinstance(post.get('author_info'), dict):
+        author = post['author_info'].get('name') or author
+
+    head = [
+        f"<title>{html.escape(title)} - {html.escape(site_title)}</title>",
+        f'<meta name="description" content="{_attr(description)}">',
+    ]
+    if tags:
+        head.append(f'<meta name="keywords" content="{_attr(", ".join(tags))}">')
+    if url:
+        head.append(f'<link rel="canonical" href="{_attr(url)}">')
+    head += [
+        '<meta property="og:type" content="article">',
+        f'<meta property="og:title" content="{_attr(title)}">',
+        f'<meta property="og:description" content="{_attr(description)}">',
+        f'<meta property="og:site_name" content="{_attr(site_title)}">',
+    ]
+    if url:
+        head.append(f'<meta property="og:url" content="{_attr(url)}">')
+    if image:
+        head.append(f'<meta property="og:image" content="{_attr(image)}">')
+    if post.get('date'):
+        head.append(f'<meta property="article:published_time" content="{_attr(post["date"])}">')
+    if post.get('category'):
+        head.append(f'<meta property="article:section" content="{_attr(post["category"])}">')
+    head.append(f'<meta name="twitter:card" content="{"summary_large_image" if image else "summary"}">')
+
+    json_ld = {
+        '@context': 'https://schema.org',
+        '@type': 'BlogPosting',
+        'headline': title,
+        'description': description,
+        'author': {'@type': 'Person', 'name': str(author)},
+        'publisher': {'@type': 'Organization', 'name': site_title},
+    }
+    if post.get('date'):
+        json_ld['datePublished'] = json_ld['dateModified'] = str(post['date'])
+    if image:
+        json_ld['image'] = image
+    if url:
+        json_ld['url'] = json_ld['mainEntityOfPage'] = url
+    if tags:
+        json_ld['keywords'] = ', '.join(tags)
+    if post.get('category'):
+        json_ld['articleSection'] = str(post['category'])
+    head.append(f'<script type="application/ld+json">{_script_json(json_ld)}</script>')
+
+    meta = ' &bull; '.join(html.escape(str(part)) for part in (post.get('category') or 'Uncategorized', post.get('date'), author) if part)
+    body = [
+        '<article>',
+        f'<h1>{html.escape(title)}</h1>',
+        f'<div class="meta">{meta}</div>',
+    ]
+    if image:
+        body.append(f'<img class="featured" src="{_attr(image)}" alt="{_attr(title)}">')
+    body.append(f'<div class="content">{content_html(post.get("content"))}</div>')
+    if tags:
+        body.append('<div class="tags">' + ''.join(f'<span>{html.escape(tag)}</span>' for tag in tags) + '</div>')
+    body.append('</article>')
+    return '\n'.join(head), '\n'.join(body)
+
+
+def render_post_page(post, site, layout=None):
+    """Complete HTML page for one post"""
+    head, body = render_post_parts(post, site)
+    return (layout or render_layout(site)).replace(HEAD_MARKER, head, 1).replace(BODY_MARKER, body, 1)
+
+
+def _publishable(posts):
+    seen = set()
+    for post in posts:
+        if (post.get('status') or 'published') != 'published':
+            continue
+        slug = post.get('slug') or slugify(post.get('title', ''))
+        if slug and slug not in seen:
+            seen.add(slug)
+            yield slug, post
+
+
+def render_post_pages(posts, site, max_workers=4, parallel_min_posts=PARALLEL_RENDER_MIN_POSTS):
+    """{slug: (head, body)} for every published post (first post wins on duplicate slugs)"""
+    slugs, selected = [], []
+    for slug, post in _publishable(posts):
+        slugs.append(slug)
+        selected.append(dict(post, slug=slug))
+
+    render = partial(render_post_parts, site=site)
+    if len(selected) >= parallel_min_posts and max_workers > 1:
+        chunksize = max(1, len(selected) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(render, selected, chunksize=chunksize))
+    else:
+        parts = [render(post) for post in selected]
+    return dict(zip(slugs, parts))
+
+
+def prerendered_map(posts, site, **kwargs):
+    """Compact {layout, pages} map for config['prerenderedPages'] in the worker generators"""
+    pages = render_post_pages(posts, site, **kwargs)
+    return {'layout': render_layout(site), 'pages': {slug: list(parts) for slug, parts in pages.items()}}
+
+
+def write_post_pages(posts, site, directory='dist', **kwargs):
+    """Write post/<slug>/index.html static files, returns the written paths"""
+    layout = render_layout(site)
+    paths = []
+    for slug, (head, body) in render_post_pages(posts, site, **kwargs).items():
+        path = os.path.join(directory, 'post', slug, 'index.html')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(layout.replace(HEAD_MARKER, head, 1).replace(BODY_MARKER, body, 1))
+        paths.append(path)
+    return paths
@@ -0,0 +1,206 @@
+"""
+Memoized preview rendering for the Preview tab and preview_generated_template.
+
+Rendered HTML is keyed on (template hash, config hash, data snapshot version)
+and kept in a bounded LRU, so a Streamlit rerun or a tab switch reuses the
+previous result instead of re-reading files and re-running the template
+substitutions. Callers pass the version the snapshot store already assigned;
+hashing the posts is only the fallback. Large post lists render progressively:
+the first screen of cards is plain HTML, the rest (card fields only) is
+appended in chunks after first paint.
+"""
+
+import hashlib
+import html
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from blog_schema import post_tags
+from change_detector import snapshot_version
+from preview_server import api_routes
+
+_file_cache = {}
+
+
+def content_hash(value):
+    """Short hash of a string, or of any JSON-serializable value"""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def read_text_cached(path):
+    """File contents, re-read only when mtime or size changes (None if missing)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    cached = _file_cache.get(path)
+    if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    _file_cache[path] = ((stat.st_mtime_ns, stat.st_size), text)
+    return text
+
+
+def _script_json(value):
+    # Safe inside <script>: no "</script>" or "<!--" can close the block early
+    return json.dumps(value, ensure_ascii=False, default=str).replace('</', '<\\/').replace('<!--', '<\\!--')
+
+
+CARD_STYLE = """<style>
+    body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 12px; background: #f8fafc; }
+    .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(260px, 1fr)); gap: 12px; }
+    .card { background: #fff; border-radius: 10px; padding: 14px; box-shadow: 0 2px 4px rgba(0,0,0,0.08); }
+    .card h4 { margin: 0 0 6px; color: %(primary)s; font-size: 1rem; }
+    .meta { color: #64748b; font-size: 0.8rem; margin-bottom: 8px; }
+    .tags { color: #475569; font-size: 0.8rem; margin-top: 8px; }
+    .count { color: #64748b; font-size: 0.8rem; margin-bottom: 8px; }
+</style>
+"""
+
+CARD_JS = """<script>
+(function () {
+    const rest = JSON.parse(document.getElementById('preview-rest').textContent)
+    const grid = document.getElementById('preview-grid')
+    const escapeHtml = text => String(text == null ? '' : text).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]))
+    const schedule = window.requestIdleCallback || (fn => setTimeout(fn, 16))
+    let index = 0
+    function appendChunk() {
+        const html = rest.slice(index, index + %(chunk)d).map(post => `
+            <div class="card">
+                <h4>${escapeHtml(post.title)}</h4>
+                <div class="meta">${escapeHtml(post.category)} &bull; ${escapeHtml(post.date)} &bull; ${escapeHtml(post.author)}</div>
+                <div>${escapeHtml(post.excerpt)}...</div>
+                <div class="tags"><b>Tags:</b> ${escapeHtml(post.tags.join(', '))}</div>
+            </div>`).join('')
+        grid.insertAdjacentHTML('beforeend', html)
+        index += %(chunk)d
+        if (index < rest.length) schedule(appendChunk)
+    }
+    if (rest.length) schedule(appendChunk)
+})()
+</script>
+"""
+
+FETCH_SHIM_JS = """<script type="application/json" id="preview-routes">%(routes)s</script>
+<script>
+(function () {
+    // Offline preview: answer the template's /api calls from the embedded snapshot
+    const routes = JSON.parse(document.getElementById('preview-routes').textContent)
+    const realFetch = window.fetch ? window.fetch.bind(window) : null
+    window.fetch = function (input, init) {
+        const path = new URL(String(input && input.url ? input.url : input), 'https://preview.local').pathname
+        if (Object.prototype.hasOwnProperty.call(routes, path)) {
+            return Promise.resolve(new Response(JSON.stringify(routes[path]), { headers: { 'Content-Type': 'application/json' } }))
+        }
+        return realFetch ? realFetch(input, init) : Promise.reject(new Error('Not available in preview'))
+    }
+})()
+</script>
+"""
+
+
+EXCERPT_CHARS = 200
+
+
+def card_fields(post):
+    """Only what a card shows: the full content never goes into the preview iframe"""
+    return {
+        'title': str(post.get('title', '')),
+        'category': str(post.get('category', '')),
+        'date': str(post.get('date', '')),
+        'author': str(post.get('author', '')),
+        'excerpt': str(post.get('content') or '')[:EXCERPT_CHARS],
+        'tags': post_tags(post),
+    }
+
+
+def _card(card):
+    return (
+        '<div class="card">'
+        f"<h4>{html.escape(card['title'])}</h4>"
+        f"<div class=\"meta\">{html.escape(card['category'])} &bull; {html.escape(card['date'])} &bull; {html.escape(card['author'])}</div>"
+        f"<div>{html.escape(card['excerpt'])}...</div>"
+        f"<div class=\"tags\"><b>Tags:</b> {html.escape(', '.join(card['tags']))}</div>"
+        '</div>'
+    )
+
+
+class PreviewRenderer:
+    """Bounded LRU of rendered preview HTML"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memo(self, key, build):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+        rendered = build()
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = rendered
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'maxEntries': self.max_entries, 'hits': self.hits, 'misses': self.misses}
+
+    def render_cards(self, posts, primary_color='#2563eb', first_screen=6, chunk_size=24, version=None):
+        """Card grid for the Preview tab: first screen as HTML, the rest appended after first paint
+
+        `version` is the snapshot version of `posts` (SnapshotStore); without
+        it the posts are hashed on every call.
+        """
+        key = ('cards', content_hash(primary_color), version or snapshot_version(posts), first_screen, chunk_size)
+
+        def build():
+            cards = [card_fields(post) for post in posts]
+            head, rest = cards[:first_screen], cards[first_screen:]
+            return (
+                CARD_STYLE % {'primary': primary_color}
+                + f'<div class="count">{len(posts)} posts</div>'
+                + '<div class="grid" id="preview-grid">' + ''.join(_card(card) for card in head) + '</div>'
+                + f'<script type="application/json" id="preview-rest">{_script_json(rest)}</script>'
+                + CARD_JS % {'chunk': chunk_size}
+            )
+
+        return self._memo(key, build)
+
+    def render_template(self, template_html, config, posts, version=None):
+        """Generated template with placeholders filled and /api routes served from `posts` (snapshot `version`)"""
+        version = version or snapshot_version(posts)
+        key = ('template', content_hash(template_html), content_hash(config), version)
+
+        def build():
+            rendered = template_html
+            for name in ('blog_title', 'site_title'):
+                rendered = rendered.replace('{{' + name + '}}', str(config.get('blog_title', 'Preview Blog')))
+            for name in ('blog_description', 'site_description'):
+                rendered = rendered.replace('{{' + name + '}}', str(config.get('blog_description', 'This is a preview of your generated template')))
+            for name in ('blog_keywords', 'site_keywords'):
+                rendered = rendered.replace('{{' + name + '}}', str(config.get('blog_keywords', '')))
+            rendered = rendered.replace('{{current_year}}', str(datetime.now().year))
+
+            routes = dict(api_routes(posts), **{'/api/version': {'version': version}})
+            shim = FETCH_SHIM_JS % {'routes': _script_json(routes)}
+            # Install the shim before any template script runs
+            if '<head>' in rendered:
+                return rendered.replace('<head>', '<head>\n' + shim, 1)
+            return shim + rendered
+
+        return self._memo(key, build)
@@ -0,0 +1,354 @@
+"""
+Local preview server for the generated blog, without Node or Cloudflare.
+
+Runs an asyncio HTTP server on a background event-loop thread and serves the
+generated template plus the same JSON routes the workers expose (/api/posts,
+/api/stats, /post/<slug>...) from an in-memory data snapshot. Templates and
+data are swapped in place with update(), so open pages pick up changes
+without restarting anything: the data version feeds the template's own
+/api/version watcher, and a small injected script reloads the page when the
+template itself changes.
+"""
+
+import asyncio
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import unquote
+
+from blog_schema import post_tags
+from change_detector import VERSION_WATCH_CLIENT_JS, snapshot_version
+from sheets_loader import slugify
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Injected before </body>: reload the page when the template generation changes
+LIVE_RELOAD_JS = """<script>
+(function () {
+    let current = null
+    setInterval(async function () {
+        try {
+            const response = await fetch('/__preview/template', { cache: 'no-store' })
+            const { version } = await response.json()
+            if (current !== null && version !== current) location.reload()
+            current = version
+        } catch (error) {}
+    }, 1000)
+})()
+</script>
+"""
+
+POST_PAGE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - {blog_title}</title>
+    <meta name="description" content="{description}">
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+</head>
+<body>
+    <div class="container my-5" style="max-width: 760px">
+        <a href="/">&larr; {blog_title}</a>
+        <h1 class="mt-3">{title}</h1>
+        <p class="text-muted">{category} &bull; {date} &bull; {author}</p>
+        <div>{content}</div>
+    </div>
+</body>
+</html>
+"""
+
+
+def api_routes(posts):
+    """JSON payloads for /api/posts, /api/categories, /api/tags and /api/stats (same shapes as blog-server.js)"""
+    # Wire format matches blog-server.js: tags as a comma-separated string
+    published = [
+        {**post, 'tags': ', '.join(post_tags(post))}
+        for post in posts if str(post.get('status') or 'published').lower() == 'published'
+    ]
+    published.sort(key=lambda post: str(post.get('date', '')), reverse=True)
+
+    categories, tags = {}, {}
+    for post in posts:
+        category = post.get('category') or 'Uncategorized'
+        categories[category] = categories.get(category, 0) + 1
+        for tag in post_tags(post):
+            tags[tag] = tags.get(tag, 0) + 1
+
+    return {
+        '/api/posts': {'success': True, 'posts': published, 'total': len(published)},
+        '/api/categories': {'success': True, 'categories': categories},
+        '/api/tags': {'success': True, 'tags': tags},
+        '/api/stats': {'success': True, 'stats': {
+            'totalPosts': len(posts),
+            'totalCategories': len(categories),
+            'totalTags': len(tags),
+            'publishedPosts': sum(1 for post in posts if post.get('status') == 'published'),
+        }},
+    }
+
+
+def _hash_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+
+class PreviewServer:
+    """asyncio HTTP server serving a template and a post snapshot from memory"""
+
+    def __init__(self, host='127.0.0.1', port=5060, blog_title='Blog Preview'):
+        self.host = host
+        self.port = port
+        self.blog_title = blog_title
+        self.started_at = None
+        self.startup_ms = None
+        self.requests_served = 0
+        self._site = self._build_site('', [])
+        self._template_paths = ()
+        self._template_mtime = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and self._server is not None
+
+    def _build_site(self, template_html, posts):
+        posts = [dict(post) for post in posts]
+        for post in posts:
+            if not post.get('slug') and post.get('title'):
+                post['slug'] = slugify(post['title'])
+        return {
+            'html': template_html,
+            'template_version': _hash_text(template_html),
+            'posts': posts,
+            'by_slug': {str(post.get('slug')): post for post in posts if post.get('slug')},
+            'api': api_routes(posts),
+            'data_version': snapshot_version(posts),
+            'updated_at': datetime.now().isoformat(),
+        }
+
+    def update(self, template_html=None, posts=None):
+        """Swap in a new template and/or data snapshot, returns True if anything changed"""
+        current = self._site
+        template_html = current['html'] if template_html is None else template_html
+        posts = current['posts'] if posts is None else posts
+        site = self._build_site(template_html, posts)
+        if site['template_version'] == current['template_version'] and site['data_version'] == current['data_version']:
+            return False
+        # Single reference swap: requests see either the old or the new site, never a mix
+        self._site = site
+        return True
+
+    def watch_template(self, *paths):
+        """Serve the first existing file of `paths` as the template, reloading on mtime change"""
+        self._template_paths = paths
+        self._template_mtime = None
+        self._reload_template_file()
+
+    def _reload_template_file(self):
+        for path in self._template_paths:
+            try:
+                mtime = (path, os.path.getmtime(path))
+            except OSError:
+                continue
+            if mtime != self._template_mtime:
+                self._template_mtime = mtime
+                with open(path, 'r', encoding='utf-8') as f:
+                    # blog-template.html itself still carries the version watch marker
+                    self.update(template_html=f.read().replace('/*{{VERSION_WATCH_CLIENT}}*/', VERSION_WATCH_CLIENT_JS))
+            return
+
+    def status(self):
+        site = self._site
+        return {
+            'status': 'ok' if self.running else 'stopped',
+            'url': self.url,
+            'startedAt': self.started_at,
+            'startupMs': self.startup_ms,
+            'requests': self.requests_served,
+            'posts': len(site['posts']),
+            'templateVersion': site['template_version'],
+            'dataVersion': site['data_version'],
+            'updatedAt': site['updated_at'],
+        }
+
+    # ---- lifecycle ----
+
+    def start(self, timeout=10):
+        """Start the server thread and wait until /health answers, returns (success, message)"""
+        if self.running:
+            return True, f"Preview server already running at {self.url}"
+        began = time.perf_counter()
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="preview-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._error:
+            return False, f"Preview server failed to start: {self._error or 'timeout'}"
+
+        ok, message = self.probe(timeout=timeout)
+        if not ok:
+            return False, message
+        self.startup_ms = round((time.perf_counter() - began) * 1000, 1)
+        self.started_at = datetime.now().isoformat()
+        return True, f"Preview server ready at {self.url} in {self.startup_ms} ms"
+
+    def probe(self, timeout=5):
+        """Real readiness check: GET /health until it returns 200 or `timeout` passes"""
+        deadline = time.monotonic() + timeout
+        last_error = None
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"{self.url}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return True, "healthy"
+            except Exception as e:
+                last_error = e
+            time.sleep(0.05)
+        return False, f"Health probe failed: {last_error}"
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port)
+            )
+            # port=0 picks a free port
+            self.port = server.sockets[0].getsockname()[1]
+            self._server = server
+        except Exception as e:
+            self._error = str(e)
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() open
+            try:
+                self._loop.run_until_complete(asyncio.wait_for(server.wait_closed(), 1))
+            except asyncio.TimeoutError:
+                pass
+            self._loop.close()
+
+    # ---- HTTP ----
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get('content-length') or 0):
+                    await reader.readexactly(int(headers['content-length']))
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) < 2:
+                    await self._write(writer, 400, 'text/plain', b'Bad Request', keep_alive=False)
+                    break
+                method, target = parts[0], parts[1]
+                keep_alive = headers.get('connection', '').lower() != 'close' and parts[-1] == 'HTTP/1.1'
+                status, content_type, body = self.handle(method, target)
+                self.requests_served += 1
+                await self._write(writer, status, content_type, b'' if method == 'HEAD' else body, keep_alive, len(body))
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, content_type, body, keep_alive, length=None):
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body) if length is None else length}\r\n"
+            "Cache-Control: no-store\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    def handle(self, method, target):
+        """Route one request, returns (status, content_type, body bytes)"""
+        if method not in ('GET', 'HEAD'):
+            return self._json({'success': False, 'message': 'Method Not Allowed'}, 405)
+
+        path = unquote(target.split('?', 1)[0])
+        # The page and its live-reload poll both pick up edits to the watched file
+        if path in ('/', '/__preview/template'):
+            self._reload_template_file()
+        site = self._site
+
+        if path == '/':
+            page = site['html'] or '<p>No template generated yet</p>'
+            if '</body>' in page:
+                page = page.replace('</body>', LIVE_RELOAD_JS + '</body>', 1)
+            else:
+                page += LIVE_RELOAD_JS
+            return 200, 'text/html; charset=utf-8', page.encode('utf-8')
+        if path in site['api']:
+            return self._json(site['api'][path])
+        if path.startswith('/api/post/'):
+            post = site['by_slug'].get(path[len('/api/post/'):])
+            if not post:
+                return self._json({'success': False, 'message': 'Post not found'}, 404)
+            return self._json({'success': True, 'post': post})
+        if path.startswith('/post/'):
+            post = site['by_slug'].get(path[len('/post/'):])
+            if not post:
+                return 404, 'text/html; charset=utf-8', b'<h1>Post not found</h1>'
+            return 200, 'text/html; charset=utf-8', self._render_post(post).encode('utf-8')
+        if path == '/api/version':
+            return self._json({'version': site['data_version'], 'fetchedAt': site['updated_at']})
+        if path == '/__preview/template':
+            return self._json({'version': site['template_version']})
+        if path == '/health':
+            return self._json(self.status())
+        return self._json({'success': False, 'message': 'Not Found'}, 404)
+
+    def _json(self, payload, status=200):
+        return status, 'application/json', json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8')
+
+    def _render_post(self, post):
+        content = html.escape(str(post.get('content', ''))).replace('\n', '<br>')
+        return POST_PAGE.format(
+            title=html.escape(str(post.get('title', ''))),
+            blog_title=html.escape(self.blog_title),
+            description=html.escape(str(post.get('meta_description') or post.get('excerpt') or '')),
+            category=html.escape(str(post.get('category') or 'Uncategorized')),
+            date=html.escape(str(post.get('date', ''))),
+            author=html.escape(str(post.get('author', ''))),
+            content=content,
+        )
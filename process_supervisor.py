@@ -0,0 +1,216 @@
+"""
+Supervisor for the Node.js web app (web-app.js).
+
+Keeps exactly one managed child per port: repeated start() calls reuse the
+running process instead of spawning another one. Readiness is detected by
+polling the port, stdout/stderr are drained into a bounded ring buffer so
+the child can never block on a full pipe, crashes are restarted with
+exponential backoff, and the child is terminated when the Python process
+exits.
+"""
+
+import atexit
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Restart delays after a crash: 1s, 2s, 4s ... capped at RESTART_MAX_DELAY
+RESTART_BASE_DELAY = 1.0
+RESTART_MAX_DELAY = 30.0
+# A child that stayed up this long resets the backoff
+STABLE_AFTER_SECONDS = 60.0
+
+_supervisors = {}
+_supervisors_lock = threading.Lock()
+
+
+def port_open(port, host='127.0.0.1', timeout=0.2):
+    """True when something accepts TCP connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ProcessSupervisor:
+    """One managed child process bound to one port"""
+
+    def __init__(self, command, port, cwd=None, env=None, log_lines=500, ready_timeout=15):
+        self.command = list(command)
+        self.port = port
+        self.cwd = cwd
+        self.env = env
+        self.ready_timeout = ready_timeout
+        self.logs = deque(maxlen=log_lines)
+        self.process = None
+        self.started_at = None
+        self.startup_ms = None
+        self.restarts = 0
+        self.last_exit_code = None
+        self.last_error = None
+        self._backoff = RESTART_BASE_DELAY
+        self._ready_at = None
+        self._stopping = threading.Event()
+        # _lock guards the child handle and is only held briefly; _start_lock
+        # serializes spawns, including their wait for readiness
+        self._lock = threading.RLock()
+        self._start_lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def status(self):
+        return {
+            'running': self.running,
+            'pid': self.process.pid if self.running else None,
+            'port': self.port,
+            'startedAt': self.started_at,
+            'startupMs': self.startup_ms,
+            'restarts': self.restarts,
+            'lastExitCode': self.last_exit_code,
+            'lastError': self.last_error,
+        }
+
+    def tail(self, lines=50):
+        return list(self.logs)[-lines:]
+
+    def _log(self, line):
+        self.logs.append(f"[{datetime.now().strftime('%H:%M:%S')}] {line.rstrip()}")
+
+    def start(self):
+        """Start (or reuse) the child and wait until its port accepts connections, returns (success, message)"""
+        with self._start_lock:
+            with self._lock:
+                if self.running:
+                    return True, f"Already running (pid {self.process.pid}) on port {self.port}"
+                if port_open(self.port):
+                    return False, f"Port {self.port} is already used by another process"
+                self._stopping.clear()
+            success, message = self._spawn()
+            if success:
+                threading.Thread(target=self._watch, args=(self.process,), name=f"supervisor-watch-{self.port}", daemon=True).start()
+            return success, message
+
+    def _spawn(self):
+        """Launch the child and wait for its port (caller holds _start_lock), returns (success, message)"""
+        began = time.perf_counter()
+        env = dict(os.environ, PORT=str(self.port), **(self.env or {}))
+        with self._lock:
+            if self._stopping.is_set():
+                return False, "Stopped"
+            try:
+                self.process = subprocess.Popen(
+                    self.command,
+                    cwd=self.cwd,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                )
+            except OSError as e:
+                self.last_error = str(e)
+                return False, f"Error starting {' '.join(self.command)}: {str(e)}"
+            process = self.process
+
+        self._log(f"started pid {process.pid}: {' '.join(self.command)}")
+        threading.Thread(target=self._drain, args=(process,), name=f"supervisor-log-{self.port}", daemon=True).start()
+
+        # Readiness: the port accepts connections, or the child died trying.
+        # Polled without _lock, so status() and stop() answer meanwhile.
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                self.last_exit_code = process.returncode
+                self.last_error = f"exited with code {process.returncode} before becoming ready"
+                return False, f"Process {self.last_error}"
+            if port_open(self.port):
+                self.startup_ms = round((time.perf_counter() - began) * 1000, 1)
+                self.started_at = datetime.now().isoformat()
+                self.last_error = None
+                self._ready_at = time.monotonic()
+                return True, f"Ready on port {self.port} in {self.startup_ms} ms (pid {process.pid})"
+            time.sleep(0.05)
+
+        self.last_error = f"port {self.port} not ready after {self.ready_timeout}s"
+        self._terminate(process)
+        return False, f"Process started but {self.last_error}"
+
+    def _drain(self, process):
+        # Reading continuously keeps the pipe from filling up and blocking the child
+        for line in process.stdout:
+            self._log(line)
+        process.stdout.close()
+
+    def _watch(self, process):
+        # One watcher per supervised run: restarts until a spawn succeeds, then watches the new child
+        while True:
+            process.wait()
+            self.last_exit_code = process.returncode
+            self._log(f"pid {process.pid} exited with code {process.returncode}")
+            if self._stopping.is_set():
+                return
+            if self._ready_at is not None and time.monotonic() - self._ready_at >= STABLE_AFTER_SECONDS:
+                self._backoff = RESTART_BASE_DELAY
+
+            while True:
+                delay = self._backoff
+                self._backoff = min(self._backoff * 2, RESTART_MAX_DELAY)
+                self._log(f"restarting in {delay:.1f}s")
+                if self._stopping.wait(delay):
+                    return
+                with self._start_lock:
+                    # A start() in the meantime has its own watcher
+                    if self._stopping.is_set() or self.running:
+                        return
+                    self.restarts += 1
+                    success, message = self._spawn()
+                if success:
+                    break
+                self._log(f"restart failed: {message}")
+            process = self.process
+
+    def stop(self, timeout=5):
+        """Terminate the child (SIGTERM, then SIGKILL after `timeout`)"""
+        with self._lock:
+            self._stopping.set()
+            if self.process is None:
+                return
+            self._terminate(self.process, timeout)
+            self._log("stopped")
+
+    def _terminate(self, process, timeout=5):
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        self.last_exit_code = process.returncode
+
+
+def get_supervisor(command, port, **kwargs):
+    """Process-wide supervisor for `port` (created on first use)"""
+    with _supervisors_lock:
+        supervisor = _supervisors.get(port)
+        if supervisor is None or supervisor.command != list(command):
+            if supervisor is not None:
+                supervisor.stop()
+            supervisor = _supervisors[port] = ProcessSupervisor(command, port, **kwargs)
+        return supervisor
+
+
+@atexit.register
+def stop_all():
+    """Terminate every managed child (also runs on interpreter shutdown)"""
+    with _supervisors_lock:
+        for supervisor in _supervisors.values():
+            supervisor.stop()
@@ -0,0 +1,161 @@
+"""
+Push-based cache invalidation for the generated workers.
+
+An installable Apps Script trigger (Script/purgeTrigger.js) signs a small
+JSON message with a shared secret and POSTs it to each worker's /__purge
+route whenever the sheet really changes. Workers can then keep their
+snapshot for a long time instead of polling Google every minute.
+
+sign_purge / verify_purge implement the signature both sides use;
+send_purge and serve_purge_endpoint are local stand-ins for the Apps Script
+sender and the worker receiver.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Script', 'purgeTrigger.js')
+
+# Purge messages older (or newer) than this are rejected as replays
+MAX_SKEW_SECONDS = 300
+
+# Snapshot TTL for workers that receive purges (the trigger keeps them fresh);
+# the worker only uses it when a KV namespace carries the purge marker to every colo
+PURGE_SNAPSHOT_TTL_SECONDS = 6 * 60 * 60
+
+
+def generate_purge_secret():
+    """Random shared secret for signing purge messages"""
+    return secrets.token_hex(32)
+
+
+def sign_purge(secret, body, timestamp):
+    """HMAC-SHA256 hex signature over "<timestamp>.<body>" """
+    message = f"{timestamp}.{body}".encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def verify_purge(secret, body, timestamp, signature, now=None):
+    """Check a purge signature and its timestamp window, returns (ok, reason)"""
+    if not secret:
+        return False, "purge not configured"
+    try:
+        age = abs((now if now is not None else time.time()) - int(timestamp))
+    except (TypeError, ValueError):
+        return False, "missing or invalid timestamp"
+    if age > MAX_SKEW_SECONDS:
+        return False, "timestamp outside allowed window"
+    if not hmac.compare_digest(sign_purge(secret, body, timestamp), (signature or '').lower()):
+        return False, "bad signature"
+    return True, "ok"
+
+
+def generate_apps_script_trigger(worker_urls, secret, sheet_names=None, debounce_seconds=30):
+    """Apps Script source for the edit/change trigger, filled in from Script/purgeTrigger.js"""
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    replacements = {
+        '{{WORKER_URLS}}': json.dumps([url.rstrip('/') for url in worker_urls if url]),
+        '{{SHEET_NAMES}}': json.dumps(list(sheet_names or [])),
+        '{{DEBOUNCE_SECONDS}}': str(int(debounce_seconds)),
+        '{{PURGE_SECRET}}': secret,
+    }
+    for placeholder, value in replacements.items():
+        template = template.replace(placeholder, value)
+    return template
+
+
+def send_purge(worker_url, secret, sheet="*", reason="manual", spreadsheet_id="", session=None, timeout=10):
+    """POST a signed purge to a worker (what the Apps Script trigger does), returns (success, data, message)"""
+    body = json.dumps({
+        'spreadsheetId': spreadsheet_id,
+        'sheet': sheet,
+        'reason': reason,
+        'editedAt': datetime.now().isoformat(),
+    })
+    timestamp = str(int(time.time()))
+    http = session or requests
+    try:
+        response = http.post(
+            worker_url.rstrip('/') + '/__purge',
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                'X-Purge-Timestamp': timestamp,
+                'X-Purge-Signature': sign_purge(secret, body, timestamp),
+            },
+            timeout=timeout,
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = {'body': response.text}
+        if response.status_code == 200:
+            return True, data, "Purge accepted"
+        return False, data, f"Purge rejected (HTTP {response.status_code})"
+    except Exception as e:
+        return False, {}, f"Error: {str(e)}"
+
+
+def _make_handler(secret, on_purge):
+    class PurgeHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send_json({'error': 'Method Not Allowed'}, status=405)
+
+        def do_POST(self):
+            if self.path.split('?', 1)[0] != '/__purge':
+                self._send_json({'error': 'Not Found'}, status=404)
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8')
+            ok, reason = verify_purge(
+                secret, body,
+                self.headers.get('X-Purge-Timestamp'),
+                self.headers.get('X-Purge-Signature'),
+            )
+            if not ok:
+                self._send_json({'success': False, 'error': reason}, status=401)
+                return
+            try:
+                message = json.loads(body or '{}')
+            except ValueError:
+                message = {}
+            on_purge(message)
+            self._send_json({'success': True, 'purgedAt': datetime.now().isoformat()})
+
+    return PurgeHandler
+
+
+def serve_purge_endpoint(secret, on_purge, host='127.0.0.1', port=0):
+    """Local /__purge receiver with the worker's checks, served from a daemon thread
+
+    `on_purge` is called with the decoded message for every accepted purge
+    (e.g. ChangeDetector.poll_once or clearing st.cache_data). Pass port=0
+    to pick a free port; it is available as server.server_address[1].
+    """
+    server = ThreadingHTTPServer((host, port), _make_handler(secret, on_purge))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="purge-endpoint", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,158 @@
+"""
+Google Sheets API v4 ingestion backend (values:batchGet).
+
+Alternative to the CSV export scraping in get_sheets_data: reads several named
+sheets and column ranges in a single request, asks for unformatted values and
+supports column projection so list views never download the `content` column.
+Uses the GOOGLE_SHEETS_API_KEY described in the README.
+"""
+
+import requests
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values:batchGet"
+
+# Columns needed to render post listings (everything except the heavy `content`)
+LIST_COLUMNS = [
+    'id', 'title', 'slug', 'category', 'tags', 'author', 'date', 'status',
+    'meta_description', 'featured_image', 'excerpt'
+]
+
+
+def column_letter(index):
+    """Convert a 0-based column index to A1 letters (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def column_index(letters):
+    """Convert A1 column letters to a 0-based index (A -> 0, AA -> 26)"""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def quote_sheet_name(sheet_name):
+    """Quote a sheet name for use in A1 notation"""
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def batch_get(spreadsheet_id, api_key, ranges, major_dimension="ROWS", session=None, timeout=30):
+    """Fetch several A1 ranges with one values:batchGet call, returns the valueRanges list"""
+    params = [('ranges', a1_range) for a1_range in ranges]
+    params += [
+        ('key', api_key),
+        ('majorDimension', major_dimension),
+        ('valueRenderOption', 'UNFORMATTED_VALUE'),
+        ('dateTimeRenderOption', 'FORMATTED_STRING'),
+    ]
+    http = session or requests
+    response = http.get(
+        SHEETS_API_URL.format(spreadsheet_id=spreadsheet_id),
+        params=params,
+        timeout=timeout,
+    )
+    if response.status_code != 200:
+        try:
+            message = response.json().get('error', {}).get('message', response.text)
+        except ValueError:
+            message = response.text
+        raise RuntimeError(f"Sheets API error {response.status_code}: {message}")
+    return response.json().get('valueRanges', [])
+
+
+def _cell(value):
+    return "" if value is None else value
+
+
+def _rows_to_dicts(values):
+    if not values:
+        return []
+    headers = [str(h).strip() for h in values[0]]
+    rows = []
+    for raw in values[1:]:
+        if not any(str(v).strip() for v in raw):
+            continue
+        rows.append({
+            header: _cell(raw[i]) if i < len(raw) else ""
+            for i, header in enumerate(headers) if header
+        })
+    return rows
+
+
+def fetch_sheets(spreadsheet_id, api_key, sheet_names, columns=None, session=None):
+    """Load several sheets through the Sheets API, returns {sheet_name: [row dicts]}
+
+    With columns=None every column is downloaded in a single batchGet. With a
+    column list, the header rows of all sheets are read first (one small call)
+    and then only the requested columns of every sheet are fetched together in
+    one COLUMNS-major batchGet. Columns missing from a sheet are skipped.
+    """
+    sheet_names = list(sheet_names)
+
+    if columns is None:
+        value_ranges = batch_get(
+            spreadsheet_id, api_key,
+            [quote_sheet_name(name) for name in sheet_names],
+            session=session,
+        )
+        return {
+            name: _rows_to_dicts(value_range.get('values', []))
+            for name, value_range in zip(sheet_names, value_ranges)
+        }
+
+    header_ranges = batch_get(
+        spreadsheet_id, api_key,
+        [f"{quote_sheet_name(name)}!1:1" for name in sheet_names],
+        session=session,
+    )
+
+    # Plan which column ranges to request per sheet
+    plan = []
+    for name, value_range in zip(sheet_names, header_ranges):
+        header_row = (value_range.get('values') or [[]])[0]
+        positions = {str(h).strip(): i for i, h in enumerate(header_row)}
+        selected = [column for column in columns if column in positions]
+        plan.append((name, selected, [
+            f"{quote_sheet_name(name)}!{column_letter(positions[column])}2:{column_letter(positions[column])}"
+            for column in selected
+        ]))
+
+    ranges = [a1_range for _, _, sheet_ranges in plan for a1_range in sheet_ranges]
+    value_ranges = batch_get(spreadsheet_id, api_key, ranges, major_dimension="COLUMNS", session=session) if ranges else []
+
+    result = {}
+    offset = 0
+    for name, selected, sheet_ranges in plan:
+        column_values = []
+        for value_range in value_ranges[offset:offset + len(sheet_ranges)]:
+            values = value_range.get('values') or [[]]
+            column_values.append(values[0])
+        offset += len(sheet_ranges)
+
+        row_count = max((len(values) for values in column_values), default=0)
+        rows = []
+        for i in range(row_count):
+            row = {
+                column: _cell(values[i]) if i < len(values) else ""
+                for column, values in zip(selected, column_values)
+            }
+            if any(str(v).strip() for v in row.values()):
+                rows.append(row)
+        result[name] = rows
+    return result
+
+
+def get_sheets_api_data(spreadsheet_id, api_key, sheet_name="WEBSITE", columns=None, session=None):
+    """Get data from one sheet through the Sheets API v4 (same return shape as get_sheets_data)"""
+    if not api_key:
+        return False, [], "Google Sheets API key is required for the Sheets API backend"
+    try:
+        data = fetch_sheets(spreadsheet_id, api_key, [sheet_name], columns=columns, session=session)[sheet_name]
+        return True, data, f"Successfully loaded {len(data)} rows via Sheets API"
+    except Exception as e:
+        return False, [], f"Error: {str(e)}"
@@ -0,0 +1,205 @@
+"""
+Multi-tab spreadsheet loader.
+
+Real blogs split content across tabs (posts, authors, categories, redirects).
+load_spreadsheet_tabs resolves tab names to gids, downloads the tabs
+concurrently through a bounded thread pool, parses them in parallel and
+returns a SheetDataset with join helpers.
+"""
+
+import csv
+import html
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+from sheets_api import fetch_sheets
+
+SHEETS_BASE_URL = "https://docs.google.com/spreadsheets/d/{spreadsheet_id}"
+USER_AGENT = 'Mozilla/5.0 (compatible; BlogGenerator/1.0)'
+
+# Below this many CSV bytes in total, process start-up costs more than parsing
+PARALLEL_PARSE_MIN_BYTES = 2 * 1024 * 1024
+
+SHEET_BUTTON = re.compile(r'id="sheet-button-(\d+)"[^>]*>\s*<a[^>]*>(.*?)</a>', re.S)
+
+
+def wire_tags(tags):
+    """Tags as the workers read them: one comma-separated string"""
+    return ', '.join(str(tag).strip() for tag in tags if str(tag).strip())
+
+
+def slugify(text):
+    """URL slug, same rules as the generated workers"""
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')
+
+
+def parse_csv_rows(csv_text):
+    """Parse CSV text into row dicts (handles quoted commas and multi-line cells)"""
+    reader = csv.reader(io.StringIO(csv_text))
+    headers = next(reader, None)
+    if not headers:
+        return []
+    headers = [h.strip() for h in headers]
+    rows = []
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        rows.append({
+            header: values[i] if i < len(values) else ""
+            for i, header in enumerate(headers) if header
+        })
+    return rows
+
+
+def resolve_sheet_gids(spreadsheet_id, api_key=None, session=None):
+    """Map tab names to gids, using the Sheets API metadata when a key is available"""
+    http = session or requests
+    base_url = SHEETS_BASE_URL.format(spreadsheet_id=spreadsheet_id)
+    try:
+        if api_key:
+            response = http.get(
+                f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}",
+                params={'key': api_key, 'fields': 'sheets.properties(sheetId,title)'},
+                timeout=15,
+            )
+            if response.status_code == 200:
+                return {
+                    sheet['properties']['title']: str(sheet['properties']['sheetId'])
+                    for sheet in response.json().get('sheets', [])
+                }
+
+        # Public spreadsheets list their tabs in the htmlview page
+        response = http.get(f"{base_url}/htmlview", headers={'User-Agent': USER_AGENT}, timeout=15)
+        if response.status_code == 200:
+            return {html.unescape(name).strip(): gid for gid, name in SHEET_BUTTON.findall(response.text)}
+    except Exception:
+        pass
+    return {}
+
+
+def tab_csv_url(spreadsheet_id, tab_name, gid=None):
+    """CSV export URL for one tab (gid when known, otherwise gviz by sheet name)"""
+    base_url = SHEETS_BASE_URL.format(spreadsheet_id=spreadsheet_id)
+    if gid is not None:
+        return f"{base_url}/export?format=csv&gid={gid}"
+    return f"{base_url}/gviz/tq?tqx=out:csv&sheet={quote(tab_name)}"
+
+
+def _fetch_tab_csv(spreadsheet_id, tab_name, gid, session):
+    http = session or requests
+    response = http.get(tab_csv_url(spreadsheet_id, tab_name, gid), headers={'User-Agent': USER_AGENT}, timeout=30)
+    if response.status_code != 200 or response.text.lstrip().startswith('<'):
+        raise RuntimeError(f"Could not download tab '{tab_name}' (HTTP {response.status_code})")
+    return response.text
+
+
+class SheetDataset:
+    """Unified view over several parsed tabs with join helpers"""
+
+    def __init__(self, tables, errors=None):
+        self.tables = tables
+        self.errors = errors or {}
+        self._indexes = {}
+
+    def __getitem__(self, tab_name):
+        return self.tables[tab_name]
+
+    def __contains__(self, tab_name):
+        return tab_name in self.tables
+
+    def index(self, tab_name, key):
+        """Dict of key value -> row for a tab (cached; later duplicates win)"""
+        cache_key = (tab_name, key)
+        if cache_key not in self._indexes:
+            self._indexes[cache_key] = {
+                str(row.get(key, "")).strip().lower(): row
+                for row in self.tables.get(tab_name, [])
+            }
+        return self._indexes[cache_key]
+
+    def join(self, left, right, on, right_on=None, name=None):
+        """Left join: each `left` row gets the matching `right` row nested under `name`
+
+        Matching is case-insensitive on trimmed values. Rows without a match
+        get None, so templates can test for it.
+        """
+        lookup = self.index(right, right_on or on)
+        name = name or right
+        return [
+            {**row, name: lookup.get(str(row.get(on, "")).strip().lower())}
+            for row in self.tables.get(left, [])
+        ]
+
+    def summary(self):
+        """Row counts per tab, plus load errors"""
+        return {
+            'tabs': {tab_name: len(rows) for tab_name, rows in self.tables.items()},
+            'errors': self.errors,
+        }
+
+
+def load_spreadsheet_tabs(spreadsheet_id, tab_names, api_key=None, max_workers=4, session=None):
+    """Load several tabs concurrently and return a SheetDataset
+
+    With an API key every tab comes back from a single values:batchGet call.
+    Otherwise tab names are resolved to gids, CSV exports are downloaded
+    through a pool of at most `max_workers` threads, and large downloads are
+    parsed in parallel across processes. Tabs that fail are reported in
+    dataset.errors instead of aborting the whole load.
+    """
+    tab_names = list(tab_names)
+
+    api_error = None
+    if api_key:
+        try:
+            return SheetDataset(fetch_sheets(spreadsheet_id, api_key, tab_names, session=session))
+        except Exception as e:
+            # Fall back to the public CSV exports below
+            api_error = str(e)
+
+    gids = resolve_sheet_gids(spreadsheet_id, api_key=api_key, session=session)
+
+    texts, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tab_names)))) as pool:
+        futures = {
+            tab_name: pool.submit(_fetch_tab_csv, spreadsheet_id, tab_name, gids.get(tab_name), session)
+            for tab_name in tab_names
+        }
+        for tab_name, future in futures.items():
+            try:
+                texts[tab_name] = future.result()
+            except Exception as e:
+                errors[tab_name] = str(e)
+
+    total_bytes = sum(len(text) for text in texts.values())
+    if len(texts) > 1 and total_bytes >= PARALLEL_PARSE_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(texts)))) as pool:
+            parsed = dict(zip(texts, pool.map(parse_csv_rows, texts.values())))
+    else:
+        parsed = {tab_name: parse_csv_rows(text) for tab_name, text in texts.items()}
+
+    if api_error:
+        errors['_api'] = api_error
+    return SheetDataset({tab_name: parsed[tab_name] for tab_name in tab_names if tab_name in parsed}, errors)
+
+
+def build_worker_posts(dataset, posts_tab, authors_tab=None, author_key='author'):
+    """Posts ready to embed in a generated worker, joined with the authors tab when present
+
+    Rows are put in the workers' wire shape: validated rows hold `tags` as a
+    list, the workers expect the sheet's comma-separated string.
+    """
+    if authors_tab and authors_tab in dataset:
+        posts = dataset.join(posts_tab, authors_tab, on=author_key, name='author_info')
+    else:
+        posts = [dict(row) for row in dataset.tables.get(posts_tab, [])]
+    for post in posts:
+        if not post.get('slug') and post.get('title'):
+            post['slug'] = slugify(post['title'])
+        if isinstance(post.get('tags'), (list, tuple)):
+            post['tags'] = wire_tags(post['tags'])
+    return posts
@@ -0,0 +1,642 @@
+"""
+Build and deploy pipeline shared by the Streamlit UI and blog_cli.py.
+
+Nothing here imports Streamlit. Modules that pull in pandas (schema
+validation, post pages, artifacts, local files), pyarrow (snapshot store) or
+Pillow (images) are imported inside the functions that use them, so a CLI
+run only pays for the stages it executes. Snapshots (.snapshots), the image
+cache (.image-cache), the KV sync state (.kv-sync) and their keys are the
+same ones the UI uses, so a sheet loaded in the UI is a warm cache for the
+CLI and vice versa.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+
+from change_detector import VERSION_WATCH_CLIENT_JS
+from sheets_loader import parse_csv_rows
+from worker_generators import MODERN_TEMPLATE_PATH, generate_modern_worker_script
+from worker_runtime import shared_runtime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(ROOT, '.snapshots')
+KV_STATE_DIR = os.path.join(ROOT, '.kv-sync')
+BUILD_MANIFEST = 'build.json'
+# Sources whose content changes the generated worker (part of the build key)
+GENERATOR_SOURCES = ('worker_generators.py', 'worker_runtime.py', 'js_minify.py', 'change_detector.py', 'blog-template.html', 'post_pages.py', 'build_artifacts.py')
+BENCH_SCRIPT = os.path.join(ROOT, 'bench_worker.js')
+# Settings that only affect the UI or credentials, never the build output
+NON_BUILD_KEYS = ('cf_api_token', 'sheets_api_key', 'poll_interval', 'auto_generate_name', 'kv_api_base', 'kv_state_dir')
+
+
+class StageTimer:
+    """Wall-clock milliseconds per named stage, for machine-readable timing output"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0) + (time.perf_counter() - start) * 1000, 1)
+
+    def as_dict(self):
+        return dict(self.stages, total=round((time.perf_counter() - self.started) * 1000, 1))
+
+
+def get_snapshot_store(root=SNAPSHOT_DIR):
+    """Snapshot store at `root` (pyarrow is only imported here)"""
+    from snapshot_store import SnapshotStore
+    return SnapshotStore(root, keep=5)
+
+
+def snapshot_key(config):
+    """Snapshot store key for the configured sheet (same key in the UI and the CLI)"""
+    sheet_name = config.get('sheet_name', 'WEBSITE')
+    if config.get('data_source') == "Local File":
+        return f"local-{os.path.basename(config.get('local_path') or '')}-{sheet_name}"
+    return f"{config.get('spreadsheet_id', '')}-{sheet_name}"
+
+
+def get_sheets_data(spreadsheet_id, sheet_name="WEBSITE", query=None):
+    """Get data from Google Sheets using CSV export
+
+    `query` (query_sheet keyword arguments, e.g. gviz_query.list_view_query())
+    is pushed down to the gviz endpoint first; the full exports below are the
+    fallback, so callers still filter and project rows that come from them.
+    """
+    if query:
+        from gviz_query import query_sheet
+        success, data, message = query_sheet(spreadsheet_id, sheet_name, **query)
+        if success:
+            return success, data, message
+    try:
+        # Multiple URL formats to try
+        urls = [
+            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid=0",
+            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv",
+            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/gviz/tq?tqx=out:csv",
+            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/pub?output=csv"
+        ]
+        
+        for url in urls:
+            try:
+                response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; BlogGenerator/1.0)'}, timeout=30)
+                if response.status_code == 200 and not response.text.startswith('<!DOCTYPE'):
+                    # Parse CSV data (quoted commas and multi-line cells included)
+                    data = parse_csv_rows(response.text)
+                    if data:
+                        return True, data, f"Successfully loaded {len(data)} rows"
+            except Exception:
+                continue
+        
+        return False, [], "Could not access spreadsheet data"
+        
+    except Exception as e:
+        return False, [], f"Error: {str(e)}"
+
+
+def list_view_rows(rows, columns=None, published_only=False):
+    """Validated rows as a list view shows them: drafts and untitled rows dropped, only `columns` kept
+
+    Expects validate_rows output, so `status` is already normalized
+    ('Draft', 'konsep' -> 'draft') and header aliases are resolved.
+    """
+    if published_only:
+        rows = [row for row in rows if row.get('status') != 'draft' and str(row.get('title') or '').strip()]
+    if columns is not None:
+        rows = [{column: row[column] for column in columns if column in row} for row in rows]
+    return rows
+
+
+def load_validated_sheet(config, spreadsheet_id, sheet_name="WEBSITE", columns=None, published_only=False):
+    """Load rows via config['data_source'] and run them through the blog schema, returns (success, ValidationResult, message)
+
+    `columns` / `published_only` narrow the rows for list views; the CSV
+    backend pushes both down to Google as a gviz query.
+    """
+    from blog_schema import validate_rows
+
+    if config.get("data_source") == "Local File":
+        from local_import import get_local_file_data
+        success, data, message = get_local_file_data(config.get("local_path"), sheet_name)
+    elif config.get("data_source") == "Sheets API v4":
+        from sheets_api import get_sheets_api_data
+        success, data, message = get_sheets_api_data(spreadsheet_id, config.get("sheets_api_key"), sheet_name, columns=columns)
+    else:
+        query = None
+        if columns is not None or published_only:
+            from gviz_query import list_view_query
+            query = list_view_query(published_only, columns)
+        success, data, message = get_sheets_data(spreadsheet_id, sheet_name, query=query)
+    if not success:
+        return False, validate_rows([]), message
+    result = validate_rows(data)
+    if columns is not None or published_only:
+        result.rows = list_view_rows(result.rows, columns, published_only)
+    if result.quarantined:
+        message += f" ({len(result.quarantined)} rows quarantined)"
+    return True, result, message
+
+
+def load_sheet_snapshot(config, store=None, refresh=False):
+    """Rows of the current snapshot, fetching and storing the sheet when missing or `refresh`
+
+    Returns (success, {'rows', 'version', 'fetched'}, message). Stored Arrow
+    rows come back as a SnapshotRows view, turned into dicts on first use.
+    """
+    store = store or get_snapshot_store()
+    key = snapshot_key(config)
+    versions = store.versions(key)
+    if versions and not refresh:
+        rows = store.load_rows(key)
+        if rows is not None:
+            return True, {'rows': rows, 'version': versions[0]['version'], 'fetched': False}, f"Loaded {len(rows)} rows from snapshot"
+
+    success, result, message = load_validated_sheet(config, config.get('spreadsheet_id'), config.get('sheet_name', 'WEBSITE'))
+    if not success:
+        return False, None, message
+    entry = store.save(key, result.rows)
+    return True, {'rows': result.rows, 'version': entry['version'], 'fetched': True}, message
+
+
+def template_config_from(config):
+    """Template settings for a headless build (the UI takes type, colors and layout from its widgets)"""
+    return {
+        "type": config.get('template_type', "Blog Homepage"),
+        "blog_title": config.get('blog_title', 'My Blog'),
+        "blog_description": config.get('blog_description', 'Blog powered by Google Sheets'),
+        "blog_keywords": config.get('blog_keywords', 'blog, google sheets'),
+        "color_scheme": config.get('color_scheme', "Blue"),
+        "layout_style": config.get('layout_style', "Modern"),
+        "posts_per_page": config.get('posts_per_page', 6)
+    }
+
+
+def generate_html_template(config):
+    """Generate HTML template based on configuration"""
+    color_schemes = {
+        "Blue": {"primary": "#2563eb", "secondary": "#1d4ed8"},
+        "Green": {"primary": "#059669", "secondary": "#047857"},
+        "Purple": {"primary": "#7c3aed", "secondary": "#6d28d9"},
+        "Red": {"primary": "#dc2626", "secondary": "#b91c1c"},
+        "Orange": {"primary": "#ea580c", "secondary": "#c2410c"}
+    }
+    
+    colors = color_schemes.get(config['color_scheme'], color_schemes['Blue'])
+    
+    # Read the base template
+    try:
+        with open(os.path.join(ROOT, 'blog-template.html'), 'r', encoding='utf-8') as f:
+            template = f.read()
+    except FileNotFoundError:
+        # Fallback template if file doesn't exist
+        template = """<!DOCTYPE html>
+<html lang="id">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{blog_title}}</title>
+    <meta name="description" content="{{blog_description}}">
+    <meta name="keywords" content="{{blog_keywords}}">
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+    <style>
+        :root {
+            --primary-color: #2563eb;
+            --secondary-color: #1d4ed8;
+        }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+        .navbar { background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%); }
+        .hero { background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%); color: white; padding: 4rem 0; }
+        .card { border: none; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.3s; }
+        .card:hover { transform: translateY(-5px); }
+    </style>
+</head>
+<body>
+    <nav class="navbar navbar-expand-lg navbar-dark">
+        <div class="container">
+            <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>{{blog_title}}</a>
+        </div>
+    </nav>
+    
+    <div class="hero text-center">
+        <div class="container">
+            <h1 class="display-4">{{blog_title}}</h1>
+            <p class="lead">{{blog_description}}</p>
+        </div>
+    </div>
+    
+    <div class="container mt-5">
+        <div class="row">
+            <div class="col-lg-8">
+                <div id="posts" class="row">
+                    <div class="col-12 text-center">
+                        <i class="fas fa-spinner fa-spin fa-2x"></i>
+                        <p>Loading posts...</p>
+                    </div>
+                </div>
+            </div>
+            <div class="col-lg-4">
+                <div class="card">
+                    <div class="card-body">
+                        <h5><i class="fas fa-info-circle me-2"></i>About This Blog</h5>
+                        <p>{{blog_description}}</p>
+                        <p><small>Powered by Google Sheets & Cloudflare Workers</small></p>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <footer class="bg-dark text-white mt-5 py-4">
+        <div class="container text-center">
+            <p>&copy; {{current_year}} {{blog_title}}. Generated by Template System.</p>
+        </div>
+    </footer>
+    
+    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
+    <script>
+        // Load posts from API
+        async function loadPosts() {
+            try {
+                const response = await fetch('/api/posts');
+                const data = await response.json();
+                
+                if (data.success && data.posts) {
+                    const postsContainer = document.getElementById('posts');
+                    const posts = data.posts;
+                    
+                    if (posts.length === 0) {
+                        postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>';
+                        return;
+                    }
+                    
+                    postsContainer.innerHTML = posts.map(post => `
+                        <div class="col-md-6 mb-4">
+                            <div class="card">
+                                <div class="card-body">
+                                    <h5 class="card-title">\${post.title}</h5>
+                                    <p class="card-text">\${(post.content || '').substring(0, 150)}...</p>
+                                    <div class="d-flex justify-content-between align-items-center">
+                                        <small class="text-muted">\${post.category || 'Uncategorized'} • \${post.date}</small>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+                    `).join('');
+                } else {
+                    document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Error loading posts</p></div>';
+                }
+            } catch (error) {
+                console.error('Error loading posts:', error);
+                document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>';
+            }
+        }
+        
+        // Initialize
+        loadPosts();
+    </script>
+</body>
+</html>"""
+    
+    # Replace template variables
+    template = template.replace('{{blog_title}}', config['blog_title'])
+    template = template.replace('{{blog_description}}', config['blog_description'])
+    template = template.replace('{{blog_keywords}}', config['blog_keywords'])
+    template = template.replace('{{site_title}}', config['blog_title'])
+    template = template.replace('{{site_description}}', config['blog_description'])
+    template = template.replace('{{site_keywords}}', config['blog_keywords'])
+    template = template.replace('{{current_year}}', str(datetime.now().year))
+    template = template.replace('/*{{VERSION_WATCH_CLIENT}}*/', VERSION_WATCH_CLIENT_JS)
+    
+    # Replace color scheme
+    template = template.replace('--primary-color: #2563eb', f'--primary-color: {colors["primary"]}')
+    template = template.replace('--secondary-color: #1d4ed8', f'--secondary-color: {colors["secondary"]}')
+    template = template.replace('#1d4ed8', colors["secondary"])
+    
+    return template
+
+
+def load_embedded_posts(config, rows=None):
+    """Posts to embed in the worker, returns (posts or None, message)
+
+    With an authors tab every tab is loaded and joined; otherwise `rows` (the
+    current snapshot) are used when given, so the CLI does not download twice.
+    """
+    from sheets_loader import SheetDataset, build_worker_posts, load_spreadsheet_tabs
+
+    posts_tab = config.get('sheet_name', 'WEBSITE')
+    authors_tab = config.get('authors_tab') or None
+    if rows is not None and not authors_tab:
+        return build_worker_posts(SheetDataset({posts_tab: rows}), posts_tab), f"Embedded {len(rows)} posts from snapshot"
+
+    tabs = [posts_tab] + ([authors_tab] if authors_tab else [])
+    dataset = load_spreadsheet_tabs(
+        config.get('spreadsheet_id'), tabs,
+        api_key=config.get('sheets_api_key') if config.get('data_source') == "Sheets API v4" else None
+    )
+    if posts_tab not in dataset:
+        return None, f"Could not load tab '{posts_tab}', worker will fetch Google Sheets directly: {dataset.errors}"
+    posts = build_worker_posts(dataset, posts_tab, authors_tab)
+    return posts, f"Embedded {len(posts)} posts ({dataset.summary()['tabs']})"
+
+
+def sheet_gid_for(config):
+    """gid of the configured tab (config['sheet_gid'], else looked up for a Google source), or None"""
+    if config.get('sheet_gid') not in (None, ''):
+        return str(config['sheet_gid'])
+    if not config.get('spreadsheet_id') or config.get('data_source') == "Local File":
+        return None
+    from sheets_loader import resolve_sheet_gids
+    api_key = config.get('sheets_api_key') if config.get('data_source') == "Sheets API v4" else None
+    return resolve_sheet_gids(config['spreadsheet_id'], api_key=api_key).get(config.get('sheet_name', 'WEBSITE'))
+
+
+def build_worker_config(config, template_config, worker_url, posts=None, log=None):
+    """Config for generate_modern_worker_script; `posts` adds embedded data, post pages, images and artifacts"""
+    log = log or (lambda message: None)
+    worker_config = {
+        'spreadsheetId': config.get('spreadsheet_id') or None,
+        'sheetName': config.get('sheet_name', 'WEBSITE'),
+        'blogTitle': template_config.get('blog_title', 'My Blog'),
+        'blogDescription': template_config.get('blog_description', 'Blog powered by Google Sheets'),
+        'blogKeywords': template_config.get('blog_keywords', 'blog, google sheets'),
+        'postsPerPage': template_config.get('posts_per_page', 6),
+        'enableMetrics': config.get('enable_metrics', False),
+        'streamHtml': config.get('stream_html', True)
+    }
+    worker_config = {key: value for key, value in worker_config.items() if value is not None}
+    gid = sheet_gid_for(config)
+    if gid is not None:
+        worker_config['sheetGid'] = gid
+    if config.get('kv_namespace_id'):
+        from kv_sync import KV_BINDING
+        worker_config['kvBinding'] = KV_BINDING
+    if config.get('enable_purge') and config.get('purge_secret'):
+        worker_config['purgeSecret'] = config['purge_secret']
+    if posts is None:
+        return worker_config
+
+    from build_artifacts import build_artifacts, worker_artifacts
+    from post_pages import prerendered_map
+
+    worker_config['embeddedPosts'] = posts
+    site = {
+        'title': worker_config['blogTitle'],
+        'description': worker_config['blogDescription'],
+        'base_url': worker_url,
+    }
+    # Responsive image info for the template cards (variants hosted at the image base URL)
+    if config.get('image_base_url'):
+        from image_pipeline import ImageCache, attach_images, build_images, export_images
+        image_cache = ImageCache(os.path.join(ROOT, '.image-cache'))
+        images, _ = build_images(posts, image_cache, base_url=config['image_base_url'])
+        export_images(images, image_cache, directory=config.get('image_export_dir', 'dist/img'))
+        worker_config['embeddedPosts'] = attach_images(posts, images)
+    # Post pages rendered here, so /post/<slug> paints without any API call
+    worker_config['prerenderedPages'] = prerendered_map(worker_config['embeddedPosts'], site)
+    log(f"Pre-rendered {len(worker_config['prerenderedPages']['pages'])} post pages")
+    # Sitemap, robots.txt and feeds, served with ETag / Last-Modified revalidation
+    worker_config['buildArtifacts'] = worker_artifacts(build_artifacts(worker_config['embeddedPosts'], site))
+    return worker_config
+
+
+def worker_name_for(config, site_name):
+    """Stable worker name for headless deploys (the UI picks a random one per deploy)"""
+    if config.get('worker_name'):
+        return config['worker_name']
+    digest = hashlib.sha256(f"{site_name}-{config.get('spreadsheet_id', '')}".encode('utf-8')).hexdigest()[:8]
+    return f"{config.get('worker_name_prefix') or 'blog'}-{digest}"
+
+
+def kv_bindings(config):
+    """Worker bindings for config['kv_namespace_id'], or None without a KV namespace"""
+    if not config.get('kv_namespace_id'):
+        return None
+    from kv_sync import KV_BINDING
+    return [{'type': 'kv_namespace', 'name': KV_BINDING, 'namespace_id': config['kv_namespace_id']}]
+
+
+def upload_worker(api_token, account_id, worker_name, script, session=None, bindings=None):
+    """PUT a worker script to Cloudflare, returns (success, data, message)
+
+    With `bindings` the script goes up as a multipart upload whose metadata
+    attaches them (e.g. the KV namespace) to the worker.
+    """
+    http = session or requests
+    deploy_url = f"https://api.cloudflare.com/client/v4/accounts/{account_id}/workers/scripts/{worker_name}"
+    try:
+        if bindings:
+            metadata = json.dumps({'body_part': 'script', 'bindings': bindings})
+            response = http.put(deploy_url, headers={'Authorization': f'Bearer {api_token}'}, files={
+                'metadata': (None, metadata, 'application/json'),
+                'script': ('worker.js', script.encode('utf-8'), 'application/javascript'),
+            }, timeout=60)
+        else:
+            response = http.put(deploy_url, headers={
+                'Authorization': f'Bearer {api_token}',
+                'Content-Type': 'application/javascript'
+            }, data=script.encode('utf-8'), timeout=60)
+    except Exception as e:
+        return False, {}, f"Deployment error: {str(e)}"
+    if response.status_code in [200, 201]:
+        return True, {'worker_name': worker_name, 'url': f"https://{worker_name}.{account_id}.workers.dev"}, "Deployed"
+    return False, {'status': response.status_code}, f"Deployment failed: {response.status_code} {response.text[:500]}"
+
+
+def sync_site_kv(config, api_token, account_id, store=None, posts=None):
+    """Write the site's precomputed API payloads to its KV namespace, returns (success, data, message)
+
+    Only keys whose value changed since the last sync are written. Without
+    `posts` they are built from the stored snapshot. config['kv_api_base']
+    points the sync at another endpoint (serve_kv_mock).
+    """
+    from kv_sync import API_BASE, KVClient, kv_records, sync_kv
+
+    store = store or get_snapshot_store()
+    if posts is None:
+        success, snapshot, message = load_sheet_snapshot(config, store)
+        if not success:
+            return False, {}, message
+        posts, message = load_embedded_posts(config, snapshot['rows'])
+        if posts is None:
+            return False, {}, message
+    versions = store.versions(snapshot_key(config))
+    records = kv_records(posts, page_size=config.get('posts_per_page', 6),
+                         updated=versions[0].get('created') if versions else None)
+    client = KVClient(account_id, config['kv_namespace_id'], api_token, base_url=config.get('kv_api_base') or API_BASE)
+    return sync_kv(records, client, state_dir=config.get('kv_state_dir') or KV_STATE_DIR)
+
+
+def generator_fingerprint():
+    """Hash of the generator sources, so a code change invalidates cached builds"""
+    digest = hashlib.sha256()
+    for name in GENERATOR_SOURCES + (os.path.basename(MODERN_TEMPLATE_PATH),):
+        try:
+            with open(os.path.join(ROOT, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def build_key_for(config, version):
+    """Cache key of a build: snapshot version, build settings and generator sources"""
+    settings = {key: value for key, value in sorted(config.items()) if key not in NON_BUILD_KEYS}
+    return hashlib.sha256(json.dumps(
+        [version, settings, generator_fingerprint()], sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()[:16]
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, BUILD_MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(out_dir, manifest):
+    tmp_path = os.path.join(out_dir, BUILD_MANIFEST + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, BUILD_MANIFEST))
+
+
+def measure_worker_startup(path, runs=11):
+    """Median isolate cold start in ms of a built worker (bench_worker.js --startup), None without node"""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    try:
+        completed = subprocess.run([node, BENCH_SCRIPT, path, '--startup', '--runs', str(runs), '--json'],
+                                   capture_output=True, text=True, timeout=120)
+        return json.loads(completed.stdout)['results'][0]['startupMs'] if completed.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError, ValueError, KeyError):
+        return None
+
+
+def build_site(config, out_dir, site_name='site', store=None, refresh=False, force=False):
+    """Build one site into `out_dir`, skipping the work when data, settings and generators are unchanged
+
+    Writes worker.js, template.html, post/<slug>/index.html, the SEO artifacts
+    (when site_url is set) and build.json. Returns a result dict with `ok`,
+    `cached`, `version`, `timings` (ms per stage) and `outputs` (including the
+    worker's size, gzip size, runtime version and measured cold start).
+    """
+    timer = StageTimer()
+    result = {'site': site_name, 'ok': False, 'cached': False, 'out_dir': out_dir}
+    store = store or get_snapshot_store()
+    manifest = read_manifest(out_dir)
+
+    def is_current(build_key):
+        return not force and manifest.get('key') == build_key and os.path.exists(os.path.join(out_dir, 'worker.js'))
+
+    # Unchanged stored snapshot: the manifest alone decides, no rows are read
+    stored = store.versions(snapshot_key(config))
+    if stored and not refresh and is_current(build_key_for(config, stored[0]['version'])):
+        return dict(result, ok=True, cached=True, key=manifest['key'], version=stored[0]['version'], rows=stored[0]['rows'],
+                    message="Up to date", outputs=manifest.get('outputs', {}), timings=timer.as_dict())
+
+    with timer.stage('data'):
+        success, snapshot, message = load_sheet_snapshot(config, store, refresh=refresh)
+    if not success:
+        return dict(result, message=message, timings=timer.as_dict())
+    result.update(version=snapshot['version'], rows=len(snapshot['rows']), fetched=snapshot['fetched'])
+
+    build_key = build_key_for(config, snapshot['version'])
+    if is_current(build_key):
+        return dict(result, ok=True, cached=True, key=build_key, message="Up to date",
+                    outputs=manifest.get('outputs', {}), timings=timer.as_dict())
+
+    os.makedirs(out_dir, exist_ok=True)
+    worker_name = worker_name_for(config, site_name)
+    worker_url = (config.get('site_url') or f"https://{worker_name}.{config.get('cf_account_id') or 'account'}.workers.dev").rstrip('/')
+    template_config = template_config_from(config)
+    site = {'title': template_config['blog_title'], 'description': template_config['blog_description'], 'base_url': worker_url}
+    outputs = {}
+
+    with timer.stage('template'):
+        template_html = generate_html_template(template_config)
+    with timer.stage('embed'):
+        posts = None
+        if config.get('embed_data'):
+            posts, embed_message = load_embedded_posts(config, snapshot['rows'])
+            result['embed'] = embed_message
+    with timer.stage('worker'):
+        worker_config = build_worker_config(dict(config, image_export_dir=os.path.join(out_dir, 'img')), template_config, worker_url, posts)
+        worker_script = generate_modern_worker_script(worker_config, template_html)
+    with timer.stage('pages'):
+        from post_pages import write_post_pages
+        outputs['pages'] = len(write_post_pages(snapshot['rows'], site, directory=out_dir))
+    if config.get('site_url'):
+        with timer.stage('artifacts'):
+            from build_artifacts import build_artifacts, write_artifacts
+            outputs['artifacts'] = sorted(write_artifacts(build_artifacts(snapshot['rows'], site), out_dir))
+
+    with timer.stage('write'):
+        for name, text in (('worker.js', worker_script), ('template.html', template_html)):
+            with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+                f.write(text)
+    with timer.stage('measure'):
+        worker_bytes = worker_script.encode('utf-8')
+        outputs.update(worker_bytes=len(worker_bytes), worker_gzip_bytes=len(gzip.compress(worker_bytes)),
+                       runtime_version=shared_runtime()[0],
+                       cold_start_ms=measure_worker_startup(os.path.join(out_dir, 'worker.js')))
+    with timer.stage('write'):
+        manifest = dict(manifest, key=build_key, version=snapshot['version'], worker_name=worker_name,
+                        worker_url=worker_url, built_at=datetime.now().isoformat(), outputs=outputs)
+        write_manifest(out_dir, manifest)
+
+    return dict(result, ok=True, key=build_key, message=f"Built {outputs['pages']} post pages",
+                outputs=outputs, timings=timer.as_dict())
+
+
+def deploy_site(config, out_dir, site_name='site', store=None, refresh=False, force=False, session=None):
+    """Build, then upload worker.js unless this exact build is already deployed"""
+    result = build_site(config, out_dir, site_name, store=store, refresh=refresh, force=force)
+    if not result['ok']:
+        return result
+    api_token = config.get('cf_api_token') or os.environ.get('CLOUDFLARE_API_TOKEN')
+    account_id = config.get('cf_account_id') or os.environ.get('CLOUDFLARE_ACCOUNT_ID')
+    if not api_token or not account_id:
+        return dict(result, ok=False, message="Cloudflare API Token dan Account ID diperlukan")
+
+    manifest = read_manifest(out_dir)
+    if not force and manifest.get('deployed_key') == result['key']:
+        return dict(result, deployed=False, url=manifest.get('deployed_url'), message="Already deployed")
+
+    # KV first: the new worker reads its keys from the first request on
+    if config.get('kv_namespace_id'):
+        start = time.perf_counter()
+        success, kv_result, message = sync_site_kv(config, api_token, account_id, store=store)
+        result['timings']['kv'] = round((time.perf_counter() - start) * 1000, 1)
+        result['kv'] = kv_result
+        if not success:
+            return dict(result, ok=False, message=message)
+
+    start = time.perf_counter()
+    with open(os.path.join(out_dir, 'worker.js'), 'r', encoding='utf-8') as f:
+        script = f.read()
+    success, data, message = upload_worker(api_token, account_id, manifest['worker_name'], script,
+                                           session=session, bindings=kv_bindings(config))
+    result['timings']['upload'] = round((time.perf_counter() - start) * 1000, 1)
+    if not success:
+        return dict(result, ok=False, message=message)
+    write_manifest(out_dir, dict(manifest, deployed_key=result['key'], deployed_url=data['url'],
+                                 deployed_at=datetime.now().isoformat()))
+    return dict(result, deployed=True, url=data['url'], message=message)
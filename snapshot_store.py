@@ -0,0 +1,226 @@
+"""
+On-disk store of parsed sheet snapshots.
+
+Every fetched sheet version is written once as a columnar Arrow IPC file
+(named by its content hash) and read back through a memory map, so a cold
+start or cache miss costs a file open instead of a download plus CSV parse.
+pyarrow is optional: without it (or for columns Arrow cannot type) snapshots
+are written as JSON, and rows JSON cannot represent are refused. Only the newest `keep` versions per sheet are kept;
+older ones can be restored with rollback() until they are pruned.
+"""
+
+import json
+import mmap
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Sequence
+from datetime import datetime
+
+from change_detector import snapshot_version
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
+
+EXTENSIONS = {'arrow': '.arrow', 'json': '.json'}
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'sheet'
+
+
+def default_format():
+    return 'arrow' if pa is not None else 'json'
+
+
+class SnapshotRows(Sequence):
+    """Read-only rows over a memory-mapped Arrow table
+
+    len() and to_pandas() work on the columns directly; Python dicts are
+    only built when the rows are iterated (once, then kept) or indexed.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._rows = None
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if self._rows is not None:
+            return self._rows[index]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.to_list()[index]
+            return self.table.slice(start, max(stop - start, 0)).to_pylist()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.table.slice(index, 1).to_pylist()[0]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def to_list(self):
+        if self._rows is None:
+            self._rows = self.table.to_pylist()
+        return self._rows
+
+    def to_pandas(self):
+        return self.table.to_pandas()
+
+
+class SnapshotStore:
+    """Content-addressed snapshot files plus a small manifest per sheet"""
+
+    def __init__(self, root='.snapshots', keep=5, format=None):
+        self.root = root
+        self.keep = keep
+        self.format = format or default_format()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ---- manifest ----
+
+    def _manifest_path(self, key):
+        return os.path.join(self.root, f"{_safe_name(key)}.manifest.json")
+
+    def versions(self, key):
+        """Snapshot entries for `key`, newest (current) first"""
+        try:
+            with open(self._manifest_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _write_manifest(self, key, entries):
+        self._atomic_write(self._manifest_path(key), json.dumps(entries, indent=2).encode('utf-8'))
+
+    def _atomic_write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ---- save / load ----
+
+    def save(self, key, rows):
+        """Store `rows` as the current version of `key` (no-op if that content is already stored)"""
+        version = snapshot_version(rows)
+        with self._lock:
+            entries = self.versions(key)
+            existing = next((entry for entry in entries if entry['version'] == version), None)
+            if existing and os.path.exists(os.path.join(self.root, existing['file'])):
+                entries.remove(existing)
+                entries.insert(0, existing)
+                self._write_manifest(key, entries)
+                return existing
+
+            fmt, data = self._encode(rows)
+            file_name = f"{_safe_name(key)}-{version}{EXTENSIONS[fmt]}"
+            self._atomic_write(os.path.join(self.root, file_name), data)
+
+            entry = {
+                'version': version,
+                'file': file_name,
+                'format': fmt,
+                'rows': len(rows),
+                'bytes': len(data),
+                'created': datetime.now().isoformat(),
+            }
+            entries = [entry] + [e for e in entries if e['version'] != version]
+            self._write_manifest(key, entries)
+            self._prune(key, entries)
+            return entry
+
+    def _encode(self, rows):
+        if self.format == 'arrow':
+            try:
+                table = pa.Table.from_pylist(rows)
+                sink = pa.BufferOutputStream()
+                with pa_ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                return 'arrow', sink.getvalue().to_pybytes()
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed-type columns: fall through to JSON
+                pass
+        try:
+            return 'json', json.dumps(rows, ensure_ascii=False).encode('utf-8')
+        except TypeError as e:
+            # Stringifying would change the data on the next load; refuse instead
+            raise ValueError(f"Snapshot rows cannot be stored: {e}") from e
+
+    def load_table(self, key, version=None):
+        """Memory-mapped Arrow table for an Arrow snapshot (zero-copy), else None"""
+        entry = self._entry(key, version)
+        if not entry or entry['format'] != 'arrow' or pa is None:
+            return None
+        source = pa.memory_map(os.path.join(self.root, entry['file']), 'r')
+        return pa_ipc.open_file(source).read_all()
+
+    def load_rows(self, key, version=None):
+        """Like load(), but an Arrow snapshot comes back as a lazy SnapshotRows view"""
+        table = self.load_table(key, version)
+        return SnapshotRows(table) if table is not None else self.load(key, version)
+
+    def load(self, key, version=None):
+        """Rows of the current (or given) version, None when nothing is stored"""
+        entry = self._entry(key, version)
+        if not entry:
+            return None
+        if entry['format'] == 'arrow':
+            table = self.load_table(key, entry['version'])
+            return table.to_pylist() if table is not None else None
+
+        with open(os.path.join(self.root, entry['file']), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return json.loads(mapped[:].decode('utf-8'))
+
+    def _entry(self, key, version=None):
+        entries = self.versions(key)
+        if version is None:
+            return entries[0] if entries else None
+        return next((entry for entry in entries if entry['version'] == version), None)
+
+    # ---- retention ----
+
+    def rollback(self, key, version):
+        """Make an older stored version current again, returns its entry (None if unknown)"""
+        with self._lock:
+            entries = self.versions(key)
+            entry = next((e for e in entries if e['version'] == version), None)
+            if entry:
+                entries.remove(entry)
+                entries.insert(0, entry)
+                self._write_manifest(key, entries)
+            return entry
+
+    def prune(self, key):
+        """Delete versions beyond `keep` (and files no manifest refers to)"""
+        with self._lock:
+            return self._prune(key, self.versions(key))
+
+    def _prune(self, key, entries):
+        kept, dropped = entries[:self.keep], entries[self.keep:]
+        if dropped:
+            self._write_manifest(key, kept)
+        referenced = {entry['file'] for entry in kept}
+        own_file = re.compile(re.escape(_safe_name(key)) + r'-[0-9a-f]{12}\.(arrow|json)$')
+        removed = []
+        for file_name in os.listdir(self.root):
+            if own_file.match(file_name) and file_name not in referenced:
+                os.remove(os.path.join(self.root, file_name))
+                removed.append(file_name)
+        return removed
@@ -4,9 +4,23 @@ import json
 import os
 from datetime import datetime
 import re
-import subprocess
-import time
 import pandas as pd
+from blog_schema import post_tags, validate_rows
+from build_artifacts import build_artifacts, write_artifacts
+from change_detector import VERSION_WATCH_CLIENT_JS, ChangeDetector, serve_change_feed, snapshot_version
+from data_view import PAGE_SIZES, column_stats, filter_rows, page_count, page_window
+from image_pipeline import ImageCache, build_images, export_images, responsive_img_html
+from local_import import SUPPORTED_EXTENSIONS, save_upload
+from post_pages import write_post_pages
+from preview_renderer import PreviewRenderer, read_text_cached
+from preview_server import PreviewServer
+from process_supervisor import get_supervisor
+from purge_trigger import generate_apps_script_trigger, generate_purge_secret, send_purge
+from sheets_api import LIST_COLUMNS
+from site_pipeline import SNAPSHOT_DIR, build_worker_config, generate_html_template, kv_bindings, load_embedded_posts, snapshot_key as site_snapshot_key, sync_site_kv, upload_worker
+from site_pipeline import load_validated_sheet as load_site_sheet
+from snapshot_store import SnapshotRows, SnapshotStore
+from worker_generators import generate_modern_worker_script
 
 # Page configuration with stability improvements
 st.set_page_config(
@@ -51,8 +65,8 @@ config = load_config()
 
 # Demo data function
 def get_demo_data():
-    """Get demo data for preview"""
-    return [
+    """Get demo data for preview (validated like sheet data)"""
+    return validate_rows([
         {
             "id": 1,
             "title": "Cara Membuat Blog dengan Google Sheets",
@@ -80,72 +94,86 @@ def get_demo_data():
             "author": "Admin",
             "date": "2025-01-16"
         }
-    ]
+    ]).rows
+
+def get_preview_data():
+    """(posts, version) for previews: the loaded sheet with its stored snapshot version, or the demo data"""
+    posts = st.session_state.get('spreadsheet_data')
+    if posts:
+        return posts, st.session_state.get('spreadsheet_version')
+    return get_demo_data(), 'demo'
+
+# Loaded sheet as a DataFrame, keyed by snapshot version (cache_resource: no copy per rerun)
+@st.cache_resource(max_entries=4)
+def get_data_frame(version, _data):
+    """DataFrame for a loaded snapshot (straight from the Arrow columns for a stored one)"""
+    if isinstance(_data, SnapshotRows):
+        return _data.to_pandas()
+    return pd.DataFrame(_data)
+
+@st.cache_data(max_entries=4)
+def get_column_stats(version, _df):
+    """Column statistics per snapshot"""
+    return column_stats(_df)
+
+@st.cache_data(max_entries=16)
+def get_filtered_rows(version, query, column, _df):
+    """Row positions matching a filter, per snapshot"""
+    return filter_rows(_df, query, column)
+
+# Parsed sheet snapshots on disk (Arrow IPC when pyarrow is installed)
+@st.cache_resource
+def get_snapshot_store():
+    """Snapshot store shared by all sessions"""
+    return SnapshotStore(SNAPSHOT_DIR, keep=5)
+
+# Rendered previews, memoized on (template, config, data) hashes across reruns
+@st.cache_resource
+def get_preview_renderer():
+    """Shared LRU of rendered preview HTML"""
+    return PreviewRenderer(max_entries=32)
+
+# Node.js web app supervisor (one managed child per port for the whole Streamlit server)
+@st.cache_resource
+def get_node_supervisor(port=5000):
+    """Supervisor for `node web-app.js` on `port`"""
+    return get_supervisor(['node', 'web-app.js'], port)
 
 # Function to start Node.js web app
-def start_node_webapp():
-    """Start the Node.js web application"""
-    try:
-        # Check if web-app.js exists
-        if not os.path.exists('web-app.js'):
-            return False, "web-app.js file not found"
-        
-        # Start the Node.js process
-        process = subprocess.Popen(['node', 'web-app.js'], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE)
-        
-        # Give it a moment to start
-        time.sleep(2)
-        
-        # Check if it's running
-        poll = process.poll()
-        if poll is None:
-            return True, "Node.js web app started successfully"
-        else:
-            return False, "Failed to start Node.js web app"
-            
-    except Exception as e:
-        return False, f"Error starting Node.js web app: {str(e)}"
+def start_node_webapp(port=5000):
+    """Start the Node.js web application (reuses the running one)"""
+    if not os.path.exists('web-app.js'):
+        return False, "web-app.js file not found"
+    return get_node_supervisor(port).start()
 
-# Function to get data from Google Sheets
-def get_sheets_data(spreadsheet_id, sheet_name="WEBSITE"):
-    """Get data from Google Sheets using CSV export"""
-    try:
-        # Multiple URL formats to try
-        urls = [
-            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid=0",
-            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv",
-            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/gviz/tq?tqx=out:csv",
-            f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/pub?output=csv"
-        ]
-        
-        for url in urls:
-            try:
-                response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; BlogGenerator/1.0)'})
-                if response.status_code == 200 and not response.text.startswith('<!DOCTYPE'):
-                    # Parse CSV data
-                    lines = response.text.strip().split('\n')
-                    if len(lines) > 1:
-                        # Convert to structured data
-                        headers = [h.strip('"') for h in lines[0].split(',')]
-                        data = []
-                        for line in lines[1:]:
-                            if line.strip():
-                                values = [v.strip('"') for v in line.split(',')]
-                                if len(values) >= len(headers):
-                                    row = {}
-                                    for i, header in enumerate(headers):
-                                        row[header] = values[i] if i < len(values) else ""
-                                    data.append(row)
-                        return True, data, f"Successfully loaded {len(data)} rows"
-            except Exception as e:
-                continue
-        
-        return False, [], "Could not access spreadsheet data"
-        
-    except Exception as e:
-        return False, [], f"Error: {str(e)}"
+# Function to load sheet rows through the configured data source
+def load_validated_sheet(spreadsheet_id, sheet_name="WEBSITE", columns=None, published_only=False):
+    """Load rows and run them through the blog schema, returns (success, ValidationResult, message)"""
+    return load_site_sheet(config, spreadsheet_id, sheet_name, columns, published_only)
+
+def load_sheet_data(spreadsheet_id, sheet_name="WEBSITE", columns=None):
+    """Load validated rows using the backend selected in the sidebar (CSV export or Sheets API v4)"""
+    success, result, message = load_validated_sheet(spreadsheet_id, sheet_name, columns)
+    return success, result.rows, message
+
+# Change detector singleton (one poller + version feed per sheet and port)
+@st.cache_resource
+def get_change_detector(spreadsheet_id, sheet_name, interval, port=5055):
+    """Start the sheet change detector and its /api/version + SSE feed"""
+    detector = ChangeDetector(
+        {sheet_name: lambda: load_sheet_data(spreadsheet_id, sheet_name)},
+        interval=interval
+    ).start()
+    server = serve_change_feed(detector, port=port)
+    return detector, server
+
+# Python preview server singleton (serves the generated template without Node)
+@st.cache_resource
+def get_preview_server(port=5060):
+    """Asyncio preview server shared by all sessions; serves generated_template.html"""
+    server = PreviewServer(host='127.0.0.1', port=port)
+    server.watch_template('generated_template.html', 'blog-template.html')
+    return server
 
 # Function to test Cloudflare Workers connection
 def test_cloudflare_connection(api_token, account_id):
@@ -180,6 +208,10 @@ def deploy_to_workers(api_token, account_id, worker_name, html_content, spreadsh
             'Content-Type': 'application/javascript'
         }
         
+        # Data version embedded by generate_website_html (served at /api/version)
+        version_match = re.search(r'<meta name="data-version" content="([^"]*)">', html_content)
+        data_version = version_match.group(1) if version_match else None
+        
         # Create worker script
         worker_script = f"""
 addEventListener('fetch', event => {{
@@ -193,6 +225,13 @@ async function handleRequest(request) {{
     return await getSheetData();
   }}
   
+  // Version of the data baked into this deployment
+  if (url.pathname === '/api/version') {{
+    return new Response(JSON.stringify({{ version: {json.dumps(data_version)} }}), {{
+      headers: {{ 'content-type': 'application/json', 'cache-control': 'no-store' }}
+    }});
+  }}
+  
   // Serve the main website
   return new Response(`{html_content}`, {{
     headers: {{ 'content-type': 'text/html;charset=UTF-8' }}
@@ -233,8 +272,14 @@ async function getSheetData() {{
         return False, f"Deployment error: {str(e)}"
 
 # Function to generate simple website HTML
-def generate_website_html(title, description, data, color_scheme="blue"):
-    """Generate HTML for simple website based on spreadsheet data"""
+def generate_website_html(title, description, data, color_scheme="blue", version_url="/api/version", poll_interval=60, images=None):
+    """Generate HTML for simple website based on spreadsheet data
+
+    The page embeds the data version it was built from and polls `version_url`
+    every `poll_interval` seconds, reloading only when the version changes.
+    `images` (from image_pipeline.build_images) turns featured images into
+    responsive <picture> elements; without it the original URL is lazy-loaded.
+    """
     
     color_schemes = {
         "blue": {"primary": "#2563eb", "secondary": "#3b82f6", "background": "#eff6ff"},
@@ -249,12 +294,14 @@ def generate_website_html(title, description, data, color_scheme="blue"):
     content_html = ""
     if data:
         for item in data[:10]:  # Limit to first 10 items
-            item_title = item.get('title', item.get('name', item.get('item', 'No Title')))
-            item_description = item.get('description', item.get('content', item.get('details', 'No description available')))
-            item_category = item.get('category', item.get('type', 'General'))
+            item_title = item['title']
+            item_description = item['content'] or item['excerpt'] or 'No description available'
+            item_category = item['category']
+            item_image = responsive_img_html(item.get('featured_image'), images, alt=item_title, css_class='featured')
             
             content_html += f"""
             <div class="content-item">
+                {item_image}
                 <h3>{item_title}</h3>
                 <span class="category">{item_category}</span>
                 <p>{item_description}</p>
@@ -269,6 +316,7 @@ def generate_website_html(title, description, data, color_scheme="blue"):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="data-version" content="{snapshot_version(data or [])}">
     <title>{title}</title>
     <style>
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
@@ -298,6 +346,7 @@ def generate_website_html(title, description, data, color_scheme="blue"):
             border-left: 4px solid {colors['primary']}; 
         }}
         .content-item h3 {{ color: {colors['primary']}; margin-bottom: 10px; }}
+        .content-item .featured {{ display: block; width: 100%; height: auto; border-radius: 8px; margin-bottom: 15px; }}
         .category {{ 
             background: {colors['secondary']}; 
             color: white; 
@@ -335,10 +384,11 @@ def generate_website_html(title, description, data, color_scheme="blue"):
     </div>
     
     <script>
-        // Auto-refresh data every 5 minutes
-        setInterval(function() {{
+        {VERSION_WATCH_CLIENT_JS}
+        // Reload only when the published data version changes
+        watchDataVersion({json.dumps(version_url)}, {int(poll_interval * 1000)}, function() {{
             location.reload();
-        }}, 300000);
+        }}, document.querySelector('meta[name="data-version"]').content);
     </script>
 </body>
 </html>
@@ -351,8 +401,7 @@ def calculate_stats(data):
     categories = set(post['category'] for post in data)
     tags = set()
     for post in data:
-        post_tags = post['tags'].split(',')
-        tags.update(tag.strip() for tag in post_tags)
+        tags.update(post_tags(post))
     
     return {
         'total_posts': len(data),
@@ -360,6 +409,173 @@ def calculate_stats(data):
         'tags': len(tags)
     }
 
+def generate_deployment_guide():
+    """Generate deployment guide"""
+    return """
+    ## 🚀 Deployment Guide
+    
+    ### Prerequisites
+    - Web server (Apache/Nginx)
+    - Domain name
+    - SSL certificate
+    
+    ### Steps
+    1. **Upload Files**
+       - Upload HTML template to your web server
+       - Ensure proper file permissions
+    
+    2. **Configure Environment**
+       - Set up environment variables
+       - Configure Google Sheets API
+       - Set up Cloudflare if using
+    
+    3. **Test Deployment**
+       - Check all links work
+       - Test Google Sheets connection
+       - Verify responsive design
+    
+    4. **Go Live**
+       - Point domain to your server
+       - Enable SSL
+       - Monitor for errors
+    
+    ### Environment Variables
+    ```bash
+    GOOGLE_SHEETS_API_KEY=your_api_key_here
+    SPREADSHEET_ID=your_spreadsheet_id
+    SHEET_NAME=WEBSITE
+    ```
+    
+    ### Troubleshooting
+    - Check API key permissions
+    - Verify spreadsheet sharing settings
+    - Test network connectivity
+    """
+
+def preview_generated_template():
+    """Preview template yang sudah di-generate"""
+    try:
+        if not os.path.exists('generated_template.html'):
+            st.error("❌ Template tidak ditemukan! Generate template terlebih dahulu")
+            return
+            
+        template_html = read_text_cached('generated_template.html')
+            
+        # Show template info
+        st.markdown("### 👁️ Template Preview")
+        st.info(f"Template size: {len(template_html)} karakter")
+        
+        # Show template config if available
+        template_config = json.loads(read_text_cached('generated_template_config.json') or '{}')
+        if template_config:
+            st.json(template_config)
+        
+        # Show HTML code preview (first 1000 chars)
+        st.markdown("#### HTML Code Preview:")
+        st.code(template_html[:1000] + ("..." if len(template_html) > 1000 else ""), language="html")
+        
+        # Show rendered HTML in expandable section
+        with st.expander("🌐 Rendered HTML Preview", expanded=False):
+            preview_posts, preview_version = get_preview_data()
+            preview_html = get_preview_renderer().render_template(template_html, template_config, preview_posts, version=preview_version)
+            st.components.v1.html(preview_html, height=600, scrolling=True)
+            
+    except Exception as e:
+        st.error(f"❌ Error previewing template: {str(e)}")
+
+def deploy_template_only():
+    """Deploy hanya template yang sudah di-generate tanpa konfigurasi tambahan"""
+    try:
+        # Check API credentials
+        cf_api_token = st.session_state.get('cf_api_token')
+        cf_account_id = st.session_state.get('cf_account_id')
+        
+        if not cf_api_token or not cf_account_id:
+            st.error("❌ Cloudflare API Token dan Account ID diperlukan!")
+            st.info("💡 Isi konfigurasi Cloudflare di tab Configuration terlebih dahulu")
+            return
+        
+        # Read template dan config
+        if not os.path.exists('generated_template.html'):
+            st.error("❌ Template tidak ditemukan! Generate template terlebih dahulu")
+            return
+            
+        with open('generated_template.html', 'r', encoding='utf-8') as f:
+            template_html = f.read()
+            
+        template_config = {}
+        if os.path.exists('generated_template_config.json'):
+            with open('generated_template_config.json', 'r') as f:
+                template_config = json.load(f)
+        
+        st.info(f"📄 Template siap deploy: {len(template_html)} karakter")
+        st.info(f"🎨 Template: {template_config.get('type', 'Unknown')} - {template_config.get('color_scheme', 'Default')}")
+        
+        # Generate worker name
+        import random
+        import string
+        worker_name = f"blog-{''.join(random.choices(string.ascii_lowercase + string.digits, k=8))}"
+        worker_url = f"https://{worker_name}.{cf_account_id}.workers.dev"
+        
+        # Embedded posts (multi-tab join) so the worker never fetches Google Sheets
+        posts = None
+        if config.get('embed_data'):
+            with st.spinner("Loading tabs for embedding..."):
+                posts, embed_message = load_embedded_posts(config)
+            if posts is None:
+                st.warning(f"⚠️ {embed_message}")
+            else:
+                st.info(f"📦 {embed_message}")
+        
+        # Worker config shared with blog_cli.py (pre-rendered pages, artifacts, images)
+        worker_config = build_worker_config(config, template_config, worker_url, posts, log=lambda message: st.info(f"📄 {message}"))
+        
+        # Generate modern worker script
+        worker_script = generate_modern_worker_script(worker_config, template_html)
+        
+        # Precomputed API payloads in KV before the worker that reads them goes live
+        if config.get('kv_namespace_id'):
+            with st.spinner("Syncing KV namespace..."):
+                kv_success, _, kv_message = sync_site_kv(config, cf_api_token, cf_account_id, store=get_snapshot_store(), posts=posts)
+            if not kv_success:
+                st.error(f"❌ {kv_message}")
+                return
+            st.info(f"🗄️ {kv_message}")
+        
+        with st.spinner('🚀 Deploying template to Cloudflare Workers...'):
+            # Deploy to Cloudflare
+            success, _, message = upload_worker(cf_api_token, cf_account_id, worker_name, worker_script, bindings=kv_bindings(config))
+            
+            if success:
+                st.success("✅ Template berhasil di-deploy!")
+                st.balloons()
+                
+                # Show deployment info
+                st.markdown("### 🎉 Deployment Berhasil!")
+                st.info(f"**Worker Name:** {worker_name}")
+                st.info(f"**URL:** https://{worker_name}.{cf_account_id}.workers.dev")
+                st.info(f"**Template:** {template_config.get('type', 'Custom')} - {template_config.get('color_scheme', 'Default')}")
+                
+                # Create clickable link
+                st.markdown(f"### 🔗 [Buka Blog Anda]({worker_url})")
+                
+                # Save deployment info
+                deployment_info = {
+                    'worker_name': worker_name,
+                    'url': worker_url,
+                    'template_config': template_config,
+                    'deployed_at': str(datetime.now()),
+                    'deployment_type': 'template_only'
+                }
+                
+                st.session_state['last_deployment'] = deployment_info
+                
+            else:
+                st.error(f"❌ {message}")
+                
+    except Exception as e:
+        st.error(f"❌ Error during deployment: {str(e)}")
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -416,6 +632,25 @@ with st.sidebar.expander("📊 Google Sheets Settings", expanded=True):
     st.info("🔥 Direct connection - No API key required!")
     spreadsheet_id = st.text_input("Spreadsheet ID", value=config.get("spreadsheet_id", "14K69q8SMd3pCAROB1YQMDrmuw8y6QphxAslF_y-3NrM"), help="The ID of your Google Sheets")
     sheet_name = st.text_input("Sheet Name", value=config.get("sheet_name", "WEBSITE"), help="Name of the sheet to read from")
+    data_source_options = ["CSV Export", "Sheets API v4", "Local File"]
+    data_source = st.radio("Data Source", data_source_options, index=data_source_options.index(config.get("data_source", "CSV Export")), help="CSV Export needs no key; Sheets API v4 reads named sheets and selected columns only; Local File imports a CSV/XLSX/ODS file offline")
+    # Keep the saved key when another source is picked; it is only used with Sheets API v4
+    sheets_api_key = config.get("sheets_api_key", "")
+    list_columns_only = False
+    local_path = config.get("local_path", "")
+    if data_source == "Local File":
+        uploaded_file = st.file_uploader("Upload Spreadsheet File", type=SUPPORTED_EXTENSIONS, help="CSV, XLSX or ODS; the sheet named above is used, otherwise the first sheet")
+        if uploaded_file is not None:
+            local_path = save_upload(uploaded_file)
+        local_path = st.text_input("Local File Path", value=local_path, help="Path to a CSV/XLSX/ODS file (filled in automatically after an upload)")
+    if data_source == "Sheets API v4":
+        sheets_api_key = st.text_input("Google Sheets API Key", type="password", value=config.get("sheets_api_key", os.environ.get("GOOGLE_SHEETS_API_KEY", "")), help="API key with Google Sheets API enabled")
+    if data_source != "Local File":
+        list_columns_only = st.checkbox("List columns only (skip content)", value=config.get("list_columns_only", False), help="Don't download the content column for data previews (CSV Export sends it to Google as a gviz query)")
+    published_only = st.checkbox("Published posts only", value=config.get("published_only", False), help="Leave drafts out of data previews (CSV Export filters them on Google's side)")
+    authors_tab = st.text_input("Authors Tab (optional)", value=config.get("authors_tab", ""), help="Tab joined to posts on the author column")
+    embed_data = st.checkbox("Embed joined data in worker", value=config.get("embed_data", False), help="Load all tabs once at deploy time instead of fetching Google Sheets on each request")
+    poll_interval = st.number_input("Change Poll Interval (seconds)", min_value=10, max_value=3600, value=config.get("poll_interval", 60), help="How often the change detector and generated pages check the data version")
     st.markdown("**Note:** Spreadsheet must be set to public/editor access")
 
 # Cloudflare Workers AI Configuration
@@ -446,6 +681,13 @@ with st.sidebar.expander("☁️ Cloudflare Workers AI Settings"):
     # Worker name options
     worker_name_prefix = st.text_input("Worker Name Prefix", value=config.get("worker_name_prefix", "blog"), help="Prefix for worker name")
     auto_generate_name = st.checkbox("Auto-generate available name", value=config.get("auto_generate_name", True), help="Automatically generate available worker name")
+    enable_metrics = st.checkbox("Enable /metrics endpoint", value=config.get("enable_metrics", False), help="Expose in-isolate request, cache and upstream counters at /metrics (also shown in /health)")
+    stream_html = st.checkbox("Stream HTML responses", value=config.get("stream_html", True), help="Send the page head and shell immediately and stream the posts in once the sheet data is ready")
+    kv_namespace_id = st.text_input("KV Namespace ID (optional)", value=config.get("kv_namespace_id", ""), help="Workers KV namespace bound to the worker; deploys sync precomputed API payloads to it (only changed keys are written)")
+    enable_purge = st.checkbox("Enable signed /__purge route", value=config.get("enable_purge", False), help="Workers refresh when the Apps Script edit trigger posts a signed purge. With a KV namespace (global purge marker) they keep their data for hours, otherwise for a minute")
+    purge_secret = config.get("purge_secret") or generate_purge_secret()
+    if enable_purge:
+        purge_secret = st.text_input("Purge Secret", value=purge_secret, type="password", help="Shared HMAC secret between the Apps Script trigger and the worker")
     
     # Show save status for Cloudflare settings
     if cf_api_token and cf_account_id:
@@ -459,6 +701,7 @@ with st.sidebar.expander("📝 Blog Settings", expanded=True):
     blog_description = st.text_area("Blog Description", value=config.get("blog_description", "Platform blog yang terhubung dengan Google Sheets"), help="Description of your blog")
     blog_keywords = st.text_input("Keywords", value=config.get("blog_keywords", "blog, artikel, google sheets"), help="SEO keywords")
     posts_per_page = st.number_input("Posts per Page", min_value=1, max_value=20, value=config.get("posts_per_page", 6))
+    image_base_url = st.text_input("Image Base URL (optional)", value=config.get("image_base_url", ""), help="Where dist/img is hosted; when set, featured images are resized to AVIF/WebP variants with srcset")
 
 # Auto-save indicator dengan detail
 if os.path.exists(CONFIG_FILE):
@@ -490,14 +733,28 @@ else:
 current_config = {
     "spreadsheet_id": spreadsheet_id,
     "sheet_name": sheet_name,
+    "data_source": data_source,
+    "sheets_api_key": sheets_api_key,
+    "list_columns_only": list_columns_only,
+    "published_only": published_only,
+    "local_path": local_path,
+    "authors_tab": authors_tab,
+    "embed_data": embed_data,
+    "poll_interval": poll_interval,
     "cf_api_token": cf_api_token,
     "cf_account_id": cf_account_id,
     "worker_name_prefix": worker_name_prefix,
     "auto_generate_name": auto_generate_name,
+    "enable_metrics": enable_metrics,
+    "stream_html": stream_html,
+    "kv_namespace_id": kv_namespace_id,
+    "enable_purge": enable_purge,
+    "purge_secret": purge_secret,
     "blog_title": blog_title,
     "blog_description": blog_description,
     "blog_keywords": blog_keywords,
-    "posts_per_page": posts_per_page
+    "posts_per_page": posts_per_page,
+    "image_base_url": image_base_url
 }
 
 # Save configuration only if significantly different from last saved
@@ -506,6 +763,14 @@ if current_config != st.session_state.get('last_config', {}):
     st.session_state.last_config = current_config.copy()
     config = current_config
 
+# Warm start: reuse the last stored snapshot instead of re-downloading and re-parsing the sheet
+snapshot_key = site_snapshot_key(current_config)
+if spreadsheet_id and 'spreadsheet_data' not in st.session_state:
+    stored_versions = get_snapshot_store().versions(snapshot_key)
+    if stored_versions:
+        st.session_state.spreadsheet_data = get_snapshot_store().load_rows(snapshot_key) or []
+        st.session_state.spreadsheet_version = stored_versions[0]['version']
+
 # Main content area
 tab1, tab2, tab3, tab4 = st.tabs(["🏠 Dashboard", "📝 Template Generator", "🚀 Deploy", "📊 Preview"])
 
@@ -516,18 +781,120 @@ with tab1:
     st.markdown("### 🌐 Node.js Web Application")
     col_node1, col_node2 = st.columns(2)
     
+    node_supervisor = get_node_supervisor()
+    
     with col_node1:
         if st.button("🚀 Start Node.js Web App", key="start_node"):
-            success, message = start_node_webapp()
+            with st.spinner("Waiting for port 5000..."):
+                success, message = start_node_webapp()
             if success:
                 st.success(f"✅ {message}")
                 st.info("🌐 Node.js web app is running at: http://localhost:5000")
                 st.markdown("[Open Web App](http://localhost:5000)", unsafe_allow_html=True)
             else:
                 st.error(f"❌ {message}")
+        
+        if node_supervisor.running:
+            if st.button("🔁 Restart", key="restart_node"):
+                node_supervisor.stop()
+                success, message = node_supervisor.start()
+                if success:
+                    st.success(f"✅ {message}")
+                else:
+                    st.error(f"❌ {message}")
+            if st.button("⏹️ Stop Node.js Web App", key="stop_node"):
+                node_supervisor.stop()
+                st.info("Node.js web app stopped")
     
     with col_node2:
         st.info("💡 The Node.js web app provides additional features:\n- Advanced template generation\n- Real-time data preview\n- Direct Cloudflare deployment")
+        st.json(node_supervisor.status())
+    
+    if node_supervisor.logs:
+        with st.expander("📜 Node.js Logs", expanded=False):
+            st.code("\n".join(node_supervisor.tail(100)), language="text")
+    
+    st.divider()
+    
+    # In-process preview: generated template + /api routes from the loaded data
+    st.markdown("### 🐍 Python Preview Server")
+    col_pv1, col_pv2 = st.columns(2)
+    
+    preview_server = get_preview_server()
+    preview_posts = st.session_state.get('spreadsheet_data') or st.session_state.get('website_data')
+    
+    with col_pv1:
+        if st.button("▶️ Start Preview Server", key="start_preview_server"):
+            if not preview_posts and spreadsheet_id:
+                with st.spinner("Loading data from spreadsheet..."):
+                    success, data, message = load_sheet_data(spreadsheet_id, sheet_name)
+                if success:
+                    st.session_state.spreadsheet_data = preview_posts = data
+                    st.session_state.spreadsheet_version = None
+            preview_server.blog_title = blog_title
+            preview_server.update(posts=list(preview_posts or get_demo_data()))
+            success, message = preview_server.start()
+            if success:
+                st.success(f"✅ {message}")
+                st.markdown(f"[Open Preview]({preview_server.url})")
+            else:
+                st.error(f"❌ {message}")
+        if preview_server.running and st.button("⏹️ Stop Preview Server", key="stop_preview_server"):
+            preview_server.stop()
+            st.info("Preview server stopped")
+    
+    with col_pv2:
+        if preview_server.running:
+            # Hot reload: open pages pick up new data via /api/version
+            if preview_posts and preview_server.update(posts=preview_posts):
+                st.info("🔄 Preview data updated")
+            st.json(preview_server.status())
+        else:
+            st.info("💡 Serves the generated template with `/api/posts`, `/api/stats` and `/post/<slug>` from the loaded sheet data - no Node.js or Cloudflare needed")
+    
+    st.divider()
+    
+    # Change detection: one poller instead of every page reloading the whole sheet
+    st.markdown("### 🔔 Change Detection")
+    col_cd1, col_cd2 = st.columns(2)
+    
+    with col_cd1:
+        if st.button("▶️ Start Change Detector", key="start_change_detector"):
+            if not spreadsheet_id:
+                st.error("Please provide Spreadsheet ID")
+            else:
+                try:
+                    detector, server = get_change_detector(spreadsheet_id, sheet_name, poll_interval)
+                    st.success(f"✅ Polling every {detector.interval}s - version feed at http://localhost:{server.server_port}/api/version")
+                except OSError as e:
+                    st.error(f"❌ Could not start change feed: {str(e)}")
+    
+    with col_cd2:
+        st.info("💡 Endpoints:\n- `/api/version` - tiny version token\n- `/api/changes` - row diffs (SSE)\n- `/api/status` - per-sheet versions")
+        if st.button("🔍 Check Version Now", key="check_version"):
+            detector, _ = get_change_detector(spreadsheet_id, sheet_name, poll_interval)
+            detector.poll_once()
+            st.json(detector.status())
+    
+    st.divider()
+    
+    # Stored snapshots: instant warm starts and rollback to an earlier sheet version
+    st.markdown("### 💾 Data Snapshots")
+    snapshot_store = get_snapshot_store()
+    stored_versions = snapshot_store.versions(snapshot_key) if spreadsheet_id else []
+    if stored_versions:
+        st.dataframe(pd.DataFrame(stored_versions), use_container_width=True, hide_index=True)
+        col_sn1, col_sn2 = st.columns(2)
+        with col_sn1:
+            rollback_version = st.selectbox("Version", [entry['version'] for entry in stored_versions], key="rollback_version")
+        with col_sn2:
+            if st.button("⏪ Use This Version", key="rollback_snapshot"):
+                snapshot_store.rollback(snapshot_key, rollback_version)
+                st.session_state.spreadsheet_data = snapshot_store.load_rows(snapshot_key, rollback_version)
+                st.session_state.spreadsheet_version = rollback_version
+                st.success(f"✅ Using snapshot {rollback_version} ({len(st.session_state.spreadsheet_data)} rows)")
+    else:
+        st.info(f"💡 No snapshots yet - load the spreadsheet once and it is stored as {snapshot_store.format}")
     
     st.divider()
     
@@ -566,7 +933,7 @@ with tab1:
                                         st.write(f"Row {i+1}: {line}")
                                 success = True
                                 break
-                        except Exception as e:
+                        except Exception:
                             continue
                     
                     if not success:
@@ -760,13 +1127,23 @@ with tab3:
                 st.error("Please provide Spreadsheet ID in the sidebar")
             else:
                 with st.spinner("Loading data from spreadsheet..."):
-                    success, data, message = get_sheets_data(spreadsheet_id, sheet_name)
+                    success, data, message = load_sheet_data(spreadsheet_id, sheet_name)
                     
                 if success and data:
                     st.success(f"✅ {message}")
                     
+                    # Responsive featured images (variants go to dist/img for upload to the image base URL)
+                    images = None
+                    if image_base_url:
+                        with st.spinner("Building responsive images..."):
+                            image_cache = ImageCache()
+                            images, image_errors = build_images(data, image_cache, base_url=image_base_url)
+                            export_images(images, image_cache, directory='dist/img')
+                        encoded = sum(len(info['encoded']) for info in images.values())
+                        st.info(f"🖼️ {len(images)} images, {encoded} new variants in dist/img" + (f", {len(image_errors)} failed" if image_errors else ""))
+                    
                     # Generate website HTML with real data
-                    website_html = generate_website_html(website_title, website_description, data, website_color)
+                    website_html = generate_website_html(website_title, website_description, data, website_color, poll_interval=poll_interval, images=images)
                     
                     # Save generated website
                     try:
@@ -865,36 +1242,76 @@ with tab3:
         st.markdown("### 📊 Data Preview from Spreadsheet")
         
         if st.button("📄 Load Spreadsheet Data"):
-            if not spreadsheet_id:
+            if data_source == "Local File" and not local_path:
+                st.error("Please upload a file or enter a Local File Path in the sidebar")
+            elif data_source != "Local File" and not spreadsheet_id:
                 st.error("Please provide Spreadsheet ID in the sidebar")
             else:
                 with st.spinner("Loading data from spreadsheet..."):
-                    success, data, message = get_sheets_data(spreadsheet_id, sheet_name)
+                    success, result, message = load_validated_sheet(spreadsheet_id, sheet_name, columns=LIST_COLUMNS if list_columns_only else None, published_only=published_only)
+                data = result.rows
                 
-                if success and data:
+                if success and (data or result.quarantined):
                     st.success(f"✅ {message}")
                     
-                    # Display data preview
-                    df = pd.DataFrame(data)
-                    st.dataframe(df, use_container_width=True)
-                    
-                    # Show column information
-                    st.markdown("**Available Columns:**")
-                    for col in df.columns:
-                        st.write(f"- {col}")
-                        
                     # Save data to session for later use
                     st.session_state.spreadsheet_data = data
+                    st.session_state.quarantined_rows = result.quarantined
+                    # Only full, unfiltered loads become the sheet's snapshot: builds, deploys and
+                    # the warm start read it back as the whole sheet
+                    if list_columns_only or published_only:
+                        st.session_state.spreadsheet_version = snapshot_version(data)
+                    else:
+                        st.session_state.spreadsheet_version = get_snapshot_store().save(snapshot_key, data)['version']
                 else:
                     st.error(f"❌ {message}")
         
-        # Show saved data if available
-        if 'spreadsheet_data' in st.session_state:
-            st.markdown("### 📋 Loaded Data Summary")
+        # Rows rejected by the blog schema, with reasons
+        if st.session_state.get('quarantined_rows'):
+            with st.expander(f"⚠️ {len(st.session_state.quarantined_rows)} rows quarantined", expanded=False):
+                st.dataframe(pd.DataFrame([
+                    {'row': item['row'], 'reasons': ', '.join(item['reasons']), **item['data']}
+                    for item in st.session_state.quarantined_rows
+                ]), use_container_width=True, hide_index=True)
+        
+        # Show saved data if available: filtered and paged server-side, only the visible window is sent
+        if st.session_state.get('spreadsheet_data'):
             data = st.session_state.spreadsheet_data
-            st.info(f"Total rows: {len(data)}")
-            if data:
-                st.info(f"Columns: {', '.join(data[0].keys())}")
+            version = st.session_state.get('spreadsheet_version') or snapshot_version(data)
+            df = get_data_frame(version, data)
+            
+            st.markdown("### 📋 Loaded Data")
+            col_filter, col_column, col_size = st.columns([3, 2, 1])
+            with col_filter:
+                query = st.text_input("Filter", key="data_filter", placeholder="Cari di data...")
+            with col_column:
+                filter_column = st.selectbox("Column", ["(semua kolom)"] + list(df.columns), key="data_filter_column")
+            with col_size:
+                page_size = st.selectbox("Rows", PAGE_SIZES, key="data_page_size")
+            
+            positions = get_filtered_rows(version, query, None if filter_column == "(semua kolom)" else filter_column, df)
+            pages = page_count(len(positions), page_size)
+            page = st.number_input(f"Page (1-{pages})", min_value=1, max_value=pages, value=1, key="data_page")
+            start = (page - 1) * page_size
+            st.caption(f"Rows {min(start + 1, len(positions))}-{min(start + page_size, len(positions))} of {len(positions)} (total {len(df)})")
+            st.dataframe(page_window(df, positions, page, page_size), use_container_width=True)
+            
+            # Column information, computed once per snapshot
+            with st.expander("📊 Column Statistics", expanded=False):
+                st.dataframe(get_column_stats(version, df), use_container_width=True, hide_index=True)
+            
+            # Static post pages (full HTML + OpenGraph + JSON-LD, no client API call) plus sitemap and feeds
+            site_url = st.text_input("Site URL", value=st.session_state.get('last_deployment', {}).get('url', ''), key="export_site_url", help="Absolute URL used in canonical links, sitemap.xml and the RSS/Atom feeds")
+            if st.button("📄 Export Post Pages"):
+                site = {'title': blog_title, 'description': blog_description, 'base_url': site_url}
+                with st.spinner("Rendering post pages..."):
+                    paths = write_post_pages(data, site, directory='dist')
+                st.success(f"✅ {len(paths)} pages written to dist/post/<slug>/index.html")
+                if site_url:
+                    manifest = write_artifacts(build_artifacts(data, site), directory='dist')
+                    st.success(f"✅ {', '.join(manifest)} written to dist/ (with .gz variants)")
+                else:
+                    st.info("💡 Fill in the Site URL to also build sitemap.xml, robots.txt and feeds")
     
     with col2:
         st.markdown("### ☁️ Cloudflare Workers Deploy")
@@ -949,6 +1366,41 @@ with tab3:
             st.markdown(f"### 🔗 [Buka Deployment Terakhir]({deployment['url']})")
         else:
             st.info("Belum ada deployment yang berhasil")
+        
+        # Push invalidation from the spreadsheet
+        st.markdown("---")
+        st.markdown("### 🔔 Apps Script Purge Trigger")
+        
+        if not enable_purge:
+            st.info("💡 Aktifkan 'Enable signed /__purge route' di sidebar, lalu deploy ulang worker")
+        else:
+            default_urls = st.session_state.get('last_deployment', {}).get('url', '')
+            purge_urls = st.text_area("Worker URLs (satu per baris)", value=default_urls, key="purge_worker_urls")
+            purge_sheets = st.text_input("Watched sheets (comma separated, kosong = semua)", value=sheet_name, key="purge_sheets")
+            worker_urls = [url.strip() for url in purge_urls.splitlines() if url.strip()]
+            
+            if worker_urls:
+                trigger_script = generate_apps_script_trigger(
+                    worker_urls, purge_secret,
+                    sheet_names=[name.strip() for name in purge_sheets.split(',') if name.strip()]
+                )
+                with st.expander("📜 Apps Script code", expanded=False):
+                    st.code(trigger_script, language="javascript")
+                st.download_button(
+                    label="📥 Download purgeTrigger.gs",
+                    data=trigger_script,
+                    file_name="purgeTrigger.gs",
+                    mime="application/javascript"
+                )
+                st.caption("Paste ke Extensions > Apps Script, lalu jalankan installPurgeTriggers() sekali.")
+                
+                if st.button("🧪 Send Test Purge", key="send_test_purge"):
+                    for url in worker_urls:
+                        purge_success, purge_data, purge_message = send_purge(url, purge_secret, sheet="*", reason="test", spreadsheet_id=spreadsheet_id)
+                        if purge_success:
+                            st.success(f"✅ {url}: {purge_message}")
+                        else:
+                            st.error(f"❌ {url}: {purge_message} {purge_data}")
 
 
 with tab4:
@@ -959,18 +1411,12 @@ with tab4:
     with col1:
         st.markdown("### 🖥️ Blog Preview")
         
-        # Load demo data for preview
-        demo_data = get_demo_data()
+        # Loaded sheet data when available, demo data otherwise
+        demo_data, demo_version = get_preview_data()
         
-        # Display preview
+        # Display preview (memoized on the snapshot version; large sheets render the first screen first)
         st.markdown("#### Sample Blog Posts")
-        for post in demo_data[:3]:
-            with st.container():
-                st.markdown(f"**{post['title']}**")
-                st.markdown(f"*{post['category']} • {post['date']} • {post['author']}*")
-                st.markdown(f"{post['content'][:200]}...")
-                st.markdown(f"**Tags:** {post['tags']}")
-                st.markdown("---")
+        st.components.v1.html(get_preview_renderer().render_cards(demo_data, version=demo_version), height=600, scrolling=True)
     
     with col2:
         st.markdown("### 📊 Statistics")
@@ -999,972 +1445,6 @@ with tab4:
             else:
                 st.info("No config file found")
 
-def generate_html_template(config):
-    """Generate HTML template based on configuration"""
-    color_schemes = {
-        "Blue": {"primary": "#2563eb", "secondary": "#1d4ed8"},
-        "Green": {"primary": "#059669", "secondary": "#047857"},
-        "Purple": {"primary": "#7c3aed", "secondary": "#6d28d9"},
-        "Red": {"primary": "#dc2626", "secondary": "#b91c1c"},
-        "Orange": {"primary": "#ea580c", "secondary": "#c2410c"}
-    }
-    
-    colors = color_schemes.get(config['color_scheme'], color_schemes['Blue'])
-    
-    # Read the base template
-    try:
-        with open('blog-template.html', 'r', encoding='utf-8') as f:
-            template = f.read()
-    except FileNotFoundError:
-        # Fallback template if file doesn't exist
-        template = """<!DOCTYPE html>
-<html lang="id">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{blog_title}}</title>
-    <meta name="description" content="{{blog_description}}">
-    <meta name="keywords" content="{{blog_keywords}}">
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        :root {
-            --primary-color: #2563eb;
-            --secondary-color: #1d4ed8;
-        }
-        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
-        .navbar { background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%); }
-        .hero { background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%); color: white; padding: 4rem 0; }
-        .card { border: none; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.3s; }
-        .card:hover { transform: translateY(-5px); }
-    </style>
-</head>
-<body>
-    <nav class="navbar navbar-expand-lg navbar-dark">
-        <div class="container">
-            <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>{{blog_title}}</a>
-        </div>
-    </nav>
-    
-    <div class="hero text-center">
-        <div class="container">
-            <h1 class="display-4">{{blog_title}}</h1>
-            <p class="lead">{{blog_description}}</p>
-        </div>
-    </div>
-    
-    <div class="container mt-5">
-        <div class="row">
-            <div class="col-lg-8">
-                <div id="posts" class="row">
-                    <div class="col-12 text-center">
-                        <i class="fas fa-spinner fa-spin fa-2x"></i>
-                        <p>Loading posts...</p>
-                    </div>
-                </div>
-            </div>
-            <div class="col-lg-4">
-                <div class="card">
-                    <div class="card-body">
-                        <h5><i class="fas fa-info-circle me-2"></i>About This Blog</h5>
-                        <p>{{blog_description}}</p>
-                        <p><small>Powered by Google Sheets & Cloudflare Workers</small></p>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <footer class="bg-dark text-white mt-5 py-4">
-        <div class="container text-center">
-            <p>&copy; {{current_year}} {{blog_title}}. Generated by Template System.</p>
-        </div>
-    </footer>
-    
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-        // Load posts from API
-        async function loadPosts() {
-            try {
-                const response = await fetch('/api/posts');
-                const data = await response.json();
-                
-                if (data.success && data.posts) {
-                    const postsContainer = document.getElementById('posts');
-                    const posts = data.posts;
-                    
-                    if (posts.length === 0) {
-                        postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>';
-                        return;
-                    }
-                    
-                    postsContainer.innerHTML = posts.map(post => `
-                        <div class="col-md-6 mb-4">
-                            <div class="card">
-                                <div class="card-body">
-                                    <h5 class="card-title">\${post.title}</h5>
-                                    <p class="card-text">\${(post.content || '').substring(0, 150)}...</p>
-                                    <div class="d-flex justify-content-between align-items-center">
-                                        <small class="text-muted">\${post.category || 'Uncategorized'} • \${post.date}</small>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    `).join('');
-                } else {
-                    document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Error loading posts</p></div>';
-                }
-            } catch (error) {
-                console.error('Error loading posts:', error);
-                document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>';
-            }
-        }
-        
-        // Initialize
-        loadPosts();
-    </script>
-</body>
-</html>"""
-    
-    # Replace template variables
-    template = template.replace('{{blog_title}}', config['blog_title'])
-    template = template.replace('{{blog_description}}', config['blog_description'])
-    template = template.replace('{{blog_keywords}}', config['blog_keywords'])
-    template = template.replace('{{site_title}}', config['blog_title'])
-    template = template.replace('{{site_description}}', config['blog_description'])
-    template = template.replace('{{site_keywords}}', config['blog_keywords'])
-    template = template.replace('{{current_year}}', str(datetime.now().year))
-    
-    # Replace color scheme
-    template = template.replace('--primary-color: #2563eb', f'--primary-color: {colors["primary"]}')
-    template = template.replace('--secondary-color: #1d4ed8', f'--secondary-color: {colors["secondary"]}')
-    template = template.replace('#1d4ed8', colors["secondary"])
-    
-    return template
-
-def generate_deployment_guide():
-    """Generate deployment guide"""
-    return """
-    ## 🚀 Deployment Guide
-    
-    ### Prerequisites
-    - Web server (Apache/Nginx)
-    - Domain name
-    - SSL certificate
-    
-    ### Steps
-    1. **Upload Files**
-       - Upload HTML template to your web server
-       - Ensure proper file permissions
-    
-    2. **Configure Environment**
-       - Set up environment variables
-       - Configure Google Sheets API
-       - Set up Cloudflare if using
-    
-    3. **Test Deployment**
-       - Check all links work
-       - Test Google Sheets connection
-       - Verify responsive design
-    
-    4. **Go Live**
-       - Point domain to your server
-       - Enable SSL
-       - Monitor for errors
-    
-    ### Environment Variables
-    ```bash
-    GOOGLE_SHEETS_API_KEY=your_api_key_here
-    SPREADSHEET_ID=your_spreadsheet_id
-    SHEET_NAME=WEBSITE
-    ```
-    
-    ### Troubleshooting
-    - Check API key permissions
-    - Verify spreadsheet sharing settings
-    - Test network connectivity
-    """
-
-def preview_generated_template():
-    """Preview template yang sudah di-generate"""
-    try:
-        if not os.path.exists('generated_template.html'):
-            st.error("❌ Template tidak ditemukan! Generate template terlebih dahulu")
-            return
-            
-        with open('generated_template.html', 'r', encoding='utf-8') as f:
-            template_html = f.read()
-            
-        # Show template info
-        st.markdown("### 👁️ Template Preview")
-        st.info(f"Template size: {len(template_html)} karakter")
-        
-        # Show template config if available
-        if os.path.exists('generated_template_config.json'):
-            with open('generated_template_config.json', 'r') as f:
-                template_config = json.load(f)
-            st.json(template_config)
-        
-        # Show HTML code preview (first 1000 chars)
-        st.markdown("#### HTML Code Preview:")
-        st.code(template_html[:1000] + ("..." if len(template_html) > 1000 else ""), language="html")
-        
-        # Show rendered HTML in expandable section
-        with st.expander("🌐 Rendered HTML Preview", expanded=False):
-            # Replace template variables for preview
-            preview_html = template_html.replace('{{blog_title}}', 'Preview Blog')
-            preview_html = preview_html.replace('{{blog_description}}', 'This is a preview of your generated template')
-            st.components.v1.html(preview_html, height=600, scrolling=True)
-            
-    except Exception as e:
-        st.error(f"❌ Error previewing template: {str(e)}")
-
-def deploy_template_only():
-    """Deploy hanya template yang sudah di-generate tanpa konfigurasi tambahan"""
-    try:
-        # Check API credentials
-        cf_api_token = st.session_state.get('cf_api_token')
-        cf_account_id = st.session_state.get('cf_account_id')
-        
-        if not cf_api_token or not cf_account_id:
-            st.error("❌ Cloudflare API Token dan Account ID diperlukan!")
-            st.info("💡 Isi konfigurasi Cloudflare di tab Configuration terlebih dahulu")
-            return
-        
-        # Read template dan config
-        if not os.path.exists('generated_template.html'):
-            st.error("❌ Template tidak ditemukan! Generate template terlebih dahulu")
-            return
-            
-        with open('generated_template.html', 'r', encoding='utf-8') as f:
-            template_html = f.read()
-            
-        template_config = {}
-        if os.path.exists('generated_template_config.json'):
-            with open('generated_template_config.json', 'r') as f:
-                template_config = json.load(f)
-        
-        st.info(f"📄 Template siap deploy: {len(template_html)} karakter")
-        st.info(f"🎨 Template: {template_config.get('type', 'Unknown')} - {template_config.get('color_scheme', 'Default')}")
-        
-        # Generate worker name
-        import random
-        import string
-        worker_name = f"blog-{''.join(random.choices(string.ascii_lowercase + string.digits, k=8))}"
-        
-        # Create worker config for template
-        worker_config = {
-            'blogTitle': template_config.get('blog_title', 'My Blog'),
-            'blogDescription': template_config.get('blog_description', 'Blog powered by Google Sheets'),
-            'blogKeywords': template_config.get('blog_keywords', 'blog, google sheets'),
-            'sheetsUrl': 'https://docs.google.com/spreadsheets/d/14K69q8SMd3pCAROB1YQMDrmuw8y6QphxAslF_y-3NrM/export?format=csv&gid=0',
-            'postsPerPage': template_config.get('posts_per_page', 6)
-        }
-        
-        # Generate modern worker script
-        worker_script = generate_modern_worker_script(worker_config, template_html)
-        
-        with st.spinner('🚀 Deploying template to Cloudflare Workers...'):
-            # Deploy to Cloudflare
-            deploy_url = f"https://api.cloudflare.com/client/v4/accounts/{cf_account_id}/workers/scripts/{worker_name}"
-            headers = {
-                'Authorization': f'Bearer {cf_api_token}',
-                'Content-Type': 'application/javascript'
-            }
-            
-            import requests
-            response = requests.put(deploy_url, headers=headers, data=worker_script)
-            
-            if response.status_code in [200, 201]:
-                st.success("✅ Template berhasil di-deploy!")
-                st.balloons()
-                
-                # Show deployment info
-                st.markdown("### 🎉 Deployment Berhasil!")
-                st.info(f"**Worker Name:** {worker_name}")
-                st.info(f"**URL:** https://{worker_name}.{cf_account_id}.workers.dev")
-                st.info(f"**Template:** {template_config.get('type', 'Custom')} - {template_config.get('color_scheme', 'Default')}")
-                
-                # Create clickable link
-                worker_url = f"https://{worker_name}.{cf_account_id}.workers.dev"
-                st.markdown(f"### 🔗 [Buka Blog Anda]({worker_url})")
-                
-                # Save deployment info
-                deployment_info = {
-                    'worker_name': worker_name,
-                    'url': worker_url,
-                    'template_config': template_config,
-                    'deployed_at': str(datetime.now()),
-                    'deployment_type': 'template_only'
-                }
-                
-                st.session_state['last_deployment'] = deployment_info
-                
-            else:
-                st.error(f"❌ Deployment gagal: {response.status_code}")
-                st.error(f"Response: {response.text}")
-                
-    except Exception as e:
-        st.error(f"❌ Error during deployment: {str(e)}")
-
-def generate_modern_worker_script(config, custom_html_template=None):
-    """Generate modern CF Workers script using template"""
-    # Read the modern template
-    with open('modern_template.js', 'r') as f:
-        worker_script = f.read()
-    
-    # Replace configuration placeholders
-    replacements = {
-        '{{SPREADSHEET_ID}}': config.get('spreadsheetId', '14K69q8SMd3pCAROB1YQMDrmuw8y6QphxAslF_y-3NrM'),
-        '{{SHEET_NAME}}': config.get('sheetName', 'WEBSITE'),
-        '{{BLOG_TITLE}}': config.get('blogTitle', 'My Blog'),
-        '{{BLOG_DESCRIPTION}}': config.get('blogDescription', 'Blog powered by Google Sheets'),
-        '{{PRIMARY_COLOR}}': config.get('primaryColor', '#2563eb'),
-        '{{SECONDARY_COLOR}}': config.get('secondaryColor', '#1d4ed8')
-    }
-    
-    for placeholder, value in replacements.items():
-        worker_script = worker_script.replace(placeholder, value)
-    
-    return worker_script
-
-def generate_cloudflare_worker_script(config, custom_html_template=None):
-    """Generate Cloudflare Workers script with direct Google Sheets connection"""
-    spreadsheet_id = config.get('spreadsheetId', '')
-    sheet_name = config.get('sheetName', 'Sheet1')
-    blog_title = config.get('blogTitle', 'Blog')
-    blog_description = config.get('blogDescription', 'Blog powered by Google Sheets')
-    blog_keywords = config.get('blogKeywords', 'blog, google sheets')
-    
-    # Prepare custom template for JavaScript (use JSON.stringify for safer escaping)
-    custom_template_js = "null"
-    if custom_html_template:
-        import json
-        # Use JSON.stringify equivalent in Python for safe escaping
-        escaped_template = json.dumps(custom_html_template)
-        custom_template_js = escaped_template
-    
-    return f"""// Improved Cloudflare Workers Script
-// Following CF Workers best practices
-// Generated on: {datetime.now().isoformat()}
-// Spreadsheet ID: {spreadsheet_id}
-// Custom Template: {'Yes' if custom_html_template else 'No'}
-
-// Configuration
-const CONFIG = {{
-    SPREADSHEET_ID: '{spreadsheet_id}',
-    SHEET_NAME: '{sheet_name}',
-    BLOG_TITLE: '{blog_title}',
-    BLOG_DESCRIPTION: '{blog_description}',
-    CORS_HEADERS: {{
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type'
-    }}
-}}
-
-// Main event listener
-addEventListener('fetch', event => {{
-    event.respondWith(handleRequest(event.request))
-}})
-
-// Route handler
-async function handleRequest(request) {{
-    const url = new URL(request.url)
-    const path = url.pathname
-
-    // Handle CORS preflight
-    if (request.method === 'OPTIONS') {{
-        return handleCORS()
-    }}
-    
-    // Route handling with improved structure
-    switch (path) {{
-        case '/':
-            return serveHomePage()
-        case '/api/posts':
-            return handleAPIResponse(await getPosts())
-        case '/api/categories':
-            return handleAPIResponse(await getCategories())
-        case '/api/stats':
-            return handleAPIResponse(await getStats())
-        case '/health':
-            return handleAPIResponse({{ 
-                status: 'ok', 
-                timestamp: new Date().toISOString(),
-                config: CONFIG
-            }})
-        default:
-            return new Response('Not Found', {{ status: 404 }})
-    }}
-}}
-
-// CORS handler
-function handleCORS() {{
-    return new Response(null, {{
-        status: 200,
-        headers: CONFIG.CORS_HEADERS
-    }})
-}}
-
-// API response wrapper
-function handleAPIResponse(data) {{
-    return new Response(JSON.stringify(data), {{
-        headers: {{
-            'Content-Type': 'application/json',
-            ...CONFIG.CORS_HEADERS
-        }}
-    }})
-}}
-        return new Response(JSON.stringify({{ 
-            success: false, 
-            error: error.message 
-        }}), {{ 
-            status: 500,
-            headers: {{ 
-                'Content-Type': 'application/json',
-                ...corsHeaders 
-            }}
-        }})
-    }}
-}}
-
-// Configuration
-const SPREADSHEET_ID = '{spreadsheet_id}'
-const SHEET_NAME = '{sheet_name}'
-const BLOG_CONFIG = {{
-    site_title: '{blog_title}',
-    site_description: '{blog_description}',
-    site_keywords: '{blog_keywords}',
-    current_year: new Date().getFullYear()
-}}
-
-// Custom HTML Template (if provided)
-const CUSTOM_HTML_TEMPLATE = {custom_template_js}
-
-// Debug info
-console.log('Worker initialized');
-console.log('Custom template available:', CUSTOM_HTML_TEMPLATE !== null);
-if (CUSTOM_HTML_TEMPLATE) {{
-    console.log('Custom template length:', CUSTOM_HTML_TEMPLATE.length);
-}}
-
-// Direct Google Sheets data fetching (no API key required)
-async function getGoogleSheetsData() {{
-    try {{
-        const csvUrl = `https://docs.google.com/spreadsheets/d/${{SPREADSHEET_ID}}/export?format=csv&gid=0`
-        const response = await fetch(csvUrl)
-        
-        if (!response.ok) {{
-            throw new Error(`HTTP error! status: ${{response.status}}`)
-        }}
-        
-        const csvText = await response.text()
-        return csvToJson(csvText)
-    }} catch (error) {{
-        console.error('Error fetching Google Sheets data:', error)
-        return getDemoData()
-    }}
-}}
-
-// Convert CSV to JSON
-function csvToJson(csvText) {{
-    const lines = csvText.split('\\n')
-    const headers = lines[0].split(',').map(header => header.trim().replace(/"/g, ''))
-    const data = []
-
-    for (let i = 1; i < lines.length; i++) {{
-        const values = parseCSVLine(lines[i])
-        if (values.length === headers.length) {{
-            const obj = {{}}
-            headers.forEach((header, index) => {{
-                obj[header.toLowerCase()] = values[index] || ''
-            }})
-            
-            // Ensure required fields
-            if (!obj.id) obj.id = i
-            if (!obj.slug && obj.title) {{
-                obj.slug = obj.title.toLowerCase()
-                    .replace(/[^a-z0-9\\s-]/g, '')
-                    .replace(/\\s+/g, '-')
-                    .trim()
-            }}
-            
-            data.push(obj)
-        }}
-    }}
-
-    return data
-}}
-
-// Parse CSV line with proper comma handling
-function parseCSVLine(line) {{
-    const values = []
-    let current = ''
-    let inQuotes = false
-    
-    for (let i = 0; i < line.length; i++) {{
-        const char = line[i]
-        
-        if (char === '"') {{
-            inQuotes = !inQuotes
-        }} else if (char === ',' && !inQuotes) {{
-            values.push(current.trim().replace(/"/g, ''))
-            current = ''
-        }} else {{
-            current += char
-        }}
-    }}
-    
-    values.push(current.trim().replace(/"/g, ''))
-    return values
-}}
-
-// Demo data fallback
-function getDemoData() {{
-    return [
-        {{
-            id: 1,
-            title: 'Welcome to Your Blog',
-            slug: 'welcome-to-your-blog',
-            content: 'This is your first blog post powered by Google Sheets and Cloudflare Workers. Edit your Google Sheets to add more content!',
-            category: 'Welcome',
-            tags: 'blog, welcome, cloudflare, google sheets',
-            author: 'Admin',
-            date: new Date().toISOString().split('T')[0],
-            status: 'published'
-        }}
-    ]
-}}
-
-// Serve blog home page
-async function serveBlogHome() {{
-    // Use custom HTML template if provided, otherwise use default
-    let html;
-    
-    if (CUSTOM_HTML_TEMPLATE && CUSTOM_HTML_TEMPLATE !== null && CUSTOM_HTML_TEMPLATE !== 'null') {{
-        // Use the custom generated template
-        console.log('Using custom template, length:', CUSTOM_HTML_TEMPLATE.length);
-        html = CUSTOM_HTML_TEMPLATE;
-        
-        // Replace dynamic placeholders in custom template
-        html = html.replace(/\$\{{BLOG_CONFIG\.site_title\}}/g, BLOG_CONFIG.site_title);
-        html = html.replace(/\$\{{BLOG_CONFIG\.site_description\}}/g, BLOG_CONFIG.site_description);
-        html = html.replace(/\$\{{BLOG_CONFIG\.site_keywords\}}/g, BLOG_CONFIG.site_keywords);
-        html = html.replace(/\$\{{BLOG_CONFIG\.current_year\}}/g, BLOG_CONFIG.current_year);
-        html = html.replace(/\$\{{SPREADSHEET_ID\}}/g, SPREADSHEET_ID);
-        
-        // Add API integration script if not already present
-        if (!html.includes('loadPosts()')) {{
-            html = html.replace('</body>', `
-                <script>
-                // Load posts from API
-                async function loadPosts() {{
-                    try {{
-                        const response = await fetch('/api/posts');
-                        const data = await response.json();
-                        
-                        if (data.success && data.posts) {{
-                            const postsContainer = document.getElementById('posts');
-                            if (!postsContainer) return;
-                            
-                            const posts = data.posts;
-                            
-                            if (posts.length === 0) {{
-                                postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>';
-                                return;
-                            }}
-                            
-                            postsContainer.innerHTML = posts.map(post => \`
-                                <div class="col-md-6 mb-4">
-                                    <div class="card">
-                                        <div class="card-body">
-                                            <h5 class="card-title">\${{post.title}}</h5>
-                                            <p class="card-text">\${{(post.content || '').substring(0, 150)}}...</p>
-                                            <div class="d-flex justify-content-between align-items-center">
-                                                <small class="text-muted">\${{post.category || 'Uncategorized'}} • \${{post.date}}</small>
-                                            </div>
-                                        </div>
-                                    </div>
-                                </div>
-                            \`).join('');
-                        }}
-                    }} catch (error) {{
-                        console.error('Error loading posts:', error);
-                        const postsContainer = document.getElementById('posts');
-                        if (postsContainer) {{
-                            postsContainer.innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>';
-                        }}
-                    }}
-                }}
-                
-                // Load stats
-                async function loadStats() {{
-                    try {{
-                        const response = await fetch('/api/stats');
-                        const data = await response.json();
-                        
-                        if (data.success) {{
-                            const statsContainer = document.getElementById('stats');
-                            if (statsContainer) {{
-                                const stats = data.stats;
-                                statsContainer.innerHTML = \`
-                                    <p><i class="fas fa-file-alt me-2"></i>Posts: \${{stats.totalPosts || 0}}</p>
-                                    <p><i class="fas fa-folder me-2"></i>Categories: \${{stats.totalCategories || 0}}</p>
-                                    <p><i class="fas fa-tags me-2"></i>Tags: \${{stats.totalTags || 0}}</p>
-                                \`;
-                            }}
-                        }}
-                    }} catch (error) {{
-                        console.error('Error loading stats:', error);
-                    }}
-                }}
-                
-                // Initialize
-                document.addEventListener('DOMContentLoaded', function() {{
-                    loadPosts();
-                    loadStats();
-                }});
-                </script>
-            </body>`);
-        }}
-    }} else {{
-        // Use default template
-        html = `
-    <!DOCTYPE html>
-    <html lang="id">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>${{BLOG_CONFIG.site_title}}</title>
-        <meta name="description" content="${{BLOG_CONFIG.site_description}}">
-        <meta name="keywords" content="${{BLOG_CONFIG.site_keywords}}">
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-        <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }}
-            .navbar {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); }}
-            .hero {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 4rem 0; }}
-            .card {{ border: none; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.3s; }}
-            .card:hover {{ transform: translateY(-5px); }}
-            .btn-primary {{ background: #2563eb; border-color: #2563eb; }}
-            .btn-primary:hover {{ background: #1d4ed8; border-color: #1d4ed8; }}
-            .loading {{ text-align: center; padding: 2rem; }}
-        </style>
-    </head>
-    <body>
-        <nav class="navbar navbar-expand-lg navbar-dark">
-            <div class="container">
-                <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>${{BLOG_CONFIG.site_title}}</a>
-                <div class="navbar-nav ms-auto">
-                    <a class="nav-link" href="/">Home</a>
-                    <a class="nav-link" href="/api/posts">API</a>
-                    <a class="nav-link" href="/health">Health</a>
-                </div>
-            </div>
-        </nav>
-        
-        <div class="hero text-center">
-            <div class="container">
-                <h1 class="display-4">${{BLOG_CONFIG.site_title}}</h1>
-                <p class="lead">${{BLOG_CONFIG.site_description}}</p>
-                <p><small>Powered by Google Sheets & Cloudflare Workers</small></p>
-            </div>
-        </div>
-        
-        <div class="container mt-5">
-            <div class="row">
-                <div class="col-lg-8">
-                    <div id="posts" class="row">
-                        <div class="col-12 loading">
-                            <i class="fas fa-spinner fa-spin fa-2x"></i>
-                            <p>Loading posts...</p>
-                        </div>
-                    </div>
-                </div>
-                <div class="col-lg-4">
-                    <div class="card">
-                        <div class="card-body">
-                            <h5><i class="fas fa-info-circle me-2"></i>About This Blog</h5>
-                            <p>${{BLOG_CONFIG.site_description}}</p>
-                            <p><small><strong>Data Source:</strong> Google Sheets</small></p>
-                            <p><small><strong>Spreadsheet ID:</strong> ${{SPREADSHEET_ID}}</small></p>
-                            <p><small><strong>Last Updated:</strong> <span id="lastUpdated">Loading...</span></small></p>
-                        </div>
-                    </div>
-                    
-                    <div class="card mt-3">
-                        <div class="card-body">
-                            <h5><i class="fas fa-chart-bar me-2"></i>Statistics</h5>
-                            <div id="stats">
-                                <p><i class="fas fa-spinner fa-spin"></i> Loading stats...</p>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <footer class="bg-dark text-white mt-5 py-4">
-            <div class="container text-center">
-                <p>&copy; ${{BLOG_CONFIG.current_year}} ${{BLOG_CONFIG.site_title}}. Powered by Cloudflare Workers & Google Sheets.</p>
-                <p><small>Generated by Blog Template System</small></p>
-            </div>
-        </footer>
-        
-        <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
-        <script>
-            // Update last updated time
-            document.getElementById('lastUpdated').textContent = new Date().toLocaleString('id-ID');
-            
-            // Load posts
-            async function loadPosts() {{
-                try {{
-                    const response = await fetch('/api/posts')
-                    const data = await response.json()
-                    
-                    if (data.success) {{
-                        const posts = data.posts || []
-                        const postsContainer = document.getElementById('posts')
-                        
-                        if (posts.length === 0) {{
-                            postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>'
-                            return
-                        }}
-                        
-                        postsContainer.innerHTML = posts.map(post => `
-                            <div class="col-md-6 mb-4">
-                                <div class="card">
-                                    <div class="card-body">
-                                        <h5 class="card-title">${{post.title}}</h5>
-                                        <p class="card-text">${{(post.content || '').substring(0, 150)}}...</p>
-                                        <div class="d-flex justify-content-between align-items-center">
-                                            <small class="text-muted">${{post.category || 'Uncategorized'}} • ${{post.date}}</small>
-                                            <a href="/post/${{post.slug}}" class="btn btn-primary btn-sm">Read More</a>
-                                        </div>
-                                    </div>
-                                </div>
-                            </div>
-                        `).join('')
-                    }} else {{
-                        document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Error loading posts</p></div>'
-                    }}
-                }} catch (error) {{
-                    console.error('Error loading posts:', error)
-                    document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>'
-                }}
-            }}
-            
-            // Load statistics
-            async function loadStats() {{
-                try {{
-                    const response = await fetch('/api/stats')
-                    const data = await response.json()
-                    
-                    if (data.success) {{
-                        const stats = data.stats
-                        document.getElementById('stats').innerHTML = `
-                            <p><i class="fas fa-file-alt me-2"></i>Posts: ${{stats.totalPosts}}</p>
-                            <p><i class="fas fa-folder me-2"></i>Categories: ${{stats.totalCategories}}</p>
-                            <p><i class="fas fa-tags me-2"></i>Tags: ${{stats.totalTags}}</p>
-                        `
-                    }}
-                }} catch (error) {{
-                    console.error('Error loading stats:', error)
-                    document.getElementById('stats').innerHTML = '<p>Error loading statistics</p>'
-                }}
-            }}
-            
-            // Initialize
-            loadPosts()
-            loadStats()
-        </script>
-    </body>
-    </html>
-    `
-    
-    return new Response(html, {{
-        headers: {{ 'Content-Type': 'text/html' }}
-    }})
-}}
-
-// API endpoints
-async function getPosts() {{
-    const posts = await getGoogleSheetsData()
-    const publishedPosts = posts.filter(post => post.status === 'published' || !post.status)
-    
-    return new Response(JSON.stringify({{
-        success: true,
-        posts: publishedPosts,
-        total: publishedPosts.length
-    }}), {{
-        headers: {{ 'Content-Type': 'application/json' }}
-    }})
-}}
-
-async function getCategories() {{
-    const posts = await getGoogleSheetsData()
-    const categories = {{}}
-    
-    posts.forEach(post => {{
-        const category = post.category || 'Uncategorized'
-        categories[category] = (categories[category] || 0) + 1
-    }})
-    
-    return new Response(JSON.stringify({{
-        success: true,
-        categories: categories
-    }}), {{
-        headers: {{ 'Content-Type': 'application/json' }}
-    }})
-}}
-
-async function getTags() {{
-    const posts = await getGoogleSheetsData()
-    const tags = {{}}
-    
-    posts.forEach(post => {{
-        const postTags = post.tags ? post.tags.split(',').map(tag => tag.trim()) : []
-        postTags.forEach(tag => {{
-            if (tag) tags[tag] = (tags[tag] || 0) + 1
-        }})
-    }})
-    
-    return new Response(JSON.stringify({{
-        success: true,
-        tags: tags
-    }}), {{
-        headers: {{ 'Content-Type': 'application/json' }}
-    }})
-}}
-
-async function getStats() {{
-    const posts = await getGoogleSheetsData()
-    const categories = new Set(posts.map(post => post.category || 'Uncategorized'))
-    const tags = new Set()
-    
-    posts.forEach(post => {{
-        const postTags = post.tags ? post.tags.split(',').map(tag => tag.trim()) : []
-        postTags.forEach(tag => {{
-            if (tag) tags.add(tag)
-        }})
-    }})
-    
-    return new Response(JSON.stringify({{
-        success: true,
-        stats: {{
-            totalPosts: posts.length,
-            totalCategories: categories.size,
-            totalTags: tags.size,
-            publishedPosts: posts.filter(p => p.status === 'published' || !p.status).length
-        }}
-    }}), {{
-        headers: {{ 'Content-Type': 'application/json' }}
-    }})
-}}
-
-async function getPost(slug) {{
-    const posts = await getGoogleSheetsData()
-    const post = posts.find(p => p.slug === slug)
-    
-    if (!post) {{
-        return new Response('Post not found', {{ status: 404 }})
-    }}
-    
-    const html = `
-    <!DOCTYPE html>
-    <html lang="id">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>${{post.title}} - ${{BLOG_CONFIG.site_title}}</title>
-        <meta name="description" content="${{(post.content || '').substring(0, 160)}}">
-        <meta name="keywords" content="${{post.tags}}">
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-        <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-        <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }}
-            .navbar {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); }}
-            .hero {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 4rem 0; }}
-            .post-content {{ line-height: 1.8; font-size: 1.1rem; }}
-        </style>
-    </head>
-    <body>
-        <nav class="navbar navbar-expand-lg navbar-dark">
-            <div class="container">
-                <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>${{BLOG_CONFIG.site_title}}</a>
-                <div class="navbar-nav ms-auto">
-                    <a class="nav-link" href="/">Home</a>
-                </div>
-            </div>
-        </nav>
-        
-        <div class="hero text-center">
-            <div class="container">
-                <h1 class="display-4">${{post.title}}</h1>
-                <p class="lead">${{post.category || 'Uncategorized'}} • ${{post.date}} • ${{post.author || 'Admin'}}</p>
-            </div>
-        </div>
-        
-        <div class="container mt-5">
-            <div class="row">
-                <div class="col-lg-8 mx-auto">
-                    <div class="post-content">
-                        ${{(post.content || '').replace(/\\n/g, '<br>')}}
-                    </div>
-                    
-                    <div class="mt-4">
-                        <h6>Tags:</h6>
-                        ${{(post.tags || '').split(',').map(tag => `<span class="badge bg-primary me-1">${{tag.trim()}}</span>`).join('')}}
-                    </div>
-                    
-                    <div class="mt-4">
-                        <a href="/" class="btn btn-outline-primary">
-                            <i class="fas fa-arrow-left me-2"></i>Back to Blog
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <footer class="bg-dark text-white mt-5 py-4">
-            <div class="container text-center">
-                <p>&copy; ${{BLOG_CONFIG.current_year}} ${{BLOG_CONFIG.site_title}}. Powered by Cloudflare Workers.</p>
-            </div>
-        </footer>
-        
-        <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
-    </body>
-    </html>
-    `
-    
-    return new Response(html, {{
-        headers: {{ 'Content-Type': 'text/html' }}
-    }})
-}}
-
-async function getPostAPI(slug) {{
-    const posts = await getGoogleSheetsData()
-    const post = posts.find(p => p.slug === slug)
-    
-    if (!post) {{
-        return new Response(JSON.stringify({{
-            success: false,
-            message: 'Post not found'
-        }}), {{
-            status: 404,
-            headers: {{ 'Content-Type': 'application/json' }}
-        }})
-    }}
-    
-    return new Response(JSON.stringify({{
-        success: true,
-        post: post
-    }}), {{
-        headers: {{ 'Content-Type': 'application/json' }}
-    }})
-}}"""
-
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test skema blog: alias header, koersi tipe dan karantina baris
+"""
+
+from blog_schema import validate_rows
+from sheets_loader import parse_csv_rows
+
+
+def test_sample_sheet_is_valid():
+    """Semua baris sample-blog-data.csv lolos validasi dengan tipe yang benar"""
+    with open('Spreadsheet/sample-blog-data.csv', encoding='utf-8') as f:
+        result = validate_rows(parse_csv_rows(f.read()))
+    assert result.summary()['quarantined'] == 0
+    assert len(result.rows) == 10
+    first = result.rows[0]
+    assert first['tags'] == ['blog', 'google sheets', 'tutorial', 'web development']
+    assert first['date'] == '2025-01-18'
+    assert first['status'] == 'published'
+
+
+def test_aliases_defaults_and_quarantine():
+    """Alias dipetakan, default diisi, baris rusak dikarantina dengan alasan"""
+    rows = [
+        {'Judul': 'Halo Dunia', 'Isi': 'Konten', 'Tanggal': '2025/02/03', 'Status': ' Publish ', 'Tags': 'a, ,b'},
+        {'Judul': 'Tanpa Isi', 'Isi': '', 'Tanggal': '', 'Status': '', 'Tags': ''},
+        {'Judul': 'Tanggal Rusak', 'Isi': 'x', 'Tanggal': 'kemarin', 'Status': 'archived', 'Tags': ''},
+        {'Judul': 'Halo Dunia', 'Isi': 'Duplikat', 'Tanggal': '', 'Status': 'draft', 'Tags': ''},
+    ]
+    result = validate_rows(rows)
+    assert result.renamed['Judul'] == 'title' and result.renamed['Isi'] == 'content'
+
+    assert len(result.rows) == 1
+    post = result.rows[0]
+    assert post['slug'] == 'halo-dunia'
+    assert post['date'] == '2025-02-03'
+    assert post['status'] == 'published'
+    assert post['tags'] == ['a', 'b']
+    assert post['category'] == 'Uncategorized' and post['author'] == 'Admin'
+
+    reasons = {item['row']: item['reasons'] for item in result.quarantined}
+    assert reasons[3] == ['missing content']
+    assert set(reasons[4]) == {'invalid date', 'unknown status'}
+    assert reasons[5] == ['duplicate slug']
+
+
+def test_projected_columns_are_not_required():
+    """Kolom content yang tidak diambil (proyeksi) tidak membuat baris dikarantina"""
+    result = validate_rows([{'title': 'A', 'tags': 'x'}])
+    assert len(result.rows) == 1
+    assert result.missing_columns == ['content']
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test artefak build: sitemap (dan index di atas batas URL), robots.txt, RSS dan Atom
+"""
+
+import gzip
+import json
+import xml.etree.ElementTree as ET
+
+from build_artifacts import build_artifacts, worker_artifacts, write_artifacts
+
+SITE = {'title': 'Blog & Demo', 'description': 'Tes', 'base_url': 'https://blog.example.dev/'}
+POSTS = [
+    {'title': f'Post {i}', 'slug': f'post-{i}', 'content': 'Isi', 'date': f'2025-01-{i + 1:02d}', 'status': 'published', 'author': 'Admin'}
+    for i in range(25)
+] + [{'title': 'Draft', 'content': 'x', 'date': '2025-02-01', 'status': 'draft'}]
+NS = {'s': 'http://www.sitemaps.org/schemas/sitemap/0.9', 'a': 'http://www.w3.org/2005/Atom'}
+
+
+def test_sitemap_feeds_and_robots():
+    """lastmod dari kolom date, draft dilewati, feed terbatas dan XML valid"""
+    artifacts = build_artifacts(POSTS, SITE, feed_limit=10)
+    assert set(artifacts) == {'/sitemap.xml', '/robots.txt', '/rss.xml', '/atom.xml'}
+
+    urls = ET.fromstring(artifacts['/sitemap.xml']['body']).findall('s:url', NS)
+    assert len(urls) == 26
+    assert urls[1].find('s:loc', NS).text == 'https://blog.example.dev/post/post-0'
+    assert urls[1].find('s:lastmod', NS).text == '2025-01-01'
+    assert urls[0].find('s:lastmod', NS).text == '2025-01-25'
+
+    items = ET.fromstring(artifacts['/rss.xml']['body']).findall('channel/item')
+    assert len(items) == 10 and items[0].find('title').text == 'Post 24'
+    atom = ET.fromstring(artifacts['/atom.xml']['body'])
+    assert atom.find('a:updated', NS).text == '2025-01-25T00:00:00+00:00'
+    assert b'Sitemap: https://blog.example.dev/sitemap.xml' in artifacts['/robots.txt']['body']
+
+    assert gzip.decompress(artifacts['/rss.xml']['gzip']) == artifacts['/rss.xml']['body']
+    assert 'gzip' not in artifacts['/robots.txt']
+    assert build_artifacts(POSTS, SITE, feed_limit=10)['/rss.xml']['hash'] == artifacts['/rss.xml']['hash']
+
+
+def test_sitemap_index_past_url_limit(tmp_path):
+    """Lebih dari batas URL: sitemap.xml jadi index ke sitemap-N.xml"""
+    artifacts = build_artifacts(POSTS, SITE, max_urls=10)
+    assert {'/sitemap-1.xml', '/sitemap-2.xml', '/sitemap-3.xml'} <= set(artifacts)
+    index = ET.fromstring(artifacts['/sitemap.xml']['body'])
+    assert [node.text for node in index.findall('s:sitemap/s:loc', NS)][-1] == 'https://blog.example.dev/sitemap-3.xml'
+
+    manifest = write_artifacts(artifacts, directory=str(tmp_path))
+    assert (tmp_path / 'sitemap-2.xml.gz').exists()
+    assert json.loads((tmp_path / 'artifacts.json').read_text())['/rss.xml']['hash'] == manifest['/rss.xml']['hash']
+
+    served = worker_artifacts(artifacts)['/sitemap.xml']
+    assert served['etag'] == f'"{artifacts["/sitemap.xml"]["hash"]}"'
+    assert served['lastModified'] == 'Sat, 25 Jan 2025 00:00:00 GMT'
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test change detector: version token, row diff dan feed HTTP/SSE
+"""
+
+import json
+import threading
+import urllib.request
+
+from change_detector import VERSION_WATCH_CLIENT_JS, ChangeDetector, diff_rows, serve_change_feed, snapshot_version
+from site_pipeline import generate_html_template, template_config_from
+
+
+def make_source(state):
+    return lambda: (True, state['rows'], "ok")
+
+
+def test_version_changes_only_with_data():
+    """Versi sama untuk data sama, berubah kalau data berubah"""
+    rows = [{'id': '1', 'title': 'A'}]
+    assert snapshot_version(rows) == snapshot_version([dict(rows[0])])
+    assert snapshot_version(rows) != snapshot_version([{'id': '1', 'title': 'B'}])
+
+
+def test_diff_rows_by_id():
+    """Diff per baris: added, changed, removed"""
+    old = [{'id': '1', 'title': 'A'}, {'id': '2', 'title': 'B'}]
+    new = [{'id': '1', 'title': 'A2'}, {'id': '3', 'title': 'C'}]
+    diff = diff_rows(old, new)
+    assert diff['added'] == [{'id': '3', 'title': 'C'}]
+    assert diff['changed'] == [{'id': '1', 'title': 'A2'}]
+    assert diff['removed'] == ['id:2']
+
+
+def test_poll_once_publishes_only_real_changes():
+    """Poll tanpa perubahan tidak mengirim event; fetch gagal mempertahankan snapshot"""
+    state = {'rows': [{'id': '1', 'title': 'A'}]}
+    detector = ChangeDetector({'WEBSITE': make_source(state)}, interval=3600)
+    subscriber = detector.subscribe()
+
+    assert 'WEBSITE' in detector.poll_once()
+    first_version = detector.version
+    assert detector.poll_once() == {}
+    assert subscriber.qsize() == 1
+
+    detector.sources['WEBSITE'] = lambda: (False, [], "HTTP 429")
+    assert detector.poll_once() == {}
+    assert detector.version == first_version
+    assert detector.status()['errors'] == {'WEBSITE': "HTTP 429"}
+
+
+def test_feed_serves_version_and_sse_diff():
+    """/api/version kecil dan /api/changes mengirim diff lewat SSE"""
+    state = {'rows': [{'id': '1', 'title': 'A'}]}
+    detector = ChangeDetector({'WEBSITE': make_source(state)}, interval=3600)
+    detector.poll_once()
+    server = serve_change_feed(detector, host='127.0.0.1', port=0)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{base_url}/api/version") as response:
+            assert json.load(response)['version'] == detector.version
+
+        stream = urllib.request.urlopen(f"{base_url}/api/changes", timeout=5)
+        assert stream.readline().startswith(b"event: version")
+        stream.readline()
+        stream.readline()
+
+        state['rows'] = state['rows'] + [{'id': '2', 'title': 'B'}]
+        threading.Thread(target=detector.poll_once).start()
+        assert stream.readline() == b"event: change\n"
+        event = json.loads(stream.readline()[len(b"data: "):])
+        assert event['changes']['WEBSITE']['added'] == [{'id': '2', 'title': 'B'}]
+        stream.close()
+    finally:
+        server.shutdown()
+
+
+def test_blog_template_gets_the_shared_watch_client():
+    """blog-template.html tidak punya salinan watchDataVersion sendiri; snippet disisipkan saat render"""
+    html = generate_html_template(template_config_from({}))
+    assert '{{VERSION_WATCH_CLIENT}}' not in html
+    assert html.count('function watchDataVersion(') == 1
+    assert VERSION_WATCH_CLIENT_JS in html
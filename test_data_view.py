@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test tampilan data: filter, paging dan pemotongan teks di sisi server
+"""
+
+import pandas as pd
+
+from data_view import column_stats, filter_rows, page_count, page_window
+
+
+def make_frame(rows=1000):
+    return pd.DataFrame({
+        'title': [f"Post {i}" for i in range(rows)],
+        'category': ['Tech' if i % 2 else 'News' for i in range(rows)],
+        'content': ['x' * 500] * rows,
+    })
+
+
+def test_filter_and_page_window():
+    """Hanya jendela halaman yang dikirim, teks panjang dipotong"""
+    df = make_frame()
+    positions = filter_rows(df, 'news', 'category')
+    assert len(positions) == 500
+    assert page_count(len(positions), 100) == 5
+
+    window = page_window(df, positions, 2, 100, max_chars=50)
+    assert len(window) == 100
+    assert window['title'].iloc[0] == "Post 200"
+    assert window['content'].str.len().max() == 50
+    assert df['content'].str.len().max() == 500
+
+    assert len(filter_rows(df, 'POST 99')) == 11
+    assert len(filter_rows(df, '')) == 1000
+
+
+def test_column_stats():
+    """Statistik kolom: terisi, kosong, unik, panjang maksimum"""
+    df = pd.DataFrame({'title': ['a', 'bb', ''], 'tags': [None, 'x', 'x']})
+    stats = column_stats(df).set_index('column')
+    assert stats.loc['title', 'empty'] == 1
+    assert stats.loc['tags', 'filled'] == 2
+    assert stats.loc['tags', 'unique'] == 1
+    assert stats.loc['title', 'max_length'] == 2
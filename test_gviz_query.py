@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Test gviz query pushdown: teks query, query_sheet terhadap stand-in lokal dan list window di worker
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from gviz_query import (
+    FixtureGVizSession,
+    build_query,
+    gviz_literal,
+    list_view_query,
+    query_sheet,
+    serve_gviz_mock,
+)
+from new_worker_template import generate_improved_worker_script
+from site_pipeline import load_validated_sheet
+from worker_generators import generate_cloudflare_worker_script, generate_modern_worker_script
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), 'Spreadsheet', 'sample-blog-data.csv')
+node = shutil.which('node')
+
+
+def make_session():
+    session = FixtureGVizSession.from_csv({'WEBSITE': SAMPLE_CSV})
+    grid = session.grids['WEBSITE']
+    status = grid[0].index('status')
+    grid[2][status] = 'draft'
+    grid[4][status] = ''
+    return session
+
+
+def test_query_text_uses_column_letters():
+    """Nama kolom dipetakan ke huruf, literal dikutip, != juga meloloskan sel kosong"""
+    columns = ['id', 'Title', 'content', 'status', 'date']
+    query, selected = build_query(columns, select=['title', 'missing', 'date'], where=[('status', '!=', 'draft'), ('title', '!=', '')],
+                                  order_by=[('date', 'desc')], limit=6, offset=12)
+    assert selected == ['title', 'date']
+    assert query == "select B, E where (D <> 'draft' or D is null) and B <> '' order by E desc limit 6 offset 12"
+    assert build_query(columns, where=[[('status', '=', 'published'), ('status', 'is null', None)]])[0] == \
+        "select A, B, C, D, E where (D = 'published' or D is null)"
+    assert gviz_literal("it's") == '"it\'s"'
+    with pytest.raises(ValueError):
+        gviz_literal('both \' and "')
+    with pytest.raises(ValueError):
+        build_query(columns, where={'author': 'Admin'})
+
+
+def test_list_view_is_filtered_and_paged_by_google():
+    """Draft dan kolom content tidak ikut di-download, hanya window yang diminta"""
+    session = make_session()
+    success, data, message = query_sheet('sheet-id', 'WEBSITE', session=session,
+                                         **list_view_query(limit=3, offset=1, order_by=[('date', 'asc')]))
+    assert success, message
+    assert [row['date'] for row in data] == ['2025-01-10', '2025-01-11', '2025-01-12']
+    assert 'content' not in data[0] and data[0]['title']
+    assert session.calls[0] == ('WEBSITE', 'select * limit 1')
+    window_bytes = session.bytes_sent
+
+    success, data, _ = query_sheet('sheet-id', 'WEBSITE', session=session, **list_view_query(columns=None))
+    assert success and len(data) == 9 and all(row['status'] != 'draft' for row in data)
+    assert 'content' in data[0]
+    assert window_bytes * 3 < session.bytes_sent - window_bytes
+
+
+def test_stale_header_is_detected():
+    """Header lama (kolom sudah bergeser) tidak menghasilkan data yang salah kolom"""
+    session = make_session()
+    columns = [column for column in session.grids['WEBSITE'][0] if column != 'id']
+    success, data, message = query_sheet('sheet-id', 'WEBSITE', select=['title'], columns=columns, session=session)
+    assert not success and data == [] and 'columns changed' in message
+
+
+def test_pipeline_pushes_list_views_down(monkeypatch):
+    """load_validated_sheet dengan columns/published_only memakai gviz query"""
+    session = make_session()
+    monkeypatch.setattr('gviz_query.requests', session)
+    success, result, message = load_validated_sheet({'data_source': 'CSV Export'}, 'sheet-id', 'WEBSITE',
+                                                    columns=['title', 'slug', 'excerpt', 'date'], published_only=True)
+    assert success, message
+    assert '(gviz query)' in message
+    assert len(result.rows) == 9 and not result.rows[0].get('content')
+    assert session.calls[-1][1] == "select B, C, L, H where (I <> 'draft' or I is null) and B <> ''"
+
+
+WINDOW_PROBE = """
+const fs = require('fs'), vm = require('vm')
+const origin = process.argv[3]
+let handler = null
+const fetched = []
+const context = {
+    console, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+    AbortController, setTimeout, clearTimeout,
+    addEventListener: (type, fn) => { handler = fn },
+    fetch: async (url, init) => {
+        fetched.push(decodeURIComponent(new URL(url).searchParams.get('tq') || url))
+        return fetch(url.replace('https://docs.google.com', origin), init)
+    }
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+;(async () => {
+    const out = []
+    for (const path of ['/api/posts?limit=2&offset=1', '/api/posts?limit=2&offset=1', '/api/posts?offset=7']) {
+        let response
+        handler({ request: new Request('https://blog.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        out.push(JSON.parse(await (await response).text()))
+    }
+    console.log(JSON.stringify({ out, fetched }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+@pytest.mark.parametrize('generate', [generate_improved_worker_script, generate_cloudflare_worker_script, generate_modern_worker_script])
+def test_worker_list_window_is_pushed_down(tmp_path, generate):
+    """Worker menjawab /api/posts?limit=&offset= dengan gviz query, tanpa download sheet penuh"""
+    server = serve_gviz_mock(make_session())
+    try:
+        (tmp_path / 'probe.js').write_text(WINDOW_PROBE, encoding='utf-8')
+        (tmp_path / 'worker.js').write_text(generate({'spreadsheetId': 'sheet-id', 'sheetName': 'WEBSITE'}), encoding='utf-8')
+        result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), f"http://127.0.0.1:{server.server_address[1]}"],
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        server.shutdown()
+
+    first, cached, last = report['out']
+    assert [post['title'] for post in first['posts']] == ['Desain Responsif untuk Blog Modern', 'Integrasi API dengan Google Sheets']
+    assert first['hasMore'] and first['limit'] == 2 and first['offset'] == 1
+    assert 'content' not in first['posts'][0] and first['posts'][0]['slug']
+    assert cached == first
+    assert len(last['posts']) == 2 and not last['hasMore']
+    # Header, then one query per window; the second request is cached and no full export is fetched
+    assert report['fetched'][0] == 'select * limit 1'
+    assert len(report['fetched']) == 3 and all(' limit ' in query for query in report['fetched'])
+    assert 'offset 1' in report['fetched'][1] and report['fetched'][2].endswith('limit 11 offset 7')
+
+
+EQUIVALENCE_PROBE = """
+const fs = require('fs'), vm = require('vm')
+const [workerPath, origin] = process.argv.slice(2)
+const source = fs.readFileSync(workerPath, 'utf8')
+
+function isolate() {
+    let handler = null
+    const context = {
+        console: { log() {}, error() {}, warn() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder,
+        ReadableStream, TransformStream, performance, AbortController, setTimeout, clearTimeout,
+        addEventListener: (type, fn) => { handler = fn },
+        // Queries go to the stand-in as they are, full exports become an unfiltered gviz request
+        fetch: async (url, init) => fetch(new URL(url).searchParams.has('tq')
+            ? url.replace('https://docs.google.com', origin)
+            : origin + '/spreadsheets/d/sheet-id/gviz/tq?tqx=out:csv&sheet=WEBSITE', init)
+    }
+    context.globalThis = context
+    vm.createContext(context)
+    vm.runInContext(source, context)
+    return async path => {
+        let response
+        await handler({ request: new Request('https://blog.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        return JSON.parse(await (await response).text())
+    }
+}
+
+;(async () => {
+    const pushed = isolate(), snapshot = isolate()
+    await snapshot('/api/posts')
+    const ids = payload => payload.posts.map(post => String(post.id))
+    console.log(JSON.stringify({
+        pushdown: ids(await pushed('/api/posts?limit=50')),
+        snapshot: ids(await snapshot('/api/posts?limit=50'))
+    }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+@pytest.mark.parametrize('generate', [generate_improved_worker_script, generate_cloudflare_worker_script, generate_modern_worker_script])
+def test_pushdown_matches_snapshot_filter_on_blank_cells(tmp_path, generate):
+    """Sel teks kosong adalah '' di gviz: window hasil query sama dengan filter snapshot untuk status/judul kosong"""
+    session = make_session()
+    grid = session.grids['WEBSITE']
+    title, status = grid[0].index('title'), grid[0].index('status')
+    grid[6][title] = ''
+    grid[8][title] = grid[8][status] = ''
+    server = serve_gviz_mock(session)
+    try:
+        (tmp_path / 'probe.js').write_text(EQUIVALENCE_PROBE, encoding='utf-8')
+        (tmp_path / 'worker.js').write_text(generate({'spreadsheetId': 'sheet-id', 'sheetName': 'WEBSITE'}), encoding='utf-8')
+        result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), f"http://127.0.0.1:{server.server_address[1]}"],
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        server.shutdown()
+
+    assert any(query.startswith('select ') and ' where ' in query for _, query in session.calls)
+    assert report['pushdown'] == report['snapshot']
+    assert '4' in report['snapshot'] and '2' not in report['snapshot']
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+@pytest.mark.parametrize('drop_id_column', [False, True])
+def test_window_ids_match_snapshot_without_sheet_ids(tmp_path, drop_id_column):
+    """Baris tanpa id diberi nomor baris sheet; window yang tidak bisa tahu nomor itu dipotong dari snapshot"""
+    session = make_session()
+    grid = session.grids['WEBSITE']
+    column = grid[0].index('id')
+    if drop_id_column:
+        for row in grid:
+            del row[column]
+    else:
+        grid[5][column] = grid[7][column] = ''
+    server = serve_gviz_mock(session)
+    try:
+        (tmp_path / 'probe.js').write_text(EQUIVALENCE_PROBE, encoding='utf-8')
+        (tmp_path / 'worker.js').write_text(generate_cloudflare_worker_script({'spreadsheetId': 'sheet-id', 'sheetName': 'WEBSITE'}),
+                                            encoding='utf-8')
+        result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), f"http://127.0.0.1:{server.server_address[1]}"],
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        server.shutdown()
+
+    assert report['pushdown'] == report['snapshot']
+    assert '5' in report['snapshot']
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test pipeline gambar: cache berbasis hash, varian AVIF/WebP, srcset dan lazy loading
+"""
+
+import os
+
+import pytest
+
+from image_pipeline import ImageCache, attach_images, build_images, responsive_img_html, variant_widths
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def make_fixture(path, size, color):
+    Image.new('RGB', size, color).save(path)
+    return str(path)
+
+
+def test_variants_built_once_and_skipped_on_rebuild(tmp_path):
+    """Varian dibuat di process pool, rebuild tanpa perubahan tidak encode ulang"""
+    wide = make_fixture(tmp_path / 'wide.png', (1600, 900), 'red')
+    small = make_fixture(tmp_path / 'small.jpg', (500, 500), 'blue')
+    posts = [{'title': 'A', 'featured_image': wide}, {'title': 'B', 'featured_image': small},
+             {'title': 'C', 'featured_image': wide}, {'title': 'D', 'featured_image': ''}]
+    cache = ImageCache(str(tmp_path / 'cache'))
+
+    images, errors = build_images(posts, cache, formats=['webp'], base_url='https://cdn.example.dev/img/', max_workers=2)
+    assert errors == {}
+    assert set(images) == {wide, small}
+    assert images[wide]['width'] == 1280 and images[wide]['height'] == 720
+    assert images[small]['srcset']['webp'].endswith('-500.webp 500w')
+    assert len(images[wide]['encoded']) == 4
+    with Image.open(os.path.join(cache.variants, images[wide]['files'][0])) as variant:
+        assert variant.size == (320, 180)
+
+    rebuilt, _ = build_images(posts, ImageCache(str(tmp_path / 'cache')), formats=['webp'])
+    assert all(info['encoded'] == [] for info in rebuilt.values())
+
+    # Changed content under the same path gets a new hash and new variants
+    make_fixture(tmp_path / 'small.jpg', (500, 500), 'green')
+    cache = ImageCache(str(tmp_path / 'cache'))
+    cache.fetch(small, refresh=True)
+    changed, _ = build_images(posts[1:2], cache, formats=['webp'])
+    assert changed[small]['encoded'] and changed[small]['files'] != images[small]['files']
+
+    missing, errors = build_images([{'featured_image': str(tmp_path / 'nope.png')}], cache, formats=['webp'])
+    assert missing == {} and len(errors) == 1
+
+
+def test_picture_markup_and_template_data(tmp_path):
+    """<picture> dengan srcset, sizes, width/height dan loading=lazy"""
+    path = make_fixture(tmp_path / 'hero.png', (800, 400), 'white')
+    images, _ = build_images([{'featured_image': path}], ImageCache(str(tmp_path / 'cache')), max_workers=1)
+
+    markup = responsive_img_html(path, images, alt='Judul "A"', css_class='featured')
+    assert markup.startswith('<picture><source type="image/')
+    assert 'width="800" height="400" loading="lazy"' in markup
+    assert 'alt="Judul &quot;A&quot;"' in markup
+    assert responsive_img_html('https://x.dev/a.jpg', images) == '<img src="https://x.dev/a.jpg" alt="" loading="lazy" decoding="async">'
+
+    post = attach_images([{'featured_image': path}], images)[0]
+    assert post['image']['srcset'] == images[path]['srcset']
+    assert variant_widths(2000) == [320, 640, 960, 1280]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test minifier JS untuk worker: komentar dan spasi hilang, literal dan ASI tetap utuh
+"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from js_minify import minify_js
+
+node = shutil.which('node')
+
+SOURCE = r"""
+// komentar baris
+const a = 1 /* komentar blok */ + 2
+let b = a
+++b
+const url = 'https://docs.google.com/x' // bukan komentar di dalam string
+const html = `<p class="x">  ${ a > 1 ? `nested ${ '}' }` : '/* tetap */' }  </p>`
+const re = /[/"'`]+\/\*x/g, half = a / 2 / 1
+function f(x) {
+    return /^\s+$/.test(x) ? x - -1 : x + +1
+}
+const ratio = 0.95 * 1e-3
+console.log(JSON.stringify([a, b, url, html, 'a"/*b*/'.replace(re, '_'), half, f(' '), f(2), ratio, 10 .toString()]))
+"""
+
+
+def test_comments_and_whitespace_removed_literals_kept():
+    """Komentar dan indentasi dibuang; isi string, template dan regex tidak disentuh"""
+    minified = minify_js(SOURCE)
+    assert 'komentar' not in minified and '\n\n' not in minified and '    ' not in minified
+    assert "'https://docs.google.com/x'" in minified
+    assert "`<p class=\"x\">  ${ a > 1 ? `nested ${ '}' }` : '/* tetap */' }  </p>`" in minified
+    assert '/[/"\'`]+\\/\\*x/g' in minified
+    # Baris baru dipertahankan di tempat ASI bergantung padanya
+    assert 'let b=a\n++b' in minified
+    assert 'x- -1:x+ +1' in minified and '10 .toString()' in minified
+    assert minify_js(minified) == minified
+    with pytest.raises(ValueError):
+        minify_js('const s = `tidak ditutup')
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_minified_source_behaves_the_same(tmp_path):
+    """Output node untuk sumber asli dan hasil minify sama persis"""
+    outputs = []
+    for name, text in (('original.js', SOURCE), ('minified.js', minify_js(SOURCE))):
+        (tmp_path / name).write_text(text, encoding='utf-8')
+        result = subprocess.run([node, str(tmp_path / name)], capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0, result.stderr
+        outputs.append(result.stdout)
+    assert outputs[0] == outputs[1] and outputs[0].strip()
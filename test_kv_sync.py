@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test KV data tier: key yang sudah dihitung, sync inkremental ke mock bulk API dan worker yang membaca KV
+"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from kv_sync import KVClient, kv_records, serve_kv_mock, sync_kv
+from new_worker_template import generate_improved_worker_script
+from site_pipeline import deploy_site, get_snapshot_store
+
+node = shutil.which('node')
+
+POSTS = [
+    {'title': 'Satu', 'content': 'Isi satu', 'category': 'Tech', 'tags': 'a, b', 'status': 'published'},
+    {'title': 'Dua', 'content': 'Isi dua', 'category': 'News', 'tags': 'b', 'status': 'published'},
+    {'title': 'Tiga', 'content': 'Isi tiga', 'category': 'Tech', 'tags': '', 'status': 'draft'},
+]
+
+
+def test_records_are_ready_made_api_payloads():
+    """Satu key per post dan per halaman, draft tidak ikut, payload sama dengan API worker"""
+    records = kv_records(POSTS, page_size=1, updated='2025-01-01T00:00:00')
+    assert set(records) == {'snapshot:posts', 'api:posts', 'api:posts:page:1', 'api:posts:page:2',
+                            'api:post:satu', 'api:post:dua', 'api:categories', 'api:stats', 'api:version'}
+    assert json.loads(records['api:posts'])['total'] == 2
+    assert json.loads(records['api:posts:page:2']) == {'success': True, 'posts': [dict(POSTS[1], slug='dua')],
+                                                       'total': 2, 'page': 2, 'pages': 2}
+    assert json.loads(records['api:stats'])['stats'] == {'totalPosts': 3, 'totalCategories': 2, 'totalTags': 2,
+                                                         'lastUpdated': '2025-01-01T00:00:00'}
+    assert {'name': 'Tech', 'count': 2} in json.loads(records['api:categories'])['categories']
+    assert records == kv_records(POSTS, page_size=1, updated='2025-01-01T00:00:00')
+
+
+def test_validated_rows_are_written_in_wire_format():
+    """Baris validate_rows (tags berupa list) ditulis sebagai string; totalTags dihitung dari tag asli"""
+    validated = [dict(post, tags=[tag.strip() for tag in post['tags'].split(',') if tag.strip()]) for post in POSTS]
+    records = kv_records(validated, page_size=1, updated='2025-01-01T00:00:00')
+    assert records == kv_records(POSTS, page_size=1, updated='2025-01-01T00:00:00')
+    assert json.loads(records['snapshot:posts'])[0]['tags'] == 'a, b'
+    assert json.loads(records['api:stats'])['stats']['totalTags'] == 2
+
+
+def test_sync_writes_only_changed_keys(tmp_path):
+    """Sync kedua tidak menulis apa-apa; post berubah hanya menulis key yang terdampak; key lama dihapus"""
+    server = serve_kv_mock()
+    try:
+        client = KVClient('acc', 'ns1', 'token', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        state_dir = str(tmp_path / 'state')
+        records = kv_records(POSTS, page_size=1, updated='2025-01-01')
+
+        success, data, _ = sync_kv(records, client, state_dir=state_dir, max_keys=3)
+        assert success and data['written'] == len(records) and data['chunks'] == 3
+        assert server.kv_store['ns1'] == records
+        assert server.kv_requests[-1] == ('put', 1)  # api:version paling akhir
+
+        success, data, _ = sync_kv(records, client, state_dir=state_dir, max_keys=3)
+        assert success and data == {'written': 0, 'deleted': 0, 'unchanged': len(records), 'chunks': 0, 'errors': []}
+
+        edited = [POSTS[0], dict(POSTS[1], content='Isi baru'), POSTS[2]]
+        server.kv_requests.clear()
+        records = kv_records(edited, page_size=1, updated='2025-01-02')
+        success, data, _ = sync_kv(records, client, state_dir=state_dir)
+        assert success and data['deleted'] == 0
+        assert data['written'] == 6  # snapshot, api:posts, page 2, post dua, stats, version
+        assert server.kv_store['ns1'] == records
+
+        success, data, _ = sync_kv(kv_records(edited[:1], page_size=1, updated='2025-01-03'), client, state_dir=state_dir)
+        assert success and data['deleted'] == 2  # page 2 dan post dua
+        assert 'api:post:dua' not in server.kv_store['ns1']
+    finally:
+        server.shutdown()
+
+
+def test_failed_chunks_are_retried(tmp_path):
+    """Chunk yang gagal tidak masuk state, api:version tidak bergeser, sync berikutnya mengulang"""
+    server = serve_kv_mock()
+    try:
+        good = KVClient('acc', 'ns1', 'token', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        bad = KVClient('acc', 'ns1', 'token', base_url=f"http://127.0.0.1:{server.server_address[1]}/missing")
+        records = kv_records(POSTS, updated='2025-01-01')
+        success, data, message = sync_kv(records, bad, state_dir=str(tmp_path))
+        assert not success and data['written'] == 0 and 'HTTP 404' in message
+        assert 'api:version' not in server.kv_store.get('ns1', {})
+
+        success, data, _ = sync_kv(records, good, state_dir=str(tmp_path))
+        assert success and data['written'] == len(records)
+    finally:
+        server.shutdown()
+
+
+class UploadSession:
+    def __init__(self):
+        self.calls = []
+
+    def put(self, url, **kwargs):
+        self.calls.append(kwargs)
+        return type('Response', (), {'status_code': 200, 'text': '{"success":true}'})()
+
+
+def test_deploy_syncs_kv_before_binding_upload(tmp_path):
+    """Deploy mengisi namespace KV lalu meng-upload worker dengan binding BLOG_KV"""
+    (tmp_path / 'posts.csv').write_text('title,content,category,status\nSatu,Isi,Tech,published\n', encoding='utf-8')
+    server = serve_kv_mock()
+    try:
+        config = {'data_source': 'Local File', 'local_path': str(tmp_path / 'posts.csv'), 'sheet_name': 'WEBSITE',
+                  'cf_api_token': 'token', 'cf_account_id': 'acc', 'worker_name': 'demo-blog', 'kv_namespace_id': 'ns1',
+                  'kv_api_base': f"http://127.0.0.1:{server.server_address[1]}", 'kv_state_dir': str(tmp_path / 'kv')}
+        session = UploadSession()
+        result = deploy_site(config, str(tmp_path / 'dist'), 'demo', store=get_snapshot_store(str(tmp_path / 'snapshots')), session=session)
+        assert result['ok'] and result['kv']['written'] == len(server.kv_store['ns1']) and 'api:post:satu' in server.kv_store['ns1']
+        metadata = json.loads(session.calls[0]['files']['metadata'][1])
+        assert metadata['bindings'] == [{'type': 'kv_namespace', 'name': 'BLOG_KV', 'namespace_id': 'ns1'}]
+        assert b'const KV_BINDING = "BLOG_KV"' in session.calls[0]['files']['script'][1]
+    finally:
+        server.shutdown()
+
+
+WORKER_PROBE = """
+const fs = require('fs'), vm = require('vm')
+const kv = JSON.parse(fs.readFileSync(process.argv[3], 'utf8'))
+let handler = null, fetches = 0
+const context = {
+    console, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+    addEventListener: (type, fn) => { handler = fn },
+    fetch: async () => { fetches++; return new Response('title\\n', { status: 200 }) },
+    BLOG_KV: { get: async (key, type) => key in kv ? (type === 'json' ? JSON.parse(kv[key]) : kv[key]) : null }
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+;(async () => {
+    const out = {}
+    for (const path of ['/api/posts?page=2', '/api/post/dua', '/api/stats']) {
+        let response
+        handler({ request: new Request('https://kv.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        out[path] = await (await response).text()
+    }
+    const malformed = vm.runInContext("kvKey(new URL('https://kv.local/api/post/%E0%A4%A'))", context)
+    console.log(JSON.stringify({ out, fetches, malformed }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_worker_serves_kv_keys_without_parsing(tmp_path):
+    """Worker dengan binding KV mengembalikan nilai key apa adanya tanpa fetch ke Google Sheets"""
+    records = kv_records(POSTS, page_size=1, updated='2025-01-01')
+    (tmp_path / 'kv.json').write_text(json.dumps(records), encoding='utf-8')
+    (tmp_path / 'probe.js').write_text(WORKER_PROBE, encoding='utf-8')
+    (tmp_path / 'worker.js').write_text(generate_improved_worker_script({'spreadsheetId': 'x', 'kvBinding': 'BLOG_KV'}), encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), str(tmp_path / 'kv.json')],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report['fetches'] == 0
+    # Escape rusak bukan key KV (jatuh ke jalur sheet, yang menjawab 404)
+    assert report['malformed'] is None
+    assert report['out'] == {'/api/posts?page=2': records['api:posts:page:2'], '/api/post/dua': records['api:post:dua'],
+                             '/api/stats': records['api:stats']}
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test halaman post dari Python: meta SEO, JSON-LD, render paralel dan file statis
+"""
+
+import json
+import re
+
+from post_pages import prerendered_map, render_post_page, render_post_pages, write_post_pages
+
+SITE = {'title': 'Blog Demo', 'base_url': 'https://blog.example.dev/'}
+POSTS = [
+    {
+        'title': 'Judul <Pertama>', 'slug': 'pertama', 'content': 'Paragraf satu\nbaris dua\n\nParagraf </script> dua',
+        'meta_description': 'Ringkasan "singkat"', 'featured_image': 'https://img.example.dev/a.jpg',
+        'tags': ['sheets', 'seo'], 'category': 'Tutorial', 'author': 'Admin', 'date': '2025-01-15', 'status': 'published',
+    },
+    {'title': 'Draft', 'content': 'x', 'status': 'draft'},
+    {'title': 'Judul <Pertama>', 'slug': 'pertama', 'content': 'duplikat', 'status': 'published'},
+    {'title': 'Tanpa Slug', 'content': 'Isi ' * 100, 'tags': 'a, b'},
+]
+
+
+def test_page_has_meta_opengraph_and_json_ld():
+    """Halaman lengkap dengan description, OpenGraph dan JSON-LD dari kolom sheet"""
+    page = render_post_page(POSTS[0], SITE)
+    assert '<title>Judul &lt;Pertama&gt; - Blog Demo</title>' in page
+    assert '<meta name="description" content="Ringkasan &quot;singkat&quot;">' in page
+    assert '<meta property="og:image" content="https://img.example.dev/a.jpg">' in page
+    assert '<link rel="canonical" href="https://blog.example.dev/post/pertama">' in page
+    assert '<p>Paragraf satu<br>baris dua</p><p>Paragraf &lt;/script&gt; dua</p>' in page
+
+    json_ld = json.loads(re.search(r'<script type="application/ld\+json">(.*?)</script>', page, re.S).group(1))
+    assert json_ld['@type'] == 'BlogPosting'
+    assert json_ld['datePublished'] == '2025-01-15'
+    assert json_ld['keywords'] == 'sheets, seo'
+    assert '<!--post-' not in page
+
+
+def test_parallel_render_matches_serial():
+    """Render lewat process pool sama dengan render serial; draft dan duplikat dilewati"""
+    serial = render_post_pages(POSTS, SITE, max_workers=1)
+    assert list(serial) == ['pertama', 'tanpa-slug']
+    assert 'duplikat' not in serial['pertama'][1]
+    assert len(re.search(r'name="description" content="([^"]*)"', serial['tanpa-slug'][0]).group(1)) == 160
+
+    parallel = render_post_pages(POSTS * 3, SITE, max_workers=2, parallel_min_posts=1)
+    assert parallel == serial
+
+    compact = prerendered_map(POSTS, SITE)
+    assert set(compact) == {'layout', 'pages'} and compact['pages']['pertama'] == list(serial['pertama'])
+
+
+def test_static_pages_written(tmp_path):
+    """Setiap post ditulis ke post/<slug>/index.html"""
+    paths = write_post_pages(POSTS, SITE, directory=str(tmp_path))
+    assert len(paths) == 2
+    assert (tmp_path / 'post' / 'tanpa-slug' / 'index.html').read_text(encoding='utf-8').startswith('<!DOCTYPE html>')
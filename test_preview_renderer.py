@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test preview renderer: memo per hash, LRU terbatas dan render bertahap
+"""
+
+import json
+import re
+
+import pytest
+
+from preview_renderer import PreviewRenderer, read_text_cached
+
+POSTS = [{'title': f'Post {i}', 'content': 'Isi <b>tebal</b>', 'category': 'Tech', 'tags': 'a', 'date': '2025-01-01', 'author': 'Admin'} for i in range(20)]
+
+
+def test_cards_render_first_screen_and_memoize():
+    """Layar pertama jadi HTML, sisanya JSON; render ulang memakai cache"""
+    renderer = PreviewRenderer(max_entries=2)
+    html = renderer.render_cards(POSTS, first_screen=6)
+    assert html.split('id="preview-rest"')[0].count('<div class="card">') == 6
+    rest = json.loads(re.search(r'id="preview-rest">(.*?)</script>', html, re.S).group(1))
+    assert len(rest) == 14
+    assert '<b>tebal</b>' not in html.split('id="preview-rest"')[0]
+    # Sisanya hanya field kartu dengan excerpt pendek, tanpa content penuh
+    assert set(rest[0]) == {'title', 'category', 'date', 'author', 'excerpt', 'tags'} and rest[0]['tags'] == ['a']
+
+    assert renderer.render_cards([dict(post) for post in POSTS], first_screen=6) is html
+    assert renderer.stats()['hits'] == 1
+
+    renderer.render_cards(POSTS[:2])
+    renderer.render_cards(POSTS[:3])
+    assert renderer.stats()['entries'] == 2
+    renderer.render_cards(POSTS, first_screen=6)
+    assert renderer.stats()['misses'] == 4
+
+
+def test_memo_key_uses_stored_snapshot_version(monkeypatch):
+    """Dengan version dari snapshot store, posts tidak di-hash lagi tiap rerun"""
+    renderer = PreviewRenderer()
+    long_posts = [dict(post, content='x' * 5000) for post in POSTS]
+    html = renderer.render_cards(long_posts, version='v1')
+    assert 'x' * 201 not in html
+    monkeypatch.setattr('preview_renderer.snapshot_version', lambda posts: pytest.fail('posts di-hash ulang'))
+    assert renderer.render_cards([dict(post) for post in long_posts], version='v1') is html
+    template = renderer.render_template('<html><head></head></html>', {}, POSTS, version='v1')
+    assert renderer.render_template('<html><head></head></html>', {}, POSTS, version='v1') is template
+    assert '"version": "v1"' in template
+
+
+def test_template_preview_serves_api_from_snapshot():
+    """Template diisi dan /api/posts dijawab dari data yang di-embed"""
+    renderer = PreviewRenderer()
+    html = renderer.render_template('<html><head><title>{{blog_title}}</title></head><body></body></html>', {'blog_title': 'Demo'}, POSTS[:2])
+    assert '<title>Demo</title>' in html
+    routes = json.loads(re.search(r'id="preview-routes">(.*?)</script>', html, re.S).group(1))
+    assert routes['/api/posts']['total'] == 2
+    assert html.index('preview-routes') < html.index('<title>')
+
+
+def test_read_text_cached_follows_file_changes(tmp_path):
+    """File hanya dibaca ulang kalau berubah"""
+    path = tmp_path / "template.html"
+    path.write_text("satu", encoding='utf-8')
+    assert read_text_cached(str(path)) == "satu"
+    path.write_text("dua lagi", encoding='utf-8')
+    assert read_text_cached(str(path)) == "dua lagi"
+    assert read_text_cached(str(tmp_path / "missing.html")) is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test preview server Python: health probe, route API dan hot reload
+"""
+
+import json
+import os
+import urllib.request
+
+from preview_server import PreviewServer
+
+POSTS = [
+    {'title': 'Hello World', 'content': 'Isi', 'category': 'Tech', 'tags': 'a, b', 'status': 'published', 'date': '2025-01-02'},
+    {'title': 'Draft', 'slug': 'draft', 'category': 'News', 'tags': 'c', 'status': 'draft', 'date': '2025-01-01'},
+]
+
+
+def get(server, path):
+    with urllib.request.urlopen(server.url + path, timeout=5) as response:
+        return response.status, response.read().decode('utf-8')
+
+
+def test_routes_and_hot_reload(tmp_path):
+    """Server siap via health probe, melayani template/API dan reload saat template atau data berubah"""
+    template = tmp_path / "template.html"
+    template.write_text("<html><body>v1</body></html>", encoding='utf-8')
+
+    server = PreviewServer(port=0)
+    server.watch_template(str(template))
+    server.update(posts=POSTS)
+    success, message = server.start()
+    try:
+        assert success, message
+        assert server.startup_ms is not None
+
+        status, body = get(server, '/')
+        assert 'v1' in body and '/__preview/template' in body
+
+        posts = json.loads(get(server, '/api/posts')[1])
+        assert [post['slug'] for post in posts['posts']] == ['hello-world']
+        assert json.loads(get(server, '/api/stats')[1])['stats']['totalPosts'] == 2
+        assert 'Hello World' in get(server, '/post/hello-world')[1]
+
+        version = json.loads(get(server, '/api/version')[1])['version']
+        assert server.update(posts=POSTS[:1])
+        assert not server.update(posts=POSTS[:1])
+        assert json.loads(get(server, '/api/version')[1])['version'] != version
+
+        template_version = json.loads(get(server, '/__preview/template')[1])['version']
+        template.write_text("<html><body>v2 updated</body></html>", encoding='utf-8')
+        os.utime(template, (1, 1))
+        assert 'v2 updated' in get(server, '/')[1]
+        assert json.loads(get(server, '/__preview/template')[1])['version'] != template_version
+    finally:
+        server.stop()
+    assert not server.running
+
+
+def test_template_poll_sees_file_edits(tmp_path):
+    """Live reload: edit file template terdeteksi lewat /__preview/template saja, tanpa request /"""
+    template = tmp_path / "template.html"
+    template.write_text("<html><body>v1</body></html>", encoding='utf-8')
+    server = PreviewServer(port=0)
+    server.watch_template(str(template))
+    success, message = server.start()
+    try:
+        assert success, message
+        before = json.loads(get(server, '/__preview/template')[1])['version']
+        template.write_text("<html><body>v2</body></html>", encoding='utf-8')
+        os.utime(template, (1, 1))
+        assert json.loads(get(server, '/__preview/template')[1])['version'] != before
+    finally:
+        server.stop()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test supervisor proses: satu child per port, readiness via port, log dan restart
+"""
+
+import socket
+import sys
+import time
+
+import process_supervisor
+from process_supervisor import ProcessSupervisor, get_supervisor, port_open
+
+# Stand-in for `node web-app.js`: listens on $PORT and logs a line
+CHILD = (
+    "import http.server, os, sys;"
+    "print('listening', flush=True);"
+    "http.server.ThreadingHTTPServer(('127.0.0.1', int(os.environ['PORT'])), http.server.SimpleHTTPRequestHandler).serve_forever()"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_single_child_readiness_and_logs():
+    """Start kedua memakai proses yang sama; stop mematikan child"""
+    port = free_port()
+    supervisor = get_supervisor([sys.executable, '-c', CHILD], port)
+    try:
+        success, message = supervisor.start()
+        assert success, message
+        assert port_open(port)
+        assert supervisor.startup_ms is not None
+        pid = supervisor.process.pid
+
+        success, message = get_supervisor([sys.executable, '-c', CHILD], port).start()
+        assert success and supervisor.process.pid == pid
+
+        deadline = time.monotonic() + 5
+        while not any('listening' in line for line in supervisor.logs) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert any('listening' in line for line in supervisor.logs)
+    finally:
+        supervisor.stop()
+    assert not supervisor.running
+
+
+def test_restart_after_crash(monkeypatch):
+    """Child yang crash dijalankan ulang setelah backoff"""
+    monkeypatch.setattr(process_supervisor, 'RESTART_BASE_DELAY', 0.1)
+    port = free_port()
+    supervisor = ProcessSupervisor([sys.executable, '-c', CHILD], port)
+    try:
+        assert supervisor.start()[0]
+        first_pid = supervisor.process.pid
+        supervisor.process.kill()
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not (supervisor.restarts and supervisor.running and port_open(port)):
+            time.sleep(0.05)
+        assert supervisor.restarts == 1
+        assert supervisor.process.pid != first_pid
+    finally:
+        supervisor.stop()
+
+
+def test_child_that_exits_early_is_reported():
+    """Proses yang langsung keluar dilaporkan, bukan dianggap berjalan"""
+    supervisor = ProcessSupervisor([sys.executable, '-c', 'import sys; sys.exit(3)'], free_port())
+    success, message = supervisor.start()
+    assert not success
+    assert supervisor.last_exit_code == 3
+
+
+def crash_after_first_run(marker, then):
+    """Child that serves the first time it runs and does `then` on every later run"""
+    return ("import http.server, os, sys, time;"
+            f"marker = {str(marker)!r};"
+            f"exists = os.path.exists(marker); open(marker, 'a').close();"
+            f"{then} if exists else "
+            "http.server.ThreadingHTTPServer(('127.0.0.1', int(os.environ['PORT'])), http.server.SimpleHTTPRequestHandler).serve_forever()")
+
+
+def test_crash_loop_keeps_retrying_with_backoff(monkeypatch, tmp_path):
+    """Restart yang gagal terus dicoba dengan backoff yang makin besar sampai stop()"""
+    monkeypatch.setattr(process_supervisor, 'RESTART_BASE_DELAY', 0.05)
+    supervisor = ProcessSupervisor([sys.executable, '-c', crash_after_first_run(tmp_path / 'ran', 'sys.exit(1)')], free_port())
+    try:
+        assert supervisor.start()[0]
+        supervisor.process.kill()
+
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline and supervisor.restarts < 4:
+            time.sleep(0.05)
+        assert supervisor.restarts >= 4
+        assert supervisor._backoff >= 0.05 * 2 ** 4
+        assert any('restart failed' in line for line in supervisor.logs)
+    finally:
+        supervisor.stop()
+    restarts = supervisor.restarts
+    time.sleep(1)
+    assert supervisor.restarts == restarts
+
+
+def test_stop_does_not_wait_for_a_restart_to_become_ready(monkeypatch, tmp_path):
+    """Saat restart menunggu port, status() dan stop() langsung menjawab"""
+    monkeypatch.setattr(process_supervisor, 'RESTART_BASE_DELAY', 0.05)
+    supervisor = ProcessSupervisor([sys.executable, '-c', crash_after_first_run(tmp_path / 'ran', 'time.sleep(60)')],
+                                   free_port(), ready_timeout=30)
+    assert supervisor.start()[0]
+    supervisor.process.kill()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and not supervisor.restarts:
+        time.sleep(0.05)
+    time.sleep(0.3)
+    started = time.monotonic()
+    assert supervisor.status()['restarts'] == 1
+    supervisor.stop()
+    assert time.monotonic() - started < 5
+    assert not supervisor.running
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test purge trigger: signature, template Apps Script, endpoint /__purge lokal dan purge di worker
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from new_worker_template import generate_improved_worker_script
+from purge_trigger import (
+    generate_apps_script_trigger,
+    send_purge,
+    serve_purge_endpoint,
+    sign_purge,
+    verify_purge,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), 'Spreadsheet', 'sample-blog-data.csv')
+node = shutil.which('node')
+
+
+def test_signature_round_trip_and_replay_window():
+    """Signature valid diterima; body lain, secret lain atau timestamp lama ditolak"""
+    timestamp = str(int(time.time()))
+    body = '{"sheet":"WEBSITE"}'
+    signature = sign_purge("secret", body, timestamp)
+
+    assert verify_purge("secret", body, timestamp, signature) == (True, "ok")
+    assert not verify_purge("secret", body + " ", timestamp, signature)[0]
+    assert not verify_purge("other", body, timestamp, signature)[0]
+    assert not verify_purge("secret", body, timestamp, signature, now=int(timestamp) + 3600)[0]
+    assert not verify_purge("secret", body, None, signature)[0]
+
+
+def test_generated_apps_script_fills_placeholders():
+    """Template Apps Script terisi URL worker, sheet dan secret"""
+    script = generate_apps_script_trigger(["https://blog.example.workers.dev/"], "abc123", sheet_names=["WEBSITE"])
+    assert '["https://blog.example.workers.dev"]' in script
+    assert '["WEBSITE"]' in script
+    assert "'abc123'" in script
+    assert "{{" not in script
+    assert "/__purge" in script
+
+
+def test_send_purge_to_local_endpoint():
+    """Sender dan receiver lokal: purge bertanda tangan diterima, secret salah ditolak"""
+    received = []
+    server = serve_purge_endpoint("secret", received.append)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        success, data, message = send_purge(url, "secret", sheet="WEBSITE", reason="edit")
+        assert success, message
+        assert data['success'] is True
+        assert received[0]['sheet'] == "WEBSITE"
+
+        success, data, message = send_purge(url, "wrong")
+        assert not success
+        assert data['error'] == "bad signature"
+        assert len(received) == 1
+    finally:
+        server.shutdown()
+
+
+PURGE_PROBE = """
+const fs = require('fs'), vm = require('vm'), nodeCrypto = require('crypto')
+const [workerPath, secret] = process.argv.slice(2)
+const source = fs.readFileSync(workerPath, 'utf8')
+const kvStore = new Map()
+const kv = { get: async key => kvStore.has(key) ? kvStore.get(key) : null, put: async (key, value) => { kvStore.set(key, value) } }
+let clock = Date.now()
+let fetches = 0
+
+function isolate(withKV) {
+    let handler = null
+    const context = {
+        console: { log() {}, error() {}, warn() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder,
+        ReadableStream, TransformStream, performance, AbortController, setTimeout, clearTimeout, crypto, atob, btoa,
+        CLOCK: () => clock,
+        addEventListener: (type, fn) => { handler = fn },
+        fetch: async () => { fetches += 1; return new Response('id,title,slug,content,status\\n1,Satu,satu,Isi,published\\n') }
+    }
+    if (withKV) context.BLOG_KV = kv
+    context.globalThis = context
+    vm.createContext(context)
+    vm.runInContext('Date.now = () => CLOCK()', context)
+    vm.runInContext(source, context)
+    const send = async (path, init) => {
+        let response
+        await handler({ request: new Request('https://blog.local' + path, init), respondWith: r => { response = r }, waitUntil: () => {} })
+        return await response
+    }
+    send.ttl = () => vm.runInContext('SNAPSHOT_TTL_MS', context)
+    return send
+}
+
+;(async () => {
+    const a = isolate(true), b = isolate(true)
+    const out = { ttl: [a.ttl(), isolate(false).ttl()], fetches: [] }
+    await b('/api/posts')
+    clock += 1000
+    await b('/api/posts')
+    out.fetches.push(fetches)
+    clock += 1000
+    const timestamp = String(Math.floor(clock / 1000)), body = '{}'
+    const signature = nodeCrypto.createHmac('sha256', secret).update(`${timestamp}.${body}`).digest('hex')
+    out.purge = (await a('/__purge', { method: 'POST', body, headers: { 'X-Purge-Timestamp': timestamp, 'X-Purge-Signature': signature } })).status
+    // b read the marker a second before the purge: it sees the purge once the check interval has passed
+    clock += 1000
+    await b('/api/posts')
+    out.fetches.push(fetches)
+    clock += 5000
+    await b('/api/posts')
+    await b('/api/posts')
+    out.fetches.push(fetches)
+    console.log(JSON.stringify(out))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_worker_purge_reaches_other_isolates_through_kv(tmp_path):
+    """Marker purge di KV dibaca isolate lain; TTL panjang hanya kalau KV terpasang"""
+    (tmp_path / 'probe.js').write_text(PURGE_PROBE, encoding='utf-8')
+    (tmp_path / 'worker.js').write_text(generate_improved_worker_script(
+        {'spreadsheetId': 'x', 'kvBinding': 'BLOG_KV', 'purgeSecret': 'rahasia'}), encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), 'rahasia'],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['ttl'] == [6 * 60 * 60 * 1000, 60 * 1000]
+    assert report['purge'] == 200
+    # Satu fetch awal, lalu tepat satu fetch ulang setelah purge terlihat
+    assert report['fetches'] == [1, 1, 2]
+
+
+LIST_PURGE_PROBE = """
+const fs = require('fs'), vm = require('vm'), nodeCrypto = require('crypto')
+const [workerPath, secret, origin] = process.argv.slice(2)
+const source = fs.readFileSync(workerPath, 'utf8')
+const cacheStore = new Map()
+const colo = {
+    match: async key => cacheStore.has(String(key)) ? cacheStore.get(String(key)).clone() : undefined,
+    put: async (key, response) => { cacheStore.set(String(key), response.clone()) }
+}
+let clock = Date.now()
+const queries = []
+
+function isolate() {
+    let handler = null
+    const context = {
+        console: { log() {}, error() {}, warn() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder,
+        ReadableStream, TransformStream, performance, AbortController, setTimeout, clearTimeout, crypto, atob, btoa,
+        caches: { default: colo }, CLOCK: () => clock,
+        addEventListener: (type, fn) => { handler = fn },
+        fetch: async (url, init) => {
+            queries.push(new URL(url).searchParams.get('tq') || 'full')
+            return fetch(url.replace('https://docs.google.com', origin), init)
+        }
+    }
+    context.globalThis = context
+    vm.createContext(context)
+    vm.runInContext('Date.now = () => CLOCK()', context)
+    vm.runInContext(source, context)
+    const send = async (path, init) => {
+        let response
+        await handler({ request: new Request('https://blog.local' + path, init), respondWith: r => { response = r }, waitUntil: () => {} })
+        return await response
+    }
+    send.eval = code => vm.runInContext(code, context)
+    return send
+}
+
+;(async () => {
+    const a = isolate(), b = isolate()
+    const out = {}
+    await a('/api/posts?limit=2&offset=0')
+    await a('/api/posts')
+    await b('/api/posts?limit=2&offset=0')
+    await b('/api/posts?limit=2&offset=2')
+    out.before = { a: [a.eval('LIST_CACHE.size'), a.eval('LAST_GOOD !== null')], b: b.eval('LIST_CACHE.size'), queries: queries.length }
+    clock += 1000
+    const timestamp = String(Math.floor(clock / 1000)), body = '{}'
+    const signature = nodeCrypto.createHmac('sha256', secret).update(`${timestamp}.${body}`).digest('hex')
+    out.purge = (await a('/__purge', { method: 'POST', body, headers: { 'X-Purge-Timestamp': timestamp, 'X-Purge-Signature': signature } })).status
+    out.after = { a: [a.eval('LIST_CACHE.size'), a.eval('LAST_GOOD')] }
+    // b sees the marker once its check interval has passed: the requested window is fetched again, the other one dropped
+    clock += 5000
+    const before = queries.length
+    await b('/api/posts?limit=2&offset=0')
+    out.after.b = [b.eval('LIST_CACHE.size'), queries.length - before]
+    console.log(JSON.stringify(out))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_worker_purge_drops_list_windows_and_last_good(tmp_path):
+    """Purge mengosongkan list window dan last-known-good; isolate lain membuang window yang lebih tua dari marker"""
+    from gviz_query import FixtureGVizSession, serve_gviz_mock
+
+    server = serve_gviz_mock(FixtureGVizSession.from_csv({'WEBSITE': SAMPLE_CSV}))
+    try:
+        (tmp_path / 'probe.js').write_text(LIST_PURGE_PROBE, encoding='utf-8')
+        (tmp_path / 'worker.js').write_text(generate_improved_worker_script(
+            {'spreadsheetId': 'sheet-id', 'sheetName': 'WEBSITE', 'purgeSecret': 'rahasia'}), encoding='utf-8')
+        result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js'), 'rahasia',
+                                 f"http://127.0.0.1:{server.server_address[1]}"], capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        server.shutdown()
+
+    assert report['before']['a'] == [1, True] and report['before']['b'] == 2
+    assert report['purge'] == 200
+    assert report['after']['a'] == [0, None]
+    assert report['after']['b'] == [1, 1]
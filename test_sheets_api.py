@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test Sheets API v4 batchGet backend against a local fixture stand-in
+"""
+
+import csv
+import os
+import re
+
+from sheets_api import (
+    LIST_COLUMNS,
+    column_index,
+    column_letter,
+    fetch_sheets,
+    get_sheets_api_data,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), 'Spreadsheet', 'sample-blog-data.csv')
+
+A1_RANGE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?)?$")
+
+
+class FixtureResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FixtureSheetsSession:
+    """Local stand-in for the values:batchGet endpoint, backed by in-memory grids
+
+    Grids are {sheet_name: [[cell, ...], ...]} (header row first). Every request
+    is recorded in `calls` so tests can assert how many round-trips were made
+    and which ranges were asked for.
+    """
+
+    def __init__(self, grids, api_key=None):
+        self.grids = grids
+        self.api_key = api_key
+        self.calls = []
+
+    @classmethod
+    def from_csv(cls, paths, api_key=None):
+        """Build a session from {sheet_name: csv_path} recordings"""
+        grids = {}
+        for sheet_name, path in paths.items():
+            with open(path, newline='', encoding='utf-8') as f:
+                grids[sheet_name] = [row for row in csv.reader(f)]
+        return cls(grids, api_key=api_key)
+
+    def get(self, url, params=None, timeout=None):
+        params = list(params or [])
+        self.calls.append((url, params))
+        options = dict(p for p in params if p[0] != 'ranges')
+        if self.api_key is not None and options.get('key') != self.api_key:
+            return FixtureResponse(403, {'error': {'message': 'The caller does not have permission'}})
+
+        value_ranges = []
+        for _, a1_range in (p for p in params if p[0] == 'ranges'):
+            match = A1_RANGE.match(a1_range)
+            sheet_name = None
+            if match:
+                sheet_name = match.group(1).replace("''", "'") if match.group(1) else match.group(2)
+            if sheet_name not in self.grids:
+                return FixtureResponse(400, {'error': {'message': f'Unable to parse range: {a1_range}'}})
+            grid = self.grids[sheet_name]
+            start_col, start_row, end_col, end_row = match.group(3, 4, 5, 6)
+
+            # Whole-row ranges like 1:1 have no column letters
+            has_end = ':' in a1_range.split('!', 1)[-1]
+            first_row = int(start_row) - 1 if start_row else 0
+            last_row = (int(end_row) if end_row else len(grid)) if has_end else (first_row + 1 if start_row else len(grid))
+            first_col = column_index(start_col) if start_col else 0
+            last_col = column_index(end_col) + 1 if end_col else (first_col + 1 if start_col and not has_end else None)
+
+            rows = [row[first_col:last_col] for row in grid[first_row:last_row]]
+            if options.get('majorDimension') == 'COLUMNS':
+                width = max((len(r) for r in rows), default=0)
+                values = [[r[c] if c < len(r) else "" for r in rows] for c in range(width)]
+                # The API trims trailing empty cells
+                for column in values:
+                    while column and column[-1] == "":
+                        column.pop()
+            else:
+                values = rows
+            value_ranges.append({'range': a1_range, 'majorDimension': options.get('majorDimension', 'ROWS'), 'values': values})
+
+        return FixtureResponse(200, {'spreadsheetId': url.split('/spreadsheets/')[1].split('/')[0], 'valueRanges': value_ranges})
+
+
+def make_session():
+    session = FixtureSheetsSession.from_csv({'WEBSITE': SAMPLE_CSV}, api_key='test-key')
+    session.grids['Authors'] = [['author', 'bio'], ['Admin', 'Site admin']]
+    return session
+
+
+def test_column_letters_round_trip():
+    """Konversi index kolom <-> huruf A1"""
+    for index in (0, 25, 26, 51, 701, 702):
+        assert column_index(column_letter(index)) == index
+    assert column_letter(26) == 'AA'
+
+
+def test_full_sheet_load_matches_csv():
+    """Tanpa projection semua kolom di-load dalam satu request"""
+    session = make_session()
+    success, data, message = get_sheets_api_data('sheet-id', 'test-key', 'WEBSITE', session=session)
+
+    assert success, message
+    assert len(data) == 10
+    assert data[0]['slug'] == 'cara-membuat-blog-dengan-google-sheets'
+    assert 'content' in data[0]
+    assert len(session.calls) == 1
+    options = dict(p for p in session.calls[0][1] if p[0] != 'ranges')
+    assert options['valueRenderOption'] == 'UNFORMATTED_VALUE'
+
+
+def test_projection_never_requests_content():
+    """List view projection: kolom content tidak pernah diminta"""
+    session = make_session()
+    data = fetch_sheets('sheet-id', 'test-key', ['WEBSITE', 'Authors'], columns=LIST_COLUMNS + ['bio'], session=session)
+
+    assert set(data['WEBSITE'][0]) == set(LIST_COLUMNS)
+    assert data['WEBSITE'][0]['title'] == 'Cara Membuat Blog dengan Google Sheets'
+    assert data['Authors'] == [{'author': 'Admin', 'bio': 'Site admin'}]
+
+    # One header call plus one data call covering both sheets
+    assert len(session.calls) == 2
+    data_ranges = [value for key, value in session.calls[1][1] if key == 'ranges']
+    assert "'WEBSITE'!D2:D" not in data_ranges
+    assert "'Authors'!B2:B" in data_ranges
+
+
+def test_invalid_key_reports_error():
+    """API key salah menghasilkan (False, [], message)"""
+    success, data, message = get_sheets_api_data('sheet-id', 'wrong', 'WEBSITE', session=make_session())
+    assert not success and data == []
+    assert '403' in message
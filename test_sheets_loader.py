@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test multi-tab loader dan join helpers
+"""
+
+import threading
+import time
+
+from sheets_loader import SheetDataset, build_worker_posts, load_spreadsheet_tabs, parse_csv_rows
+
+TABS = {
+    'WEBSITE': 'title,author,content\n"Hello, World",admin,"Line 1\nLine 2"\nSecond,Guest,Body\n',
+    'Authors': 'author,bio\nAdmin,Site admin\n',
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSheetsSession:
+    """Serves htmlview and per-gid CSV exports, tracking concurrency"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        if url.endswith('/htmlview'):
+            return FakeResponse(200, '<li id="sheet-button-0"><a href="#">WEBSITE</a></li>'
+                                     '<li id="sheet-button-77"><a href="#">Authors</a></li>')
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        gid = url.rsplit('gid=', 1)[-1]
+        return FakeResponse(200, TABS['WEBSITE' if gid == '0' else 'Authors'])
+
+
+def test_parse_handles_quotes_and_newlines():
+    """CSV dengan koma dan newline di dalam quotes"""
+    rows = parse_csv_rows(TABS['WEBSITE'])
+    assert rows[0]['title'] == 'Hello, World'
+    assert rows[0]['content'] == 'Line 1\nLine 2'
+
+
+def test_tabs_load_concurrently_and_join():
+    """Tab di-fetch paralel lalu posts di-join dengan authors"""
+    session = FakeSheetsSession()
+    dataset = load_spreadsheet_tabs('sheet-id', ['WEBSITE', 'Authors'], session=session)
+
+    assert dataset.errors == {}
+    assert session.peak == 2
+    posts = build_worker_posts(dataset, 'WEBSITE', 'Authors')
+    assert posts[0]['author_info'] == {'author': 'Admin', 'bio': 'Site admin'}
+    assert posts[0]['slug'] == 'hello-world'
+    assert posts[1]['author_info'] is None
+
+
+def test_failed_tab_is_reported():
+    """Tab yang gagal dicatat di errors tanpa menggagalkan tab lain"""
+    class Broken(FakeSheetsSession):
+        def get(self, url, **kwargs):
+            if 'gid=77' in url:
+                return FakeResponse(404, '<!DOCTYPE html>')
+            return super().get(url, **kwargs)
+
+    dataset = load_spreadsheet_tabs('sheet-id', ['WEBSITE', 'Authors'], session=Broken())
+    assert 'WEBSITE' in dataset and 'Authors' not in dataset
+    assert 'Authors' in dataset.errors
+    assert isinstance(dataset, SheetDataset)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test pipeline headless: build inkremental, deploy sekali per build dan CLI blog_cli
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import blog_cli
+from blog_schema import validate_rows
+from new_worker_template import generate_improved_worker_script
+from site_pipeline import build_site, deploy_site, get_snapshot_store, load_embedded_posts, load_validated_sheet
+from sheets_loader import parse_csv_rows
+from worker_generators import generate_cloudflare_worker_script, generate_modern_worker_script
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), 'Spreadsheet', 'sample-blog-data.csv')
+node = shutil.which('node')
+
+
+def write_csv(path, titles):
+    lines = ['title,content,category,date,status'] + [f'{title},Isi {title},Tech,2025-01-0{i + 1},published' for i, title in enumerate(titles)]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def site_config(tmp_path, **extra):
+    return dict({'data_source': 'Local File', 'local_path': str(tmp_path / 'posts.csv'), 'sheet_name': 'WEBSITE',
+                 'blog_title': 'Demo', 'embed_data': True, 'site_url': 'https://demo.example.dev'}, **extra)
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def put(self, url, headers=None, data=None, timeout=None):
+        self.calls.append((url, headers, data))
+        return type('Response', (), {'status_code': 200, 'text': '{"success":true}'})()
+
+
+def test_build_is_incremental(tmp_path):
+    """Build kedua dilewati; data berubah atau --force membangun ulang"""
+    write_csv(tmp_path / 'posts.csv', ['Satu', 'Dua'])
+    store = get_snapshot_store(str(tmp_path / 'snapshots'))
+    config = site_config(tmp_path)
+    out_dir = str(tmp_path / 'dist')
+
+    first = build_site(config, out_dir, 'demo', store=store)
+    assert first['ok'] and not first['cached'] and first['fetched']
+    assert first['outputs']['pages'] == 2 and '/sitemap.xml' in first['outputs']['artifacts']
+    assert {'data', 'template', 'worker', 'pages', 'total'} <= set(first['timings'])
+    worker = (tmp_path / 'dist' / 'worker.js').read_text(encoding='utf-8')
+    assert 'const EMBEDDED_POSTS = [' in worker and 'Satu' in worker
+    outputs = first['outputs']
+    assert outputs['worker_bytes'] == len(worker.encode('utf-8')) > outputs['worker_gzip_bytes']
+    assert outputs['runtime_version'] in worker and 'measure' in first['timings']
+    assert shutil.which('node') is None or outputs['cold_start_ms'] > 0
+    assert (tmp_path / 'dist' / 'post' / 'dua' / 'index.html').exists()
+
+    again = build_site(config, out_dir, 'demo', store=store)
+    assert again['cached'] and again['key'] == first['key']
+    assert build_site(config, out_dir, 'demo', store=store, force=True)['cached'] is False
+
+    write_csv(tmp_path / 'posts.csv', ['Satu', 'Dua', 'Tiga'])
+    assert build_site(config, out_dir, 'demo', store=store)['cached'] is True
+    changed = build_site(config, out_dir, 'demo', store=store, refresh=True)
+    assert not changed['cached'] and changed['version'] != first['version'] and changed['rows'] == 3
+
+
+def test_deploy_uploads_each_build_once(tmp_path):
+    """Upload hanya kalau build berubah, tanpa kredensial gagal"""
+    write_csv(tmp_path / 'posts.csv', ['Satu'])
+    store = get_snapshot_store(str(tmp_path / 'snapshots'))
+    out_dir = str(tmp_path / 'dist')
+    assert not deploy_site(site_config(tmp_path), out_dir, 'demo', store=store)['ok']
+
+    config = site_config(tmp_path, cf_api_token='token', cf_account_id='acc', worker_name='demo-blog')
+    session = FakeSession()
+    deployed = deploy_site(config, out_dir, 'demo', store=store, session=session)
+    assert deployed['ok'] and deployed['deployed'] and deployed['url'] == 'https://demo-blog.acc.workers.dev'
+    assert session.calls[0][0].endswith('/accounts/acc/workers/scripts/demo-blog')
+    assert 'upload' in deployed['timings']
+
+    skipped = deploy_site(config, out_dir, 'demo', store=store, session=session)
+    assert skipped['ok'] and skipped['deployed'] is False and len(session.calls) == 1
+
+
+def test_cli_json_lines_and_lazy_imports(tmp_path, capsys, monkeypatch):
+    """Satu baris JSON per site, exit code 1 kalau ada yang gagal; import CLI tanpa pandas/streamlit"""
+    write_csv(tmp_path / 'posts.csv', ['Satu'])
+    (tmp_path / 'demo.json').write_text(json.dumps(site_config(tmp_path)), encoding='utf-8')
+    monkeypatch.setattr(blog_cli, 'snapshot_store', lambda: get_snapshot_store(str(tmp_path / 'snapshots')))
+
+    code = blog_cli.main(['build', '--json', '-j', '2', '--out', str(tmp_path / 'dist'),
+                          str(tmp_path / 'demo.json'), str(tmp_path / 'missing.json')])
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert code == 1
+    assert results[0]['site'] == 'demo' and results[0]['ok'] and results[0]['timings']['total'] > 0
+    assert not results[1]['ok']
+    assert (tmp_path / 'dist' / 'demo' / 'build.json').exists()
+
+    probe = "import sys, blog_cli, site_pipeline; print(sorted({'pandas', 'streamlit', 'pyarrow'} & set(sys.modules)))"
+    assert subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True).stdout.strip() == '[]'
+
+
+def test_list_view_filters_normalized_rows(tmp_path):
+    """published_only memakai status yang sudah dinormalisasi ('Draft', 'konsep') dan alias header ('Judul')"""
+    (tmp_path / 'posts.csv').write_text('Judul,Isi,Status\nSatu,Isi satu,Published\nDua,Isi dua,Draft\n'
+                                        'Tiga,Isi tiga,konsep\nEmpat,Isi empat,\n', encoding='utf-8')
+    success, result, message = load_validated_sheet(site_config(tmp_path), None, 'WEBSITE',
+                                                    columns=['title', 'status'], published_only=True)
+    assert success, message
+    assert result.rows == [{'title': 'Satu', 'status': 'published'}, {'title': 'Empat', 'status': 'published'}]
+
+
+EMBED_PROBE = """
+const fs = require('fs'), vm = require('vm')
+let handler = null
+const context = {
+    console: { log() {}, error() {}, warn() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder,
+    ReadableStream, TransformStream, performance, AbortController, setTimeout, clearTimeout,
+    addEventListener: (type, fn) => { handler = fn },
+    fetch: async () => { throw new Error('no network') }
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+;(async () => {
+    const out = {}
+    for (const path of ['/', '/api/stats']) {
+        let response
+        await handler({ request: new Request('https://blog.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        response = await response
+        out[path] = { status: response.status, body: await response.text() }
+    }
+    console.log(JSON.stringify(out))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+@pytest.mark.parametrize('generate', [generate_improved_worker_script, generate_cloudflare_worker_script, generate_modern_worker_script])
+def test_embedded_validated_rows_use_worker_wire_format(tmp_path, generate):
+    """Baris hasil validate_rows (tags berupa list) di-embed sebagai string; / dan /api/stats tetap jalan"""
+    with open(SAMPLE_CSV, encoding='utf-8') as f:
+        rows = validate_rows(parse_csv_rows(f.read())).rows
+    posts, message = load_embedded_posts({'sheet_name': 'WEBSITE'}, rows)
+    assert isinstance(posts[0]['tags'], str) and isinstance(rows[0]['tags'], list)
+
+    (tmp_path / 'probe.js').write_text(EMBED_PROBE, encoding='utf-8')
+    (tmp_path / 'worker.js').write_text(generate({'spreadsheetId': 'x', 'embeddedPosts': posts}), encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'probe.js'), str(tmp_path / 'worker.js')], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['/']['status'] == 200 and rows[0]['title'] in report['/']['body']
+    assert report['/api/stats']['status'] == 200
+    stats = json.loads(report['/api/stats']['body'])['stats']
+    assert stats['totalPosts'] == len(rows)
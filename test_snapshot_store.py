@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test snapshot store: format biner, nama berbasis hash, rollback dan prune
+"""
+
+import pytest
+
+from snapshot_store import SnapshotStore
+
+ROWS = [{'id': str(i), 'title': f'Post {i}', 'tags': ['a', 'b']} for i in range(50)]
+
+
+@pytest.mark.parametrize('fmt', ['arrow', 'json'])
+def test_round_trip(tmp_path, fmt):
+    """Data yang disimpan kembali sama persis, file diberi nama hash konten"""
+    if fmt == 'arrow':
+        pytest.importorskip('pyarrow')
+    store = SnapshotStore(str(tmp_path), format=fmt)
+    entry = store.save('sheet-WEBSITE', ROWS)
+    assert entry['format'] == fmt
+    assert entry['version'] in entry['file']
+    assert store.load('sheet-WEBSITE') == ROWS
+    assert store.save('sheet-WEBSITE', [dict(row) for row in ROWS]) == entry
+
+
+def test_arrow_table_is_memory_mapped(tmp_path):
+    """Snapshot Arrow dibaca lewat memory map"""
+    pytest.importorskip('pyarrow')
+    store = SnapshotStore(str(tmp_path), format='arrow')
+    store.save('s', ROWS)
+    table = store.load_table('s')
+    assert table.num_rows == 50
+    assert table.column('tags').to_pylist()[0] == ['a', 'b']
+
+
+def test_load_rows_defers_dicts_until_needed(tmp_path):
+    """load_rows: jumlah baris dan DataFrame langsung dari kolom Arrow, dict baru dibuat saat diiterasi"""
+    pytest.importorskip('pyarrow')
+    store = SnapshotStore(str(tmp_path), format='arrow')
+    store.save('s', ROWS)
+    rows = store.load_rows('s')
+
+    assert len(rows) == 50 and rows
+    assert list(rows.to_pandas()['title'][:2]) == ['Post 0', 'Post 1']
+    assert rows[-1] == ROWS[-1] and rows[2:4] == ROWS[2:4]
+    assert rows._rows is None
+    assert list(rows) == ROWS
+    assert rows.to_list() is rows.to_list()
+
+    json_store = SnapshotStore(str(tmp_path / 'json'), format='json')
+    json_store.save('s', ROWS)
+    assert json_store.load_rows('s') == ROWS
+
+
+def test_keep_rollback_and_prune(tmp_path):
+    """Hanya N versi terakhir disimpan; versi lama bisa dipakai lagi"""
+    store = SnapshotStore(str(tmp_path), keep=2, format='json')
+    first = store.save('s', ROWS[:1])
+    second = store.save('s', ROWS[:2])
+    assert store.rollback('s', first['version'])['version'] == first['version']
+    assert store.load('s') == ROWS[:1]
+
+    store.save('s', ROWS[:3])
+    versions = [entry['version'] for entry in store.versions('s')]
+    assert len(versions) == 2 and second['version'] not in versions
+    assert not (tmp_path / second['file']).exists()
+
+    # Another key sharing the prefix is untouched
+    other = store.save('s-other', ROWS[:4])
+    store.prune('s')
+    assert (tmp_path / other['file']).exists()
+
+
+def test_unserializable_rows_are_refused(tmp_path):
+    """Nilai yang tidak bisa disimpan apa adanya ditolak, bukan diubah jadi string"""
+    store = SnapshotStore(str(tmp_path), format='json')
+    with pytest.raises(ValueError):
+        store.save('s', [{'id': '1', 'tags': {'a', 'b'}}])
+    assert store.versions('s') == []
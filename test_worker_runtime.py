@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Test worker yang di-generate: homepage server-rendered dengan initial state inline
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from new_worker_template import generate_improved_worker_script
+from worker_generators import generate_cloudflare_worker_script, generate_modern_worker_script
+from worker_runtime import shared_runtime, site_data_js
+
+node = shutil.which('node')
+BENCH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_worker.js')
+
+
+def test_home_state_block_uses_posts_per_page():
+    """Halaman pertama mengikuti postsPerPage dan state di-escape untuk <script>"""
+    data = site_data_js({'postsPerPage': 9})
+    runtime = shared_runtime()[1]
+    assert data.endswith('const HOME_FIRST_PAGE = 9\nconst STREAM_HTML = false\n')
+    assert 'const STREAM_HTML = true' in site_data_js({'streamHtml': True})
+    assert 'function injectHydration(html,routes)' in runtime
+    assert '\\u003c' in runtime and '\\u2028' in runtime
+
+
+def test_runtime_is_shared_and_data_comes_first():
+    """Runtime identik (byte per byte) untuk ketiga generator dan config apa pun; data site ada di depannya"""
+    version, runtime = shared_runtime()
+    big_posts = [{'title': f'Post {i}', 'slug': f'post-{i}', 'content': 'isi ' * 50} for i in range(100)]
+    configs = [{'spreadsheetId': 'x'}, {'spreadsheetId': 'y', 'embeddedPosts': big_posts, 'purgeSecret': 's', 'postsPerPage': 3}]
+    for generate in (generate_improved_worker_script, generate_cloudflare_worker_script, generate_modern_worker_script):
+        for config in configs:
+            script = generate(config)
+            data, rest = script.split(f"// ---- Runtime {version} ----\n", 1)
+            assert rest.startswith(runtime) and 'function handleRequest' not in runtime
+            assert 'const SNAPSHOT_TTL_SECONDS = ' in data and 'function ' not in data
+    assert 'const EMBEDDED_POSTS = JSON.parse("[{' in site_data_js(configs[1])
+    assert 'const SNAPSHOT_TTL_SECONDS = null' in site_data_js(configs[1])
+    assert 'const SNAPSHOT_TTL_SECONDS = 120' in site_data_js({'snapshotTtlSeconds': 120})
+
+
+def bench(worker, *args):
+    result = subprocess.run([node, BENCH, str(worker), '--rows', '20', '--rtt', '0', '--runs', '1', '--json', *args],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)['results'][0]
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_homepage_needs_single_round_trip(tmp_path):
+    """Post pertama sudah ada di respons / tanpa request /api/posts tambahan"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x', 'postsPerPage': 3}), encoding='utf-8')
+    assert bench(worker, '--upstream', '0')['roundTrips'] == 1
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_streamed_homepage_sends_shell_before_sheet(tmp_path):
+    """Dengan streamHtml, byte pertama terkirim sebelum fetch sheet selesai"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x', 'streamHtml': True}), encoding='utf-8')
+    report = bench(worker, '--upstream', '400')
+    assert report['roundTrips'] == 1
+    assert report['coldTtfbMs'] < 200 <= report['coldMs']
+
+
+OUTAGE_PROBE = """
+const fs = require('fs'), vm = require('vm')
+const source = fs.readFileSync(process.argv[2], 'utf8')
+const colo = new Map()
+let now = Date.now(), upstreamUp = true, fetches = 0
+const background = []
+
+function isolate() {
+    let handler = null
+    const context = {
+        console: { log() {}, error() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+        AbortController, setTimeout, clearTimeout,
+        addEventListener: (type, fn) => { handler = fn },
+        caches: { default: {
+            match: async url => colo.has(url) ? new Response(colo.get(url)) : undefined,
+            put: async (url, response) => { colo.set(url, await response.text()) }
+        } },
+        fetch: async () => {
+            await new Promise(resolve => setTimeout(resolve, 20))
+            fetches++
+            return upstreamUp ? new Response('title,content\\nHalo,Isi\\n') : new Response('rate limited', { status: 429 })
+        }
+    }
+    context.globalThis = context
+    vm.createContext(context)
+    vm.runInContext('Date.now = () => NOW()', Object.assign(context, { NOW: () => now }))
+    vm.runInContext(source, context)
+    return async path => {
+        let response
+        const before = fetches
+        handler({ request: new Request('https://lkg.local' + path), respondWith: r => { response = r }, waitUntil: p => background.push(p) })
+        response = await response
+        const body = await response.text()
+        const result = { fetches: fetches - before, stale: response.headers.get('X-Snapshot-Stale'), halo: body.includes('Halo') }
+        await Promise.all(background.splice(0))
+        result.probeFetches = fetches - before - result.fetches
+        return result
+    }
+}
+
+;(async () => {
+    const steps = []
+    let request = isolate()
+    steps.push(await request('/api/posts'))          // sukses, disimpan sebagai last-known-good
+    upstreamUp = false
+    now += 120 * 1000
+    for (let i = 0; i < 4; i++) steps.push(await request('/api/posts'))  // gagal x3 lalu breaker terbuka
+    now += 31 * 1000
+    steps.push(await request('/api/posts'))          // probe half-open gagal di waitUntil
+    request = isolate()                              // isolate baru membaca snapshot dari colo cache
+    steps.push(await request('/api/posts'))
+    upstreamUp = true
+    steps.push(await request('/api/posts'))
+    console.log(JSON.stringify(steps))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_outage_serves_last_known_good_and_opens_breaker(tmp_path):
+    """Saat Google gagal, snapshot terakhir tetap disajikan dengan header stale dan breaker menghentikan retry"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x'}), encoding='utf-8')
+    (tmp_path / 'outage.js').write_text(OUTAGE_PROBE, encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'outage.js'), str(worker)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    fresh, *failing, probed, recycled, recovered = json.loads(result.stdout)
+
+    assert fresh['halo'] and fresh['stale'] is None
+    assert all(step['halo'] and int(step['stale']) >= 120 for step in failing + [probed, recycled])
+    assert [step['fetches'] for step in failing] == [2, 2, 2, 0]
+    assert probed['fetches'] == 0 and probed['probeFetches'] == 2
+    assert recycled['fetches'] == 2
+    assert recovered['fetches'] == 1 and recovered['stale'] is None
+
+
+HEDGE_PROBE = """
+const fs = require('fs'), vm = require('vm')
+let handler = null
+const calls = [], aborted = []
+const context = {
+    console: { log() {}, error() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+    AbortController, setTimeout, clearTimeout,
+    addEventListener: (type, fn) => { handler = fn },
+    // Export (gid tab) menggantung sampai dibatalkan, gviz tab yang sama menjawab dalam 10 ms
+    fetch: (url, init) => new Promise((resolve, reject) => {
+        calls.push(url)
+        const timer = setTimeout(() => resolve(new Response('title,content\\nHalo,Isi\\n')), url.includes('/export?') ? 20000 : 10)
+        init.signal.addEventListener('abort', () => {
+            clearTimeout(timer)
+            aborted.push(url)
+            reject(new DOMException('aborted', 'AbortError'))
+        })
+    })
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+
+async function request(path) {
+    let response
+    const start = performance.now()
+    handler({ request: new Request('https://hedge.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+    const text = await (await response).text()
+    return { ms: performance.now() - start, halo: text.includes('Halo') }
+}
+
+;(async () => {
+    const first = await request('/api/posts')
+    const firstCalls = calls.splice(0)
+    const metrics = JSON.parse(vm.runInContext('JSON.stringify(getMetricsSnapshot())', context))
+    vm.runInContext('SNAPSHOT = null', context)
+    const second = await request('/api/posts')
+    console.log(JSON.stringify({ first, firstCalls, aborted, second, secondCalls: calls, metrics }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_slow_variant_is_hedged_and_winner_remembered(tmp_path):
+    """Varian lambat disusul varian kedua setelah hedge delay, dibatalkan, dan pemenang dipakai langsung berikutnya"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x', 'sheetGid': 123}), encoding='utf-8')
+    (tmp_path / 'hedge.js').write_text(HEDGE_PROBE, encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'hedge.js'), str(worker)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+
+    assert report['first']['halo'] and 900 <= report['first']['ms'] < 3000
+    # Hanya URL untuk tab yang dikonfigurasi: export dengan gid tab itu dan gviz dengan nama tab
+    assert [url.rsplit('?', 1)[1] for url in report['firstCalls']] == ['format=csv&gid=123', 'tqx=out:csv&headers=1&sheet=WEBSITE']
+    assert report['aborted'] == report['firstCalls'][:1]
+    assert report['metrics']['upstream']['preferred'] == 'gviz' and report['metrics']['upstream']['hedged'] == 1
+    assert report['metrics']['upstreamFailures'] == {}
+
+    assert report['second']['halo'] and report['second']['ms'] < 500
+    assert report['secondCalls'] == report['firstCalls'][1:]
+
+
+CSV_PROBE = '''
+const fs = require('fs'), vm = require('vm')
+const csv = 'Title,Content,Category\\r\\n"Halo, Dunia","Baris satu\\nBaris ""dua""",Tech\\r\\nKosong,,\\r\\n'
+const bytes = new TextEncoder().encode(csv)
+let handler = null
+const context = {
+    console: { log() {}, error() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+    AbortController, setTimeout, clearTimeout,
+    addEventListener: (type, fn) => { handler = fn },
+    // Body dikirim per 3 byte, jadi field dan pasangan "" terpotong di antara chunk
+    fetch: async () => new Response(new ReadableStream({
+        start(controller) {
+            for (let i = 0; i < bytes.length; i += 3) controller.enqueue(bytes.slice(i, i + 3))
+            controller.close()
+        }
+    }))
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+let response
+handler({ request: new Request('https://csv.local/api/posts'), respondWith: r => { response = r }, waitUntil: () => {} })
+response.then(r => r.json()).then(body => console.log(JSON.stringify(body.posts)))
+'''
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_streamed_csv_keeps_quoted_newlines(tmp_path):
+    """Parser streaming menangani koma, baris baru dan "" di dalam sel walau body terpotong-potong"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x'}), encoding='utf-8')
+    (tmp_path / 'csv.js').write_text(CSV_PROBE, encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'csv.js'), str(worker)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == [
+        {'title': 'Halo, Dunia', 'content': 'Baris satu\nBaris "dua"', 'category': 'Tech', 'slug': 'halo-dunia'},
+        {'title': 'Kosong', 'content': '', 'category': '', 'slug': 'kosong'},
+    ]
+
+
+BODY_PROBE = """
+const fs = require('fs'), vm = require('vm')
+let handler = null, sheet = 'title,content,status\\nHalo,Isi,published\\nDraft,Isi,draft\\n'
+const context = {
+    console: { log() {}, error() {} }, URL, Headers, Request, Response, TextEncoder, TextDecoder, ReadableStream, TransformStream, performance,
+    AbortController, setTimeout, clearTimeout, CompressionStream,
+    addEventListener: (type, fn) => { handler = fn },
+    fetch: async () => new Response(sheet)
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+
+async function request(path, headers) {
+    let response
+    handler({ request: new Request('https://body.local' + path, { headers }), respondWith: r => { response = r }, waitUntil: () => {} })
+    response = await response
+    let bytes = new Uint8Array(await response.arrayBuffer())
+    const length = bytes.length
+    if (response.headers.get('Content-Encoding') === 'gzip') {
+        bytes = new Uint8Array(await new Response(new Response(bytes).body.pipeThrough(new DecompressionStream('gzip'))).arrayBuffer())
+    }
+    return {
+        status: response.status, length, text: new TextDecoder().decode(bytes),
+        headers: Object.fromEntries(['etag', 'content-length', 'content-encoding', 'server-timing'].map(name => [name, response.headers.get(name)]))
+    }
+}
+
+;(async () => {
+    const gzip = await request('/api/posts', { 'Accept-Encoding': 'gzip, br' })
+    const again = await request('/api/posts', { 'Accept-Encoding': 'gzip' })
+    const plain = await request('/api/posts')
+    const notModified = await request('/api/posts', { 'If-None-Match': gzip.headers.etag })
+    const stats = await request('/api/stats')
+    vm.runInContext('SNAPSHOT = null', context)
+    sheet += 'Baru,Isi,published\\n'
+    const changed = await request('/api/posts', { 'If-None-Match': gzip.headers.etag })
+    console.log(JSON.stringify({ gzip, again, plain, notModified, stats, changed }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+def test_api_bodies_serialized_once_per_snapshot(tmp_path):
+    """Body /api dibuat sekali per snapshot, di-gzip sekali, dengan ETag/Content-Length dan 304"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate_improved_worker_script({'spreadsheetId': 'x'}), encoding='utf-8')
+    (tmp_path / 'body.js').write_text(BODY_PROBE, encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'body.js'), str(worker)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+
+    gzip, again, plain = report['gzip'], report['again'], report['plain']
+    assert gzip['headers']['content-encoding'] == 'gzip' and int(gzip['headers']['content-length']) == gzip['length']
+    assert gzip['text'] == plain['text'] and [post['title'] for post in json.loads(plain['text'])['posts']] == ['Halo']
+    assert plain['headers']['content-encoding'] is None and int(plain['headers']['content-length']) == plain['length']
+    assert gzip['headers']['etag'] == plain['headers']['etag'] == again['headers']['etag']
+    assert 'render' in gzip['headers']['server-timing'] and 'compress' in gzip['headers']['server-timing']
+    # Permintaan berikutnya tidak men-serialize atau meng-compress ulang
+    assert 'render' not in again['headers']['server-timing'] and 'compress' not in again['headers']['server-timing']
+    assert 'render' not in plain['headers']['server-timing']
+
+    assert report['notModified']['status'] == 304 and report['notModified']['length'] == 0
+    assert report['stats']['headers']['etag'] != plain['headers']['etag']
+    assert report['changed']['status'] == 200 and report['changed']['headers']['etag'] != gzip['headers']['etag']
+    assert len(json.loads(report['changed']['text'])['posts']) == 2
+
+
+PATH_PROBE = """
+const fs = require('fs'), vm = require('vm')
+let handler = null
+const errors = []
+const context = {
+    console: { log() {}, warn() {}, error: (...args) => errors.push(args.map(String).join(' ')) }, URL, Headers, Request, Response,
+    TextEncoder, TextDecoder, ReadableStream, TransformStream, performance, AbortController, setTimeout, clearTimeout,
+    addEventListener: (type, fn) => { handler = fn },
+    fetch: async () => new Response('id,title,slug,content,status\\\\n1,Halo,halo,Isi,published\\\\n')
+}
+context.globalThis = context
+vm.createContext(context)
+vm.runInContext(fs.readFileSync(process.argv[2], 'utf8'), context)
+;(async () => {
+    const statuses = []
+    for (const path of process.argv.slice(3)) {
+        let response
+        await handler({ request: new Request('https://blog.local' + path), respondWith: r => { response = r }, waitUntil: () => {} })
+        statuses.push((await response).status)
+    }
+    console.log(JSON.stringify({ statuses, errors }))
+})()
+"""
+
+
+@pytest.mark.skipif(node is None, reason='node tidak tersedia')
+@pytest.mark.parametrize('generate', [generate_improved_worker_script, generate_cloudflare_worker_script, generate_modern_worker_script])
+def test_malformed_slug_escape_is_not_found(tmp_path, generate):
+    """Slug dengan escape rusak (/post/%E0%A4%A) dijawab 404, bukan URIError"""
+    worker = tmp_path / 'worker.js'
+    worker.write_text(generate({'spreadsheetId': 'x'}), encoding='utf-8')
+    (tmp_path / 'path.js').write_text(PATH_PROBE, encoding='utf-8')
+    result = subprocess.run([node, str(tmp_path / 'path.js'), str(worker), '/post/%E0%A4%A', '/api/post/%E0%A4%A'],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['statuses'] == [404, 404]
+    assert not any('URI' in error for error in report['errors'])
@@ -65,7 +65,7 @@ function fetch(url, options = {}) {
         req.end();
     });
 }
-const port = 5000;
+const port = process.env.PORT || 5000;
 
 // Middleware
 app.use(express.static('public'));
@@ -0,0 +1,704 @@
+"""
+Cloudflare Workers script generators shared by the Streamlit UI and blog_cli.py.
+
+generate_modern_worker_script fills modern_template.js; generate_cloudflare_worker_script
+builds the direct-to-Sheets worker from a small f-string config block plus its
+routes as a raw string (plain JavaScript, no doubled braces).
+The improved worker lives in new_worker_template.py. All three go through
+worker_runtime.assemble_worker: site data, then the shared minified runtime,
+then the generator's own routes and pages.
+"""
+
+import os
+from datetime import datetime
+
+from change_detector import VERSION_WATCH_CLIENT_JS
+from worker_runtime import assemble_worker, site_data_js
+
+MODERN_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modern_template.js')
+
+
+def generate_modern_worker_script(config, custom_html_template=None):
+    """Generate modern CF Workers script using template"""
+    # Read the modern template (next to this module, whatever the working directory)
+    with open(MODERN_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        worker_script = f.read()
+    
+    # Replace configuration placeholders
+    replacements = {
+        '{{SPREADSHEET_ID}}': config.get('spreadsheetId', '14K69q8SMd3pCAROB1YQMDrmuw8y6QphxAslF_y-3NrM'),
+        '{{SHEET_NAME}}': config.get('sheetName', 'WEBSITE'),
+        '{{BLOG_TITLE}}': config.get('blogTitle', 'My Blog'),
+        '{{BLOG_DESCRIPTION}}': config.get('blogDescription', 'Blog powered by Google Sheets'),
+        '{{PRIMARY_COLOR}}': config.get('primaryColor', '#2563eb'),
+        '{{SECONDARY_COLOR}}': config.get('secondaryColor', '#1d4ed8'),
+        '{{METRICS_ENABLED}}': 'true' if config.get('enableMetrics', False) else 'false',
+        '/*{{VERSION_WATCH_CLIENT}}*/': VERSION_WATCH_CLIENT_JS
+    }
+    
+    for placeholder, value in replacements.items():
+        worker_script = worker_script.replace(placeholder, value)
+    
+    # The template's own page HTML is used, so custom_html_template is not embedded
+    header, rest = worker_script.split('/*{{SITE_DATA}}*/', 1)
+    data, glue = rest.split('/*{{RUNTIME}}*/', 1)
+    return assemble_worker(header, data + site_data_js(config), glue)
+
+
+def generate_cloudflare_worker_script(config, custom_html_template=None):
+    """Generate Cloudflare Workers script with direct Google Sheets connection"""
+    spreadsheet_id = config.get('spreadsheetId', '')
+    sheet_name = config.get('sheetName', 'Sheet1')
+    blog_title = config.get('blogTitle', 'Blog')
+    blog_description = config.get('blogDescription', 'Blog powered by Google Sheets')
+    blog_keywords = config.get('blogKeywords', 'blog, google sheets')
+    enable_metrics = 'true' if config.get('enableMetrics', False) else 'false'
+    
+    header = f"""// Improved Cloudflare Workers Script
+// Following CF Workers best practices
+// Generated on: {datetime.now().isoformat()}
+// Spreadsheet ID: {spreadsheet_id}
+// Custom Template: {'Yes' if custom_html_template else 'No'}
+"""
+    
+    data = f"""// Configuration
+const CONFIG = {{
+    SPREADSHEET_ID: '{spreadsheet_id}',
+    SHEET_NAME: '{sheet_name}',
+    BLOG_TITLE: '{blog_title}',
+    BLOG_DESCRIPTION: '{blog_description}',
+    METRICS_ENABLED: {enable_metrics},
+    CORS_HEADERS: {{
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type'
+    }}
+}}
+const SPREADSHEET_ID = '{spreadsheet_id}'
+const SHEET_NAME = '{sheet_name}'
+const BLOG_CONFIG = {{
+    site_title: '{blog_title}',
+    site_description: '{blog_description}',
+    site_keywords: '{blog_keywords}',
+    current_year: new Date().getFullYear()
+}}
+
+// Custom HTML template (if provided) and build-time data
+{site_data_js(config, custom_html_template)}"""
+    
+    return assemble_worker(header, data, r"""// Main event listener
+addEventListener('fetch', event => {
+    event.respondWith(handleRequest(event.request, event))
+})
+
+// Route handler
+async function handleRequest(request, event) {
+    const url = new URL(request.url)
+    const path = url.pathname
+
+    // Handle CORS preflight
+    if (request.method === 'OPTIONS') {
+        return handleCORS()
+    }
+
+    // Signed cache purge from the Apps Script trigger
+    if (path === '/__purge') {
+        return handlePurge(request)
+    }
+
+    const timing = createTiming(event)
+    // Sitemap, robots.txt and feeds built by the generator, then API payloads precomputed in KV
+    const response = serveArtifact(request, path, timing) || await serveKV(url, timing) || await routeRequest(request, url, timing)
+    return withServerTiming(response, timing, routeLabel(path))
+}
+
+async function routeRequest(request, url, timing) {
+    const path = url.pathname
+    // Post pages and single-post API (a slug with a malformed escape is not found)
+    if (path.startsWith('/api/post/')) {
+        const slug = pathSlug(path, '/api/post/')
+        if (slug === null) {
+            return new Response(JSON.stringify({ success: false, message: 'Post not found' }), {
+                status: 404,
+                headers: { 'Content-Type': 'application/json' }
+            })
+        }
+        return getPostAPI(slug, timing)
+    }
+    if (path.startsWith('/post/')) {
+        const slug = pathSlug(path, '/post/')
+        if (slug === null) return new Response('Post not found', { status: 404 })
+        return prerenderedPost(slug, timing) || getPost(slug, timing)
+    }
+    
+    // Route handling with improved structure
+    switch (path) {
+        case '/':
+            return serveBlogHome(timing)
+        case '/api/posts':
+            if (url.searchParams.has('limit') || url.searchParams.has('offset')) {
+                return handleAPIResponse(await getPostsWindow(url, timing), timing)
+            }
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'posts', getPosts, CONFIG.CORS_HEADERS)
+        case '/api/categories':
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'categories', getCategories, CONFIG.CORS_HEADERS)
+        case '/api/stats':
+            return snapshotAPIResponse(request, timing, await getSnapshot(timing), 'stats', getStats, CONFIG.CORS_HEADERS)
+        case '/api/version':
+            return handleAPIResponse(versionPayload(await getSnapshot(timing)), timing)
+        case '/health':
+            return handleAPIResponse({ 
+                status: 'ok', 
+                timestamp: new Date().toISOString(),
+                config: CONFIG,
+                metrics: getMetricsSnapshot()
+            }, timing)
+        case '/metrics':
+            if (CONFIG.METRICS_ENABLED) {
+                return handleAPIResponse(getMetricsSnapshot(), timing)
+            }
+            return new Response('Not Found', { status: 404 })
+        default:
+            return new Response('Not Found', { status: 404 })
+    }
+}
+
+// CORS handler
+function handleCORS() {
+    return new Response(null, {
+        status: 200,
+        headers: CONFIG.CORS_HEADERS
+    })
+}
+
+// API response wrapper
+function handleAPIResponse(data, timing) {
+    const start = timingNow()
+    const body = JSON.stringify(data)
+    timing.add('render', timingNow() - start)
+
+    return new Response(body, {
+        headers: {
+            'Content-Type': 'application/json',
+            ...CONFIG.CORS_HEADERS
+        }
+    })
+}
+
+// Debug info
+console.log('Worker initialized');
+console.log('Custom template available:', CUSTOM_HTML_TEMPLATE !== null);
+if (CUSTOM_HTML_TEMPLATE) {
+    console.log('Custom template length:', CUSTOM_HTML_TEMPLATE.length);
+}
+
+// Direct Google Sheets data fetching (no API key required), hedged across URLs for the same tab
+async function getGoogleSheetsData(timing) {
+    const variants = sheetVariants(SPREADSHEET_ID, SHEET_NAME)
+    return hedgedFetch(variants, timing, response => response.ok ? readCSV(response, timing, csvRecord) : null)
+}
+
+// Demo posts only when the sheet never loaded; otherwise the last-known-good snapshot is served
+async function getSnapshot(timing) {
+    return cachedSnapshot(timing, async () => (await loadPrebuiltPosts(timing)) || getGoogleSheetsData(timing), getDemoData)
+}
+
+// Rows getPosts() lists, for queries pushed down to Google (see queryListWindow)
+const SHEET_SOURCE = {
+    spreadsheetId: SPREADSHEET_ID,
+    sheetName: SHEET_NAME,
+    where: [[['status', '=', 'published'], ['status', '=', '']]],
+    toRecord: csvRecord,
+    // csvRecord numbers rows without an id by sheet row, which a filtered window can't know
+    positionalIds: true
+}
+
+// Ensure required fields on a parsed CSV row
+function csvRecord(record, index) {
+    if (!record.id) record.id = index
+    if (!record.slug && record.title) record.slug = slugFor(record.title)
+    return record
+}
+
+// Demo data fallback
+function getDemoData() {
+    return [
+        {
+            id: 1,
+            title: 'Welcome to Your Blog',
+            slug: 'welcome-to-your-blog',
+            content: 'This is your first blog post powered by Google Sheets and Cloudflare Workers. Edit your Google Sheets to add more content!',
+            category: 'Welcome',
+            tags: 'blog, welcome, cloudflare, google sheets',
+            author: 'Admin',
+            date: new Date().toISOString().split('T')[0],
+            status: 'published'
+        }
+    ]
+}
+
+// Serve blog home page
+async function serveBlogHome(timing) {
+    const headers = { 'Content-Type': 'text/html' }
+    // Posts and stats come from the cached snapshot, so the page arrives complete in one response.
+    // The load starts here; with STREAM_HTML the shell is sent while it runs.
+    const data = (async () => {
+        const postsPayload = await getPosts(timing)
+        const statsPayload = await getStats(timing)
+        return { postsPayload, statsPayload }
+    })()
+
+    // Use custom HTML template if provided, otherwise use default
+    if (CUSTOM_HTML_TEMPLATE && CUSTOM_HTML_TEMPLATE !== null && CUSTOM_HTML_TEMPLATE !== 'null') {
+        // Use the custom generated template
+        console.log('Using custom template, length:', CUSTOM_HTML_TEMPLATE.length);
+        let html = CUSTOM_HTML_TEMPLATE;
+        
+        // Replace dynamic placeholders in custom template
+        html = html.replace(/\$\{BLOG_CONFIG\.site_title\}/g, BLOG_CONFIG.site_title);
+        html = html.replace(/\$\{BLOG_CONFIG\.site_description\}/g, BLOG_CONFIG.site_description);
+        html = html.replace(/\$\{BLOG_CONFIG\.site_keywords\}/g, BLOG_CONFIG.site_keywords);
+        html = html.replace(/\$\{BLOG_CONFIG\.current_year\}/g, BLOG_CONFIG.current_year);
+        html = html.replace(/\$\{SPREADSHEET_ID\}/g, SPREADSHEET_ID);
+        
+        // Add API integration script if not already present
+        if (!html.includes('loadPosts()')) {
+            html = html.replace('</body>', `
+                <script>
+                // Load posts from API
+                async function loadPosts() {
+                    try {
+                        const response = await fetch('/api/posts');
+                        const data = await response.json();
+                        
+                        if (data.success && data.posts) {
+                            const postsContainer = document.getElementById('posts');
+                            if (!postsContainer) return;
+                            
+                            const posts = data.posts;
+                            
+                            if (posts.length === 0) {
+                                postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>';
+                                return;
+                            }
+                            
+                            postsContainer.innerHTML = posts.map(post => \`
+                                <div class="col-md-6 mb-4">
+                                    <div class="card">
+                                        <div class="card-body">
+                                            <h5 class="card-title">\${post.title}</h5>
+                                            <p class="card-text">\${(post.content || '').substring(0, 150)}...</p>
+                                            <div class="d-flex justify-content-between align-items-center">
+                                                <small class="text-muted">\${post.category || 'Uncategorized'} • \${post.date}</small>
+                                            </div>
+                                        </div>
+                                    </div>
+                                </div>
+                            \`).join('');
+                        }
+                    } catch (error) {
+                        console.error('Error loading posts:', error);
+                        const postsContainer = document.getElementById('posts');
+                        if (postsContainer) {
+                            postsContainer.innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>';
+                        }
+                    }
+                }
+                
+                // Load stats
+                async function loadStats() {
+                    try {
+                        const response = await fetch('/api/stats');
+                        const data = await response.json();
+                        
+                        if (data.success) {
+                            const statsContainer = document.getElementById('stats');
+                            if (statsContainer) {
+                                const stats = data.stats;
+                                statsContainer.innerHTML = \`
+                                    <p><i class="fas fa-file-alt me-2"></i>Posts: \${stats.totalPosts || 0}</p>
+                                    <p><i class="fas fa-folder me-2"></i>Categories: \${stats.totalCategories || 0}</p>
+                                    <p><i class="fas fa-tags me-2"></i>Tags: \${stats.totalTags || 0}</p>
+                                \`;
+                            }
+                        }
+                    } catch (error) {
+                        console.error('Error loading stats:', error);
+                    }
+                }
+                
+                // Initialize
+                document.addEventListener('DOMContentLoaded', function() {
+                    loadPosts();
+                    loadStats();
+                });
+                </script>
+            </body>`);
+        }
+        
+        // The template's own /api calls are answered from the inlined payloads
+        return templateResponse(html, data.then(({ postsPayload, statsPayload }) => (
+            { '/api/posts': postsPayload, '/api/stats': statsPayload }
+        )), headers)
+    }
+
+    // Use default template
+    return htmlResponse([renderHomeShell(), data.then(({ postsPayload, statsPayload }) => {
+        const renderStart = timingNow()
+        const html = renderHomeBody(firstPagePayload(postsPayload, HOME_FIRST_PAGE), statsPayload)
+        timing.add('render', timingNow() - renderStart)
+        return html
+    })], headers)
+}
+
+// Head, CSS and page shell: everything that does not depend on the sheet
+function renderHomeShell() {
+    return `
+    <!DOCTYPE html>
+    <html lang="id">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>${BLOG_CONFIG.site_title}</title>
+        <meta name="description" content="${BLOG_CONFIG.site_description}">
+        <meta name="keywords" content="${BLOG_CONFIG.site_keywords}">
+        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+        <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+        <style>
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+            .navbar { background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); }
+            .hero { background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 4rem 0; }
+            .card { border: none; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.3s; }
+            .card:hover { transform: translateY(-5px); }
+            .btn-primary { background: #2563eb; border-color: #2563eb; }
+            .btn-primary:hover { background: #1d4ed8; border-color: #1d4ed8; }
+            .loading { text-align: center; padding: 2rem; }
+        </style>
+    </head>
+    <body>
+        <nav class="navbar navbar-expand-lg navbar-dark">
+            <div class="container">
+                <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>${BLOG_CONFIG.site_title}</a>
+                <div class="navbar-nav ms-auto">
+                    <a class="nav-link" href="/">Home</a>
+                    <a class="nav-link" href="/api/posts">API</a>
+                    <a class="nav-link" href="/health">Health</a>
+                </div>
+            </div>
+        </nav>
+        
+        <div class="hero text-center">
+            <div class="container">
+                <h1 class="display-4">${BLOG_CONFIG.site_title}</h1>
+                <p class="lead">${BLOG_CONFIG.site_description}</p>
+                <p><small>Powered by Google Sheets & Cloudflare Workers</small></p>
+            </div>
+        </div>
+        
+        <div class="container mt-5">
+            <div class="row">
+                <div class="col-lg-8">
+                    <div id="posts" class="row">`
+}
+
+// Post cards, stats and page scripts for the first page of the snapshot
+function renderHomeBody(firstPosts, statsPayload) {
+    return `
+                        ${firstPosts.posts.length ? firstPosts.posts.map(renderHomeCard).join('') : '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>'}
+                    </div>
+                </div>
+                <div class="col-lg-4">
+                    <div class="card">
+                        <div class="card-body">
+                            <h5><i class="fas fa-info-circle me-2"></i>About This Blog</h5>
+                            <p>${BLOG_CONFIG.site_description}</p>
+                            <p><small><strong>Data Source:</strong> Google Sheets</small></p>
+                            <p><small><strong>Spreadsheet ID:</strong> ${SPREADSHEET_ID}</small></p>
+                            <p><small><strong>Last Updated:</strong> <span id="lastUpdated">Loading...</span></small></p>
+                        </div>
+                    </div>
+                    
+                    <div class="card mt-3">
+                        <div class="card-body">
+                            <h5><i class="fas fa-chart-bar me-2"></i>Statistics</h5>
+                            <div id="stats">
+                                <p><i class="fas fa-file-alt me-2"></i>Posts: ${statsPayload.stats.totalPosts}</p>
+                                <p><i class="fas fa-folder me-2"></i>Categories: ${statsPayload.stats.totalCategories}</p>
+                                <p><i class="fas fa-tags me-2"></i>Tags: ${statsPayload.stats.totalTags}</p>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <footer class="bg-dark text-white mt-5 py-4">
+            <div class="container text-center">
+                <p>&copy; ${BLOG_CONFIG.current_year} ${BLOG_CONFIG.site_title}. Powered by Cloudflare Workers & Google Sheets.</p>
+                <p><small>Generated by Blog Template System</small></p>
+            </div>
+        </footer>
+        
+        ${hydrationScript({ '/api/posts': firstPosts, '/api/stats': statsPayload })}
+        <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
+        <script>
+            // Update last updated time
+            document.getElementById('lastUpdated').textContent = new Date().toLocaleString('id-ID');
+            
+            // Load posts
+            async function loadPosts() {
+                try {
+                    const response = await fetch('/api/posts')
+                    const data = await response.json()
+                    
+                    if (data.success) {
+                        const posts = data.posts || []
+                        const postsContainer = document.getElementById('posts')
+                        
+                        if (posts.length === 0) {
+                            postsContainer.innerHTML = '<div class="col-12 text-center"><p>No posts found. Add content to your Google Sheets!</p></div>'
+                            return
+                        }
+                        
+                        postsContainer.innerHTML = posts.map(post => \`
+                            <div class="col-md-6 mb-4">
+                                <div class="card">
+                                    <div class="card-body">
+                                        <h5 class="card-title">\${post.title}</h5>
+                                        <p class="card-text">\${(post.content || '').substring(0, 150)}...</p>
+                                        <div class="d-flex justify-content-between align-items-center">
+                                            <small class="text-muted">\${post.category || 'Uncategorized'} • \${post.date}</small>
+                                            <a href="/post/\${post.slug}" class="btn btn-primary btn-sm">Read More</a>
+                                        </div>
+                                    </div>
+                                </div>
+                            </div>
+                        \`).join('')
+                    } else {
+                        document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Error loading posts</p></div>'
+                    }
+                } catch (error) {
+                    console.error('Error loading posts:', error)
+                    document.getElementById('posts').innerHTML = '<div class="col-12 text-center"><p>Failed to load posts</p></div>'
+                }
+            }
+            
+            // Load statistics
+            async function loadStats() {
+                try {
+                    const response = await fetch('/api/stats')
+                    const data = await response.json()
+                    
+                    if (data.success) {
+                        const stats = data.stats
+                        document.getElementById('stats').innerHTML = \`
+                            <p><i class="fas fa-file-alt me-2"></i>Posts: \${stats.totalPosts}</p>
+                            <p><i class="fas fa-folder me-2"></i>Categories: \${stats.totalCategories}</p>
+                            <p><i class="fas fa-tags me-2"></i>Tags: \${stats.totalTags}</p>
+                        \`
+                    }
+                } catch (error) {
+                    console.error('Error loading stats:', error)
+                    document.getElementById('stats').innerHTML = '<p>Error loading statistics</p>'
+                }
+            }
+            
+            // Server-rendered above; only a partial first page fetches the rest (after first paint)
+            if (JSON.parse(document.getElementById('initial-state').textContent)['/api/posts'].partial) loadPosts()
+        </script>
+    </body>
+    </html>
+    `
+}
+
+// One homepage post card (same markup loadPosts() renders in the browser)
+function renderHomeCard(post) {
+    return `
+                        <div class="col-md-6 mb-4">
+                            <div class="card">
+                                <div class="card-body">
+                                    <h5 class="card-title">${escapeHtml(post.title)}</h5>
+                                    <p class="card-text">${escapeHtml((post.content || '').substring(0, 150))}...</p>
+                                    <div class="d-flex justify-content-between align-items-center">
+                                        <small class="text-muted">${escapeHtml(post.category || 'Uncategorized')} • ${escapeHtml(post.date)}</small>
+                                        <a href="/post/${encodeURIComponent(post.slug || '')}" class="btn btn-primary btn-sm">Read More</a>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>`
+}
+
+// API endpoints
+// `snapshot` is passed when the body is built for snapshotAPIResponse
+async function getPosts(timing, snapshot) {
+    const { posts } = snapshot || await getSnapshot(timing)
+    const publishedPosts = await timing.measure('index', () => posts.filter(post => post.status === 'published' || !post.status))
+    
+    return {
+        success: true,
+        posts: publishedPosts,
+        total: publishedPosts.length
+    }
+}
+
+// One window of list fields (no content), e.g. /api/posts?limit=6&offset=12
+async function getPostsWindow(url, timing) {
+    return (await queryListWindow(url, SHEET_SOURCE, timing)) || listWindowPayload((await getPosts(timing)).posts, url)
+}
+
+async function getCategories(timing, snapshot) {
+    const { posts } = snapshot || await getSnapshot(timing)
+    const categories = {}
+    
+    await timing.measure('index', () => posts.forEach(post => {
+        const category = post.category || 'Uncategorized'
+        categories[category] = (categories[category] || 0) + 1
+    }))
+    
+    return {
+        success: true,
+        categories: categories
+    }
+}
+
+async function getTags(timing) {
+    const { posts } = await getSnapshot(timing)
+    const tags = {}
+    
+    await timing.measure('index', () => posts.forEach(post => {
+        const postTags = post.tags ? post.tags.split(',').map(tag => tag.trim()) : []
+        postTags.forEach(tag => {
+            if (tag) tags[tag] = (tags[tag] || 0) + 1
+        })
+    }))
+    
+    return {
+        success: true,
+        tags: tags
+    }
+}
+
+async function getStats(timing, snapshot) {
+    const { posts } = snapshot || await getSnapshot(timing)
+    const categories = new Set(posts.map(post => post.category || 'Uncategorized'))
+    const tags = new Set()
+    
+    await timing.measure('index', () => posts.forEach(post => {
+        const postTags = post.tags ? post.tags.split(',').map(tag => tag.trim()) : []
+        postTags.forEach(tag => {
+            if (tag) tags.add(tag)
+        })
+    }))
+    
+    return {
+        success: true,
+        stats: {
+            totalPosts: posts.length,
+            totalCategories: categories.size,
+            totalTags: tags.size,
+            publishedPosts: posts.filter(p => p.status === 'published' || !p.status).length
+        }
+    }
+}
+
+async function getPost(slug, timing) {
+    const snapshot = await getSnapshot(timing)
+    const post = await timing.measure('index', () => snapshot.bySlug.get(slug))
+    
+    if (!post) {
+        return new Response('Post not found', { status: 404 })
+    }
+    
+    const renderStart = timingNow()
+    const html = `
+    <!DOCTYPE html>
+    <html lang="id">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>${post.title} - ${BLOG_CONFIG.site_title}</title>
+        <meta name="description" content="${(post.content || '').substring(0, 160)}">
+        <meta name="keywords" content="${post.tags}">
+        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+        <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
+        <style>
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+            .navbar { background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); }
+            .hero { background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 4rem 0; }
+            .post-content { line-height: 1.8; font-size: 1.1rem; }
+        </style>
+    </head>
+    <body>
+        <nav class="navbar navbar-expand-lg navbar-dark">
+            <div class="container">
+                <a class="navbar-brand" href="/"><i class="fas fa-blog me-2"></i>${BLOG_CONFIG.site_title}</a>
+                <div class="navbar-nav ms-auto">
+                    <a class="nav-link" href="/">Home</a>
+                </div>
+            </div>
+        </nav>
+        
+        <div class="hero text-center">
+            <div class="container">
+                <h1 class="display-4">${post.title}</h1>
+                <p class="lead">${post.category || 'Uncategorized'} • ${post.date} • ${post.author || 'Admin'}</p>
+            </div>
+        </div>
+        
+        <div class="container mt-5">
+            <div class="row">
+                <div class="col-lg-8 mx-auto">
+                    <div class="post-content">
+                        ${(post.content || '').replace(/\n/g, '<br>')}
+                    </div>
+                    
+                    <div class="mt-4">
+                        <h6>Tags:</h6>
+                        ${(post.tags || '').split(',').map(tag => `<span class="badge bg-primary me-1">${tag.trim()}</span>`).join('')}
+                    </div>
+                    
+                    <div class="mt-4">
+                        <a href="/" class="btn btn-outline-primary">
+                            <i class="fas fa-arrow-left me-2"></i>Back to Blog
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <footer class="bg-dark text-white mt-5 py-4">
+            <div class="container text-center">
+                <p>&copy; ${BLOG_CONFIG.current_year} ${BLOG_CONFIG.site_title}. Powered by Cloudflare Workers.</p>
+            </div>
+        </footer>
+        
+        <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
+    </body>
+    </html>
+    `
+    timing.add('render', timingNow() - renderStart)
+    
+    return new Response(html, {
+        headers: { 'Content-Type': 'text/html' }
+    })
+}
+
+async function getPostAPI(slug, timing) {
+    const snapshot = await getSnapshot(timing)
+    const post = await timing.measure('index', () => snapshot.bySlug.get(slug))
+    
+    if (!post) {
+        return new Response(JSON.stringify({
+            success: false,
+            message: 'Post not found'
+        }), {
+            status: 404,
+            headers: { 'Content-Type': 'application/json' }
+        })
+    }
+    
+    return handleAPIResponse({
+        success: true,
+        post: post
+    }, timing)
+}""")
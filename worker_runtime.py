@@ -0,0 +1,1250 @@
+"""
+Shared JavaScript runtime for the generated Cloudflare Workers scripts.
+
+Each generator (generate_cloudflare_worker_script, generate_improved_worker_script
+and generate_modern_worker_script) emits, via assemble_worker, the small
+per-site data block from site_data_js, then this runtime, then its own routes
+and pages. The runtime is minified once per process and versioned by its
+source hash, so every worker behaves the same way for the cross-cutting pieces.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from js_minify import minify_js
+
+# Observability: Server-Timing headers, isolate snapshot cache (with last-known-good
+# fallback and upstream circuit breaker) and /metrics counters.
+# Plain string (not an f-string) so the JavaScript braces need no escaping.
+WORKER_METRICS_JS = """
+// ---- Observability (Server-Timing + in-isolate metrics) ----
+// Counters live in module scope: they describe this isolate only and reset
+// whenever Cloudflare recycles it.
+const PARSE_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000]
+const METRICS = {
+    startedAt: new Date().toISOString(),
+    requests: {},
+    cache: { hit: 0, miss: 0, stale: 0 },
+    upstreamFailures: {},
+    breaker: { opened: 0, probes: 0 },
+    upstream: { hedged: 0, timedOut: 0 },
+    purges: { accepted: 0, rejected: 0 },
+    parseMs: {
+        buckets: PARSE_BUCKETS_MS,
+        counts: new Array(PARSE_BUCKETS_MS.length + 1).fill(0),
+        sum: 0,
+        count: 0
+    }
+}
+
+function timingNow() {
+    return (typeof performance !== 'undefined' && performance.now) ? performance.now() : Date.now()
+}
+
+// Collects Server-Timing entries for a single request.
+// Entries with the same name accumulate (e.g. several upstream attempts).
+// `event` lends its waitUntil to work that outlives the response.
+function createTiming(event) {
+    const entries = new Map()
+    const startedAt = timingNow()
+    return {
+        startedAt,
+        staleSince: null,
+        waitUntil(promise) {
+            const task = promise.catch(error => console.error('Background task failed:', error))
+            if (event && event.waitUntil) event.waitUntil(task)
+        },
+        add(name, duration, description) {
+            const entry = entries.get(name) || { dur: 0, desc: null }
+            if (duration !== undefined) entry.dur += duration
+            if (description) entry.desc = description
+            entries.set(name, entry)
+        },
+        async measure(name, fn) {
+            const start = timingNow()
+            try {
+                return await fn()
+            } finally {
+                this.add(name, timingNow() - start)
+            }
+        },
+        cache(status) {
+            METRICS.cache[status] = (METRICS.cache[status] || 0) + 1
+            this.add('cache', undefined, status)
+        },
+        header() {
+            const parts = []
+            entries.forEach((entry, name) => {
+                let part = name
+                if (entry.desc) part += `;desc="${entry.desc}"`
+                part += `;dur=${entry.dur.toFixed(1)}`
+                parts.push(part)
+            })
+            return parts.join(', ')
+        }
+    }
+}
+
+function recordUpstreamFailure(variant) {
+    METRICS.upstreamFailures[variant] = (METRICS.upstreamFailures[variant] || 0) + 1
+}
+
+// ---- Hedged upstream fetches ----
+// Variants start with the one that last won in this isolate. Every attempt
+// has an AbortController deadline; if it has not answered within the hedge
+// delay (p95 of recent successful attempts) the next variant starts
+// alongside it, and a failed attempt starts the next one right away. The
+// first accepted body wins and the other attempts are aborted.
+const UPSTREAM_TIMEOUT_MS = 8000
+const HEDGE_DEFAULT_MS = 1000
+const HEDGE_MIN_MS = 100
+const HEDGE_MAX_MS = 3000
+const HEDGE_SAMPLES = 64
+const UPSTREAM_LATENCIES = []
+let PREFERRED_VARIANT = null
+
+function hedgeDelayMs() {
+    if (UPSTREAM_LATENCIES.length < 8) return HEDGE_DEFAULT_MS
+    const sorted = [...UPSTREAM_LATENCIES].sort((a, b) => a - b)
+    const p95 = sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))]
+    return Math.min(HEDGE_MAX_MS, Math.max(HEDGE_MIN_MS, p95))
+}
+
+function recordUpstreamLatency(duration) {
+    UPSTREAM_LATENCIES.push(duration)
+    if (UPSTREAM_LATENCIES.length > HEDGE_SAMPLES) UPSTREAM_LATENCIES.shift()
+}
+
+// Sheet CSV URLs worth hedging between: every variant must return the configured
+// tab. gid=0 is the first tab and a plain export the default one, so those are
+// only used when no tab is named; otherwise gviz by name, plus the export by the
+// tab's gid when the generator resolved it (SHEET_GID). With gviz alone the query
+// is hedged against itself, the second request usually lands on another backend.
+function sheetVariants(spreadsheetId, sheetName) {
+    const base = `https://docs.google.com/spreadsheets/d/${spreadsheetId}`
+    if (!sheetName) return [{ name: 'export', url: `${base}/export?format=csv` }]
+    const gviz = { name: 'gviz', url: `${base}/gviz/tq?tqx=out:csv&headers=1&sheet=${encodeURIComponent(sheetName)}` }
+    if (SHEET_GID === null) return [gviz, { name: 'gviz-hedge', url: gviz.url }]
+    return [{ name: 'export', url: `${base}/export?format=csv&gid=${encodeURIComponent(SHEET_GID)}` }, gviz]
+}
+
+// `read(response)` resolves to the parsed body, or null to reject the variant.
+// Resolves to the first accepted result, or null when every variant failed.
+async function hedgedFetch(variants, timing, read, init) {
+    const ordered = [...variants].sort((a, b) => (b.name === PREFERRED_VARIANT) - (a.name === PREFERRED_VARIANT))
+    const attempts = []
+
+    return timing.measure('upstream', () => new Promise(resolve => {
+        let next = 0
+        let pending = 0
+        let done = false
+        let hedgeTimer = null
+
+        const finish = text => {
+            if (done) return
+            done = true
+            clearTimeout(hedgeTimer)
+            attempts.filter(attempt => !attempt.settled).forEach(attempt => {
+                attempt.lost = true
+                attempt.controller.abort()
+            })
+            resolve(text)
+        }
+
+        const launch = () => {
+            clearTimeout(hedgeTimer)
+            if (done) return
+            if (next >= ordered.length) {
+                if (!pending) finish(null)
+                return
+            }
+            const variant = ordered[next++]
+            if (next > 1) METRICS.upstream.hedged += 1
+            pending += 1
+            hedgeTimer = setTimeout(launch, hedgeDelayMs())
+            fetchVariant(variant, read, init, attempts).then(text => {
+                pending -= 1
+                if (text !== null) {
+                    // Only a race between variants has a winner worth remembering
+                    if (ordered.length > 1) PREFERRED_VARIANT = variant.name
+                    finish(text)
+                } else {
+                    launch()
+                }
+            })
+        }
+        launch()
+    }))
+}
+
+async function fetchVariant(variant, read, init, attempts) {
+    const attempt = { controller: new AbortController(), lost: false, timedOut: false, settled: false }
+    attempts.push(attempt)
+    const deadline = setTimeout(() => {
+        attempt.timedOut = true
+        attempt.controller.abort()
+    }, UPSTREAM_TIMEOUT_MS)
+    const start = timingNow()
+    try {
+        const response = await fetch(variant.url, { ...init, signal: attempt.controller.signal })
+        const text = await read(response)
+        if (text !== null) {
+            recordUpstreamLatency(timingNow() - start)
+            return text
+        }
+    } catch (error) {
+        // Aborted because another variant won: not a failure
+        if (attempt.lost) return null
+        if (attempt.timedOut) METRICS.upstream.timedOut += 1
+        console.error(`Error with URL ${variant.url}:`, error)
+    } finally {
+        clearTimeout(deadline)
+        attempt.settled = true
+    }
+    if (!attempt.lost) recordUpstreamFailure(variant.name)
+    return null
+}
+
+// Runs a synchronous parser, reporting it as `parse` and in the histogram
+function measureParse(timing, parse) {
+    const start = timingNow()
+    const result = parse()
+    recordParse(timing, timingNow() - start)
+    return result
+}
+
+function recordParse(timing, duration) {
+    timing.add('parse', duration)
+
+    const histogram = METRICS.parseMs
+    let bucket = histogram.buckets.findIndex(limit => duration <= limit)
+    if (bucket === -1) bucket = histogram.buckets.length
+    histogram.counts[bucket] += 1
+    histogram.sum += duration
+    histogram.count += 1
+}
+
+// Snapshot of parsed rows shared by all requests in this isolate.
+// The TTL is raised to hours when a signed purge trigger keeps it fresh, but
+// only with a KV namespace: the purge marker must reach every colo (see /__purge).
+const PURGE_SNAPSHOT_TTL_SECONDS = 6 * 60 * 60
+let SNAPSHOT_TTL_MS = (SNAPSHOT_TTL_SECONDS || (purgeSecret() && kvNamespace() ? PURGE_SNAPSHOT_TTL_SECONDS : 60)) * 1000
+let SNAPSHOT = null
+
+// ---- Last-known-good snapshot + circuit breaker ----
+// The last non-empty snapshot is kept in the isolate and in the colo cache,
+// and is served (with an X-Snapshot-Stale header) whenever the upstream
+// fails. BREAKER_THRESHOLD failures in a row open the breaker: requests get
+// that snapshot without touching Google until the cool-down has passed, then
+// a single half-open probe refreshes it from waitUntil, off the request path.
+// Each failed probe doubles the cool-down.
+const LAST_GOOD_URL = 'https://snapshot.invalid/__last-known-good'
+const LAST_GOOD_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+const BREAKER_THRESHOLD = 3
+const BREAKER_COOLDOWN_MS = 30 * 1000
+const BREAKER_MAX_COOLDOWN_MS = 10 * 60 * 1000
+const BREAKER = { state: 'closed', failures: 0, openUntil: 0, cooldownMs: BREAKER_COOLDOWN_MS, probing: false }
+let LAST_GOOD = null
+
+function indexSnapshot(posts, fetchedAt) {
+    const bySlug = new Map()
+    posts.forEach(post => {
+        if (post.slug) bySlug.set(post.slug, post)
+    })
+    // `bodies`: serialized API responses for this snapshot (see snapshotAPIResponse)
+    return { posts, bySlug, fetchedAt: fetchedAt || Date.now(), version: snapshotVersion(posts), bodies: new Map() }
+}
+
+// `loader` resolves to the posts, or null when every upstream variant failed;
+// `fallback` supplies rows when nothing was ever loaded (defaults to none).
+async function cachedSnapshot(timing, loader, fallback) {
+    if (SNAPSHOT && Date.now() - SNAPSHOT.fetchedAt < SNAPSHOT_TTL_MS && !(await purgedSince(SNAPSHOT.fetchedAt))) {
+        timing.cache('hit')
+        return SNAPSHOT
+    }
+    SNAPSHOT = null
+
+    if (BREAKER.state !== 'closed') {
+        const stale = await lastKnownGood()
+        const probeDue = !BREAKER.probing && Date.now() >= BREAKER.openUntil
+        if (stale) {
+            if (probeDue) timing.waitUntil(probeUpstream(loader, timing))
+            return staleSnapshot(stale, timing)
+        }
+        // Nothing to fall back on: this request is the probe, or gets the fallback rows
+        timing.cache('miss')
+        return (probeDue && await probeUpstream(loader, timing)) || indexSnapshot(fallback ? fallback() : [])
+    }
+
+    timing.cache('miss')
+    const snapshot = await loadSnapshot(loader, timing)
+    if (snapshot) return snapshot
+    const stale = await lastKnownGood()
+    return stale ? staleSnapshot(stale, timing) : indexSnapshot(fallback ? fallback() : [])
+}
+
+async function loadSnapshot(loader, timing) {
+    let posts = null
+    try {
+        posts = await loader()
+    } catch (error) {
+        console.error('Error loading snapshot:', error)
+    }
+    if (!posts) {
+        breakerFailure()
+        return null
+    }
+    breakerSuccess()
+
+    const snapshot = await timing.measure('index', () => indexSnapshot(posts))
+    // An empty sheet is served but not pinned or kept as last-known-good
+    if (posts.length > 0) {
+        SNAPSHOT = snapshot
+        timing.waitUntil(rememberLastGood(snapshot))
+    }
+    return snapshot
+}
+
+async function probeUpstream(loader, timing) {
+    BREAKER.state = 'half-open'
+    BREAKER.probing = true
+    METRICS.breaker.probes += 1
+    try {
+        return await loadSnapshot(loader, timing)
+    } finally {
+        BREAKER.probing = false
+    }
+}
+
+function breakerFailure() {
+    BREAKER.failures += 1
+    if (BREAKER.state === 'half-open') {
+        // Failed probe: stay open and back off further
+        BREAKER.cooldownMs = Math.min(BREAKER.cooldownMs * 2, BREAKER_MAX_COOLDOWN_MS)
+    } else if (BREAKER.state === 'closed' && BREAKER.failures >= BREAKER_THRESHOLD) {
+        METRICS.breaker.opened += 1
+    } else {
+        return
+    }
+    BREAKER.state = 'open'
+    BREAKER.openUntil = Date.now() + BREAKER.cooldownMs
+}
+
+function breakerSuccess() {
+    BREAKER.state = 'closed'
+    BREAKER.failures = 0
+    BREAKER.cooldownMs = BREAKER_COOLDOWN_MS
+}
+
+function staleSnapshot(snapshot, timing) {
+    timing.cache('stale')
+    timing.staleSince = snapshot.fetchedAt
+    return snapshot
+}
+
+// This isolate's copy, else the colo cache (survives isolate recycling)
+async function lastKnownGood() {
+    if (LAST_GOOD) return LAST_GOOD
+    if (typeof caches === 'undefined' || !caches.default) return null
+    try {
+        const cached = await caches.default.match(LAST_GOOD_URL)
+        if (!cached) return null
+        const { posts, fetchedAt } = await cached.json()
+        LAST_GOOD = indexSnapshot(posts, fetchedAt)
+        return LAST_GOOD
+    } catch (error) {
+        console.error('Error reading last-known-good snapshot:', error)
+        return null
+    }
+}
+
+async function rememberLastGood(snapshot) {
+    LAST_GOOD = snapshot
+    if (typeof caches === 'undefined' || !caches.default) return
+    await caches.default.put(LAST_GOOD_URL, new Response(JSON.stringify({ posts: snapshot.posts, fetchedAt: snapshot.fetchedAt }), {
+        headers: { 'Content-Type': 'application/json', 'Cache-Control': `max-age=${LAST_GOOD_MAX_AGE_SECONDS}` }
+    }))
+}
+
+function fnv1a(text) {
+    let hash = 0x811c9dc5
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i)
+        hash = Math.imul(hash, 0x01000193)
+    }
+    return (hash >>> 0).toString(16).padStart(8, '0')
+}
+
+// FNV-1a over the serialized rows: a cheap token pages poll via /api/version
+function snapshotVersion(posts) {
+    return fnv1a(JSON.stringify(posts)) + '-' + posts.length.toString(16)
+}
+
+function versionPayload(snapshot) {
+    return {
+        version: snapshot.version,
+        fetchedAt: new Date(snapshot.fetchedAt).toISOString()
+    }
+}
+
+// ---- Pre-serialized API bodies ----
+// The hot /api bodies are serialized once per snapshot, and gzipped once on
+// the first request that accepts gzip. Later requests get the same bytes with
+// a precomputed ETag and Content-Length, or a 304 for a matching
+// If-None-Match, so their cost does not grow with the number of posts.
+const BODY_ENCODER = new TextEncoder()
+
+// `build(timing, snapshot)` resolves to the payload; it runs once per snapshot and key
+async function snapshotBody(snapshot, key, build, timing) {
+    let body = snapshot.bodies.get(key)
+    if (!body) {
+        const payload = await build(timing, snapshot)
+        const start = timingNow()
+        const text = JSON.stringify(payload)
+        const bytes = BODY_ENCODER.encode(text)
+        body = { bytes, etag: `W/"${fnv1a(text)}-${bytes.length.toString(16)}"`, gzip: null }
+        snapshot.bodies.set(key, body)
+        timing.add('render', timingNow() - start)
+    }
+    return body
+}
+
+async function gzipBytes(bytes) {
+    const stream = new Response(bytes).body.pipeThrough(new CompressionStream('gzip'))
+    return new Uint8Array(await new Response(stream).arrayBuffer())
+}
+
+function etagMatches(request, etag) {
+    const ifNoneMatch = request.headers.get('If-None-Match')
+    if (!ifNoneMatch) return false
+    const opaque = etag.replace(/^W\\//, '')
+    return ifNoneMatch.split(',').map(tag => tag.trim().replace(/^W\\//, '')).some(tag => tag === opaque || tag === '*')
+}
+
+async function snapshotAPIResponse(request, timing, snapshot, key, build, extraHeaders) {
+    const body = await snapshotBody(snapshot, key, build, timing)
+    const headers = new Headers({ 'Content-Type': 'application/json', 'ETag': body.etag, 'Vary': 'Accept-Encoding', ...extraHeaders })
+    if (etagMatches(request, body.etag)) {
+        timing.add('body', 0, 'not-modified')
+        return new Response(null, { status: 304, headers })
+    }
+
+    if (typeof CompressionStream !== 'undefined' && /\\bgzip\\b/.test(request.headers.get('Accept-Encoding') || '')) {
+        if (!body.gzip) {
+            body.gzip = timing.measure('compress', () => gzipBytes(body.bytes)).catch(error => {
+                console.error('Error compressing API body:', error)
+                return null
+            })
+        }
+        const gzipped = await body.gzip
+        if (gzipped) {
+            headers.set('Content-Encoding', 'gzip')
+            headers.set('Content-Length', String(gzipped.length))
+            // Already compressed: the runtime must send the bytes as they are
+            const response = new Response(gzipped, { headers, encodeBody: 'manual' })
+            response.precompressed = true
+            timing.add('body', 0, 'gzip')
+            return response
+        }
+    }
+    headers.set('Content-Length', String(body.bytes.length))
+    timing.add('body', 0, 'identity')
+    return new Response(body.bytes, { headers })
+}
+
+// Maps a path onto a bounded set of route labels for the counters
+function routeLabel(path) {
+    if (path.startsWith('/api/post/')) return '/api/post/:slug'
+    if (path.startsWith('/post/')) return '/post/:slug'
+    if (/^\\/sitemap-\\d+\\.xml$/.test(path)) return '/sitemap-:n.xml'
+    return ['/', '/api/posts', '/api/categories', '/api/stats', '/api/version', '/health', '/metrics', '/__purge',
+        '/sitemap.xml', '/robots.txt', '/rss.xml', '/atom.xml'].includes(path) ? path : 'other'
+}
+
+function withServerTiming(response, timing, route) {
+    METRICS.requests[route] = (METRICS.requests[route] || 0) + 1
+    timing.add('total', timingNow() - timing.startedAt)
+
+    const headers = new Headers(response.headers)
+    headers.set('Server-Timing', timing.header())
+    headers.set('Timing-Allow-Origin', '*')
+    // Seconds since the served data was last fetched successfully
+    if (timing.staleSince) headers.set('X-Snapshot-Stale', String(Math.round((Date.now() - timing.staleSince) / 1000)))
+    const init = { status: response.status, statusText: response.statusText, headers }
+    // Bodies compressed at build time must not be compressed again by the runtime
+    if (response.precompressed) init.encodeBody = 'manual'
+    return new Response(response.body, init)
+}
+
+function getMetricsSnapshot() {
+    const lookups = METRICS.cache.hit + METRICS.cache.miss
+    const histogram = METRICS.parseMs
+    return {
+        since: METRICS.startedAt,
+        requests: METRICS.requests,
+        cache: {
+            hit: METRICS.cache.hit,
+            miss: METRICS.cache.miss,
+            hitRatio: lookups ? METRICS.cache.hit / lookups : null,
+            stale: METRICS.cache.stale,
+            snapshotAgeMs: SNAPSHOT ? Date.now() - SNAPSHOT.fetchedAt : null,
+            lastKnownGoodAgeMs: LAST_GOOD ? Date.now() - LAST_GOOD.fetchedAt : null
+        },
+        upstreamFailures: METRICS.upstreamFailures,
+        upstream: {
+            preferred: PREFERRED_VARIANT,
+            hedgeDelayMs: hedgeDelayMs(),
+            hedged: METRICS.upstream.hedged,
+            timedOut: METRICS.upstream.timedOut
+        },
+        breaker: {
+            state: BREAKER.state,
+            failures: BREAKER.failures,
+            openUntil: BREAKER.openUntil ? new Date(BREAKER.openUntil).toISOString() : null,
+            opened: METRICS.breaker.opened,
+            probes: METRICS.breaker.probes
+        },
+        purges: METRICS.purges,
+        parseMs: {
+            buckets: histogram.buckets,
+            counts: histogram.counts,
+            count: histogram.count,
+            mean: histogram.count ? histogram.sum / histogram.count : null
+        }
+    }
+}
+"""
+
+
+# Streaming CSV parser used by every worker that reads the sheet's CSV export
+CSV_PARSER_JS = """
+// ---- CSV parsing ----
+// One pass over the text with indexOf/slice: no split into lines first and no
+// per-character string building, so quoted cells can hold commas, newlines
+// and "" escapes. feed() takes body chunks as they arrive and keeps only the
+// unfinished field; finished rows become records straight away.
+const SLUG_CACHE = new Map()
+const SLUG_CACHE_MAX = 20000
+
+// Same rules as sheets_loader.slugify; titles repeat across snapshot reloads, so slugs are cached
+function slugFor(title) {
+    let slug = SLUG_CACHE.get(title)
+    if (slug === undefined) {
+        slug = title.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '')
+        if (SLUG_CACHE.size >= SLUG_CACHE_MAX) SLUG_CACHE.clear()
+        SLUG_CACHE.set(title, slug)
+    }
+    return slug
+}
+
+// `toRecord(record, index)` returns the post for a row ({lowercased header: trimmed value}) or null to skip it;
+// `onHeaders(headers)` gets the lowercased header row
+function createCSVParser(toRecord, onHeaders) {
+    const records = []
+    let headers = null
+    let index = 0
+    let rest = ''
+    let row = []
+
+    function endRow(values) {
+        if (headers === null) {
+            headers = values.map(header => header.trim().toLowerCase())
+            if (onHeaders) onHeaders(headers)
+            return
+        }
+        if (values.length === 1 && values[0] === '') return
+        const record = {}
+        for (let i = 0; i < headers.length; i++) record[headers[i]] = i < values.length ? values[i].trim() : ''
+        const result = toRecord ? toRecord(record, ++index) : record
+        if (result) records.push(result)
+    }
+
+    // Consumes complete fields of `text`, returns where the unfinished one starts
+    function scan(text, final) {
+        const length = text.length
+        let values = row
+        let pos = 0
+        // Next ',' / newline at or after the scan position: -1 none left, -2 not searched yet
+        let comma = -2
+        let newline = -2
+        while (pos < length) {
+            let value = ''
+            let end = pos
+            if (text.charCodeAt(pos) === 34) {
+                // Quoted: find the closing quote, stepping over "" pairs
+                let quote = text.indexOf('"', pos + 1)
+                let escaped = false
+                while (quote !== -1 && text.charCodeAt(quote + 1) === 34) {
+                    escaped = true
+                    quote = text.indexOf('"', quote + 2)
+                }
+                // The quote may be half of a "" pair split across chunks
+                if (!final && (quote === -1 || quote + 1 === length)) break
+                // An unterminated quote runs to the end of the text
+                end = quote === -1 ? length : quote + 1
+                value = text.slice(pos + 1, quote === -1 ? length : quote)
+                if (escaped) value = value.replace(/""/g, '"')
+            }
+            if (comma !== -1 && comma < end) comma = text.indexOf(',', end)
+            if (newline !== -1 && newline < end) newline = text.indexOf('\\n', end)
+            let stop = comma === -1 || (newline !== -1 && newline < comma) ? newline : comma
+            if (stop === -1) {
+                if (!final) break
+                stop = length
+            }
+            // Unquoted text, or whatever follows a closing quote (usually nothing or a CR)
+            if (stop > end) {
+                const tail = text.slice(end, text.charCodeAt(stop - 1) === 13 ? stop - 1 : stop)
+                value = value === '' ? tail : value + tail
+            }
+            values.push(value)
+            pos = stop + 1
+            if (stop === length || text.charCodeAt(stop) === 10) {
+                endRow(values)
+                values = []
+            }
+        }
+        row = values
+        return pos
+    }
+
+    return {
+        feed(chunk) {
+            const text = rest ? rest + chunk : chunk
+            const pos = scan(text, false)
+            rest = pos < text.length ? text.slice(pos) : ''
+        },
+        end(chunk) {
+            scan(rest + (chunk || ''), true)
+            rest = ''
+            // Text ended right after a comma: the row's last field is empty
+            if (row.length) {
+                row.push('')
+                endRow(row)
+                row = []
+            }
+            return records
+        }
+    }
+}
+
+// Parses a CSV response while its body streams in; null when the body is an HTML page (sign-in, error)
+async function readCSV(response, timing, toRecord, onHeaders) {
+    const parser = createCSVParser(toRecord, onHeaders)
+    if (!response.body) return parser.end('')
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let parseMs = 0
+    let sniffed = false
+    for (let chunk = await reader.read(); !chunk.done; chunk = await reader.read()) {
+        const text = decoder.decode(chunk.value, { stream: true })
+        if (!sniffed && text.trim()) {
+            sniffed = true
+            if (text.trimStart().startsWith('<')) {
+                await reader.cancel()
+                return null
+            }
+        }
+        const start = timingNow()
+        parser.feed(text)
+        parseMs += timingNow() - start
+    }
+    const start = timingNow()
+    const records = parser.end(decoder.decode())
+    recordParse(timing, parseMs + timingNow() - start)
+    return records
+}
+"""
+
+
+# /api/posts?limit=&offset= in the workers: the list window is pushed down to
+# Google as a Visualization query (same clauses as gviz_query.build_query).
+GVIZ_QUERY_JS = """
+// ---- gviz query pushdown ----
+// A list window is fetched with a `tq` query, so Google drops drafts and the
+// content column and cuts the window before anything is downloaded. Queries
+// address columns by letter: the header row is read once per isolate and the
+// labels of every result are checked against it. Prebuilt/KV data, a warm
+// snapshot or an open breaker skip the query and the window is cut from the
+// snapshot instead.
+const LIST_FIELDS = ['id', 'title', 'slug', 'category', 'tags', 'author', 'date', 'status', 'meta_description', 'featured_image', 'excerpt']
+// status and title are text columns: their blank cells are '' in gviz, not null
+const PUBLISHED_WHERE = [['status', '!=', 'draft'], ['title', '!=', '']]
+const LIST_LIMIT_DEFAULT = 10
+const LIST_LIMIT_MAX = 50
+const LIST_CACHE_MAX = 64
+const LIST_CACHE = new Map()
+let SHEET_COLUMNS = null
+
+function columnLetter(index) {
+    let letters = ''
+    for (index += 1; index; index = Math.floor((index - 1) / 26)) {
+        letters = String.fromCharCode(65 + (index - 1) % 26) + letters
+    }
+    return letters
+}
+
+// The language has no escapes: use a quote the value does not contain
+function gvizLiteral(value) {
+    const text = String(value)
+    if (!text.includes("'")) return "'" + text + "'"
+    if (!text.includes('"')) return '"' + text + '"'
+    throw new Error('Value cannot be quoted in a gviz query')
+}
+
+function gvizCondition(letters, [name, op, value]) {
+    const letter = letters.get(name)
+    if (op === 'is null' || op === 'is not null') return `${letter} ${op}`
+    // Blank text cells are '' and match <>, but blank number/date cells are null and null <> 'x' is not true
+    if (op === '!=') return value === '' ? `${letter} <> ''` : `(${letter} <> ${gvizLiteral(value)} or ${letter} is null)`
+    return `${letter} ${op} ${gvizLiteral(value)}`
+}
+
+// `where`: [[name, op, value]] joined with `and`; an array of conditions in place of one is joined with `or`.
+// Null when a filter column is missing (dropping it would change the rows).
+function gvizQuery(columns, select, where, limit, offset) {
+    const letters = new Map()
+    columns.forEach((name, index) => {
+        if (name && !letters.has(name)) letters.set(name, columnLetter(index))
+    })
+    const selected = select.filter(name => letters.has(name))
+    const conditions = where.map(item => Array.isArray(item[0]) ? item : [item])
+    if (!selected.length || conditions.some(group => group.some(([name]) => !letters.has(name)))) return null
+    let query = 'select ' + selected.map(name => letters.get(name)).join(', ')
+    if (conditions.length) {
+        query += ' where ' + conditions.map(group => group.length > 1
+            ? '(' + group.map(condition => gvizCondition(letters, condition)).join(' or ') + ')'
+            : gvizCondition(letters, group[0])).join(' and ')
+    }
+    if (limit !== undefined) query += ' limit ' + limit
+    if (offset) query += ' offset ' + offset
+    return { query, selected }
+}
+
+function gvizUrl(source, query) {
+    return `https://docs.google.com/spreadsheets/d/${source.spreadsheetId}/gviz/tq?tqx=out:csv&headers=1` +
+        `&sheet=${encodeURIComponent(source.sheetName)}&tq=${encodeURIComponent(query)}`
+}
+
+// Rows of one query (null when it failed); `onHeaders` gets the result's labels
+function gvizFetch(source, query, timing, toRecord, onHeaders) {
+    return hedgedFetch([{ name: 'gviz-query', url: gvizUrl(source, query) }], timing, response => {
+        if (!response.ok || response.url.includes('accounts.google.com')) return null
+        return readCSV(response, timing, toRecord, onHeaders)
+    })
+}
+
+function listWindowParams(url) {
+    const limit = parseInt(url.searchParams.get('limit'), 10)
+    const offset = parseInt(url.searchParams.get('offset'), 10)
+    return {
+        limit: Math.min(LIST_LIMIT_MAX, limit > 0 ? limit : LIST_LIMIT_DEFAULT),
+        offset: offset > 0 ? offset : 0
+    }
+}
+
+function listFields(post) {
+    const fields = {}
+    LIST_FIELDS.forEach(name => {
+        if (post[name] !== undefined) fields[name] = post[name]
+    })
+    return fields
+}
+
+// The window cut from already published posts (the snapshot path)
+function listWindowPayload(posts, url) {
+    const { limit, offset } = listWindowParams(url)
+    return {
+        success: true,
+        posts: posts.slice(offset, offset + limit).map(listFields),
+        limit,
+        offset,
+        hasMore: posts.length > offset + limit
+    }
+}
+
+// Windows past the TTL or fetched before the latest purge marker
+async function dropStaleListWindows() {
+    for (const [key, entry] of LIST_CACHE) {
+        if (Date.now() - entry.fetchedAt >= SNAPSHOT_TTL_MS || await purgedSince(entry.fetchedAt)) LIST_CACHE.delete(key)
+    }
+}
+
+// `source`: { spreadsheetId, sheetName, where, toRecord, positionalIds } of the calling worker.
+// Resolves to the window payload, or null to cut it from the snapshot instead. With
+// `positionalIds` (toRecord falls back to the row number for a missing id) a window
+// is only served when every row in it has its own id.
+async function queryListWindow(url, source, timing) {
+    const snapshotWarm = SNAPSHOT && Date.now() - SNAPSHOT.fetchedAt < SNAPSHOT_TTL_MS
+    if (EMBEDDED_POSTS || DATA_URL || kvNamespace() || snapshotWarm || BREAKER.state !== 'closed') return null
+
+    const { limit, offset } = listWindowParams(url)
+    const key = limit + ':' + offset
+    const cached = LIST_CACHE.get(key)
+    if (cached && Date.now() - cached.fetchedAt < SNAPSHOT_TTL_MS && !(await purgedSince(cached.fetchedAt))) {
+        timing.cache('hit')
+        return cached.payload
+    }
+    if (cached) await dropStaleListWindows()
+    timing.cache('miss')
+
+    try {
+        if (!SHEET_COLUMNS) {
+            let headers = null
+            const rows = await gvizFetch(source, 'select * limit 1', timing, null, labels => { headers = labels })
+            if (!rows || !headers) return null
+            SHEET_COLUMNS = headers
+        }
+        // One extra row tells whether another window follows
+        const built = gvizQuery(SHEET_COLUMNS, LIST_FIELDS, source.where, limit + 1, offset)
+        if (!built || (source.positionalIds && !built.selected.includes('id'))) return null
+        let labels = null
+        let missingId = false
+        const toRecord = source.positionalIds
+            ? (record, index) => { if (!record.id) missingId = true; return source.toRecord(record, index) }
+            : source.toRecord
+        const rows = await gvizFetch(source, built.query, timing, toRecord, headers => { labels = headers })
+        if (!rows || missingId) return null
+        if (!labels || labels.join() !== built.selected.join()) {
+            // The sheet's columns moved since the header was read
+            SHEET_COLUMNS = null
+            return null
+        }
+        const payload = { success: true, posts: rows.slice(0, limit).map(listFields), limit, offset, hasMore: rows.length > limit }
+        if (LIST_CACHE.size >= LIST_CACHE_MAX) LIST_CACHE.delete(LIST_CACHE.keys().next().value)
+        LIST_CACHE.set(key, { payload, fetchedAt: Date.now() })
+        return payload
+    } catch (error) {
+        console.error('Error running gviz query:', error)
+        return null
+    }
+}
+"""
+
+# Signed purge endpoint: the Apps Script trigger (Script/purgeTrigger.js) POSTs
+# here after real sheet edits. Signature = HMAC-SHA256("<timestamp>.<body>").
+PURGE_JS = """
+// ---- Signed purge (/__purge) ----
+// The secret comes from a PURGE_SECRET Worker secret binding when present,
+// otherwise from the generator config. Without a secret the route is a 404.
+const PURGE_MAX_SKEW_SECONDS = 300
+// The purge time is written to KV (global, visible in other colos within about
+// a minute) and to the colo cache (immediate for sibling isolates)
+const PURGE_MARKER_KEY = 'purge:marker'
+const PURGE_MARKER_URL = 'https://purge.invalid/__purge-marker'
+const PURGE_MARKER_CHECK_MS = 5000
+// Latest purge time this isolate knows of, re-read at most every PURGE_MARKER_CHECK_MS
+const PURGE_MARKER = { at: 0, checkedAt: 0, pending: null }
+
+function purgeSecret() {
+    return (typeof PURGE_SECRET !== 'undefined' && PURGE_SECRET) || CONFIGURED_PURGE_SECRET
+}
+
+async function hmacHex(secret, message) {
+    const encoder = new TextEncoder()
+    const key = await crypto.subtle.importKey('raw', encoder.encode(secret), { name: 'HMAC', hash: 'SHA-256' }, false, ['sign'])
+    const signature = await crypto.subtle.sign('HMAC', key, encoder.encode(message))
+    return [...new Uint8Array(signature)].map(byte => byte.toString(16).padStart(2, '0')).join('')
+}
+
+function constantTimeEqual(a, b) {
+    if (a.length !== b.length) return false
+    let diff = 0
+    for (let i = 0; i < a.length; i++) diff |= a.charCodeAt(i) ^ b.charCodeAt(i)
+    return diff === 0
+}
+
+function purgeResponse(payload, status) {
+    return new Response(JSON.stringify(payload), {
+        status,
+        headers: { 'Content-Type': 'application/json', 'Cache-Control': 'no-store' }
+    })
+}
+
+async function handlePurge(request) {
+    const secret = purgeSecret()
+    if (!secret) return purgeResponse({ error: 'Not Found' }, 404)
+    if (request.method !== 'POST') return purgeResponse({ error: 'Method Not Allowed' }, 405)
+
+    const timestamp = request.headers.get('X-Purge-Timestamp') || ''
+    const signature = (request.headers.get('X-Purge-Signature') || '').toLowerCase()
+    const body = await request.text()
+
+    const skew = Math.abs(Date.now() / 1000 - Number(timestamp))
+    if (!timestamp || !(skew <= PURGE_MAX_SKEW_SECONDS)) {
+        METRICS.purges.rejected += 1
+        return purgeResponse({ success: false, error: 'timestamp outside allowed window' }, 401)
+    }
+    if (!constantTimeEqual(await hmacHex(secret, `${timestamp}.${body}`), signature)) {
+        METRICS.purges.rejected += 1
+        return purgeResponse({ success: false, error: 'bad signature' }, 401)
+    }
+
+    // Drop this isolate's snapshot, slug index, list windows and last-known-good copy...
+    const purgedAt = Date.now()
+    const dropped = SNAPSHOT !== null
+    SNAPSHOT = null
+    LIST_CACHE.clear()
+    LAST_GOOD = null
+    PURGE_MARKER.at = Math.max(PURGE_MARKER.at, purgedAt)
+    METRICS.purges.accepted += 1
+
+    // ...and leave the marker so other isolates and colos drop theirs too
+    await writePurgeMarker(purgedAt)
+
+    return purgeResponse({ success: true, dropped, purgedAt: new Date(purgedAt).toISOString() }, 200)
+}
+
+async function writePurgeMarker(purgedAt) {
+    const kv = kvNamespace()
+    try {
+        if (kv) await kv.put(PURGE_MARKER_KEY, String(purgedAt))
+        if (typeof caches !== 'undefined' && caches.default) {
+            await caches.default.put(PURGE_MARKER_URL, new Response(String(purgedAt), {
+                headers: { 'Cache-Control': `max-age=${Math.ceil(SNAPSHOT_TTL_MS / 1000)}` }
+            }))
+        }
+    } catch (error) {
+        console.error('Error writing purge marker:', error)
+    }
+}
+
+async function readPurgeMarker() {
+    const reads = []
+    const kv = kvNamespace()
+    if (kv) reads.push(kv.get(PURGE_MARKER_KEY).catch(() => null))
+    if (typeof caches !== 'undefined' && caches.default) {
+        reads.push(caches.default.match(PURGE_MARKER_URL).then(marker => marker ? marker.text() : null).catch(() => null))
+    }
+    return Math.max(0, ...(await Promise.all(reads)).map(Number).filter(Number.isFinite))
+}
+
+// Latest known purge time; concurrent requests share one marker read
+async function purgeMarkerTime() {
+    if (!PURGE_MARKER.pending && Date.now() - PURGE_MARKER.checkedAt >= PURGE_MARKER_CHECK_MS) {
+        PURGE_MARKER.checkedAt = Date.now()
+        PURGE_MARKER.pending = readPurgeMarker().then(at => {
+            PURGE_MARKER.at = Math.max(PURGE_MARKER.at, at)
+            PURGE_MARKER.pending = null
+        })
+    }
+    if (PURGE_MARKER.pending) await PURGE_MARKER.pending
+    return PURGE_MARKER.at
+}
+
+// True when any isolate, in any colo, accepted a purge after `fetchedAt`
+async function purgedSince(fetchedAt) {
+    if (!purgeSecret()) return false
+    return (await purgeMarkerTime()) > fetchedAt
+}
+"""
+
+
+# Posts prepared on the Python side (e.g. a multi-tab SheetDataset join)
+PREBUILT_DATA_JS = """
+// ---- Prebuilt data ----
+// Posts prepared by the generator: embedded at build time, or a single JSON
+// document (posts already joined with authors, categories...) fetched instead
+// of one Google request per tab.
+async function loadPrebuiltPosts(timing) {
+    if (EMBEDDED_POSTS) return EMBEDDED_POSTS
+    const kv = kvNamespace()
+    if (kv) {
+        try {
+            const posts = await timing.measure('kv', () => kv.get('snapshot:posts', 'json'))
+            if (Array.isArray(posts)) return posts
+        } catch (error) {
+            console.error('Error reading KV snapshot:', error)
+        }
+        recordUpstreamFailure('kv')
+    }
+    if (!DATA_URL) return null
+
+    try {
+        const response = await timing.measure('upstream', () => fetch(DATA_URL))
+        if (response.ok) {
+            const text = await timing.measure('upstream', () => response.text())
+            const data = measureParse(timing, () => JSON.parse(text))
+            return Array.isArray(data) ? data : (data.posts || [])
+        }
+        recordUpstreamFailure('data-url')
+    } catch (error) {
+        console.error('Error fetching prebuilt data:', error)
+        recordUpstreamFailure('data-url')
+    }
+    return null
+}
+
+// ---- KV data tier ----
+// kv_sync.py writes the API payloads as ready-made JSON, so these routes are
+// one KV read with no parsing or filtering in the worker.
+function kvNamespace() {
+    return KV_BINDING ? globalThis[KV_BINDING] || null : null
+}
+
+function kvKey(url) {
+    const path = url.pathname
+    if (path === '/api/posts') {
+        // List windows are not precomputed
+        if (url.searchParams.has('limit') || url.searchParams.has('offset')) return null
+        const page = parseInt(url.searchParams.get('page'), 10)
+        return page > 0 ? 'api:posts:page:' + page : 'api:posts'
+    }
+    if (path.startsWith('/api/post/')) {
+        // A malformed escape is no KV key: the sheet path answers it with 404
+        const slug = pathSlug(path, '/api/post/')
+        return slug === null ? null : 'api:post:' + slug
+    }
+    return { '/api/categories': 'api:categories', '/api/stats': 'api:stats', '/api/version': 'api:version' }[path] || null
+}
+
+// Precomputed JSON response for an /api route, or null to fall back to the snapshot
+async function serveKV(url, timing) {
+    const kv = kvNamespace()
+    const key = kv && kvKey(url)
+    if (!key) return null
+    try {
+        const body = await timing.measure('kv', () => kv.get(key))
+        if (body !== null) return new Response(body, { headers: { 'Content-Type': 'application/json' } })
+    } catch (error) {
+        console.error('Error reading KV key ' + key + ':', error)
+        recordUpstreamFailure('kv')
+    }
+    return null
+}
+"""
+
+
+# Post pages rendered by the generator (post_pages.prerendered_map): one shared
+# layout plus a head/body pair per slug, served without touching the data source.
+PRERENDERED_PAGES_JS = """
+// ---- Pre-rendered post pages ----
+const POST_HEAD_MARKER = '<!--post-head-->'
+const POST_BODY_MARKER = '<!--post-body-->'
+
+// Decoded slug after `prefix`; null for a malformed escape such as /post/%E0%A4%A (answered with 404)
+function pathSlug(path, prefix) {
+    try {
+        return decodeURIComponent(path.slice(prefix.length))
+    } catch (error) {
+        return null
+    }
+}
+
+// Full HTML for /post/<slug> when the generator rendered it, otherwise null
+function prerenderedPost(slug, timing) {
+    if (!PRERENDERED_PAGES || slug === null) return null
+    const parts = PRERENDERED_PAGES.pages[slug]
+    if (!parts) return null
+
+    const start = timingNow()
+    // Function replacements: page text may contain "$&" and similar patterns
+    const html = PRERENDERED_PAGES.layout
+        .replace(POST_HEAD_MARKER, () => parts[0])
+        .replace(POST_BODY_MARKER, () => parts[1])
+    timing.add('render', timingNow() - start, 'prerendered')
+    return new Response(html, {
+        headers: { 'Content-Type': 'text/html;charset=UTF-8', 'Cache-Control': 'public, max-age=300' }
+    })
+}
+"""
+
+
+# Sitemap, robots.txt and feeds built by build_artifacts (worker_artifacts form):
+# served with long cache lifetimes, ETag/Last-Modified revalidation and the
+# build-time gzip/brotli bodies.
+ARTIFACTS_JS = """
+// ---- Build artifacts (sitemap, robots.txt, RSS, Atom) ----
+const ARTIFACT_CACHE_CONTROL = 'public, max-age=86400, stale-while-revalidate=604800'
+const ARTIFACT_BYTES = new Map()
+
+function artifactBytes(path, encoding) {
+    const key = `${path}:${encoding}`
+    if (!ARTIFACT_BYTES.has(key)) {
+        const binary = atob(BUILD_ARTIFACTS[path][encoding])
+        const bytes = new Uint8Array(binary.length)
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i)
+        ARTIFACT_BYTES.set(key, bytes)
+    }
+    return ARTIFACT_BYTES.get(key)
+}
+
+function artifactNotModified(request, artifact) {
+    const ifNoneMatch = request.headers.get('If-None-Match')
+    if (ifNoneMatch) {
+        return ifNoneMatch.split(',').map(tag => tag.trim().replace(/^W\\//, '')).some(tag => tag === artifact.etag || tag === '*')
+    }
+    const ifModifiedSince = Date.parse(request.headers.get('If-Modified-Since') || '')
+    return !Number.isNaN(ifModifiedSince) && Date.parse(artifact.lastModified) <= ifModifiedSince
+}
+
+// Response for a built artifact path, otherwise null
+function serveArtifact(request, path, timing) {
+    if (!BUILD_ARTIFACTS || !Object.prototype.hasOwnProperty.call(BUILD_ARTIFACTS, path)) return null
+    const artifact = BUILD_ARTIFACTS[path]
+    const headers = new Headers({
+        'Content-Type': artifact.type,
+        'Cache-Control': ARTIFACT_CACHE_CONTROL,
+        'ETag': artifact.etag,
+        'Last-Modified': artifact.lastModified,
+        'Vary': 'Accept-Encoding'
+    })
+    if (artifactNotModified(request, artifact)) {
+        timing.add('artifact', 0, 'not-modified')
+        return new Response(null, { status: 304, headers })
+    }
+
+    const accepted = request.headers.get('Accept-Encoding') || ''
+    const encoding = ['br', 'gzip'].find(name => artifact[name] && new RegExp(`\\\\b${name}\\\\b`).test(accepted))
+    if (!encoding) return new Response(artifact.body, { headers })
+
+    headers.set('Content-Encoding', encoding)
+    // Already compressed at build time: the runtime must send the bytes as they are
+    const response = new Response(artifactBytes(path, encoding), { headers, encodeBody: 'manual' })
+    response.precompressed = true
+    timing.add('artifact', 0, encoding)
+    return response
+}
+"""
+
+
+# Server-rendered homepage: the /api payloads the page scripts would fetch are
+# inlined into the HTML and answered locally, so first paint needs no round-trip.
+# config['streamHtml'] sends the page shell before the snapshot is ready.
+# Raw string: the JS source keeps its own escape sequences.
+HOME_STATE_JS = r"""
+// ---- Server-rendered homepage state ----
+function escapeHtml(text) {
+    return String(text == null ? '' : text).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]))
+}
+
+// JSON that is safe inside a <script> block
+function inlineJson(value) {
+    return JSON.stringify(value).replace(/</g, '\\u003c').replace(/\u2028/g, '\\u2028').replace(/\u2029/g, '\\u2029')
+}
+
+// The first page of a posts payload; `partial` payloads are not answered locally
+function firstPagePayload(payload, limit) {
+    const posts = payload.posts || []
+    return posts.length > limit ? { ...payload, posts: posts.slice(0, limit), partial: true } : payload
+}
+
+// <script> tags answering the first GET of each complete payload in `routes` from inline JSON
+function hydrationScript(routes) {
+    return `<script type="application/json" id="initial-state">${inlineJson(routes)}</script>
+<script>
+(function () {
+    var routes = JSON.parse(document.getElementById('initial-state').textContent)
+    var realFetch = window.fetch ? window.fetch.bind(window) : null
+    window.fetch = function (input, init) {
+        var path = new URL(String(input && input.url ? input.url : input), location.href).pathname
+        var payload = routes[path]
+        if (payload && !payload.partial && !(init && init.method && init.method !== 'GET')) {
+            delete routes[path]
+            return Promise.resolve(new Response(JSON.stringify(payload), { headers: { 'Content-Type': 'application/json' } }))
+        }
+        return realFetch(input, init)
+    }
+})()
+</script>`
+}
+
+// Installs the hydration script before any page script runs
+function injectHydration(html, routes) {
+    const script = hydrationScript(routes)
+    return html.includes('<head>') ? html.replace('<head>', () => '<head>\n' + script) : script + html
+}
+
+// ---- Streamed HTML responses ----
+// With STREAM_HTML the response starts with the chunks that are ready (head, CSS
+// links, page shell) and promise chunks are written as they resolve, so the
+// browser fetches CDN assets while the sheet snapshot is still loading.
+async function htmlResponse(chunks, headers) {
+    if (!STREAM_HTML) {
+        return new Response((await Promise.all(chunks)).join(''), { headers })
+    }
+    const { readable, writable } = new TransformStream()
+    const writer = writable.getWriter()
+    const encoder = new TextEncoder()
+    ;(async () => {
+        try {
+            for (const chunk of chunks) {
+                await writer.write(encoder.encode(await chunk))
+            }
+        } catch (error) {
+            console.error('Error streaming page:', error)
+            await writer.write(encoder.encode('<p>Error loading content</p></body></html>')).catch(() => {})
+        } finally {
+            await writer.close().catch(() => {})
+        }
+    })()
+    return new Response(readable, { headers })
+}
+
+// A custom template streamed up to </head>; the hydration state follows once `routes` resolves
+function templateResponse(html, routes, headers) {
+    const headEnd = STREAM_HTML ? html.indexOf('</head>') : -1
+    if (headEnd < 0) {
+        return routes.then(resolved => htmlResponse([injectHydration(html, resolved)], headers))
+    }
+    return htmlResponse([html.slice(0, headEnd), routes.then(resolved => hydrationScript(resolved) + '\n' + html.slice(headEnd))], headers)
+}
+"""
+
+RUNTIME_BLOCKS = (WORKER_METRICS_JS, CSV_PARSER_JS, GVIZ_QUERY_JS, PREBUILT_DATA_JS, PURGE_JS,
+                  PRERENDERED_PAGES_JS, ARTIFACTS_JS, HOME_STATE_JS)
+# Above this size an object is emitted as JSON.parse('...'): V8 scans a string
+# literal and parses JSON much faster than it parses a JS object literal.
+JSON_PARSE_MIN_BYTES = 10 * 1024
+
+
+def data_literal(value):
+    """JS expression for a JSON-serializable build-time value"""
+    if value is None:
+        return 'null'
+    text = json.dumps(value, separators=(',', ':'))
+    if isinstance(value, (dict, list)) and len(text) >= JSON_PARSE_MIN_BYTES:
+        return f"JSON.parse({json.dumps(text)})"
+    return text
+
+
+def site_data_js(config, custom_html_template=None):
+    """Per-site constants the shared runtime reads (and the HTML template), in front of the runtime
+
+    Keys: embeddedPosts, kvBinding, dataUrl, purgeSecret, snapshotTtlSeconds,
+    prerenderedPages, buildArtifacts, postsPerPage, streamHtml, sheetGid (gid
+    of the configured tab, lets sheetVariants hedge with an export). Without an
+    explicit snapshotTtlSeconds the runtime picks the TTL: hours with a purge
+    secret and a bound KV namespace, otherwise a minute.
+    """
+    secret = config.get('purgeSecret') or None
+    ttl_seconds = config.get('snapshotTtlSeconds')
+    return (
+        f"const CUSTOM_HTML_TEMPLATE = {json.dumps(custom_html_template) if custom_html_template else 'null'}\n"
+        f"const EMBEDDED_POSTS = {data_literal(config.get('embeddedPosts'))}\n"
+        f"const KV_BINDING = {json.dumps(config.get('kvBinding') or None)}\n"
+        f"const DATA_URL = {json.dumps(config.get('dataUrl') or None)}\n"
+        f"const CONFIGURED_PURGE_SECRET = {json.dumps(secret)}\n"
+        f"const SNAPSHOT_TTL_SECONDS = {int(ttl_seconds) if ttl_seconds else 'null'}\n"
+        f"const SHEET_GID = {json.dumps(str(config['sheetGid']) if config.get('sheetGid') not in (None, '') else None)}\n"
+        f"const PRERENDERED_PAGES = {data_literal(config.get('prerenderedPages') or None)}\n"
+        f"const BUILD_ARTIFACTS = {data_literal(config.get('buildArtifacts') or None)}\n"
+        f"const HOME_FIRST_PAGE = {int(config.get('postsPerPage') or 6)}\n"
+        f"const STREAM_HTML = {'true' if config.get('streamHtml') else 'false'}\n"
+    )
+
+
+@lru_cache(maxsize=None)
+def shared_runtime():
+    """(version, minified runtime): built once per process, byte-identical for every site and generator"""
+    source = '\n'.join(RUNTIME_BLOCKS)
+    version = hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+    return version, f"const RUNTIME_VERSION = '{version}'\n" + minify_js(source)
+
+
+def assemble_worker(header, data, glue):
+    """Worker script: header comments, site data, shared runtime, then the generator's own code (minified)"""
+    version, runtime = shared_runtime()
+    return (f"{header.rstrip()}\n// Runtime: {version}\n\n// ---- Site data ----\n{data.strip()}\n\n"
+            f"// ---- Runtime {version} ----\n{runtime}// ---- Worker ----\n{minify_js(glue)}")